@@ -0,0 +1,387 @@
+"""
+Módulo que mantém agregados diários das transações, atualizados a cada operação (visões materializadas).
+
+Cada transação concluída com sucesso é somada, no momento em que é registrada, a três visões:
+
+    - por conta e dia: total em centavos e quantidade de cada tipo de transação;
+    - por agência e dia: total e quantidade de cada tipo de transação;
+    - fluxo líquido do banco por dia: créditos menos débitos.
+
+As consultas leem as visões diretamente, sem percorrer os históricos das contas. As transferências
+entram nas duas contas ("Transferencia" e "TransferenciaRecebida"), de modo que não alteram o fluxo
+líquido do banco.
+
+Os agregados não são persistidos. Ao iniciar, `AgregadosDiarios.carregar(contas)` soma os históricos
+das contas já existentes em uma thread, sem atrasar o início do serviço: enquanto a carga não termina,
+as operações nas contas ainda não carregadas são ignoradas pelos agregados, pois já estão nos
+históricos que a carga vai somar, e as demais são somadas normalmente; os relatórios desse intervalo
+são parciais (`carregando`). Com as contas de um snapshot (`snapshot.ContasSnapshot`), a carga lê as
+colunas dos históricos das contas ainda não usadas direto do arquivo mapeado, sem construir os objetos
+dessas contas. `recalcular` calcula os agregados do zero de forma síncrona e serve de
+referência para `verificar`, que compara os agregados mantidos de forma incremental com os
+recalculados.
+
+Classes:
+    AgregadosDiarios: Agregados diários das transações, atualizados a cada operação.
+    AgregadosNulos: Agregados que descartam as anotações, usados quando nenhum está ativo.
+
+Funções:
+    ativar(agregados): Define os agregados que recebem as anotações das operações.
+    ativo(): Retorna os agregados ativos.
+    recalcular(contas): Calcula os agregados do zero a partir dos históricos das contas.
+    verificar(agregados, contas): Retorna as divergências entre os agregados e os históricos.
+"""
+
+import bisect
+import threading
+from datetime import date
+from itertools import compress
+
+from historico import TIPOS_CREDITO, Historico, dia_de, fim_do_dia
+
+
+class AgregadosDiarios:
+    """
+    Agregados diários das transações, atualizados a cada operação.
+
+    Os totais de cada visão são listas `[total, quantidade]` indexadas pelo nome do tipo da transação.
+    Uma única trava protege as três visões; ela é adquirida depois da trava da conta e não chama
+    nenhum outro código, então não participa de ciclos de travas.
+
+    Durante a carga em segundo plano, uma conta é carregada com a sua trava adquirida, a mesma com que
+    as operações registram o histórico e anotam os agregados; por isso cada transação é somada uma
+    única vez, pela carga (se registrada antes de a conta ser carregada) ou pela anotação.
+
+    Propriedades:
+        carregando (bool): Se a carga em segundo plano ainda não terminou.
+
+    Métodos:
+        anotar_transacao(conta, tipo, valor, timestamp): Soma uma transação de uma conta.
+        anotar_transferencia(origem, destino, valor, timestamp): Soma os dois lados de uma transferência.
+        carregar(contas): Soma em segundo plano os históricos das contas existentes.
+        carregar_historico(conta): Soma todas as transações do histórico de uma conta.
+        conta_no_dia(conta, dia=None): Retorna os totais de uma conta em um dia.
+        agencia_no_dia(agencia, dia=None): Retorna os totais de uma agência em um dia.
+        fluxo_liquido(dia=None): Retorna o fluxo líquido do banco em um dia.
+        relatorio(dia=None): Retorna o relatório de fim de dia.
+    """
+
+    def __init__(self):
+        """
+        Inicializa agregados vazios.
+        """
+        self._por_conta = {}
+        self._por_agencia = {}
+        self._fluxo = {}
+        self._trava = threading.Lock()
+        self._corte = None
+        self._carregadas = None
+
+    @property
+    def carregando(self):
+        """Retorna se a carga em segundo plano dos históricos ainda não terminou."""
+        return self._corte is not None
+
+    def _ignorar(self, conta):
+        """
+        Indica se uma operação da conta será somada pela carga em andamento, por ser uma conta já
+        existente e ainda não carregada; deve ser chamado com a trava adquirida.
+        """
+        numero = int(conta.numero)
+        return numero <= self._corte and numero not in self._carregadas
+
+    def _marcar(self, numero):
+        """Marca uma conta como carregada: as operações seguintes nela passam a ser somadas."""
+        with self._trava:
+            if self._carregadas is not None:
+                self._carregadas.add(int(numero))
+
+    def _somar(self, agencia, numero, tipo, valor, dia, quantidade=1):
+        """Soma transações de um tipo às três visões; deve ser chamado com a trava adquirida."""
+        totais = self._por_conta.get((agencia, numero, dia))
+        if totais is None:
+            totais = self._por_conta[(agencia, numero, dia)] = {}
+        total = totais.get(tipo)
+        if total is None:
+            totais[tipo] = [valor, quantidade]
+        else:
+            total[0] += valor
+            total[1] += quantidade
+
+        agencias = self._por_agencia.get(dia)
+        if agencias is None:
+            agencias = self._por_agencia[dia] = {}
+        totais = agencias.get(agencia)
+        if totais is None:
+            totais = agencias[agencia] = {}
+        total = totais.get(tipo)
+        if total is None:
+            totais[tipo] = [valor, quantidade]
+        else:
+            total[0] += valor
+            total[1] += quantidade
+
+        self._fluxo[dia] = self._fluxo.get(dia, 0) + (valor if tipo in TIPOS_CREDITO else -valor)
+
+    def anotar_transacao(self, conta, tipo, valor, timestamp):
+        """
+        Soma uma transação concluída de uma conta.
+
+        Args:
+            conta (Conta): A conta movimentada.
+            tipo (str): O nome da classe da transação.
+            valor (int): O valor da transação, em centavos.
+            timestamp (int): A data registrada no histórico, em segundos desde a época.
+        """
+        dia = dia_de(timestamp)
+        with self._trava:
+            if self._corte is not None and self._ignorar(conta):
+                return
+            self._somar(conta.agencia, conta.numero, tipo, valor, dia)
+
+    def anotar_transferencia(self, origem, destino, valor, timestamp):
+        """
+        Soma os dois lados de uma transferência concluída.
+
+        Args:
+            origem (Conta): A conta debitada.
+            destino (Conta): A conta creditada.
+            valor (int): O valor transferido, em centavos.
+            timestamp (int): A data registrada nos históricos, em segundos desde a época.
+        """
+        dia = dia_de(timestamp)
+        with self._trava:
+            if self._corte is None or not self._ignorar(origem):
+                self._somar(origem.agencia, origem.numero, "Transferencia", valor, dia)
+            if self._corte is None or not self._ignorar(destino):
+                self._somar(destino.agencia, destino.numero, "TransferenciaRecebida", valor, dia)
+
+    def carregar(self, contas):
+        """
+        Soma em segundo plano os históricos das contas existentes, enquanto as novas operações são
+        anotadas normalmente.
+
+        Deve ser chamado antes de os agregados receberem anotações, por exemplo logo antes de `ativar`.
+        Se as contas têm o método `historicos` (como `snapshot.ContasSnapshot`), os históricos são lidos
+        por ele, sem construir as contas ainda não usadas.
+
+        Args:
+            contas (IndiceContas | ContasSnapshot | iterable): As contas cadastradas, percorridas pela
+                thread de carga.
+
+        Returns:
+            threading.Thread: A thread da carga, que termina quando `carregando` passa a ser falso.
+        """
+        if hasattr(contas, "ultimo_numero"):
+            corte = contas.ultimo_numero()
+        else:
+            corte = max((int(conta.numero) for conta in contas), default=0)
+        with self._trava:
+            self._corte = corte
+            self._carregadas = set()
+        carga = threading.Thread(target=self._carregar, args=(contas, corte), name="agregados", daemon=True)
+        carga.start()
+        return carga
+
+    def _carregar(self, contas, corte):
+        """
+        Soma os históricos das contas com número até `corte`, lidos com a trava de cada conta
+        adquirida ou, para as contas de um snapshot ainda não construídas, das colunas do arquivo.
+        """
+        try:
+            if hasattr(contas, "historicos"):
+                for agencia, numero, tipos, valores, datas in contas.historicos(self._marcar):
+                    if int(numero) <= corte:
+                        self._somar_historico(agencia, numero, tipos, valores, datas)
+            else:
+                for conta in contas:
+                    if int(conta.numero) <= corte:
+                        with conta.trava:
+                            self.carregar_historico(conta)
+        finally:
+            with self._trava:
+                self._corte = self._carregadas = None
+
+    def carregar_historico(self, conta):
+        """
+        Soma todas as transações do histórico de uma conta, agrupando-as antes de atualizar as visões.
+
+        O histórico está em ordem de data, então as transações de cada dia são localizadas por busca
+        binária e contadas e somadas por tipo com `array.count` e `compress`, sem um laço em Python
+        por transação.
+
+        Args:
+            conta (Conta): A conta cujo histórico será somado.
+        """
+        historico = conta.historico
+        self._somar_historico(conta.agencia, conta.numero, historico.tipos, historico.valores, historico.datas)
+        self._marcar(conta.numero)
+
+    def _somar_historico(self, agencia, numero, tipos, valores, datas):
+        """Soma as colunas do histórico de uma conta, agrupadas por dia e tipo."""
+        grupos = []
+        posicao = 0
+        while posicao < len(datas):
+            dia = date.fromtimestamp(datas[posicao])
+            final = bisect.bisect_left(datas, fim_do_dia(dia), posicao)
+            tipos_dia, valores_dia = tipos[posicao:final], valores[posicao:final]
+            for codigo in set(tipos_dia):
+                total = sum(compress(valores_dia, map(codigo.__eq__, tipos_dia)))
+                grupos.append((Historico.nome_tipo(codigo), total, dia, tipos_dia.count(codigo)))
+            posicao = final
+        with self._trava:
+            for tipo, total, dia, quantidade in grupos:
+                self._somar(agencia, numero, tipo, total, dia, quantidade)
+
+    @staticmethod
+    def _copiar(totais):
+        """Retorna uma cópia dos totais de uma visão, com tuplas (total, quantidade)."""
+        return {tipo: tuple(total) for tipo, total in totais.items()} if totais else {}
+
+    def conta_no_dia(self, conta, dia=None):
+        """
+        Retorna os totais de uma conta em um dia, sem percorrer o histórico.
+
+        Args:
+            conta (Conta): A conta consultada.
+            dia (date, optional): O dia consultado. Padrão é o dia atual.
+
+        Returns:
+            dict: O total em centavos e a quantidade, `(total, quantidade)`, de cada tipo de transação.
+        """
+        with self._trava:
+            return self._copiar(self._por_conta.get((conta.agencia, conta.numero, dia or date.today())))
+
+    def agencia_no_dia(self, agencia, dia=None):
+        """
+        Retorna os totais de uma agência em um dia.
+
+        Args:
+            agencia (str): A agência consultada.
+            dia (date, optional): O dia consultado. Padrão é o dia atual.
+
+        Returns:
+            dict: O total em centavos e a quantidade, `(total, quantidade)`, de cada tipo de transação.
+        """
+        with self._trava:
+            return self._copiar(self._por_agencia.get(dia or date.today(), {}).get(agencia))
+
+    def fluxo_liquido(self, dia=None):
+        """
+        Retorna o fluxo líquido do banco em um dia: créditos menos débitos.
+
+        Args:
+            dia (date, optional): O dia consultado. Padrão é o dia atual.
+
+        Returns:
+            int: O fluxo líquido em centavos.
+        """
+        return self._fluxo.get(dia or date.today(), 0)
+
+    def relatorio(self, dia=None):
+        """
+        Retorna o relatório de fim de dia: os totais de cada agência e o fluxo líquido do banco.
+
+        Args:
+            dia (date, optional): O dia do relatório. Padrão é o dia atual.
+
+        Returns:
+            dict: As chaves "dia", "agencias" (totais por agência, como em `agencia_no_dia`) e
+            "fluxo_liquido" (em centavos).
+        """
+        dia = dia or date.today()
+        with self._trava:
+            agencias = {agencia: self._copiar(totais) for agencia, totais in self._por_agencia.get(dia, {}).items()}
+            return {"dia": dia, "agencias": agencias, "fluxo_liquido": self._fluxo.get(dia, 0)}
+
+
+class AgregadosNulos:
+    """
+    Agregados que descartam as anotações. São os agregados ativos por padrão.
+    """
+
+    carregando = False
+
+    def anotar_transacao(self, conta, tipo, valor, timestamp):
+        pass
+
+    def anotar_transferencia(self, origem, destino, valor, timestamp):
+        pass
+
+    def relatorio(self, dia=None):
+        return {"dia": dia or date.today(), "agencias": {}, "fluxo_liquido": 0}
+
+
+_agregados_ativos = AgregadosNulos()
+
+
+def ativar(agregados):
+    """
+    Define os agregados que recebem as anotações das operações.
+
+    Args:
+        agregados (AgregadosDiarios): Os agregados, ou None para desativar.
+    """
+    global _agregados_ativos
+    _agregados_ativos = agregados if agregados is not None else AgregadosNulos()
+
+
+def ativo():
+    """
+    Retorna os agregados ativos.
+
+    Returns:
+        AgregadosDiarios | AgregadosNulos: Os agregados ativos.
+    """
+    return _agregados_ativos
+
+
+def recalcular(contas):
+    """
+    Calcula os agregados do zero, percorrendo os históricos de todas as contas antes de retornar.
+
+    Args:
+        contas (iterable): As contas cadastradas.
+
+    Returns:
+        AgregadosDiarios: Os agregados das transações registradas nos históricos.
+    """
+    agregados = AgregadosDiarios()
+    for conta in contas:
+        agregados.carregar_historico(conta)
+    return agregados
+
+
+def verificar(agregados, contas):
+    """
+    Compara os agregados mantidos de forma incremental com os recalculados a partir dos históricos.
+
+    Deve ser chamado sem operações em andamento, pois os históricos são lidos sem as travas das contas.
+
+    Args:
+        agregados (AgregadosDiarios): Os agregados a verificar.
+        contas (iterable): As contas cadastradas.
+
+    Returns:
+        list: As divergências, como tuplas `(visao, chave, esperado, encontrado)`, onde `visao` é
+        "conta", "agencia" ou "fluxo". A lista vazia indica agregados consistentes.
+    """
+    referencia = recalcular(contas)
+    divergencias = []
+    with agregados._trava:
+        visoes = (
+            ("conta", referencia._por_conta, agregados._por_conta),
+            ("agencia", _achatar(referencia._por_agencia), _achatar(agregados._por_agencia)),
+            ("fluxo", referencia._fluxo, agregados._fluxo),
+        )
+        for visao, esperados, encontrados in visoes:
+            for chave in esperados.keys() | encontrados.keys():
+                esperado, encontrado = esperados.get(chave), encontrados.get(chave)
+                if esperado != encontrado and (esperado or encontrado):
+                    divergencias.append((visao, chave, esperado, encontrado))
+    return divergencias
+
+
+def _achatar(por_agencia):
+    """Converte a visão por agência, indexada por dia e agência, em um dicionário indexado por (agência, dia)."""
+    return {(agencia, dia): totais for dia, agencias in por_agencia.items() for agencia, totais in agencias.items()}
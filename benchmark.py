@@ -0,0 +1,1153 @@
+"""
+Módulo de benchmarks do sistema bancário.
+
+Cada benchmark é uma função decorada com `benchmark` e pode ser executada pela linha de comando.
+
+Uso:
+    python benchmark.py --listar
+    python benchmark.py registro [outro_benchmark ...]
+"""
+
+import asyncio
+import os
+import gc
+import json
+import queue
+import random
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from array import array
+from datetime import datetime
+from decimal import Decimal
+
+from cliente import PessoaFisica
+from conta import ContaCorrente
+import agregados
+import diario
+from diario import Diario, PoliticaCommit
+from fechamento import FechamentoDiario, TabelaTarifas
+from historico import Historico
+from lote import ProcessadorLote
+from menu import gerar_extrato
+import particoes
+import regras
+import dinheiro
+import eventos
+import exportacao
+import extratos
+import idempotencia
+import metricas
+import snapshot
+from registro import AlocadorNumeros, ClienteRegistry, IndiceContas
+from repositorio import RepositorioMemoria, RepositorioSQLite
+from transacao import Deposito, Saque, Transferencia
+from validador_cpf import ValidadorCPF
+
+BENCHMARKS = {}
+
+
+def benchmark(funcao):
+    """
+    Registra uma função de benchmark pelo nome, sem o prefixo `bench_`.
+
+    Args:
+        funcao (callable): A função de benchmark.
+
+    Returns:
+        callable: A própria função, sem alterações.
+    """
+    BENCHMARKS[funcao.__name__.removeprefix("bench_")] = funcao
+    return funcao
+
+
+def cronometrar(funcao, *args):
+    """
+    Executa uma função uma vez e mede o tempo gasto.
+
+    Args:
+        funcao (callable): A função a ser medida.
+        *args: Argumentos repassados à função.
+
+    Returns:
+        float: O tempo gasto em segundos.
+    """
+    inicio = time.perf_counter()
+    funcao(*args)
+    return time.perf_counter() - inicio
+
+
+def gerar_clientes(quantidade):
+    """
+    Gera clientes fictícios com CPFs distintos.
+
+    Args:
+        quantidade (int): A quantidade de clientes a gerar.
+
+    Returns:
+        list: Lista de instâncias de PessoaFisica.
+    """
+    return [
+        PessoaFisica(nome=f"Cliente {i}", data_nascimento="01-01-1990", cpf=f"{i:011d}", endereco="Rua A, 1")
+        for i in range(quantidade)
+    ]
+
+
+@benchmark
+def bench_registro():
+    """Mede a busca de clientes por CPF no ClienteRegistry e na antiga varredura linear."""
+    consultas = 100_000
+    print(f"{'clientes':>10} {'registro (ns/busca)':>20} {'lista (ns/busca)':>18}")
+    for quantidade in (1_000, 10_000, 100_000, 1_000_000):
+        clientes = gerar_clientes(quantidade)
+        registro = ClienteRegistry(clientes)
+        cpfs = [f"{random.randrange(quantidade):011d}" for _ in range(consultas)]
+
+        def buscar_registro():
+            for cpf in cpfs:
+                registro.buscar(cpf)
+
+        tempo_registro = cronometrar(buscar_registro) / consultas * 1e9
+
+        tempo_lista = "-"
+        if quantidade <= 10_000:
+            amostra = cpfs[:200]
+
+            def buscar_lista():
+                for cpf in amostra:
+                    [cliente for cliente in clientes if cliente.cpf == cpf]
+
+            tempo_lista = f"{cronometrar(buscar_lista) / len(amostra) * 1e9:.0f}"
+
+        print(f"{quantidade:>10} {tempo_registro:>20.0f} {tempo_lista:>18}")
+
+
+@benchmark
+def bench_saque_historico_longo():
+    """Mede ContaCorrente.sacar em contas com históricos longos."""
+    saques = 10_000
+    print(f"{'historico':>10} {'contador (ns/saque)':>20} {'varredura (ns/saque)':>21}")
+    for tamanho in (1_000, 100_000, 1_000_000):
+        conta = ContaCorrente(numero=1, cliente=None, limite_saques=saques + 1)
+        deposito = Deposito(1)
+        for _ in range(tamanho):
+            conta.historico.adicionar_transacao(deposito)
+        conta._saldo = saques
+
+        def sacar():
+            for _ in range(saques):
+                conta.sacar(1)
+
+        tempo_contador = cronometrar(sacar) / saques * 1e9
+
+        amostra = 2
+
+        def varrer():
+            for _ in range(amostra):
+                len([transacao for transacao in conta.historico.transacoes if transacao["tipo"] == Saque.__name__])
+
+        tempo_varredura = cronometrar(varrer) / amostra * 1e9
+        print(f"{tamanho:>10} {tempo_contador:>20.0f} {tempo_varredura:>21.0f}")
+
+
+@benchmark
+def bench_extrato():
+    """Compara o extrato completo por concatenação com uma página de um período, em históricos longos."""
+    print(f"{'historico':>10} {'completo (ms)':>14} {'página do período (ms)':>22}")
+    for tamanho in (1_000, 100_000, 1_000_000):
+        historico = Historico()
+        codigo = Historico.codigo_tipo("Deposito")
+        inicio = int(time.time()) - tamanho
+        historico.carregar_colunas(
+            array("B", [codigo]) * tamanho, array("q", [100]) * tamanho, array("q", range(inicio, inicio + tamanho))
+        )
+
+        def completo():
+            extrato = ""
+            for transacao in historico.transacoes:
+                extrato += f"\n{transacao['tipo']}:\n\tR$ {transacao['valor']:.2f}"
+            return extrato
+
+        meio = inicio + tamanho // 2
+        tempo_completo = cronometrar(completo) * 1e3
+        tempo_pagina = cronometrar(lambda: list(gerar_extrato(historico, meio, meio + 3_600, 0, 20))) * 1e3
+        print(f"{tamanho:>10} {tempo_completo:>14.1f} {tempo_pagina:>22.3f}")
+
+
+@benchmark
+def bench_extrato_cache():
+    """Mede a latência de páginas e extratos completos sem cache e com o cache de extratos em janelas."""
+    repeticoes = 100
+    print(
+        f"{'historico':>10} {'página sem cache (ms)':>21} {'primeira página (ms)':>21} {'página repetida (ms)':>21} "
+        f"{'após depósito (ms)':>19} {'completo (ms)':>14}"
+    )
+    for tamanho in (1_000, 100_000, 1_000_000):
+        historico = Historico()
+        codigo = Historico.codigo_tipo("Deposito")
+        inicio = int(time.time()) - tamanho
+        historico.carregar_colunas(
+            array("B", [codigo]) * tamanho, array("q", [100]) * tamanho, array("q", range(inicio, inicio + tamanho))
+        )
+        sem_cache = extratos.ExtratosSemCache()
+        cache = extratos.CacheExtratos()
+        cursor = tamanho // 2
+        tempo_sem_cache = cronometrar(sem_cache.pagina, historico, None, None, cursor, 20) * 1e3
+        tempo_primeira = cronometrar(cache.pagina, historico, None, None, cursor, 20) * 1e3
+
+        def paginas():
+            for _ in range(repeticoes):
+                cache.pagina(historico, None, None, cursor, 20)
+
+        def depositos():
+            for indice in range(repeticoes):
+                historico.registrar("Deposito", 100, inicio + tamanho + indice)
+                cache.pagina(historico, None, None, len(historico.valores) - 20, 20)
+
+        tempo_pagina = cronometrar(paginas) / repeticoes * 1e3
+        tempo_deposito = cronometrar(depositos) / repeticoes * 1e3
+        tempo_completo = cronometrar(cache.pagina, historico) * 1e3
+        print(
+            f"{tamanho:>10} {tempo_sem_cache:>21.4f} {tempo_primeira:>21.4f} {tempo_pagina:>21.4f} "
+            f"{tempo_deposito:>19.4f} {tempo_completo:>14.1f}"
+        )
+    print(cache.estatisticas())
+
+
+@benchmark
+def bench_saldo_historico():
+    """Mede consultas de saldo em uma data e de extremos do saldo em históricos de 10^6 transações."""
+    tamanho = 1_000_000
+    consultas = 100_000
+    contas = 3
+    gerador = random.Random(12)
+    inicio = int(time.time()) - tamanho
+    deposito, saque = Historico.codigo_tipo("Deposito"), Historico.codigo_tipo("Saque")
+    historicos = []
+    tempo_carga = 0.0
+    for _ in range(contas):
+        historico = Historico()
+        tipos = array("B", (deposito if gerador.random() < 0.6 else saque for _ in range(tamanho)))
+        valores = array("q", (gerador.randint(1, 10_000) for _ in range(tamanho)))
+        tempo_carga += cronometrar(historico.carregar_colunas, tipos, valores, array("q", range(inicio, inicio + tamanho)))
+        historicos.append(historico)
+
+    datas = [gerador.randint(inicio - 10, inicio + tamanho + 10) for _ in range(consultas)]
+    tempo_saldo = cronometrar(lambda: [historico.saldo_em(data) for historico in historicos for data in datas])
+    periodos = [sorted((gerador.randint(inicio, inicio + tamanho), gerador.randint(inicio, inicio + tamanho))) for _ in range(consultas)]
+    tempo_extremos = cronometrar(lambda: [historico.extremos_saldo(a, b) for historico in historicos for a, b in periodos])
+
+    amostra = 3
+    historico = historicos[0]
+
+    def reproduzir():
+        for data in datas[:amostra]:
+            saldo = 0
+            for tipo, valor, momento in zip(historico.tipos, historico.valores, historico.datas):
+                if momento > data:
+                    break
+                saldo += valor if tipo == deposito else -valor
+
+    tempo_reproducao = cronometrar(reproduzir) / amostra
+    total = contas * consultas
+    print(f"contas: {contas} x {tamanho} transações (carga com índice: {tempo_carga:.2f} s)")
+    print(f"saldo_em:        {tempo_saldo / total * 1e6:>10.2f} µs/consulta ({total} consultas em {tempo_saldo:.2f} s)")
+    print(f"extremos_saldo:  {tempo_extremos / total * 1e6:>10.2f} µs/consulta ({total} consultas em {tempo_extremos:.2f} s)")
+    print(f"reprodução:      {tempo_reproducao * 1e6:>10.0f} µs/consulta")
+
+
+@benchmark
+def bench_dinheiro():
+    """Compara depósitos e saques com centavos inteiros, float e Decimal, incluindo o desvio de arredondamento."""
+    operacoes = 1_000_000
+    gerador = random.Random(13)
+    textos = [f"{gerador.randint(0, 500)}.{gerador.randint(0, 99):02d}" for _ in range(operacoes)]
+
+    def movimentar(valores, zero, limite, arredondar=None):
+        saldo = zero
+        for indice, valor in enumerate(valores):
+            if indice & 1:
+                if zero < valor <= limite and valor <= saldo:
+                    saldo -= valor
+            elif valor > zero:
+                saldo += valor
+            if arredondar:
+                saldo = arredondar(saldo, 2)
+        return saldo
+
+    representacoes = (
+        ("centavos (int)", dinheiro.para_centavos, 0, 50_000, None),
+        ("float", float, 0.0, 500.0, None),
+        ("float arredondado", float, 0.0, 500.0, round),
+        ("Decimal", Decimal, Decimal(0), Decimal(500), None),
+    )
+    exato = None
+    print(f"{'representação':>18} {'conversão (ns)':>15} {'operação (ns)':>14} {'operações/s':>12} {'desvio (centavos)':>18}")
+    for nome, converter, zero, limite, arredondar in representacoes:
+        inicio = time.perf_counter()
+        valores = [converter(texto) for texto in textos]
+        tempo_conversao = time.perf_counter() - inicio
+        inicio = time.perf_counter()
+        saldo = movimentar(valores, zero, limite, arredondar)
+        tempo = time.perf_counter() - inicio
+        centavos = Decimal(saldo) if isinstance(saldo, int) else Decimal(saldo) * 100
+        if exato is None:
+            exato = centavos
+        desvio = centavos - exato
+        print(
+            f"{nome:>18} {tempo_conversao / operacoes * 1e9:>15.0f} {tempo / operacoes * 1e9:>14.0f} "
+            f"{operacoes / tempo:>12.0f} {float(desvio):>18.2g}"
+        )
+
+    conta = ContaCorrente(numero=1, cliente=None, limite_saques=operacoes)
+    valores = [dinheiro.para_centavos(texto) for texto in textos]
+
+    def registrar():
+        for indice, valor in enumerate(valores):
+            (Saque if indice & 1 else Deposito)(valor).registrar(conta)
+
+    tempo = cronometrar(registrar)
+    print(f"\nConta em centavos, com histórico: {operacoes / tempo:.0f} operações/s; saldo R$ {dinheiro.formatar(conta.saldo)}")
+
+
+@benchmark
+def bench_eventos():
+    """Compara a vazão de depósitos e saques com uma mensagem no terminal por operação e com os destinos de eventos."""
+    operacoes = 200_000
+    deposito, saque = Deposito(100), Saque(100)
+
+    class DestinoPrint:
+        """Reproduz o comportamento anterior: um print com quebra de linha por operação."""
+
+        def __init__(self, arquivo):
+            self.arquivo = arquivo
+
+        def publicar(self, tipo, conta, valor, resultado):
+            print(eventos.mensagem(tipo, resultado), file=self.arquivo)
+
+    def movimentar(conta):
+        for _ in range(operacoes // 2):
+            deposito.registrar(conta)
+            saque.registrar(conta)
+
+    with open(os.devnull, "w", buffering=1) as terminal:
+        destinos = (
+            ("print por operação", DestinoPrint(terminal)),
+            ("console em blocos", eventos.DestinoConsole(terminal)),
+            ("fila", eventos.DestinoFila(queue.SimpleQueue())),
+            ("nulo", eventos.DestinoNulo()),
+        )
+        print(f"{'destino':>20} {'operações/s':>12} {'ganho':>7}")
+        base = None
+        for nome, destino in destinos:
+            conta = ContaCorrente(numero=1, cliente=None, limite_saques=operacoes)
+            eventos.ativar(destino)
+            try:
+                tempo = cronometrar(movimentar, conta)
+                if isinstance(destino, eventos.DestinoConsole):
+                    destino.descarregar()
+            finally:
+                eventos.ativar(None)
+            base = base or tempo
+            print(f"{nome:>20} {operacoes / tempo:>12.0f} {base / tempo:>6.2f}x")
+
+
+@benchmark
+def bench_metricas():
+    """Mede o custo da instrumentação: desligada, ligada e desligada de novo, em depósitos e saques."""
+    operacoes = 200_000
+    conta = ContaCorrente(numero=1, cliente=None, limite_saques=operacoes)
+    deposito, saque = Deposito(100), Saque(100)
+
+    def movimentar():
+        for _ in range(operacoes // 2):
+            deposito.registrar(conta)
+            saque.registrar(conta)
+
+    print(f"{'instrumentação':>16} {'ns/operação':>12} {'custo':>8}")
+    base = None
+    for nome, ligar in (("desligada", False), ("ligada", True), ("desligada", False)):
+        if ligar:
+            metricas.ativar()
+        tempo = min(cronometrar(movimentar) for _ in range(3)) / operacoes * 1e9
+        if ligar:
+            instantaneo = metricas.ativo().instantaneo()
+            metricas.desativar()
+        base = base or tempo
+        print(f"{nome:>16} {tempo:>12.0f} {tempo / base - 1:>+8.1%}")
+
+    print()
+    for operacao, latencia in sorted(instantaneo["latencias_ns"].items()):
+        if not latencia["contagem"]:
+            continue
+        print(
+            f"{operacao:<28} {latencia['contagem']:>8} chamadas  p50 {latencia['p50']:>6} ns  "
+            f"p99 {latencia['p99']:>6} ns  p99.9 {latencia['p999']:>7} ns"
+        )
+
+
+def medir_memoria(funcao):
+    """
+    Executa uma função e mede a memória alocada que permanece em uso pelo seu resultado.
+
+    Args:
+        funcao (callable): A função a ser medida.
+
+    Returns:
+        tuple: O resultado da função e a quantidade de bytes alocados.
+    """
+    tracemalloc.start()
+    inicio = tracemalloc.get_traced_memory()[0]
+    resultado = funcao()
+    fim = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return resultado, fim - inicio
+
+
+@benchmark
+def bench_memoria_historico():
+    """Compara a memória por transação do histórico colunar com a lista de dicionários original."""
+    tamanho = 1_000_000
+    deposito = Deposito(10_000)
+
+    def historico_dicionarios():
+        transacoes = []
+        for i in range(tamanho):
+            transacoes.append(
+                {
+                    "tipo": deposito.__class__.__name__,
+                    "valor": deposito.valor + i,
+                    "data": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
+                }
+            )
+        return transacoes
+
+    def historico_colunar():
+        historico = Historico()
+        for _ in range(tamanho):
+            historico.adicionar_transacao(deposito)
+        return historico
+
+    _, bytes_dicionarios = medir_memoria(historico_dicionarios)
+    _, bytes_colunar = medir_memoria(historico_colunar)
+    print(f"{'armazenamento':>14} {'bytes/transação':>16}")
+    print(f"{'dicionários':>14} {bytes_dicionarios / tamanho:>16.1f}")
+    print(f"{'colunar':>14} {bytes_colunar / tamanho:>16.1f}")
+
+
+def memoria_residente():
+    """
+    Retorna a memória residente do processo, medida pelo sistema operacional.
+
+    Returns:
+        int: A memória residente em bytes.
+    """
+    gc.collect()
+    with open("/proc/self/statm") as statm:
+        return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+
+@benchmark
+def bench_memoria_contas(quantidade=10_000_000):
+    """Mede bytes por cliente, por conta e por transação com o banco populado com 10 milhões de contas."""
+    contas_movimentadas = min(quantidade, 1_000_000)
+    transacoes_por_conta = 8
+    inicio = memoria_residente()
+    clientes = ClienteRegistry(gerar_clientes(quantidade))
+    depois_clientes = memoria_residente()
+    contas = []
+    for numero, cliente in enumerate(clientes, 1):
+        conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero)
+        cliente.adicionar_conta(conta)
+        contas.append(conta)
+    depois_contas = memoria_residente()
+
+    deposito = Deposito(10_000)
+    for conta in contas[:contas_movimentadas]:
+        deposito.registrar(conta)
+    depois_primeira = memoria_residente()
+    for _ in range(transacoes_por_conta):
+        for conta in contas[:contas_movimentadas]:
+            deposito.registrar(conta)
+    depois_transacoes = memoria_residente()
+
+    print(f"contas: {quantidade}; memória residente total: {(depois_transacoes - inicio) / 2 ** 30:.2f} GiB")
+    print(f"{'por cliente (bytes)':>28} {(depois_clientes - inicio) / quantidade:>10.1f}")
+    print(f"{'por conta (bytes)':>28} {(depois_contas - depois_clientes) / quantidade:>10.1f}")
+    print(f"{'primeira transação (bytes)':>28} {(depois_primeira - depois_contas) / contas_movimentadas:>10.1f}")
+    total_transacoes = contas_movimentadas * transacoes_por_conta
+    print(f"{'por transação (bytes)':>28} {(depois_transacoes - depois_primeira) / total_transacoes:>10.1f}")
+
+
+def popular_banco(quantidade):
+    """
+    Cria clientes fictícios, cada um com uma conta corrente.
+
+    Args:
+        quantidade (int): A quantidade de clientes e contas.
+
+    Returns:
+        tuple: O registro de clientes e a lista de contas.
+    """
+    clientes = ClienteRegistry(gerar_clientes(quantidade))
+    contas = []
+    for numero, cliente in enumerate(clientes, 1):
+        conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero)
+        cliente.adicionar_conta(conta)
+        contas.append(conta)
+    return clientes, contas
+
+
+@benchmark
+def bench_repositorio():
+    """Compara os repositórios em memória e SQLite com 1 milhão de transações: gravação, carga e consultas."""
+    quantidade_contas = 1_000
+    transacoes = 1_000_000
+    consultas = 2_000
+    deposito = Deposito(100)
+
+    def movimentar(contas):
+        for indice in range(transacoes):
+            deposito.registrar(contas[indice % quantidade_contas])
+
+    def consultar(repositorio, contas, quantidade):
+        for indice in range(quantidade):
+            repositorio.consultar_transacoes(contas[indice % quantidade_contas])
+
+    print(f"{'repositório':>12} {'transações/s':>13} {'sincronização (s)':>18} {'carga da conta (ms)':>20} "
+          f"{'consultas/s':>12} {'4 threads':>10}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho = os.path.join(diretorio, "banco.sqlite3")
+        for nome in ("memória", "sqlite"):
+            clientes, contas = popular_banco(quantidade_contas)
+            if nome == "memória":
+                repositorio = RepositorioMemoria(clientes, contas)
+            else:
+                # Group commit sem espera: mede a gravação em bloco, não um fsync do diário por transação.
+                repositorio = RepositorioSQLite(caminho, politica=diario.PoliticaCommit(registros=10_000, aguardar=False))
+                repositorio.importar(clientes, contas)
+            diario.ativar(repositorio)
+            try:
+                tempo = cronometrar(movimentar, contas)
+                tempo_sincronizacao = cronometrar(repositorio.sincronizar)
+            finally:
+                diario.ativar(None)
+
+            tempo_carga = 0.0
+            if nome == "sqlite":
+                repositorio.fechar()
+                repositorio = RepositorioSQLite(caminho)
+                tempo_carga = cronometrar(repositorio.buscar_conta, quantidade_contas // 2)
+                contas = [repositorio.buscar_conta(numero) for numero in range(1, quantidade_contas + 1)]
+                assert sum(len(conta.historico.valores) for conta in contas) == transacoes
+
+            tempo_consultas = cronometrar(consultar, repositorio, contas, consultas)
+            threads = [
+                threading.Thread(target=consultar, args=(repositorio, contas, consultas // 4)) for _ in range(4)
+            ]
+            inicio = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            tempo_paralelo = time.perf_counter() - inicio
+            print(
+                f"{nome:>12} {transacoes / (tempo + tempo_sincronizacao):>13.0f} {tempo_sincronizacao:>18.2f} "
+                f"{tempo_carga * 1e3:>20.1f} {consultas / tempo_consultas:>12.0f} {consultas / tempo_paralelo:>10.0f}"
+            )
+            repositorio.fechar()
+        print(f"\nTamanho do banco SQLite: {os.path.getsize(caminho) / 2 ** 20:.1f} MiB")
+
+
+@benchmark
+def bench_indice_contas():
+    """Compara a busca de contas por número no índice com a varredura da lista e mede a alocação paralela."""
+    quantidade_contas = 100_000
+    buscas = 2_000
+    alocacoes = 200_000
+    _, contas = popular_banco(quantidade_contas)
+    indice = IndiceContas(contas)
+    numeros = [random.randrange(1, quantidade_contas + 1) for _ in range(buscas)]
+
+    def varrer():
+        for numero in numeros:
+            next(conta for conta in contas if conta.numero == numero)
+
+    def buscar():
+        for numero in numeros:
+            indice.buscar("0001", numero)
+
+    def paginar():
+        cursor = None
+        while True:
+            _, cursor = indice.intervalo(cursor, 10)
+            if cursor is None:
+                break
+
+    tempo_varredura = cronometrar(varrer)
+    tempo_indice = cronometrar(buscar)
+    print(f"Busca por número em {quantidade_contas} contas:")
+    print(f"  varredura da lista: {buscas / tempo_varredura:>12.0f} buscas/s")
+    print(f"  índice:             {buscas / tempo_indice:>12.0f} buscas/s ({tempo_varredura / tempo_indice:.0f}x)")
+    print(f"  paginação completa de 10 em 10: {cronometrar(paginar):.3f} s")
+
+    print(f"\nAlocação de {alocacoes} números:")
+    for threads in (1, 4):
+        alocador = AlocadorNumeros()
+        alocados = [[] for _ in range(threads)]
+
+        def alocar(destino):
+            for _ in range(alocacoes // threads):
+                destino.append(alocador.alocar())
+
+        trabalhadores = [threading.Thread(target=alocar, args=(destino,)) for destino in alocados]
+        inicio = time.perf_counter()
+        for trabalhador in trabalhadores:
+            trabalhador.start()
+        for trabalhador in trabalhadores:
+            trabalhador.join()
+        tempo = time.perf_counter() - inicio
+        unicos = len({numero for destino in alocados for numero in destino})
+        assert unicos == alocacoes
+        print(f"  {threads} thread(s): {alocacoes / tempo:>12.0f} números/s, sem repetição")
+
+
+@benchmark
+def bench_agregados(transacoes=100_000_000):
+    """Compara o relatório de fim de dia lido dos agregados com a varredura dos históricos, com 10^8 transações."""
+    quantidade_contas = 10_000
+    dias = 30
+    operacoes_incrementais = 200_000
+    por_conta = transacoes // quantidade_contas
+    hoje = datetime.combine(datetime.now().date(), datetime.min.time())
+    primeiro_dia = int(hoje.timestamp()) - (dias - 1) * 86_400
+    codigos = array("B", [Historico.codigo_tipo("Deposito"), Historico.codigo_tipo("Saque")])
+    tipos = array("B", (codigos[i % 3 == 2] for i in range(por_conta)))
+    valores = array("q", (i % 500 + 1 for i in range(por_conta)))
+    datas = array("q", (primeiro_dia + i * dias * 86_400 // por_conta for i in range(por_conta)))
+
+    _, contas = popular_banco(quantidade_contas)
+    for conta in contas:
+        conta.historico.carregar_colunas(tipos, valores, datas)
+    dia = hoje.date()
+
+    def relatorio_por_varredura():
+        return agregados.recalcular(contas).relatorio(dia)
+
+    def relatorio_materializado():
+        relatorio = materializados.relatorio(dia)
+        for conta in contas:
+            materializados.conta_no_dia(conta, dia)
+        return relatorio
+
+    inicio = time.perf_counter()
+    materializados = agregados.recalcular(contas)
+    tempo_varredura = time.perf_counter() - inicio
+    tempo_materializado = cronometrar(relatorio_materializado)
+    assert relatorio_materializado() == relatorio_por_varredura()
+    print(f"{quantidade_contas} contas, {por_conta * quantidade_contas} transações em {dias} dias")
+    print(f"  relatório varrendo os históricos: {tempo_varredura:>10.3f} s")
+    print(f"  relatório lido dos agregados:     {tempo_materializado:>10.4f} s (inclui os totais de cada conta)")
+    print(f"  fluxo líquido do dia:             {cronometrar(materializados.fluxo_liquido, dia) * 1e6:>10.1f} µs")
+    del materializados
+
+    deposito = Deposito(100)
+
+    def movimentar(contas):
+        for indice in range(operacoes_incrementais):
+            deposito.registrar(contas[indice % quantidade_contas])
+
+    tempos = {False: [], True: []}
+    for _ in range(3):
+        for ligado in (False, True):
+            _, contas = popular_banco(quantidade_contas)
+            incrementais = agregados.AgregadosDiarios() if ligado else None
+            agregados.ativar(incrementais)
+            try:
+                tempos[ligado].append(cronometrar(movimentar, contas))
+            finally:
+                agregados.ativar(None)
+    custo = (min(tempos[True]) - min(tempos[False])) / operacoes_incrementais * 1e9
+    print(f"\nCusto da atualização incremental: {custo:.0f} ns por depósito")
+    divergencias = agregados.verificar(incrementais, contas)
+    print(f"Verificação de consistência: {len(divergencias)} divergência(s) entre agregados e históricos")
+
+
+@benchmark
+def bench_regras():
+    """Mede vereditos por segundo do motor de regras, operação a operação e em lotes, por taxa de recusa."""
+    quantidade_contas = 10_000
+    operacoes = 1_000_000
+    politicas = {
+        "padrão": regras.politica_padrao(50_000, 1_000),
+        "estendida": regras.Politica([
+            regras.LimitePorSaque(50_000),
+            regras.LimiteNoturno(50_000),
+            regras.SaquesPorDia(1_000),
+            regras.TetoDiario(10_000_000),
+            regras.Velocidade(1_000, 60, regras.TODAS),
+            regras.SaldoSuficiente(),
+            regras.ValorPositivo(),
+        ]).compilar(),
+    }
+    _, contas = popular_banco(quantidade_contas)
+    for conta in contas:
+        Deposito(1_000_000).registrar(conta)
+    agora = time.time()
+
+    print(f"{'política':>10} {'recusadas':>10} {'verificar (vereditos/s)':>24} {'avaliar (vereditos/s)':>22}")
+    for nome, politica in politicas.items():
+        for conta in contas:
+            conta.politica = politica
+        for taxa_invalidas in (0.001, 0.01, 0.1):
+            lote = [
+                (
+                    contas[random.randrange(quantidade_contas)],
+                    (Saque if indice % 3 else Deposito)(
+                        -1 if random.random() < taxa_invalidas else random.randrange(1, 10_000)
+                    ),
+                )
+                for indice in range(operacoes)
+            ]
+
+            def verificar():
+                for conta, transacao in lote:
+                    politica.verificar(conta, transacao.__class__.__name__, transacao.valor, agora)
+
+            tempo_verificar = cronometrar(verificar)
+            inicio = time.perf_counter()
+            vereditos = regras.avaliar_lote(lote, agora)
+            tempo_avaliar = time.perf_counter() - inicio
+            recusadas = sum(not veredito for veredito in vereditos) / operacoes
+            print(
+                f"{nome:>10} {recusadas:>10.1%} {operacoes / tempo_verificar:>24.0f} "
+                f"{operacoes / tempo_avaliar:>22.0f}"
+            )
+
+
+@benchmark
+def bench_fechamento(quantidade=10_000_000):
+    """Mede o fechamento diário em blocos vetorizados contra depósitos e saques conta a conta."""
+    contas_medidas = min(quantidade, 500_000)
+    tabela = TabelaTarifas(((0, 50), (100_000, 100), (1_000_000, 150)), 1_200, 200_000, 3_000)
+    fechamento = FechamentoDiario(tabela)
+    aleatorio = random.Random(22)
+    saldos = array("q", (aleatorio.randrange(-100_000, 2_000_000) for _ in range(quantidade)))
+    tempo_calculo = cronometrar(fechamento.calcular, saldos)
+    print(f"contas: {quantidade}; cálculo vetorizado dos lançamentos: {tempo_calculo:.2f} s")
+
+    _, contas = popular_banco(2 * contas_medidas)
+    em_lote, conta_a_conta = contas[:contas_medidas], contas[contas_medidas:]
+    ontem = int(time.time()) - 86_400
+    for conta in contas:
+        conta.historico.registrar("Deposito", 1, ontem)
+    for conta, saldo in zip(em_lote, saldos):
+        conta._saldo = saldo
+    for conta, saldo in zip(conta_a_conta, saldos):
+        conta._saldo = saldo
+
+    inicio = time.perf_counter()
+    resumo = fechamento.executar(em_lote)
+    tempo_lote = time.perf_counter() - inicio
+    inicio = time.perf_counter()
+    repeticao = fechamento.executar(em_lote)
+    tempo_repeticao = time.perf_counter() - inicio
+    assert repeticao.contas == 0 and repeticao.ignoradas == resumo.contas
+
+    inicio = time.perf_counter()
+    for conta in conta_a_conta:
+        juros, tarifas, cheque_especial = (int(coluna[0]) for coluna in fechamento.calcular([conta.saldo]))
+        if juros:
+            Deposito(juros).registrar(conta)
+        if tarifas + cheque_especial:
+            Saque(tarifas + cheque_especial).registrar(conta)
+    tempo_conta_a_conta = time.perf_counter() - inicio
+
+    escala = quantidade / contas_medidas
+    print(f"contas medidas: {contas_medidas}; lançamentos em {resumo.contas} contas; tempos estimados para {quantidade}")
+    print(f"{'modo':>22} {'medido (s)':>12} {'estimado (s)':>14} {'contas/s':>12}")
+    for nome, tempo in (
+        ("fechamento em blocos", tempo_lote),
+        ("repetição (ignoradas)", tempo_repeticao),
+        ("conta a conta", tempo_conta_a_conta),
+    ):
+        print(f"{nome:>22} {tempo:>12.2f} {tempo * escala:>14.1f} {contas_medidas / tempo:>12.0f}")
+
+
+@benchmark
+def bench_exportacao():
+    """Mede linhas por segundo da exportação colunar dos históricos, por formato e partição."""
+    quantidade_contas = 100_000
+    transacoes_por_conta = 10
+    _, contas = popular_banco(quantidade_contas)
+    inicio = int(time.time()) - 5 * 86_400
+    for conta in contas:
+        for indice in range(transacoes_por_conta):
+            conta.historico.registrar("Saque" if indice % 3 else "Deposito", 1_000 + indice, inicio + indice * 43_200)
+    linhas = quantidade_contas * transacoes_por_conta
+    formatos = ["csv"] + (["parquet", "arrow"] if exportacao.pa is not None else [])
+
+    print(f"linhas: {linhas}")
+    print(f"{'formato':>8} {'partição':>9} {'arquivos':>9} {'tempo (s)':>10} {'linhas/s':>12}")
+    for formato in formatos:
+        for particionar_por in exportacao.PARTICOES:
+            with tempfile.TemporaryDirectory() as diretorio:
+                exportador = exportacao.Exportador(diretorio, particionar_por, formato)
+                inicio = time.perf_counter()
+                resumo = exportador.exportar(contas)
+                tempo = time.perf_counter() - inicio
+            assert resumo.linhas == linhas
+            print(f"{formato:>8} {particionar_por:>9} {resumo.arquivos:>9} {tempo:>10.2f} {linhas / tempo:>12.0f}")
+
+
+@benchmark
+def bench_idempotencia(chaves=3_000_000):
+    """Mede o custo por operação das chaves de idempotência com o cache populado com milhões de chaves."""
+    operacoes = 200_000
+    _, contas = popular_banco(10_000)
+    cache = idempotencia.CacheIdempotencia(capacidade=chaves)
+    antes = memoria_residente()
+    for indice in range(chaves):
+        cache.memorizar(contas[indice % len(contas)], f"chave-{indice}", "Deposito", 100, eventos.Resultado.SUCESSO)
+    bytes_por_chave = (memoria_residente() - antes) / chaves
+    idempotencia.ativar(cache)
+
+    def depositar(chaves_usadas):
+        for indice in range(operacoes):
+            Deposito(100, chaves_usadas and f"{chaves_usadas}-{indice}").registrar(contas[indice % len(contas)])
+
+    def repetir():
+        for indice in range(operacoes):
+            Deposito(100, f"chave-{indice}").registrar(contas[indice % len(contas)])
+
+    try:
+        tempos = {
+            "sem chave": cronometrar(depositar, None),
+            "repetição": cronometrar(repetir),
+            "chave nova": cronometrar(depositar, "nova"),
+        }
+    finally:
+        idempotencia.ativar(None)
+
+    print(f"chaves no cache: {len(cache)}; memória por chave: {bytes_por_chave:.0f} bytes")
+    print(f"{'depósito':>12} {'µs/operação':>12} {'custo extra (µs)':>17}")
+    for nome, tempo in tempos.items():
+        por_operacao = tempo / operacoes * 1e6
+        print(f"{nome:>12} {por_operacao:>12.2f} {por_operacao - tempos['sem chave'] / operacoes * 1e6:>17.2f}")
+    print(cache.estatisticas())
+
+
+@benchmark
+def bench_lote():
+    """Mede a vazão do processamento em lote de arquivos CSV e JSONL."""
+    quantidade_registros = 500_000
+    clientes, contas = popular_banco(10_000)
+    with tempfile.TemporaryDirectory() as diretorio:
+        caminho_csv = os.path.join(diretorio, "lote.csv")
+        caminho_jsonl = os.path.join(diretorio, "lote.jsonl")
+        with open(caminho_csv, "w") as csv_, open(caminho_jsonl, "w") as jsonl:
+            csv_.write("cpf,conta,tipo,valor\n")
+            for i in range(quantidade_registros):
+                tipo = "saque" if i % 4 == 0 else "deposito"
+                if i % 2:
+                    cpf = f"{random.randrange(10_000):011d}"
+                    csv_.write(f"{cpf},,{tipo},{i % 500 + 1}\n")
+                    jsonl.write(f'{{"cpf": "{cpf}", "tipo": "{tipo}", "valor": {i % 500 + 1}}}\n')
+                else:
+                    numero = random.randrange(1, 10_001)
+                    csv_.write(f",{numero},{tipo},{i % 500 + 1}\n")
+                    jsonl.write(f'{{"conta": {numero}, "tipo": "{tipo}", "valor": {i % 500 + 1}}}\n')
+
+        print(f"{'formato':>8} {'registros/s':>12} {'sucessos':>9}")
+        for formato, caminho in (("csv", caminho_csv), ("jsonl", caminho_jsonl)):
+            processador = ProcessadorLote(clientes, contas)
+            inicio = time.perf_counter()
+            sucessos = sum(resultado.sucesso for resultado in processador.processar_arquivo(caminho))
+            tempo = time.perf_counter() - inicio
+            print(f"{formato:>8} {quantidade_registros / tempo:>12.0f} {sucessos:>9}")
+
+
+@benchmark
+def bench_validar_cpf_lote():
+    """Compara ValidadorCPF.validar CPF a CPF com ValidadorCPF.validar_lote."""
+    print(f"{'cpfs':>10} {'validar (s)':>12} {'validar_lote (s)':>17} {'aceleração':>11}")
+    for quantidade in (1_000_000, 10_000_000):
+        cpfs = [f"{random.randrange(10 ** 11):011d}" for _ in range(quantidade)]
+        for i in range(0, quantidade, 3):
+            cpfs[i] = f"{cpfs[i][:3]}.{cpfs[i][3:6]}.{cpfs[i][6:9]}-{cpfs[i][9:]}"
+
+        def validar_escalar():
+            for cpf in cpfs:
+                ValidadorCPF.validar(cpf)
+
+        tempo_escalar = cronometrar(validar_escalar)
+        tempo_lote = cronometrar(ValidadorCPF.validar_lote, cpfs)
+        print(f"{quantidade:>10} {tempo_escalar:>12.2f} {tempo_lote:>17.2f} {tempo_escalar / tempo_lote:>10.1f}x")
+
+
+@benchmark
+def bench_diario():
+    """Compara a vazão do diário com fsync por operação e com group commit."""
+    conta = ContaCorrente(numero=1, cliente=None)
+    cenarios = (
+        ("fsync por operação", 1, PoliticaCommit(), 2_000),
+        ("group commit, 8 threads", 8, PoliticaCommit(registros=8, atraso=0.002), 2_000),
+        ("group commit, 64 threads", 64, PoliticaCommit(registros=64, atraso=0.002), 500),
+        ("group commit sem espera", 1, PoliticaCommit(registros=1_000, atraso=0.01, aguardar=False), 200_000),
+    )
+    print(f"{'cenário':>26} {'operações/s':>12}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for nome, quantidade_threads, politica, operacoes_por_thread in cenarios:
+            diario = Diario(os.path.join(diretorio, f"{quantidade_threads}-{politica.registros}.diario"), politica)
+
+            def anotar():
+                for _ in range(operacoes_por_thread):
+                    diario.anotar_transacao(conta, "Deposito", 1_000, 0)
+
+            threads = [threading.Thread(target=anotar) for _ in range(quantidade_threads)]
+            inicio = time.perf_counter()
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            diario.fechar()
+            tempo = time.perf_counter() - inicio
+            print(f"{nome:>26} {quantidade_threads * operacoes_por_thread / tempo:>12.0f}")
+
+
+@benchmark
+def bench_snapshot():
+    """Mede o tempo de inicialização a partir de um snapshot mapeado em memória."""
+    print(f"{'contas':>10} {'gravação (s)':>13} {'inicialização (ms)':>19} {'1ª consulta (ms)':>17}")
+    for quantidade in (10_000, 1_000_000):
+        clientes, contas = popular_banco(quantidade)
+        deposito = Deposito(10_000)
+        for conta in contas:
+            deposito.registrar(conta)
+        with tempfile.TemporaryDirectory() as diretorio:
+            tempo_gravacao = cronometrar(snapshot.escrever, os.path.join(diretorio, snapshot.NOME_ARQUIVO), clientes, contas, 1)
+            del clientes, contas
+            gc.collect()
+
+            inicio = time.perf_counter()
+            restaurados, _ = snapshot.restaurar(diretorio)
+            tempo_inicializacao = time.perf_counter() - inicio
+            tempo_consulta = cronometrar(restaurados.buscar, f"{quantidade // 2:011d}")
+            print(f"{quantidade:>10} {tempo_gravacao:>13.2f} {tempo_inicializacao * 1e3:>19.2f} {tempo_consulta * 1e3:>17.3f}")
+            restaurados._snapshot.fechar()
+
+
+@benchmark
+def bench_transferencias():
+    """Executa transferências concorrentes, verifica a conservação do dinheiro e mede a vazão por threads."""
+    operacoes_por_thread = 20_000
+    print(f"{'threads':>8} {'transferências/s':>17} {'total conservado':>17}")
+    for quantidade_threads in (1, 2, 4, 8, 16):
+        _, contas = popular_banco(100)
+        for conta in contas:
+            Deposito(100_000).registrar(conta)
+        total_inicial = sum(conta.saldo for conta in contas)
+
+        def transferir(semente):
+            gerador = random.Random(semente)
+            for _ in range(operacoes_por_thread):
+                origem, destino = gerador.sample(contas, 2)
+                Transferencia(gerador.randint(100, 5_000), destino).registrar(origem)
+
+        threads = [threading.Thread(target=transferir, args=(semente,)) for semente in range(quantidade_threads)]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        tempo = time.perf_counter() - inicio
+
+        total_final = sum(conta.saldo for conta in contas)
+        saldos_coerentes = all(
+            conta.saldo == sum(
+                valor if Historico.nome_tipo(tipo) in ("Deposito", "TransferenciaRecebida") else -valor
+                for tipo, valor in zip(conta.historico.tipos, conta.historico.valores)
+            )
+            for conta in contas
+        )
+        conservado = total_final == total_inicial and saldos_coerentes
+        print(f"{quantidade_threads:>8} {quantidade_threads * operacoes_por_thread / tempo:>17.0f} {str(conservado):>17}")
+        if not conservado:
+            raise AssertionError(f"Total de dinheiro não conservado: {total_inicial} != {total_final}")
+
+
+async def executar_carga(host, porta, conexoes, requisicoes_por_conexao, janela, cpfs):
+    """
+    Gera carga de depósitos e saques sobre o servidor bancário, com pipelining em cada conexão.
+
+    Args:
+        host (str): O endereço do servidor.
+        porta (int): A porta do servidor.
+        conexoes (int): A quantidade de conexões simultâneas.
+        requisicoes_por_conexao (int): A quantidade de requisições enviadas por conexão.
+        janela (int): A quantidade máxima de requisições sem resposta em cada conexão.
+        cpfs (list): Os CPFs dos clientes usados nas requisições.
+
+    Returns:
+        tuple: As latências das requisições, em segundos, e o tempo total.
+    """
+    latencias = []
+
+    async def conexao(indice):
+        leitor, escritor = await asyncio.open_connection(host, porta, limit=2 ** 20)
+        envios = {}
+        liberadas = asyncio.Semaphore(janela)
+
+        async def receber():
+            for _ in range(requisicoes_por_conexao):
+                resposta = json.loads(await leitor.readline())
+                latencias.append(time.perf_counter() - envios.pop(resposta["id"]))
+                liberadas.release()
+
+        recepcao = asyncio.create_task(receber())
+        for numero in range(requisicoes_por_conexao):
+            await liberadas.acquire()
+            operacao = "sacar" if numero % 10 == 0 else "depositar"
+            cpf = cpfs[(indice + numero) % len(cpfs)]
+            envios[numero] = time.perf_counter()
+            escritor.write(json.dumps({"id": numero, "op": operacao, "cpf": cpf, "valor": 10}).encode() + b"\n")
+        await recepcao
+        escritor.close()
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(conexao(indice) for indice in range(conexoes)))
+    return latencias, time.perf_counter() - inicio
+
+
+@benchmark
+def bench_servidor():
+    """Mede latência p50/p99 e requisições por segundo do servidor bancário em outro processo."""
+    cpfs = gerar_cpfs_validos(1_000)
+    with tempfile.TemporaryDirectory() as diretorio:
+        processo = subprocess.Popen(
+            [sys.executable, os.path.join(os.path.dirname(os.path.abspath(__file__)), "servidor.py"),
+             "--porta", "0", "--dados", diretorio],
+            stdout=subprocess.PIPE, text=True,
+        )
+        try:
+            porta = int(processo.stdout.readline().rsplit(":", 1)[1])
+
+            async def preparar():
+                leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+                for cpf in cpfs:
+                    for requisicao in (
+                        {"op": "criar_cliente", "cpf": cpf, "nome": "Cliente", "data_nascimento": "01-01-1990",
+                         "endereco": "Rua A, 1"},
+                        {"op": "criar_conta", "cpf": cpf},
+                    ):
+                        escritor.write(json.dumps(requisicao).encode() + b"\n")
+                for _ in range(2 * len(cpfs)):
+                    await leitor.readline()
+                escritor.close()
+
+            asyncio.run(preparar())
+
+            print(f"{'conexões':>9} {'janela':>7} {'requisições/s':>14} {'p50 (ms)':>9} {'p99 (ms)':>9}")
+            for conexoes, janela, por_conexao in ((1, 1, 20_000), (1, 64, 50_000), (100, 16, 2_000), (2_000, 4, 50)):
+                latencias, tempo = asyncio.run(executar_carga("127.0.0.1", porta, conexoes, por_conexao, janela, cpfs))
+                latencias.sort()
+                p50 = latencias[len(latencias) // 2] * 1e3
+                p99 = latencias[int(len(latencias) * 0.99)] * 1e3
+                print(f"{conexoes:>9} {janela:>7} {len(latencias) / tempo:>14.0f} {p50:>9.2f} {p99:>9.2f}")
+        finally:
+            processo.terminate()
+            processo.wait()
+
+
+@benchmark
+def bench_particoes():
+    """Mede a vazão do motor particionado por quantidade de processos e verifica a conservação do dinheiro."""
+    quantidade_contas = 10_000
+    operacoes_por_lote = 20_000
+    lotes = 10
+    print(f"{'processos':>10} {'operações/s':>12} {'total conservado':>17}")
+    for quantidade_processos in sorted({1, 2, 4, os.cpu_count() or 1}):
+        motor = particoes.MotorParticionado(quantidade_processos)
+        try:
+            motor.executar([("criar_conta", numero, f"{numero:011d}", "Cliente") for numero in range(1, quantidade_contas + 1)])
+            motor.executar([("depositar", numero, 100_000) for numero in range(1, quantidade_contas + 1)])
+            gerador = random.Random(quantidade_processos)
+            operacoes = []
+            for _ in range(lotes):
+                lote = []
+                for numero in range(operacoes_por_lote):
+                    conta = gerador.randint(1, quantidade_contas)
+                    if numero % 4 == 0:
+                        lote.append(("transferir", conta, gerador.randint(100, 5_000), gerador.randint(1, quantidade_contas)))
+                    elif numero % 4 == 1:
+                        lote.append(("sacar", conta, 1_000))
+                    else:
+                        lote.append(("depositar", conta, 1_000))
+                operacoes.append(lote)
+
+            inicio = time.perf_counter()
+            resultados = [motor.executar(lote) for lote in operacoes]
+            tempo = time.perf_counter() - inicio
+
+            movimentado = sum(
+                (valor if tipo == "depositar" else -valor)
+                for lote, resultados_lote in zip(operacoes, resultados)
+                for (tipo, _, valor, *_), (sucesso, _) in zip(lote, resultados_lote)
+                if sucesso and tipo != "transferir"
+            )
+            saldos = motor.executar([("saldo", numero) for numero in range(1, quantidade_contas + 1)])
+            conservado = sum(saldo for _, saldo in saldos) == quantidade_contas * 100_000 + movimentado
+        finally:
+            motor.encerrar()
+        print(f"{quantidade_processos:>10} {lotes * operacoes_por_lote / tempo:>12.0f} {str(conservado):>17}")
+        if not conservado:
+            raise AssertionError("Total de dinheiro não conservado no motor particionado.")
+
+
+def gerar_cpfs_validos(quantidade):
+    """
+    Gera CPFs distintos com dígitos verificadores válidos.
+
+    Args:
+        quantidade (int): A quantidade de CPFs a gerar.
+
+    Returns:
+        list: Os CPFs, somente com dígitos.
+    """
+    cpfs = []
+    base = 100_000_000
+    while len(cpfs) < quantidade:
+        digitos = [int(digito) for digito in str(base)]
+        for pesos in (range(10, 1, -1), range(11, 1, -1)):
+            digitos.append(sum(d * p for d, p in zip(digitos, pesos)) * 10 % 11 % 10)
+        cpf = "".join(map(str, digitos))
+        if ValidadorCPF.validar(cpf):
+            cpfs.append(cpf)
+        base += 1
+    return cpfs
+
+
+def main(nomes):
+    """
+    Executa os benchmarks informados.
+
+    Args:
+        nomes (list): Nomes dos benchmarks a executar; `--listar` exibe os disponíveis.
+    """
+    if not nomes or "--listar" in nomes:
+        for nome, funcao in BENCHMARKS.items():
+            print(f"{nome}:\t{funcao.__doc__}")
+        return
+    for nome in nomes:
+        if nome not in BENCHMARKS:
+            print(f"\n@@@ Benchmark desconhecido: {nome} @@@")
+            continue
+        print(f"\n================ {nome.upper()} ================")
+        BENCHMARKS[nome]()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,38 @@
+"""
+Configuração compartilhada dos testes.
+
+Os módulos com um objeto ativo (diário, agregados, cache de idempotência, destino de eventos, cache
+de extratos e métricas) são restaurados ao padrão depois de cada teste, para que um teste não veja o
+estado ativado por outro.
+"""
+
+import pytest
+
+import agregados
+import diario
+import eventos
+import extratos
+import idempotencia
+import metricas
+from cliente import PessoaFisica
+from conta import ContaCorrente
+
+
+@pytest.fixture(autouse=True)
+def estado_padrao():
+    yield
+    diario.ativar(None)
+    agregados.ativar(None)
+    idempotencia.ativar(None)
+    eventos.ativar(None)
+    extratos.ativar(None)
+    metricas.desativar()
+
+
+def nova_conta(numero, saldo=0, cpf=None):
+    """Cria uma conta corrente com um titular próprio e o saldo informado, em centavos."""
+    cliente = PessoaFisica(nome=f"Titular {numero}", data_nascimento="01-01-1990", cpf=cpf or f"{numero:011d}", endereco="")
+    conta = ContaCorrente.nova_conta(cliente, str(numero))
+    cliente.adicionar_conta(conta)
+    conta._saldo = saldo
+    return conta
@@ -1,194 +1,263 @@
-"""
-Módulo para gerenciamento de contas bancárias, incluindo contas correntes com limites e histórico de transações.
-
-Classes:
-    Conta: Representa uma conta bancária básica.
-    ContaCorrente: Representa uma conta corrente com limites de saque e número máximo de saques.
-"""
-
-from historico import Historico
-
-
-class Conta:
-    """
-    Classe que representa uma conta bancária.
-
-    Atributos:
-        _saldo (float): Saldo da conta.
-        _numero (str): Número da conta.
-        _agencia (str): Agência da conta.
-        _cliente (object): Cliente associado à conta.
-        _historico (Historico): Histórico de transações da conta.
-
-    Métodos:
-        __init__(self, numero, cliente): Inicializa uma nova instância de Conta.
-        nova_conta(cls, cliente, numero): Cria uma nova conta para um cliente.
-        saldo(self): Retorna o saldo da conta.
-        numero(self): Retorna o número da conta.
-        agencia(self): Retorna a agência da conta.
-        cliente(self): Retorna o cliente associado à conta.
-        historico(self): Retorna o histórico de transações da conta.
-        sacar(self, valor): Realiza um saque na conta.
-        depositar(self, valor): Realiza um depósito na conta.
-    """
-
-    def __init__(self, numero, cliente):
-        """
-        Inicializa uma nova instância de Conta.
-
-        Args:
-            numero (str): Número da conta.
-            cliente (object): Cliente associado à conta.
-        """
-        self._saldo = 0
-        self._numero = numero
-        self._agencia = "0001"
-        self._cliente = cliente
-        self._historico = Historico()
-
-    @classmethod
-    def nova_conta(cls, cliente, numero):
-        """
-        Cria uma nova conta para um cliente.
-
-        Args:
-            cliente (object): Cliente que será associado à nova conta.
-            numero (str): Número da nova conta.
-
-        Returns:
-            Conta: Uma nova instância de Conta.
-        """
-        return cls(numero, cliente)
-
-    @property
-    def saldo(self):
-        """Retorna o saldo da conta."""
-        return self._saldo
-
-    @property
-    def numero(self):
-        """Retorna o número da conta."""
-        return self._numero
-
-    @property
-    def agencia(self):
-        """Retorna a agência da conta."""
-        return self._agencia
-
-    @property
-    def cliente(self):
-        """Retorna o cliente associado à conta."""
-        return self._cliente
-
-    @property
-    def historico(self):
-        """Retorna o histórico de transações da conta."""
-        return self._historico
-
-    def sacar(self, valor):
-        """
-        Realiza um saque na conta.
-
-        Args:
-            valor (float): Valor a ser sacado.
-
-        Returns:
-            bool: True se o saque foi realizado com sucesso, False caso contrário.
-        """
-        saldo = self.saldo
-        excedeu_saldo = valor > saldo
-
-        if excedeu_saldo:
-            print("\n@@@ Operação falhou! Você não tem saldo suficiente. @@@")
-        elif valor > 0:
-            self._saldo -= valor
-            print("\n=== Saque realizado com sucesso! ===")
-            return True
-        else:
-            print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
-        return False
-
-    def depositar(self, valor):
-        """
-        Realiza um depósito na conta.
-
-        Args:
-            valor (float): Valor a ser depositado.
-
-        Returns:
-            bool: True se o depósito foi realizado com sucesso, False caso contrário.
-        """
-        if valor > 0:
-            self._saldo += valor
-            print("\n=== Depósito realizado com sucesso! ===")
-        else:
-            print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
-            return False
-        return True
-
-
-class ContaCorrente(Conta):
-    """
-    Classe que representa uma conta corrente com limites de saque e número máximo de saques.
-
-    Atributos:
-        _limite (float): Limite de saque da conta.
-        _limite_saques (int): Número máximo de saques permitidos por dia.
-
-    Métodos:
-        __init__(self, numero, cliente, limite=500, limite_saques=3): Inicializa uma nova instância de ContaCorrente.
-        sacar(self, valor): Realiza um saque na conta corrente considerando os limites.
-        __str__(self): Retorna uma representação em string da conta corrente.
-    """
-
-    def __init__(self, numero, cliente, limite=500, limite_saques=3):
-        """
-        Inicializa uma nova instância de ContaCorrente.
-
-        Args:
-            numero (str): Número da conta.
-            cliente (object): Cliente associado à conta.
-            limite (float, optional): Limite de saque da conta. Padrão é 500.
-            limite_saques (int, optional): Número máximo de saques permitidos por dia. Padrão é 3.
-        """
-        super().__init__(numero, cliente)
-        self._limite = limite
-        self._limite_saques = limite_saques
-
-    def sacar(self, valor):
-        """
-        Realiza um saque na conta corrente considerando os limites.
-
-        Args:
-            valor (float): Valor a ser sacado.
-
-        Returns:
-            bool: True se o saque foi realizado com sucesso, False caso contrário.
-        """
-        from transacao import Saque  # Importação local para evitar importação circular
-        numero_saques = len(
-            [transacao for transacao in self.historico.transacoes if transacao["tipo"] == Saque.__name__]
-        )
-        excedeu_limite = valor > self._limite
-        excedeu_saques = numero_saques >= self._limite_saques
-
-        if excedeu_limite:
-            print("\n@@@ Operação falhou! O valor do saque excede o limite. @@@")
-        elif excedeu_saques:
-            print("\n@@@ Operação falhou! Número máximo de saques excedido. @@@")
-        else:
-            return super().sacar(valor)
-        return False
-
-    def __str__(self):
-        """
-        Retorna uma representação em string da conta corrente.
-
-        Returns:
-            str: Representação em string da conta corrente.
-        """
-        return f"""\
-            Agência:\t{self.agencia}
-            C/C:\t\t{self.numero}
-            Titular:\t{self.cliente.nome}
-        """
+"""
+Módulo para gerenciamento de contas bancárias, incluindo contas correntes com limites e histórico de transações.
+
+Cada conta possui uma trava própria, de modo que operações em contas diferentes podem ser executadas
+em paralelo, enquanto operações na mesma conta são serializadas. Saldos, valores e limites são
+inteiros em centavos (veja o módulo dinheiro).
+
+As operações não escrevem no terminal: retornam um `Resultado` (veja o módulo eventos), verdadeiro
+apenas em caso de sucesso, e quem chama decide como exibir o motivo de uma falha.
+
+Saques e depósitos são verificados pela política compilada da conta (veja o módulo regras). Os limites
+da conta corrente formam a política padrão; outra política pode ser atribuída a cada conta. Uma
+operação cujo saldo resultante passaria de `dinheiro.LIMITE_CENTAVOS` é recusada com VALOR_INVALIDO
+antes de alterar o saldo.
+
+Classes:
+    Conta: Representa uma conta bancária básica.
+    ContaCorrente: Representa uma conta corrente com limites de saque e número máximo de saques.
+
+Funções:
+    travar_contas(*contas): Adquire as travas de várias contas em uma ordem fixa.
+"""
+
+import threading
+from contextlib import ExitStack, contextmanager
+
+from dinheiro import LIMITE_CENTAVOS
+from eventos import Resultado
+from historico import Historico
+from regras import politica_padrao
+
+AGENCIA = "0001"
+
+
+@contextmanager
+def travar_contas(*contas):
+    """
+    Adquire as travas de várias contas sempre na mesma ordem (agência, número), evitando deadlocks
+    entre operações que envolvem as mesmas contas em ordens diferentes.
+
+    Args:
+        *contas (Conta): As contas a serem travadas.
+    """
+    unicas = {id(conta): conta for conta in contas}.values()
+    with ExitStack() as pilha:
+        for conta in sorted(unicas, key=lambda conta: (conta.agencia, conta.numero)):
+            pilha.enter_context(conta.trava)
+        yield
+
+
+class Conta:
+    """
+    Classe que representa uma conta bancária.
+
+    Atributos:
+        _saldo (int): Saldo da conta, em centavos.
+        _numero (str): Número da conta.
+        _agencia (str): Agência da conta.
+        _cliente (object): Cliente associado à conta.
+        _historico (Historico): Histórico de transações da conta, protegido pela mesma trava.
+        _trava (RLock): Trava que serializa as operações na conta.
+        _politica (PoliticaCompilada): Política que verifica os saques e depósitos.
+
+    Métodos:
+        __init__(self, numero, cliente): Inicializa uma nova instância de Conta.
+        nova_conta(cls, cliente, numero): Cria uma nova conta para um cliente.
+        saldo(self): Retorna o saldo da conta.
+        numero(self): Retorna o número da conta.
+        agencia(self): Retorna a agência da conta.
+        cliente(self): Retorna o cliente associado à conta.
+        historico(self): Retorna o histórico de transações da conta.
+        trava(self): Retorna a trava da conta.
+        politica(self): Retorna ou define a política de saques e depósitos da conta.
+        sacar(self, valor): Realiza um saque na conta.
+        depositar(self, valor): Realiza um depósito na conta.
+        transferir(self, destino, valor): Transfere um valor para outra conta.
+    """
+
+    __slots__ = ("_saldo", "_numero", "_agencia", "_cliente", "_historico", "_trava", "_politica")
+
+    def __init__(self, numero, cliente):
+        """
+        Inicializa uma nova instância de Conta.
+
+        Args:
+            numero (str): Número da conta.
+            cliente (object): Cliente associado à conta.
+        """
+        self._saldo = 0
+        self._numero = numero
+        self._agencia = AGENCIA
+        self._cliente = cliente
+        self._trava = threading.RLock()
+        self._historico = Historico(self._trava)
+        self._politica = politica_padrao()
+
+    @classmethod
+    def nova_conta(cls, cliente, numero):
+        """
+        Cria uma nova conta para um cliente.
+
+        Args:
+            cliente (object): Cliente que será associado à nova conta.
+            numero (str): Número da nova conta.
+
+        Returns:
+            Conta: Uma nova instância de Conta.
+        """
+        return cls(numero, cliente)
+
+    @property
+    def saldo(self):
+        """Retorna o saldo da conta."""
+        return self._saldo
+
+    @property
+    def numero(self):
+        """Retorna o número da conta."""
+        return self._numero
+
+    @property
+    def agencia(self):
+        """Retorna a agência da conta."""
+        return self._agencia
+
+    @property
+    def cliente(self):
+        """Retorna o cliente associado à conta."""
+        return self._cliente
+
+    @property
+    def historico(self):
+        """Retorna o histórico de transações da conta."""
+        return self._historico
+
+    @property
+    def trava(self):
+        """Retorna a trava que serializa as operações na conta."""
+        return self._trava
+
+    @property
+    def politica(self):
+        """Retorna a política que verifica os saques e depósitos da conta."""
+        return self._politica
+
+    @politica.setter
+    def politica(self, politica):
+        """
+        Define a política da conta.
+
+        Args:
+            politica (PoliticaCompilada): A política compilada, por exemplo `Politica([...]).compilar()`.
+        """
+        with self._trava:
+            self._politica = politica
+
+    def sacar(self, valor):
+        """
+        Realiza um saque na conta, se aprovado pela política da conta.
+
+        Args:
+            valor (int): Valor a ser sacado, em centavos.
+
+        Returns:
+            Resultado: SUCESSO ou o resultado da regra violada, por exemplo SALDO_INSUFICIENTE.
+        """
+        with self._trava:
+            resultado = self._politica.verificar(self, "Saque", valor)
+            if resultado and not -LIMITE_CENTAVOS <= self._saldo - valor <= LIMITE_CENTAVOS:
+                resultado = Resultado.VALOR_INVALIDO
+            if resultado:
+                self._saldo -= valor
+            return resultado
+
+    def depositar(self, valor):
+        """
+        Realiza um depósito na conta, se aprovado pela política da conta.
+
+        Args:
+            valor (int): Valor a ser depositado, em centavos.
+
+        Returns:
+            Resultado: SUCESSO ou o resultado da regra violada, por exemplo VALOR_INVALIDO.
+        """
+        with self._trava:
+            resultado = self._politica.verificar(self, "Deposito", valor)
+            if resultado and not -LIMITE_CENTAVOS <= self._saldo + valor <= LIMITE_CENTAVOS:
+                resultado = Resultado.VALOR_INVALIDO
+            if resultado:
+                self._saldo += valor
+            return resultado
+
+    def transferir(self, destino, valor):
+        """
+        Transfere um valor desta conta para outra, de forma atômica.
+
+        As travas das duas contas são mantidas durante toda a operação, de modo que nenhuma outra
+        operação observa o valor debitado de uma conta e ainda não creditado na outra.
+
+        Args:
+            destino (Conta): A conta que recebe o valor.
+            valor (int): Valor a ser transferido, em centavos.
+
+        Returns:
+            Resultado: SUCESSO, MESMA_CONTA, SALDO_INSUFICIENTE ou VALOR_INVALIDO.
+        """
+        with travar_contas(self, destino):
+            if destino is self:
+                return Resultado.MESMA_CONTA
+            if valor > self._saldo:
+                return Resultado.SALDO_INSUFICIENTE
+            if valor <= 0 or destino._saldo + valor > LIMITE_CENTAVOS:
+                return Resultado.VALOR_INVALIDO
+            self._saldo -= valor
+            destino._saldo += valor
+            return Resultado.SUCESSO
+
+
+class ContaCorrente(Conta):
+    """
+    Classe que representa uma conta corrente com limites de saque e número máximo de saques.
+
+    Os limites formam a política padrão da conta (`regras.politica_padrao`), compartilhada pelas
+    contas com os mesmos limites; são eles que o diário e os snapshots gravam.
+
+    Atributos:
+        _limite (int): Limite de saque da conta, em centavos.
+        _limite_saques (int): Número máximo de saques permitidos por dia.
+
+    Métodos:
+        __init__(self, numero, cliente, limite=50_000, limite_saques=3): Inicializa uma nova instância de ContaCorrente.
+        __str__(self): Retorna uma representação em string da conta corrente.
+    """
+
+    __slots__ = ("_limite", "_limite_saques")
+
+    def __init__(self, numero, cliente, limite=50_000, limite_saques=3):
+        """
+        Inicializa uma nova instância de ContaCorrente.
+
+        Args:
+            numero (str): Número da conta.
+            cliente (object): Cliente associado à conta.
+            limite (int, optional): Limite de saque da conta, em centavos. Padrão é 50.000 (R$ 500,00).
+            limite_saques (int, optional): Número máximo de saques permitidos por dia. Padrão é 3.
+        """
+        super().__init__(numero, cliente)
+        self._limite = limite
+        self._limite_saques = limite_saques
+        self._politica = politica_padrao(limite, limite_saques)
+
+    def __str__(self):
+        """
+        Retorna uma representação em string da conta corrente.
+
+        Returns:
+            str: Representação em string da conta corrente.
+        """
+        return f"""\
+            Agência:\t{self.agencia}
+            C/C:\t\t{self.numero}
+            Titular:\t{self.cliente.nome}
+        """
@@ -0,0 +1,337 @@
+"""
+Suíte de benchmarks de regressão do núcleo bancário.
+
+Cada caso mede uma operação do sistema, parametrizada pelo tamanho dos dados, e reporta o tempo por
+operação em nanossegundos. A suíte roda sem interação: `input()` recebe respostas programadas e a
+saída das operações é descartada. Os resultados são gravados em JSON e podem ser comparados com uma
+execução de referência (baseline); a suíte termina com código 1 se algum caso ficar mais lento que o
+limite de regressão configurado.
+
+Casos:
+    filtrar_cliente: Busca de clientes por CPF, pelo número de clientes cadastrados.
+    sacar_historico_longo: ContaCorrente.sacar, pelo tamanho do histórico da conta.
+    depositar: Conta.depositar, pelo tamanho do histórico da conta.
+    adicionar_transacao: Historico.adicionar_transacao, pelo tamanho do histórico.
+    exibir_extrato: Exibição do extrato completo pelo menu, pelo tamanho do histórico.
+    validar_cpf: ValidadorCPF.validar, pela quantidade de CPFs validados.
+    criar_conta: Criação de contas pelo menu, pelo número de contas cadastradas.
+
+Uso:
+    python desempenho.py --saida resultados.json
+    python desempenho.py --base base.json --limite 0.10
+    python desempenho.py --casos filtrar_cliente depositar --tamanho-maximo 10000
+"""
+
+import argparse
+import builtins
+import contextlib
+import gc
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime
+
+import menu
+from benchmark import gerar_clientes, gerar_cpfs_validos, popular_banco
+from conta import ContaCorrente
+from historico import Historico
+from registro import AlocadorNumeros, ClienteRegistry, IndiceContas
+from transacao import Deposito
+from validador_cpf import ValidadorCPF
+
+CASOS = {}
+
+
+def caso(*tamanhos):
+    """
+    Registra um caso da suíte pelo nome da função, com os tamanhos de dados a medir.
+
+    A função recebe o tamanho, prepara os dados e retorna a função a ser cronometrada e a quantidade
+    de operações que ela executa.
+
+    Args:
+        *tamanhos (int): Os tamanhos de dados do caso.
+
+    Returns:
+        callable: O decorador que registra o caso.
+    """
+
+    def registrar(funcao):
+        CASOS[funcao.__name__] = (funcao, tamanhos)
+        return funcao
+
+    return registrar
+
+
+@contextlib.contextmanager
+def sem_interacao(respostas=None):
+    """
+    Executa um trecho sem interação: descarta a saída e responde `input()` automaticamente.
+
+    Args:
+        respostas (callable, optional): Função que recebe a pergunta e retorna a resposta. Padrão é
+        responder sempre com texto vazio.
+    """
+    entrada = builtins.input
+    builtins.input = respostas or (lambda pergunta="": "")
+    try:
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            yield
+    finally:
+        builtins.input = entrada
+
+
+def conta_com_historico(tamanho):
+    """
+    Cria uma conta corrente com um histórico de depósitos do tamanho informado.
+
+    Args:
+        tamanho (int): A quantidade de transações no histórico.
+
+    Returns:
+        ContaCorrente: A conta criada, com saldo e limite de saques suficientes para os casos.
+    """
+    conta = ContaCorrente(numero=1, cliente=gerar_clientes(1)[0], limite_saques=10 ** 9)
+    codigo = Historico.codigo_tipo("Deposito")
+    inicio = int(time.time()) - tamanho
+    conta.historico.carregar_colunas([codigo] * tamanho, [100] * tamanho, range(inicio, inicio + tamanho))
+    conta._saldo = 100 * tamanho + 10 ** 12
+    return conta
+
+
+@caso(1_000, 10_000, 100_000, 1_000_000)
+def filtrar_cliente(tamanho):
+    """Busca 10.000 CPFs aleatórios entre `tamanho` clientes."""
+    clientes, _ = popular_banco(tamanho)
+    gerador = random.Random(tamanho)
+    cpfs = [f"{gerador.randrange(tamanho):011d}" for _ in range(10_000)]
+
+    def executar():
+        for cpf in cpfs:
+            menu.filtrar_cliente(cpf, clientes)
+
+    return executar, len(cpfs)
+
+
+@caso(1_000, 100_000, 1_000_000)
+def sacar_historico_longo(tamanho):
+    """Executa 10.000 saques em uma conta com `tamanho` transações no histórico."""
+    conta = conta_com_historico(tamanho)
+    operacoes = 10_000
+
+    def executar():
+        for _ in range(operacoes):
+            conta.sacar(1)
+
+    return executar, operacoes
+
+
+@caso(1_000, 100_000, 1_000_000)
+def depositar(tamanho):
+    """Executa 10.000 depósitos em uma conta com `tamanho` transações no histórico."""
+    conta = conta_com_historico(tamanho)
+    operacoes = 10_000
+
+    def executar():
+        for _ in range(operacoes):
+            conta.depositar(1)
+
+    return executar, operacoes
+
+
+@caso(1_000, 100_000, 1_000_000)
+def adicionar_transacao(tamanho):
+    """Acrescenta 10.000 transações a um histórico com `tamanho` transações."""
+    historico = conta_com_historico(tamanho).historico
+    deposito = Deposito(100)
+    operacoes = 10_000
+
+    def executar():
+        for _ in range(operacoes):
+            historico.adicionar_transacao(deposito)
+
+    return executar, operacoes
+
+
+@caso(100, 1_000, 10_000)
+def exibir_extrato(tamanho):
+    """Exibe pelo menu o extrato completo de uma conta com `tamanho` transações."""
+    conta = conta_com_historico(tamanho)
+    clientes = ClienteRegistry()
+    clientes.adicionar(conta.cliente)
+    conta.cliente.adicionar_conta(conta)
+    cpf = conta.cliente.cpf
+
+    def executar():
+        with sem_interacao(lambda pergunta="": cpf if "CPF" in pergunta else ""):
+            menu.exibir_extrato(clientes)
+
+    return executar, 1
+
+
+@caso(1_000, 10_000, 100_000)
+def validar_cpf(tamanho):
+    """Valida `tamanho` CPFs, metade válidos e metade inválidos."""
+    validos = gerar_cpfs_validos(min(tamanho, 1_000))
+    cpfs = [validos[i % len(validos)] if i % 2 else f"{i:011d}" for i in range(tamanho)]
+
+    def executar():
+        for cpf in cpfs:
+            ValidadorCPF.validar(cpf)
+
+    return executar, len(cpfs)
+
+
+@caso(1_000, 10_000, 100_000)
+def criar_conta(tamanho):
+    """Cria pelo menu até 1.000 contas em um banco com `tamanho` clientes e contas."""
+    clientes, contas = popular_banco(tamanho)
+    contas = IndiceContas(contas)
+    alocador = AlocadorNumeros(contas.ultimo_numero() + 1)
+    cpfs = [f"{i:011d}" for i in range(min(tamanho, 1_000))]
+    respostas = iter([])
+
+    def executar():
+        nonlocal respostas
+        respostas = iter(cpfs)
+        with sem_interacao(lambda pergunta="": next(respostas)):
+            for _ in cpfs:
+                menu.criar_conta(alocador, clientes, contas)
+
+    return executar, len(cpfs)
+
+
+def medir(preparar, tamanho, repeticoes):
+    """
+    Prepara um caso e mede o tempo por operação em várias repetições, sem coleta de lixo.
+
+    Args:
+        preparar (callable): A função do caso.
+        tamanho (int): O tamanho dos dados.
+        repeticoes (int): A quantidade de repetições.
+
+    Returns:
+        dict: A mediana, o mínimo e o máximo em nanossegundos por operação, e as repetições.
+    """
+    with sem_interacao():
+        executar, operacoes = preparar(tamanho)
+    tempos = []
+    gc.collect()
+    gc.disable()
+    try:
+        with sem_interacao():
+            for _ in range(repeticoes):
+                inicio = time.perf_counter_ns()
+                executar()
+                tempos.append((time.perf_counter_ns() - inicio) / operacoes)
+    finally:
+        gc.enable()
+    return {
+        "ns_por_operacao": statistics.median(tempos),
+        "minimo": min(tempos),
+        "maximo": max(tempos),
+        "repeticoes": repeticoes,
+    }
+
+
+def executar_suite(nomes=None, tamanho_maximo=None, repeticoes=5):
+    """
+    Executa os casos da suíte.
+
+    Args:
+        nomes (list, optional): Os casos a executar. Padrão é todos.
+        tamanho_maximo (int, optional): Ignora os tamanhos maiores que este.
+        repeticoes (int, optional): A quantidade de repetições de cada medida. Padrão é 5.
+
+    Returns:
+        dict: Os resultados, com os dados do ambiente e uma entrada "caso[tamanho]" por medida.
+    """
+    resultados = {}
+    for nome in nomes or CASOS:
+        preparar, tamanhos = CASOS[nome]
+        for tamanho in tamanhos:
+            if tamanho_maximo is not None and tamanho > tamanho_maximo:
+                continue
+            resultados[f"{nome}[{tamanho}]"] = medir(preparar, tamanho, repeticoes)
+            gc.collect()
+    return {
+        "data": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "resultados": resultados,
+    }
+
+
+def comparar(atual, base, limite):
+    """
+    Compara os resultados com uma execução de referência.
+
+    Args:
+        atual (dict): Os resultados da execução atual.
+        base (dict): Os resultados da execução de referência.
+        limite (float): A variação máxima tolerada, por exemplo 0.10 para 10% mais lento.
+
+    Returns:
+        list: Tuplas (medida, ns atual, ns de referência ou None, variação ou None, regrediu).
+    """
+    comparacao = []
+    referencias = base.get("resultados", {})
+    for medida, resultado in atual["resultados"].items():
+        tempo = resultado["ns_por_operacao"]
+        referencia = referencias.get(medida)
+        if referencia is None:
+            comparacao.append((medida, tempo, None, None, False))
+            continue
+        tempo_base = referencia["ns_por_operacao"]
+        variacao = tempo / tempo_base - 1 if tempo_base else 0.0
+        comparacao.append((medida, tempo, tempo_base, variacao, variacao > limite))
+    return comparacao
+
+
+def main(argumentos=None):
+    """
+    Executa a suíte pela linha de comando.
+
+    Args:
+        argumentos (list, optional): Os argumentos da linha de comando. Padrão é `sys.argv`.
+
+    Returns:
+        int: 0 se não houve regressão, 1 caso contrário.
+    """
+    parser = argparse.ArgumentParser(description="Suíte de benchmarks de regressão do núcleo bancário.")
+    parser.add_argument("--casos", nargs="+", choices=list(CASOS), help="Casos a executar. Padrão é todos.")
+    parser.add_argument("--tamanho-maximo", type=int, help="Ignora os tamanhos de dados maiores que este.")
+    parser.add_argument("--repeticoes", type=int, default=5, help="Repetições de cada medida. Padrão é 5.")
+    parser.add_argument("--saida", help="Arquivo JSON onde gravar os resultados.")
+    parser.add_argument("--base", help="Arquivo JSON de referência para detectar regressões.")
+    parser.add_argument("--limite", type=float, default=0.10,
+                        help="Variação máxima tolerada em relação à referência. Padrão é 0.10 (10%%).")
+    opcoes = parser.parse_args(argumentos)
+
+    atual = executar_suite(opcoes.casos, opcoes.tamanho_maximo, opcoes.repeticoes)
+    if opcoes.saida:
+        with open(opcoes.saida, "w", encoding="utf-8") as arquivo:
+            json.dump(atual, arquivo, indent=2, ensure_ascii=False)
+    base = {}
+    if opcoes.base:
+        with open(opcoes.base, encoding="utf-8") as arquivo:
+            base = json.load(arquivo)
+
+    regressoes = 0
+    print(f"{'medida':<36} {'ns/op':>12} {'referência':>12} {'variação':>9}")
+    for medida, tempo, tempo_base, variacao, regrediu in comparar(atual, base, opcoes.limite):
+        referencia = f"{tempo_base:>12.0f}" if tempo_base is not None else f"{'-':>12}"
+        texto_variacao = f"{variacao:>+9.1%}" if variacao is not None else f"{'-':>9}"
+        print(f"{medida:<36} {tempo:>12.0f} {referencia} {texto_variacao}{'  REGRESSÃO' if regrediu else ''}")
+        regressoes += regrediu
+    if regressoes:
+        print(f"\n@@@ {regressoes} medida(s) acima do limite de {opcoes.limite:.0%}. @@@")
+    return 1 if regressoes else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
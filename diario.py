@@ -0,0 +1,566 @@
+"""
+Módulo que define o diário de transações (write-ahead log) do sistema bancário.
+
+Cada depósito, saque, cliente e conta criados com sucesso é anotado no diário em um formato binário
+compacto antes de ser confirmado. Ao iniciar, o diário é reproduzido para reconstruir os clientes,
+as contas, os saldos e os históricos.
+
+Uma anotação de transação pode ser feita sem aguardar a gravação em disco (`aguardar=False`): ela
+retorna a marca da anotação, e quem a fez chama `confirmar(marca)` depois de liberar as travas das
+contas, para que o fsync do grupo não seja aguardado com as contas travadas.
+
+O diário é um diretório de segmentos numerados (`segmento-000001.diario`, ...). Apenas o último
+segmento recebe anotações; os anteriores podem ser descartados depois de cobertos por um snapshot.
+
+Formato dos registros:
+    Cabeçalho de 7 bytes (`<IBH`): CRC32 do conteúdo, tipo do registro e tamanho do conteúdo.
+    CLIENTE: cpf, nome, data de nascimento e endereço, cada um como texto (`<H` + UTF-8).
+    CONTA: número, limite em centavos e limite de saques (`<qqI`), seguidos do CPF do titular como texto.
+    TRANSACAO: número da conta, código do tipo, valor em centavos e data em segundos (`<qBqq`).
+    TRANSFERENCIA: números das contas de origem e destino, valor em centavos e data em segundos (`<qqqq`).
+
+Classes:
+    PoliticaCommit: Define quando o diário força a gravação em disco (fsync).
+    Diario: Diário de transações gravado em segmentos.
+    DiarioNulo: Diário que descarta as anotações, usado quando nenhum diário está ativo.
+
+Funções:
+    ativar(diario): Define o diário que recebe as anotações das operações.
+    segmentos(diretorio): Lista os segmentos de um diário.
+    ler(caminho): Lê os registros válidos de um segmento.
+    reproduzir(diretorio, clientes, contas, localizar_conta=None, a_partir_de=1): Aplica os segmentos a um estado.
+    restaurar(diretorio): Reconstrói clientes e contas a partir de um diário.
+"""
+
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from historico import TIPOS_CREDITO
+from registro import ClienteRegistry, IndiceContas
+
+CLIENTE = 1
+CONTA = 2
+TRANSACAO = 3
+TRANSFERENCIA = 4
+
+TIPOS_TRANSACAO = {
+    "Deposito": 1,
+    "Saque": 2,
+    "Transferencia": 3,
+    "TransferenciaRecebida": 4,
+    "Estorno": 5,
+    "Juros": 6,
+    "Tarifa": 7,
+    "JurosChequeEspecial": 8,
+}
+NOMES_TIPOS_TRANSACAO = {codigo: nome for nome, codigo in TIPOS_TRANSACAO.items()}
+
+_CABECALHO = struct.Struct("<IBH")
+_TEXTO = struct.Struct("<H")
+_CONTA = struct.Struct("<qqI")
+_TRANSACAO = struct.Struct("<qBqq")
+_TRANSFERENCIA = struct.Struct("<qqqq")
+_NOME_SEGMENTO = re.compile(r"^segmento-(\d+)\.diario$")
+
+
+class PoliticaCommit:
+    """
+    Define quando o diário força a gravação em disco (fsync).
+
+    Com os valores padrão, cada anotação é gravada em disco antes de ser confirmada. Com
+    `registros` maior que 1, várias anotações compartilham um único fsync (group commit).
+
+    Atributos:
+        registros (int): Quantidade de anotações pendentes que dispara um fsync.
+        atraso (float): Tempo máximo, em segundos, que uma anotação espera pelo fsync.
+        aguardar (bool): Se True, a anotação só é confirmada depois de gravada em disco. Se False,
+            é confirmada imediatamente e gravada no próximo fsync do grupo.
+    """
+
+    def __init__(self, registros=1, atraso=0.0, aguardar=True):
+        """
+        Inicializa a política de gravação.
+
+        Args:
+            registros (int, optional): Anotações pendentes que disparam um fsync. Padrão é 1.
+            atraso (float, optional): Espera máxima, em segundos, por um fsync. Padrão é 0.
+            aguardar (bool, optional): Se a anotação aguarda o fsync para ser confirmada. Padrão é True.
+        """
+        self.registros = max(1, registros)
+        self.atraso = atraso
+        self.aguardar = aguardar
+
+
+class DiarioNulo:
+    """
+    Diário que descarta as anotações, usado quando nenhum diário está ativo.
+    """
+
+    def anotar_cliente(self, cliente):
+        pass
+
+    def anotar_conta(self, conta):
+        pass
+
+    def anotar_transacao(self, conta, tipo, valor, timestamp, aguardar=True):
+        pass
+
+    def anotar_transferencia(self, origem, destino, valor, timestamp, aguardar=True):
+        pass
+
+    def confirmar(self, marca):
+        pass
+
+    def fechar(self):
+        pass
+
+
+class Diario(DiarioNulo):
+    """
+    Diário de transações gravado em segmentos, apenas com acréscimos.
+
+    Atributos:
+        segmento (int): O número do segmento que recebe as anotações.
+        anotacoes_no_segmento (int): Quantidade de anotações feitas no segmento atual desde a abertura.
+
+    Métodos:
+        __init__(self, diretorio, politica=None): Abre o diário, descartando registros incompletos do final.
+        anotar_cliente(self, cliente): Anota a criação de um cliente.
+        anotar_conta(self, conta): Anota a criação de uma conta.
+        anotar_transacao(self, conta, tipo, valor, timestamp, aguardar=True): Anota uma transação bem-sucedida.
+        anotar_transferencia(self, origem, destino, valor, timestamp, aguardar=True): Anota uma transferência
+            bem-sucedida.
+        confirmar(self, marca): Aguarda a gravação de uma anotação feita sem aguardar, conforme a política.
+        sincronizar(self): Grava em disco todas as anotações pendentes.
+        rotacionar(self): Encerra o segmento atual e passa a anotar em um novo segmento.
+        fechar(self): Grava as anotações pendentes e fecha o arquivo.
+    """
+
+    def __init__(self, diretorio, politica=None):
+        """
+        Abre o diário no último segmento, descartando registros incompletos deixados no seu final.
+
+        Args:
+            diretorio (str): O diretório dos segmentos do diário. É criado se não existir.
+            politica (PoliticaCommit, optional): A política de gravação. Padrão é um fsync por anotação.
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        existentes = segmentos(diretorio)
+        self._diretorio = diretorio
+        self._politica = politica or PoliticaCommit()
+        self.segmento = existentes[-1][0] if existentes else 1
+        caminho = caminho_segmento(diretorio, self.segmento)
+        self._arquivo = open(caminho, "ab")
+        self._arquivo.truncate(_tamanho_valido(caminho))
+        self.anotacoes_no_segmento = 0
+        self._condicao = threading.Condition()
+        self._lsn = 0
+        self._lsn_duravel = 0
+        self._sincronizando = False
+        self._fechado = False
+        if not self._politica.aguardar and self._politica.atraso > 0:
+            threading.Thread(target=self._sincronizar_periodicamente, daemon=True).start()
+
+    def anotar_cliente(self, cliente):
+        """
+        Anota a criação de um cliente.
+
+        Args:
+            cliente (PessoaFisica): O cliente criado.
+        """
+        conteudo = b"".join(
+            _texto(campo) for campo in (cliente.cpf, cliente.nome, cliente.data_nascimento, cliente.endereco)
+        )
+        self._anotar(CLIENTE, conteudo)
+
+    def anotar_conta(self, conta):
+        """
+        Anota a criação de uma conta.
+
+        Args:
+            conta (ContaCorrente): A conta criada.
+        """
+        conteudo = _CONTA.pack(int(conta.numero), conta._limite, conta._limite_saques) + _texto(conta.cliente.cpf)
+        self._anotar(CONTA, conteudo)
+
+    def anotar_transacao(self, conta, tipo, valor, timestamp, aguardar=True):
+        """
+        Anota uma transação bem-sucedida.
+
+        Args:
+            conta (Conta): A conta em que a transação foi registrada.
+            tipo (str): O nome da classe da transação.
+            valor (int): O valor da transação, em centavos.
+            timestamp (int): A data registrada no histórico, em segundos desde a época.
+            aguardar (bool, optional): Se False, retorna sem aguardar a gravação em disco, que deve
+                ser aguardada com `confirmar`. Padrão é True.
+
+        Returns:
+            int: A marca da anotação, para `confirmar`.
+        """
+        conteudo = _TRANSACAO.pack(int(conta.numero), TIPOS_TRANSACAO[tipo], valor, timestamp)
+        return self._anotar(TRANSACAO, conteudo, aguardar)
+
+    def anotar_transferencia(self, origem, destino, valor, timestamp, aguardar=True):
+        """
+        Anota uma transferência bem-sucedida em um único registro, para que a reprodução nunca aplique
+        apenas um dos lados.
+
+        Args:
+            origem (Conta): A conta debitada.
+            destino (Conta): A conta creditada.
+            valor (int): O valor transferido, em centavos.
+            timestamp (int): A data registrada nos históricos, em segundos desde a época.
+            aguardar (bool, optional): Se False, retorna sem aguardar a gravação em disco, que deve
+                ser aguardada com `confirmar`. Padrão é True.
+
+        Returns:
+            int: A marca da anotação, para `confirmar`.
+        """
+        conteudo = _TRANSFERENCIA.pack(int(origem.numero), int(destino.numero), valor, timestamp)
+        return self._anotar(TRANSFERENCIA, conteudo, aguardar)
+
+    def confirmar(self, marca):
+        """
+        Aguarda a gravação em disco de uma anotação feita com `aguardar=False`, conforme a política:
+        com `PoliticaCommit(aguardar=False)` retorna imediatamente.
+
+        Args:
+            marca (int): A marca retornada pela anotação.
+        """
+        with self._condicao:
+            self._aguardar(marca, time.monotonic() + self._politica.atraso)
+
+    def sincronizar(self):
+        """
+        Grava em disco todas as anotações pendentes.
+        """
+        with self._condicao:
+            while self._lsn_duravel < self._lsn:
+                if self._sincronizando:
+                    self._condicao.wait()
+                else:
+                    self._sincronizar()
+
+    def rotacionar(self):
+        """
+        Grava as anotações pendentes, encerra o segmento atual e passa a anotar em um novo segmento.
+
+        Returns:
+            int: O número do novo segmento. Os segmentos anteriores contêm todas as anotações feitas até aqui.
+        """
+        with self._condicao:
+            while self._lsn_duravel < self._lsn or self._sincronizando:
+                if self._sincronizando:
+                    self._condicao.wait()
+                else:
+                    self._sincronizar()
+            self._arquivo.close()
+            self.segmento += 1
+            self._arquivo = open(caminho_segmento(self._diretorio, self.segmento), "ab")
+            self.anotacoes_no_segmento = 0
+            sincronizar_diretorio(self._diretorio)
+            return self.segmento
+
+    def fechar(self):
+        """
+        Grava as anotações pendentes e fecha o arquivo.
+        """
+        if self._fechado:
+            return
+        self.sincronizar()
+        with self._condicao:
+            self._fechado = True
+            self._arquivo.close()
+            self._condicao.notify_all()
+
+    def _anotar(self, tipo, conteudo, aguardar=True):
+        """
+        Acrescenta um registro ao diário e, se `aguardar`, aguarda sua gravação conforme a política.
+
+        Args:
+            tipo (int): O tipo do registro.
+            conteudo (bytes): O conteúdo do registro.
+            aguardar (bool, optional): Se aguarda a gravação. Padrão é True.
+
+        Returns:
+            int: A marca (número de sequência) do registro.
+        """
+        registro = _CABECALHO.pack(zlib.crc32(conteudo), tipo, len(conteudo)) + conteudo
+        with self._condicao:
+            self._arquivo.write(registro)
+            self._lsn += 1
+            self.anotacoes_no_segmento += 1
+            lsn = self._lsn
+            if aguardar:
+                self._aguardar(lsn, time.monotonic() + self._politica.atraso)
+            return lsn
+
+    def _aguardar(self, lsn, prazo):
+        """
+        Aguarda a gravação de um registro conforme a política; deve ser chamado com a condição adquirida.
+
+        Args:
+            lsn (int): A marca do registro.
+            prazo (float): O instante (`time.monotonic`) a partir do qual o fsync é forçado.
+        """
+        politica = self._politica
+        while self._lsn_duravel < lsn:
+            grupo_completo = self._lsn - self._lsn_duravel >= politica.registros
+            prazo_esgotado = politica.aguardar and time.monotonic() >= prazo
+            if not self._sincronizando and (grupo_completo or prazo_esgotado):
+                self._sincronizar()
+            elif not politica.aguardar:
+                break
+            else:
+                self._condicao.wait(None if self._sincronizando else max(0.0, prazo - time.monotonic()))
+
+    def _sincronizar(self):
+        """
+        Executa um fsync cobrindo todas as anotações já escritas.
+
+        Deve ser chamado com a condição adquirida. A condição é liberada durante o fsync, para que
+        outras anotações possam ser escritas e formar o próximo grupo.
+        """
+        self._sincronizando = True
+        alvo = self._lsn
+        self._arquivo.flush()
+        descritor = self._arquivo.fileno()
+        self._condicao.release()
+        try:
+            os.fsync(descritor)
+        finally:
+            self._condicao.acquire()
+            self._sincronizando = False
+        self._lsn_duravel = max(self._lsn_duravel, alvo)
+        self._condicao.notify_all()
+
+    def _sincronizar_periodicamente(self):
+        """
+        Grava as anotações pendentes a cada `atraso` segundos, quando as anotações não aguardam o fsync.
+        """
+        while True:
+            time.sleep(self._politica.atraso)
+            with self._condicao:
+                if self._fechado:
+                    return
+                if self._lsn_duravel < self._lsn and not self._sincronizando:
+                    self._sincronizar()
+
+
+_diario_ativo = DiarioNulo()
+
+
+def ativar(diario):
+    """
+    Define o diário que recebe as anotações das operações.
+
+    Args:
+        diario (Diario): O diário a ser ativado, ou None para desativar.
+    """
+    global _diario_ativo
+    _diario_ativo = diario if diario is not None else DiarioNulo()
+
+
+def ativo():
+    """
+    Retorna o diário ativo.
+
+    Returns:
+        DiarioNulo: O diário ativo, ou um DiarioNulo se nenhum estiver ativo.
+    """
+    return _diario_ativo
+
+
+def caminho_segmento(diretorio, numero):
+    """
+    Retorna o caminho do arquivo de um segmento.
+
+    Args:
+        diretorio (str): O diretório do diário.
+        numero (int): O número do segmento.
+
+    Returns:
+        str: O caminho do segmento.
+    """
+    return os.path.join(diretorio, f"segmento-{numero:06d}.diario")
+
+
+def segmentos(diretorio):
+    """
+    Lista os segmentos de um diário, em ordem crescente.
+
+    Args:
+        diretorio (str): O diretório do diário.
+
+    Returns:
+        list: Tuplas com o número e o caminho de cada segmento.
+    """
+    if not os.path.isdir(diretorio):
+        return []
+    encontrados = []
+    for nome in os.listdir(diretorio):
+        correspondencia = _NOME_SEGMENTO.match(nome)
+        if correspondencia:
+            encontrados.append((int(correspondencia.group(1)), os.path.join(diretorio, nome)))
+    return sorted(encontrados)
+
+
+def ler(caminho):
+    """
+    Lê os registros válidos de um segmento, parando no primeiro registro incompleto ou corrompido.
+
+    Args:
+        caminho (str): O caminho do segmento.
+
+    Yields:
+        tuple: O tipo do registro e seus campos.
+    """
+    for tipo, conteudo, _ in _registros(caminho):
+        if tipo == TRANSACAO:
+            numero, codigo, valor, timestamp = _TRANSACAO.unpack(conteudo)
+            yield tipo, (numero, NOMES_TIPOS_TRANSACAO[codigo], valor, timestamp)
+        elif tipo == TRANSFERENCIA:
+            yield tipo, _TRANSFERENCIA.unpack(conteudo)
+        elif tipo == CONTA:
+            numero, limite, limite_saques = _CONTA.unpack_from(conteudo)
+            cpf, _ = _ler_texto(conteudo, _CONTA.size)
+            yield tipo, (numero, limite, limite_saques, cpf)
+        else:
+            campos = []
+            posicao = 0
+            while posicao < len(conteudo):
+                campo, posicao = _ler_texto(conteudo, posicao)
+                campos.append(campo)
+            yield tipo, tuple(campos)
+
+
+def reproduzir(diretorio, clientes, contas, localizar_conta=None, a_partir_de=1):
+    """
+    Aplica os registros dos segmentos de um diário a um estado existente.
+
+    Args:
+        diretorio (str): O diretório do diário.
+        clientes (ClienteRegistry): O registro que recebe os clientes criados.
+        contas (list): A lista que recebe as contas criadas.
+        localizar_conta (callable, optional): Função que localiza pelo número uma conta já existente
+            no estado, usada para contas que não foram criadas nos segmentos reproduzidos.
+        a_partir_de (int, optional): O primeiro segmento a ser reproduzido. Padrão é 1.
+    """
+    contas_por_numero = {}
+
+    def conta_por_numero(numero):
+        conta = contas_por_numero.get(numero)
+        if conta is None:
+            conta = contas_por_numero[numero] = localizar_conta(numero)
+        return conta
+
+    for numero_segmento, caminho in segmentos(diretorio):
+        if numero_segmento < a_partir_de:
+            continue
+        for tipo, campos in ler(caminho):
+            if tipo == TRANSACAO:
+                numero, nome_tipo, valor, timestamp = campos
+                conta = conta_por_numero(numero)
+                conta._saldo += valor if nome_tipo in TIPOS_CREDITO else -valor
+                conta.historico.registrar(nome_tipo, valor, timestamp)
+            elif tipo == TRANSFERENCIA:
+                numero_origem, numero_destino, valor, timestamp = campos
+                origem, destino = conta_por_numero(numero_origem), conta_por_numero(numero_destino)
+                origem._saldo -= valor
+                destino._saldo += valor
+                origem.historico.registrar("Transferencia", valor, timestamp)
+                destino.historico.registrar("TransferenciaRecebida", valor, timestamp)
+            elif tipo == CONTA:
+                numero, limite, limite_saques, cpf = campos
+                cliente = clientes.buscar(cpf)
+                conta = ContaCorrente(numero, cliente, limite=limite, limite_saques=limite_saques)
+                cliente.adicionar_conta(conta)
+                contas.append(conta)
+                contas_por_numero[numero] = conta
+            else:
+                cpf, nome, data_nascimento, endereco = campos
+                clientes.adicionar(
+                    PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
+                )
+
+
+def restaurar(diretorio):
+    """
+    Reconstrói clientes e contas reproduzindo todos os segmentos de um diário.
+
+    Args:
+        diretorio (str): O diretório do diário. Se não existir, nada é restaurado.
+
+    Returns:
+        tuple: O registro de clientes (ClienteRegistry) e o índice de contas (IndiceContas).
+    """
+    clientes = ClienteRegistry()
+    contas = IndiceContas()
+    reproduzir(diretorio, clientes, contas)
+    return clientes, contas
+
+
+def _texto(valor):
+    """Codifica um texto como tamanho (`<H`) seguido dos bytes em UTF-8."""
+    dados = str(valor).encode("utf-8")
+    return _TEXTO.pack(len(dados)) + dados
+
+
+def _ler_texto(conteudo, posicao):
+    """Decodifica um texto gravado por `_texto`, retornando-o junto com a próxima posição."""
+    (tamanho,) = _TEXTO.unpack_from(conteudo, posicao)
+    inicio = posicao + _TEXTO.size
+    return conteudo[inicio:inicio + tamanho].decode("utf-8"), inicio + tamanho
+
+
+def _registros(caminho):
+    """
+    Percorre os registros íntegros de um arquivo de diário.
+
+    Yields:
+        tuple: O tipo, o conteúdo e a posição final de cada registro.
+    """
+    if not os.path.exists(caminho):
+        return
+    with open(caminho, "rb") as arquivo:
+        posicao = 0
+        while True:
+            cabecalho = arquivo.read(_CABECALHO.size)
+            if len(cabecalho) < _CABECALHO.size:
+                return
+            crc, tipo, tamanho = _CABECALHO.unpack(cabecalho)
+            conteudo = arquivo.read(tamanho)
+            if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+                return
+            posicao += _CABECALHO.size + tamanho
+            yield tipo, conteudo, posicao
+
+
+def sincronizar_diretorio(diretorio):
+    """
+    Grava em disco as entradas de um diretório, tornando duráveis a criação e a remoção de arquivos.
+
+    Args:
+        diretorio (str): O diretório a ser sincronizado.
+    """
+    if hasattr(os, "O_DIRECTORY"):
+        descritor = os.open(diretorio, os.O_RDONLY | os.O_DIRECTORY)
+        try:
+            os.fsync(descritor)
+        finally:
+            os.close(descritor)
+
+
+def _tamanho_valido(caminho):
+    """Retorna o tamanho do trecho íntegro de um arquivo de diário."""
+    tamanho = 0
+    for _, _, posicao in _registros(caminho):
+        tamanho = posicao
+    return tamanho
@@ -0,0 +1,115 @@
+"""
+Módulo que define a conversão de valores monetários entre texto e centavos.
+
+Todo o núcleo do sistema (transações, saldos, limites e históricos) trabalha com valores inteiros em
+centavos, sem arredondamentos acumulados. A conversão de e para reais acontece apenas nas bordas:
+na leitura dos valores digitados ou recebidos e na exibição dos extratos e respostas.
+
+Os históricos, o diário e os snapshots guardam os valores e os saldos como inteiros de 64 bits, então
+nenhum valor pode passar de `LIMITE_CENTAVOS` em módulo.
+
+Funções:
+    para_centavos(valor): Converte um valor em reais para centavos.
+    formatar(centavos): Formata um valor em centavos como texto em reais.
+    reais(centavos): Converte um valor em centavos para reais, para protocolos numéricos como JSON.
+    validar_centavos(centavos): Verifica se um valor em centavos é um inteiro de 64 bits.
+"""
+
+LIMITE_CENTAVOS = 2**63 - 1
+
+
+def para_centavos(valor):
+    """
+    Converte um valor em reais para centavos, sem passar por ponto flutuante.
+
+    Aceita textos como "100", "100.5", "100,50", "1.234,56" e "R$ 10,00", além de números. Números
+    de ponto flutuante são convertidos pela sua representação decimal mais curta, de modo que 0.1
+    resulta em 10 centavos.
+
+    Args:
+        valor (str | int | float): O valor em reais.
+
+    Returns:
+        int: O valor em centavos.
+
+    Raises:
+        ValueError: Se o valor não for um número com no máximo duas casas decimais ou passar de
+            `LIMITE_CENTAVOS` em módulo.
+    """
+    if type(valor) is str:
+        inteiro, _, fracao = valor.partition(".")
+        if inteiro.isdigit() and inteiro.isascii() and len(fracao) <= 2 and (fracao.isdigit() or not fracao):
+            return validar_centavos(int(inteiro) * 100 + int(fracao.ljust(2, "0")))
+    if isinstance(valor, bool):
+        raise ValueError(f"Valor monetário inválido: {valor!r}")
+    if isinstance(valor, int):
+        return validar_centavos(valor * 100)
+    texto = str(valor).strip()
+    if texto.startswith("R$"):
+        texto = texto[2:].lstrip()
+    if "," in texto:
+        texto = texto.replace(".", "").replace(",", ".")
+    negativo = texto.startswith("-")
+    if texto[:1] in "+-":
+        texto = texto[1:]
+    inteiro, _, fracao = texto.partition(".")
+    if (
+        not texto.isascii()
+        or not (inteiro or fracao)
+        or (inteiro and not inteiro.isdigit())
+        or (fracao and not fracao.isdigit())
+        or len(fracao) > 2
+    ):
+        raise ValueError(f"Valor monetário inválido: {valor!r}")
+    centavos = int(inteiro or 0) * 100 + int(fracao.ljust(2, "0") or 0)
+    return validar_centavos(-centavos if negativo else centavos)
+
+
+def validar_centavos(centavos):
+    """
+    Verifica se um valor em centavos é um inteiro que cabe nas colunas de 64 bits dos históricos e do
+    diário.
+
+    Args:
+        centavos (int): O valor em centavos.
+
+    Returns:
+        int: O próprio valor.
+
+    Raises:
+        TypeError: Se o valor não for um `int`; valores booleanos e de ponto flutuante são recusados.
+        ValueError: Se o valor passar de `LIMITE_CENTAVOS` em módulo.
+    """
+    if type(centavos) is not int:
+        raise TypeError(f"Valor em centavos deve ser inteiro: {centavos!r}")
+    if not -LIMITE_CENTAVOS <= centavos <= LIMITE_CENTAVOS:
+        raise ValueError(f"Valor monetário fora do limite: {centavos} centavos")
+    return centavos
+
+
+def formatar(centavos):
+    """
+    Formata um valor em centavos como texto em reais, com duas casas decimais.
+
+    Args:
+        centavos (int): O valor em centavos.
+
+    Returns:
+        str: O valor em reais, por exemplo "1234.56".
+    """
+    sinal = "-" if centavos < 0 else ""
+    reais_, resto = divmod(abs(centavos), 100)
+    return f"{sinal}{reais_}.{resto:02d}"
+
+
+def reais(centavos):
+    """
+    Converte um valor em centavos para reais, para protocolos que representam valores como número.
+
+    Args:
+        centavos (int): O valor em centavos.
+
+    Returns:
+        float: O valor em reais.
+    """
+    return centavos / 100
@@ -0,0 +1,204 @@
+"""
+Módulo que define os códigos de resultado das operações e a publicação de eventos do núcleo bancário.
+
+As contas e transações não escrevem no terminal: retornam um `Resultado` e as transações publicam um
+`Evento` no destino de eventos ativo. Por padrão o destino é nulo, de modo que processamento em lote,
+servidor e benchmarks não pagam nenhum custo de E/S; o menu interativo exibe as mensagens a partir dos
+resultados com `mensagem`.
+
+Classes:
+    Resultado: Código de resultado de uma operação, verdadeiro apenas em caso de sucesso.
+    Evento: Operação registrada em uma conta, publicada no destino de eventos ativo.
+    DestinoNulo: Destino que descarta os eventos.
+    DestinoConsole: Destino que escreve as mensagens dos eventos em blocos.
+    DestinoFila: Destino que coloca os eventos em uma fila (`queue.Queue` ou `asyncio.Queue`).
+
+Funções:
+    mensagem(tipo, resultado): Retorna a mensagem a exibir para o resultado de uma operação.
+    ativar(destino): Define o destino que recebe os eventos.
+    ativo(): Retorna o destino de eventos ativo.
+"""
+
+import asyncio
+import enum
+import queue
+import sys
+from collections import namedtuple
+
+
+class Resultado(enum.Enum):
+    """
+    Código de resultado de uma operação.
+
+    Apenas `SUCESSO` é verdadeiro em contexto booleano, de modo que `if conta.sacar(valor):` continua
+    valendo. O valor de cada código é a sua descrição curta, usada por exemplo nos relatórios de lote.
+    """
+
+    SUCESSO = "sucesso"
+    SALDO_INSUFICIENTE = "saldo insuficiente"
+    LIMITE_EXCEDIDO = "limite excedido"
+    SAQUES_EXCEDIDOS = "saques excedidos"
+    VALOR_INVALIDO = "valor inválido"
+    MESMA_CONTA = "mesma conta"
+    TETO_DIARIO_EXCEDIDO = "teto diário excedido"
+    LIMITE_NOTURNO_EXCEDIDO = "limite noturno excedido"
+    VELOCIDADE_EXCEDIDA = "velocidade excedida"
+    CHAVE_REUTILIZADA = "chave reutilizada"
+
+    def __bool__(self):
+        return self._value_ == "sucesso"
+
+
+Evento = namedtuple("Evento", ["tipo", "agencia", "numero", "valor", "resultado"])
+
+SUCESSOS = {
+    "Saque": "Saque realizado com sucesso!",
+    "Deposito": "Depósito realizado com sucesso!",
+    "Transferencia": "Transferência realizada com sucesso!",
+}
+
+FALHAS = {
+    Resultado.SALDO_INSUFICIENTE: "Você não tem saldo suficiente.",
+    Resultado.LIMITE_EXCEDIDO: "O valor do saque excede o limite.",
+    Resultado.SAQUES_EXCEDIDOS: "Número máximo de saques excedido.",
+    Resultado.VALOR_INVALIDO: "O valor informado é inválido.",
+    Resultado.MESMA_CONTA: "A conta de destino deve ser diferente da conta de origem.",
+    Resultado.TETO_DIARIO_EXCEDIDO: "O valor excede o teto diário de saques.",
+    Resultado.LIMITE_NOTURNO_EXCEDIDO: "O valor do saque excede o limite noturno.",
+    Resultado.VELOCIDADE_EXCEDIDA: "Muitas operações em pouco tempo. Tente novamente mais tarde.",
+    Resultado.CHAVE_REUTILIZADA: "A chave de idempotência já foi usada em outra operação.",
+}
+
+
+def mensagem(tipo, resultado):
+    """
+    Retorna a mensagem a exibir para o resultado de uma operação, no formato do menu.
+
+    Args:
+        tipo (str): O tipo da operação, por exemplo "Saque".
+        resultado (Resultado): O resultado da operação.
+
+    Returns:
+        str: A mensagem de sucesso ou de falha.
+    """
+    if resultado:
+        return f"\n=== {SUCESSOS.get(tipo, 'Operação realizada com sucesso!')} ==="
+    return f"\n@@@ Operação falhou! {FALHAS[resultado]} @@@"
+
+
+class DestinoNulo:
+    """
+    Destino que descarta os eventos. É o destino ativo por padrão.
+    """
+
+    def publicar(self, tipo, conta, valor, resultado):
+        pass
+
+
+class DestinoConsole:
+    """
+    Destino que escreve as mensagens dos eventos em um arquivo, em blocos.
+
+    As mensagens são acumuladas e escritas de uma vez a cada `capacidade` eventos ou em `descarregar`,
+    em vez de uma escrita por operação.
+
+    Métodos:
+        publicar(tipo, conta, valor, resultado): Acumula a mensagem de um evento.
+        descarregar(): Escreve as mensagens acumuladas.
+    """
+
+    def __init__(self, arquivo=None, capacidade=1_000):
+        """
+        Inicializa o destino.
+
+        Args:
+            arquivo (file, optional): O arquivo de saída. Padrão é `sys.stdout`.
+            capacidade (int, optional): Quantidade de mensagens acumuladas por escrita. Padrão é 1.000.
+        """
+        self._arquivo = arquivo
+        self._capacidade = capacidade
+        self._mensagens = []
+
+    def publicar(self, tipo, conta, valor, resultado):
+        """
+        Acumula a mensagem de um evento, escrevendo o bloco quando atingir a capacidade.
+
+        Args:
+            tipo (str): O tipo da operação.
+            conta (Conta): A conta da operação.
+            valor (int): O valor da operação, em centavos.
+            resultado (Resultado): O resultado da operação.
+        """
+        self._mensagens.append(mensagem(tipo, resultado))
+        if len(self._mensagens) >= self._capacidade:
+            self.descarregar()
+
+    def descarregar(self):
+        """
+        Escreve as mensagens acumuladas.
+        """
+        if self._mensagens:
+            arquivo = self._arquivo or sys.stdout
+            arquivo.write("\n".join(self._mensagens) + "\n")
+            self._mensagens.clear()
+
+
+class DestinoFila:
+    """
+    Destino que coloca os eventos em uma fila, para serem consumidos por outra thread ou corrotina.
+
+    Aceita `queue.Queue` e `asyncio.Queue`; uma `asyncio.Queue` deve ser usada na thread do seu laço de
+    eventos. Se a fila estiver cheia o evento é descartado e contado, sem bloquear a operação.
+
+    Atributos:
+        descartados (int): A quantidade de eventos descartados por fila cheia.
+    """
+
+    def __init__(self, fila):
+        """
+        Inicializa o destino.
+
+        Args:
+            fila (queue.Queue | asyncio.Queue): A fila que recebe os eventos.
+        """
+        self._fila = fila
+        self.descartados = 0
+
+    def publicar(self, tipo, conta, valor, resultado):
+        """
+        Coloca o evento na fila.
+
+        Args:
+            tipo (str): O tipo da operação.
+            conta (Conta): A conta da operação.
+            valor (int): O valor da operação, em centavos.
+            resultado (Resultado): O resultado da operação.
+        """
+        try:
+            self._fila.put_nowait(Evento(tipo, conta.agencia, conta.numero, valor, resultado))
+        except (queue.Full, asyncio.QueueFull):
+            self.descartados += 1
+
+
+_destino_ativo = DestinoNulo()
+
+
+def ativar(destino):
+    """
+    Define o destino que recebe os eventos das operações.
+
+    Args:
+        destino (DestinoNulo | DestinoConsole | DestinoFila): O destino, ou None para descartar os eventos.
+    """
+    global _destino_ativo
+    _destino_ativo = destino if destino is not None else DestinoNulo()
+
+
+def ativo():
+    """
+    Retorna o destino de eventos ativo.
+
+    Returns:
+        DestinoNulo | DestinoConsole | DestinoFila: O destino ativo.
+    """
+    return _destino_ativo
@@ -0,0 +1,251 @@
+"""
+Módulo que exporta os históricos das contas em arquivos colunares, para análise.
+
+Cada transação vira uma linha com a agência e o número da conta, os atributos do titular (CPF, nome,
+data de nascimento e endereço), o tipo, o valor em centavos e a data. As linhas são particionadas por
+dia ou por agência em subdiretórios no estilo Hive (`data=2024-01-31/`, `agencia=0001/`) e gravadas
+em arquivos numerados (`parte-000001.parquet`, ...).
+
+A exportação é feita em fluxo: as contas são percorridas uma vez e as linhas acumuladas em blocos
+colunares (`array`) por partição. Quando o total de linhas acumuladas atinge `linhas_por_bloco`, todos
+os blocos são gravados e descartados, de modo que a memória não depende do tamanho do banco. As colunas
+de cada histórico são copiadas para o bloco com a trava da conta adquirida, direto do buffer das
+colunas e sem criar objetos Python por transação; na gravação em Arrow, os blocos são entregues ao
+pyarrow sem nova cópia.
+
+Os arquivos são gravados em um diretório temporário ao lado do destino (`<destino>.tmp`), que só
+substitui o diretório de destino quando a exportação termina. Assim, o destino nunca mistura arquivos
+de duas exportações: uma exportação menor não deixa para trás partes de uma anterior, e uma
+exportação interrompida não altera a anterior.
+
+Formatos:
+    "parquet": Apache Parquet (requer pyarrow).
+    "arrow": Arrow IPC em arquivo (requer pyarrow).
+    "csv": CSV com cabeçalho, com a data em segundos desde a época. É o formato padrão sem pyarrow.
+
+Classes:
+    ResumoExportacao: Totais de uma exportação.
+    Exportador: Exporta os históricos das contas em arquivos particionados.
+"""
+
+import bisect
+import csv
+import os
+import shutil
+from array import array
+from collections import namedtuple
+from datetime import date
+from itertools import repeat
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pragma: no cover - pyarrow é opcional
+    pa = pq = None
+
+from historico import Historico, fim_do_dia
+
+COLUNAS = ("agencia", "conta", "cpf", "nome", "data_nascimento", "endereco", "tipo", "valor", "data")
+PARTICOES = ("data", "agencia")
+EXTENSOES = {"parquet": ".parquet", "arrow": ".arrow", "csv": ".csv"}
+
+ResumoExportacao = namedtuple("ResumoExportacao", ["linhas", "arquivos"])
+
+
+class _Bloco:
+    """Linhas acumuladas de uma partição, em colunas."""
+
+    __slots__ = ("agencias", "contas", "cpfs", "nomes", "nascimentos", "enderecos", "tipos", "valores", "datas")
+
+    def __init__(self):
+        self.agencias, self.cpfs, self.nomes, self.nascimentos, self.enderecos = [], [], [], [], []
+        self.contas = array("q")
+        self.tipos = array("B")
+        self.valores = array("q")
+        self.datas = array("q")
+
+    def __len__(self):
+        return len(self.valores)
+
+    def acrescentar(self, conta, tipos, valores, datas, inicio, fim):
+        """Copia as transações `[inicio, fim)` de um histórico; deve ser chamado com a trava da conta."""
+        quantidade = fim - inicio
+        cliente = conta.cliente
+        self.agencias.extend(repeat(conta.agencia, quantidade))
+        self.contas.extend(repeat(int(conta.numero), quantidade))
+        self.cpfs.extend(repeat(cliente.cpf, quantidade))
+        self.nomes.extend(repeat(cliente.nome, quantidade))
+        self.nascimentos.extend(repeat(cliente.data_nascimento, quantidade))
+        self.enderecos.extend(repeat(cliente.endereco, quantidade))
+        for destino, origem in ((self.tipos, tipos), (self.valores, valores), (self.datas, datas)):
+            with memoryview(origem) as coluna, coluna.cast("B") as octetos:
+                destino.frombytes(octetos[inicio * origem.itemsize:fim * origem.itemsize])
+
+
+class Exportador:
+    """
+    Exporta os históricos das contas em arquivos colunares particionados.
+
+    Métodos:
+        __init__(self, diretorio, particionar_por="data", formato=None, linhas_por_bloco=1_000_000):
+            Inicializa o exportador.
+        exportar(self, contas): Exporta os históricos das contas.
+    """
+
+    def __init__(self, diretorio, particionar_por="data", formato=None, linhas_por_bloco=1_000_000):
+        """
+        Inicializa o exportador.
+
+        Args:
+            diretorio (str): O diretório de destino, de uso exclusivo da exportação. Se já existir, é
+                substituído por inteiro ao fim de cada exportação.
+            particionar_por (str, optional): "data" ou "agencia". Padrão é "data".
+            formato (str, optional): "parquet", "arrow" ou "csv". Padrão é "parquet" se o pyarrow estiver
+                instalado, senão "csv".
+            linhas_por_bloco (int, optional): Quantidade de linhas acumuladas em memória antes de
+                gravar os blocos. Padrão é 1.000.000.
+
+        Raises:
+            ValueError: Se a partição ou o formato não forem suportados, ou se o formato exigir o
+                pyarrow e ele não estiver instalado.
+        """
+        formato = formato or ("parquet" if pa is not None else "csv")
+        if particionar_por not in PARTICOES:
+            raise ValueError(f"Partição não suportada: {particionar_por}")
+        if formato not in EXTENSOES:
+            raise ValueError(f"Formato não suportado: {formato}")
+        if formato != "csv" and pa is None:
+            raise ValueError(f"O formato {formato} requer o pyarrow")
+        self._diretorio = diretorio
+        self._particionar_por = particionar_por
+        self._formato = formato
+        self._linhas_por_bloco = linhas_por_bloco
+
+    @property
+    def formato(self):
+        """Retorna o formato dos arquivos gravados."""
+        return self._formato
+
+    def exportar(self, contas):
+        """
+        Exporta os históricos das contas.
+
+        Args:
+            contas (iterable): As contas cadastradas, percorridas uma única vez.
+
+        Returns:
+            ResumoExportacao: A quantidade de linhas e de arquivos gravados.
+        """
+        destino = os.path.normpath(self._diretorio)
+        temporario = f"{destino}.tmp"
+        shutil.rmtree(temporario, ignore_errors=True)
+        os.makedirs(temporario)
+        try:
+            resumo = self._exportar(contas, temporario)
+        except BaseException:
+            shutil.rmtree(temporario, ignore_errors=True)
+            raise
+        _substituir(temporario, destino)
+        return resumo
+
+    def _exportar(self, contas, diretorio):
+        """Exporta os históricos das contas para um diretório vazio."""
+        blocos = {}
+        partes = {}
+        pendentes = linhas = arquivos = 0
+        for conta in contas:
+            with conta.trava:
+                historico = conta.historico
+                tipos, valores, datas = historico.tipos, historico.valores, historico.datas
+                for chave, inicio, fim in self._segmentos(conta, datas):
+                    bloco = blocos.get(chave)
+                    if bloco is None:
+                        bloco = blocos[chave] = _Bloco()
+                    bloco.acrescentar(conta, tipos, valores, datas, inicio, fim)
+                    pendentes += fim - inicio
+            if pendentes >= self._linhas_por_bloco:
+                arquivos += self._gravar(diretorio, blocos, partes)
+                linhas += pendentes
+                blocos, pendentes = {}, 0
+        arquivos += self._gravar(diretorio, blocos, partes)
+        return ResumoExportacao(linhas + pendentes, arquivos)
+
+    def _segmentos(self, conta, datas):
+        """Gera as faixas `(partição, inicio, fim)` do histórico de uma conta."""
+        if not datas:
+            return
+        if self._particionar_por == "agencia":
+            yield f"agencia={conta.agencia}", 0, len(datas)
+            return
+        posicao = 0
+        while posicao < len(datas):
+            dia = date.fromtimestamp(datas[posicao])
+            final = bisect.bisect_left(datas, fim_do_dia(dia), posicao)
+            yield f"data={dia.isoformat()}", posicao, final
+            posicao = final
+
+    def _gravar(self, diretorio, blocos, partes):
+        """Grava cada bloco em um novo arquivo da sua partição e retorna a quantidade de arquivos."""
+        for chave, bloco in blocos.items():
+            partes[chave] = parte = partes.get(chave, 0) + 1
+            particao = os.path.join(diretorio, chave)
+            os.makedirs(particao, exist_ok=True)
+            caminho = os.path.join(particao, f"parte-{parte:06d}{EXTENSOES[self._formato]}")
+            if self._formato == "csv":
+                _gravar_csv(caminho, bloco)
+            elif self._formato == "parquet":
+                pq.write_table(_tabela_arrow(bloco), caminho)
+            else:
+                tabela = _tabela_arrow(bloco)
+                with pa.OSFile(caminho, "wb") as arquivo, pa.ipc.new_file(arquivo, tabela.schema) as escritor:
+                    escritor.write_table(tabela)
+        return len(blocos)
+
+
+def _substituir(temporario, destino):
+    """Coloca o diretório temporário no lugar do destino e remove o conteúdo anterior do destino."""
+    if not os.path.exists(destino):
+        os.rename(temporario, destino)
+        return
+    anterior = f"{destino}.anterior"
+    shutil.rmtree(anterior, ignore_errors=True)
+    os.rename(destino, anterior)
+    os.rename(temporario, destino)
+    shutil.rmtree(anterior)
+
+
+def _gravar_csv(caminho, bloco):
+    """Grava um bloco em CSV."""
+    with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+        escritor = csv.writer(arquivo)
+        escritor.writerow(COLUNAS)
+        escritor.writerows(zip(
+            bloco.agencias, bloco.contas, bloco.cpfs, bloco.nomes, bloco.nascimentos, bloco.enderecos,
+            map(Historico.nome_tipo, bloco.tipos), bloco.valores, bloco.datas,
+        ))
+
+
+def _tabela_arrow(bloco):
+    """Monta uma tabela Arrow de um bloco, usando os buffers das colunas numéricas sem copiá-los."""
+    quantidade = len(bloco)
+
+    def coluna(tipo, valores):
+        return pa.Array.from_buffers(tipo, quantidade, [None, pa.py_buffer(valores)])
+
+    tipos = pa.DictionaryArray.from_arrays(
+        coluna(pa.uint8(), bloco.tipos).cast(pa.int32()), pa.array(Historico._nomes_tipos, pa.string())
+    )
+    return pa.table(
+        [
+            pa.array(bloco.agencias, pa.string()),
+            coluna(pa.int64(), bloco.contas),
+            pa.array(bloco.cpfs, pa.string()),
+            pa.array(bloco.nomes, pa.string()),
+            pa.array(bloco.nascimentos, pa.string()),
+            pa.array(bloco.enderecos, pa.string()),
+            tipos,
+            coluna(pa.int64(), bloco.valores),
+            coluna(pa.timestamp("s"), bloco.datas),
+        ],
+        names=list(COLUNAS),
+    )
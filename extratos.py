@@ -0,0 +1,247 @@
+"""
+Módulo que mantém em cache as linhas formatadas dos extratos.
+
+Os históricos crescem no final, então a linha de cada posição do histórico não muda depois de
+formatada; a exceção são as transações inseridas antes de outras (veja `Historico.insercoes`), e uma
+janela guardada com outra contagem de inserções do seu histórico é formatada de novo. O cache guarda
+as linhas em janelas de `LINHAS_POR_JANELA` posições consecutivas, por histórico e índice da janela;
+uma página do extrato, de qualquer período, é montada com as fatias das janelas que ela cobre.
+Quando o histórico cresce, apenas as posições novas da última janela são formatadas e acrescentadas
+a ela; escritas em outras contas não alteram nada, e as janelas completas nunca precisam ser
+invalidadas.
+
+O cache tem um orçamento global de memória, estimado pelo tamanho das linhas guardadas; quando ele é
+excedido, as janelas consultadas há mais tempo são descartadas (LRU). Uma consulta cujas linhas
+ocupariam mais que `1 / FRACAO_MAXIMA` do orçamento, como o extrato completo de um histórico longo, é
+formatada sem passar pelo cache, para não descartar as janelas das demais consultas.
+
+Classes:
+    CacheExtratos: Cache das linhas dos extratos em janelas, atualizado de forma incremental.
+    ExtratosSemCache: Formata cada página a cada consulta, usado quando nenhum cache está ativo.
+
+Funções:
+    formatar_linha(tipo, valor): Formata a linha do extrato de uma transação.
+    ativar(cache): Define o cache usado na exibição dos extratos.
+    ativo(): Retorna o cache ativo.
+"""
+
+import sys
+import threading
+from collections import OrderedDict
+
+import dinheiro
+from historico import Historico
+
+LINHAS_POR_JANELA = 1_024
+FRACAO_MAXIMA = 8
+BYTES_POR_LINHA = 100
+
+
+def formatar_linha(tipo, valor):
+    """
+    Formata a linha do extrato de uma transação.
+
+    Args:
+        tipo (str): O nome do tipo da transação.
+        valor (int): O valor da transação, em centavos.
+
+    Returns:
+        str: A linha do extrato.
+    """
+    return f"{tipo}:\n\tR$ {dinheiro.formatar(valor)}"
+
+
+def _formatar(historico, inicio, fim):
+    """Formata as linhas das transações nas posições `[inicio, fim)` de um histórico."""
+    return list(map(formatar_linha, map(Historico.nome_tipo, historico.tipos[inicio:fim]), historico.valores[inicio:fim]))
+
+
+class _Janela:
+    """Linhas guardadas de uma janela de posições de um histórico, com a contagem de inserções do histórico."""
+
+    __slots__ = ("linhas", "bytes", "insercoes")
+
+    def __init__(self, insercoes):
+        self.linhas = []
+        self.bytes = sys.getsizeof(self.linhas)
+        self.insercoes = insercoes
+
+
+class CacheExtratos:
+    """
+    Cache das linhas formatadas dos extratos, em janelas, com orçamento global de memória e descarte LRU.
+
+    Uma única trava protege o cache; a formatação das posições que faltam em uma janela, no máximo
+    `LINHAS_POR_JANELA` linhas, é feita com ela adquirida.
+
+    Métodos:
+        __init__(self, memoria_maxima=64 * 2**20): Inicializa o cache.
+        pagina(historico, inicio=None, fim=None, cursor=0, limite=None): Retorna as linhas de uma página.
+        invalidar(historico=None): Descarta as janelas guardadas de um histórico, ou todas.
+        estatisticas(): Retorna os contadores do cache.
+    """
+
+    def __init__(self, memoria_maxima=64 * 2**20):
+        """
+        Inicializa o cache.
+
+        Args:
+            memoria_maxima (int, optional): Memória máxima estimada das linhas guardadas, em bytes.
+                Padrão é 64 MiB.
+        """
+        self._memoria_maxima = memoria_maxima
+        self._janelas = OrderedDict()
+        self._bytes = 0
+        self._linhas = 0
+        self._trava = threading.Lock()
+        self._acertos = self._faltas = self._acrescimos = self._expulsoes = self._diretas = 0
+
+    def pagina(self, historico, inicio=None, fim=None, cursor=0, limite=None):
+        """
+        Retorna as linhas de uma página do extrato de um período, formatando apenas as posições que
+        ainda não estão no cache.
+
+        Args:
+            historico (Historico): O histórico da conta.
+            inicio (int, optional): A data inicial, inclusiva, em segundos desde a época.
+            fim (int, optional): A data final, exclusiva, em segundos desde a época.
+            cursor (int, optional): A posição a partir da qual a página começa. Padrão é 0.
+            limite (int, optional): A quantidade máxima de transações na página. Padrão é sem limite.
+
+        Returns:
+            tuple: A lista das linhas da página e o cursor da próxima página, ou None se esta for a
+            última.
+        """
+        posicoes, proximo = historico.pagina(inicio, fim, cursor, limite)
+        primeira, final = posicoes.start, posicoes.stop
+        with self._trava:
+            bytes_por_linha = self._bytes / self._linhas if self._linhas else BYTES_POR_LINHA
+            if (final - primeira) * bytes_por_linha > self._memoria_maxima / FRACAO_MAXIMA:
+                self._diretas += 1
+                direta = True
+            else:
+                direta = False
+                linhas = []
+                for indice in range(primeira // LINHAS_POR_JANELA, (final - 1) // LINHAS_POR_JANELA + 1):
+                    base = indice * LINHAS_POR_JANELA
+                    janela = self._janela(historico, indice, min(final, base + LINHAS_POR_JANELA) - base)
+                    linhas.extend(janela.linhas[max(primeira, base) - base:final - base])
+                while self._bytes > self._memoria_maxima and self._janelas:
+                    self._descartar(next(iter(self._janelas)))
+                    self._expulsoes += 1
+        if direta:
+            linhas = _formatar(historico, primeira, final)
+        return linhas, proximo
+
+    def _janela(self, historico, indice, necessarias):
+        """
+        Retorna uma janela com pelo menos `necessarias` linhas, formatando as que faltam até o fim da
+        janela ou do histórico; deve ser chamado com a trava adquirida.
+        """
+        chave = (historico, indice)
+        janela = self._janelas.get(chave)
+        if janela is not None and janela.insercoes != historico.insercoes:
+            self._descartar(chave)
+            janela = None
+        if janela is None:
+            janela = self._janelas[chave] = _Janela(historico.insercoes)
+            self._bytes += janela.bytes
+            self._faltas += 1
+        else:
+            self._janelas.move_to_end(chave)
+            if len(janela.linhas) >= necessarias:
+                self._acertos += 1
+                return janela
+        base = indice * LINHAS_POR_JANELA
+        guardadas = len(janela.linhas)
+        novas = _formatar(historico, base + guardadas, min(len(historico.valores), base + LINHAS_POR_JANELA))
+        if guardadas:
+            self._acrescimos += len(novas)
+        tamanho = sys.getsizeof(janela.linhas)
+        janela.linhas.extend(novas)
+        acrescimo = sum(map(sys.getsizeof, novas)) + sys.getsizeof(janela.linhas) - tamanho
+        janela.bytes += acrescimo
+        self._bytes += acrescimo
+        self._linhas += len(novas)
+        return janela
+
+    def _descartar(self, chave):
+        """Remove uma janela guardada; deve ser chamado com a trava adquirida."""
+        janela = self._janelas.pop(chave)
+        self._bytes -= janela.bytes
+        self._linhas -= len(janela.linhas)
+
+    def invalidar(self, historico=None):
+        """
+        Descarta as janelas guardadas de um histórico, ou todas.
+
+        Não é necessário depois de novas transações, que são detectadas e acrescentadas na consulta
+        seguinte; serve para um histórico substituído ou para liberar memória.
+
+        Args:
+            historico (Historico, optional): O histórico cujas janelas serão descartadas. Padrão é todos.
+        """
+        with self._trava:
+            for chave in [chave for chave in self._janelas if historico is None or chave[0] is historico]:
+                self._descartar(chave)
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: As chaves "janelas", "bytes", "memoria_maxima", "acertos", "faltas" (janelas
+            formatadas do início), "acrescimos" (linhas acrescentadas a janelas guardadas),
+            "expulsoes" e "diretas" (consultas grandes formatadas sem o cache).
+        """
+        with self._trava:
+            return {
+                "janelas": len(self._janelas),
+                "bytes": self._bytes,
+                "memoria_maxima": self._memoria_maxima,
+                "acertos": self._acertos,
+                "faltas": self._faltas,
+                "acrescimos": self._acrescimos,
+                "expulsoes": self._expulsoes,
+                "diretas": self._diretas,
+            }
+
+
+class ExtratosSemCache:
+    """
+    Formata as linhas de cada página a cada consulta. É o cache ativo por padrão.
+    """
+
+    def pagina(self, historico, inicio=None, fim=None, cursor=0, limite=None):
+        posicoes, proximo = historico.pagina(inicio, fim, cursor, limite)
+        return _formatar(historico, posicoes.start, posicoes.stop), proximo
+
+    def invalidar(self, historico=None):
+        pass
+
+    def estatisticas(self):
+        return {}
+
+
+_cache_ativo = ExtratosSemCache()
+
+
+def ativar(cache):
+    """
+    Define o cache usado na exibição dos extratos.
+
+    Args:
+        cache (CacheExtratos): O cache, ou None para desativar.
+    """
+    global _cache_ativo
+    _cache_ativo = cache if cache is not None else ExtratosSemCache()
+
+
+def ativo():
+    """
+    Retorna o cache ativo.
+
+    Returns:
+        CacheExtratos | ExtratosSemCache: O cache ativo.
+    """
+    return _cache_ativo
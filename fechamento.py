@@ -0,0 +1,261 @@
+"""
+Módulo que define o fechamento diário: juros, tarifas de manutenção e juros do cheque especial.
+
+O fechamento percorre as contas em blocos. Os saldos de cada bloco são copiados para uma coluna
+(`numpy.int64`) e os créditos e débitos de todas as contas do bloco são calculados de uma só vez,
+com operações vetorizadas sobre a coluna. Só então as contas com lançamentos são visitadas, uma vez
+cada, para ajustar o saldo e registrar os lançamentos no histórico, no diário e nos agregados ativos.
+Sem NumPy, os mesmos valores são calculados em um laço Python.
+
+Os lançamentos usam os tipos "Juros" (crédito), "Tarifa" e "JurosChequeEspecial" (débitos), são
+datados no último segundo do dia do fechamento e calculados sobre o saldo da conta nesse instante
+(`Historico.saldo_em`), sem as transações feitas depois do fim do dia. Por isso o fechamento só pode
+ser executado depois que o dia terminou; se o histórico já tem transações posteriores, os lançamentos
+são inseridos antes delas. Os valores são inteiros em centavos e as taxas são expressas em partes por
+milhão (ppm) ao dia: os juros creditados são arredondados para baixo e os juros do cheque especial
+para cima. Os lançamentos de uma conta são verificados antes de qualquer um ser aplicado: se algum
+saldo, atual ou do histórico, passaria do limite de `dinheiro.LIMITE_CENTAVOS`, a conta é recusada
+sem nenhum lançamento. As anotações no diário não aguardam a gravação em disco com a trava da conta
+adquirida; a gravação é aguardada depois de liberá-la.
+
+O fechamento pode ser executado de novo para o mesmo dia, por exemplo depois de uma interrupção:
+os lançamentos do fechamento datados exatamente no último segundo do dia marcam a conta como
+processada nesse dia, e uma conta que já os tem é ignorada, de modo que nenhuma conta é cobrada duas
+vezes. Como o diário grava os lançamentos com a mesma data, a verificação vale também depois de
+restaurar o estado a partir do diário. Dias que ficaram sem fechamento podem ser fechados depois, um
+por vez, em ordem de data.
+
+Classes:
+    TabelaTarifas: Taxas e tarifas aplicadas no fechamento.
+    ResumoFechamento: Totais de uma execução do fechamento.
+    FechamentoDiario: Aplica uma tabela de tarifas a todas as contas.
+"""
+
+import bisect
+from collections import namedtuple
+from datetime import date, datetime, time, timedelta
+from functools import partial
+from itertools import accumulate, islice
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy é opcional
+    np = None
+
+import agregados
+import diario
+from dinheiro import LIMITE_CENTAVOS
+from eventos import Resultado
+from historico import Historico
+
+JUROS = "Juros"
+TARIFA = "Tarifa"
+JUROS_CHEQUE_ESPECIAL = "JurosChequeEspecial"
+TIPOS_FECHAMENTO = (JUROS, TARIFA, JUROS_CHEQUE_ESPECIAL)
+
+PPM = 1_000_000
+
+TabelaTarifas = namedtuple(
+    "TabelaTarifas",
+    ["faixas_juros", "tarifa_manutencao", "isencao_tarifa", "juros_cheque_especial_ppm"],
+    defaults=((), 0, 0, 0),
+)
+TabelaTarifas.__doc__ = """
+Taxas e tarifas aplicadas no fechamento.
+
+Atributos:
+    faixas_juros (tuple): Pares `(saldo_minimo, ppm)` em ordem crescente de saldo. Um saldo positivo
+        rende a taxa da maior faixa cujo saldo mínimo ele atinge; abaixo da primeira faixa não rende.
+    tarifa_manutencao (int): Tarifa diária de manutenção, em centavos.
+    isencao_tarifa (int): Saldo a partir do qual a tarifa não é cobrada, em centavos.
+    juros_cheque_especial_ppm (int): Taxa diária sobre saldos negativos, em ppm.
+"""
+
+ResumoFechamento = namedtuple(
+    "ResumoFechamento",
+    ["contas", "ignoradas", "juros", "tarifas", "juros_cheque_especial", "recusadas"],
+    defaults=(0,),
+)
+ResumoFechamento.__doc__ = """
+Totais de uma execução do fechamento.
+
+Atributos:
+    contas (int): Contas com pelo menos um lançamento.
+    ignoradas (int): Contas ignoradas por já terem sido processadas no mesmo dia.
+    juros (int): Total de juros creditados, em centavos.
+    tarifas (int): Total de tarifas debitadas, em centavos.
+    juros_cheque_especial (int): Total de juros do cheque especial debitados, em centavos.
+    recusadas (int): Contas sem lançamentos porque algum saldo passaria do limite em centavos.
+"""
+
+
+class FechamentoDiario:
+    """
+    Aplica uma tabela de tarifas a todas as contas, em blocos.
+
+    Métodos:
+        __init__(self, tabela, tamanho_bloco=1_000_000): Inicializa o fechamento.
+        calcular(self, saldos): Calcula os lançamentos de uma coluna de saldos.
+        executar(self, contas, dia=None): Aplica o fechamento de um dia às contas.
+    """
+
+    def __init__(self, tabela, tamanho_bloco=1_000_000):
+        """
+        Inicializa o fechamento.
+
+        Args:
+            tabela (TabelaTarifas): As taxas e tarifas aplicadas.
+            tamanho_bloco (int, optional): Quantidade de contas cujos saldos são calculados de uma
+                vez, o que limita a memória das colunas. Padrão é 1.000.000.
+        """
+        self._tabela = tabela
+        self._tamanho_bloco = tamanho_bloco
+        faixas = sorted(tabela.faixas_juros)
+        self._pisos = [0] + [piso for piso, _ in faixas]
+        self._taxas = [0] + [taxa for _, taxa in faixas]
+
+    @property
+    def tabela(self):
+        """Retorna a tabela de tarifas aplicada."""
+        return self._tabela
+
+    def calcular(self, saldos):
+        """
+        Calcula os juros, as tarifas e os juros do cheque especial de uma coluna de saldos.
+
+        Args:
+            saldos (sequence): Os saldos das contas, em centavos.
+
+        Returns:
+            tuple: Três colunas `(juros, tarifas, juros_cheque_especial)`, em centavos, alinhadas
+            com os saldos; arrays NumPy se disponível, senão listas.
+        """
+        tabela = self._tabela
+        if np is None:
+            juros, tarifas, cheque_especial = [], [], []
+            for saldo in saldos:
+                positivo = max(saldo, 0)
+                taxa = self._taxas[bisect.bisect_right(self._pisos, positivo) - 1]
+                juros.append(positivo * taxa // PPM)
+                tarifas.append(tabela.tarifa_manutencao if saldo < tabela.isencao_tarifa else 0)
+                cheque_especial.append(-(min(saldo, 0) * tabela.juros_cheque_especial_ppm // PPM))
+            return juros, tarifas, cheque_especial
+
+        saldos = np.asarray(saldos, dtype=np.int64)
+        positivos = np.maximum(saldos, 0)
+        taxas = np.asarray(self._taxas, dtype=np.int64)[
+            np.searchsorted(np.asarray(self._pisos, dtype=np.int64), positivos, side="right") - 1
+        ]
+        juros = _aplicar_taxa(positivos, taxas)
+        tarifas = np.where(saldos < tabela.isencao_tarifa, np.int64(tabela.tarifa_manutencao), np.int64(0))
+        cheque_especial = -_aplicar_taxa(np.minimum(saldos, 0), np.int64(tabela.juros_cheque_especial_ppm))
+        return juros, tarifas, cheque_especial
+
+    def executar(self, contas, dia=None):
+        """
+        Aplica o fechamento de um dia às contas.
+
+        Args:
+            contas (iterable): As contas cadastradas.
+            dia (date, optional): O dia do fechamento, já terminado. Padrão é o dia anterior.
+
+        Returns:
+            ResumoFechamento: Os totais da execução.
+
+        Raises:
+            ValueError: Se o dia ainda não terminou.
+        """
+        dia = dia or date.today() - timedelta(days=1)
+        carimbo = int(datetime.combine(dia, time(23, 59, 59)).timestamp())
+        if carimbo >= datetime.now().timestamp():
+            raise ValueError(f"O dia {dia.strftime('%d-%m-%Y')} ainda não terminou")
+        codigos = frozenset(map(Historico.codigo_tipo, TIPOS_FECHAMENTO))
+        ler_saldo = partial(_ler_saldo, carimbo=carimbo)
+        totais = [0, 0, 0, 0, 0, 0]
+        contas = iter(contas)
+        while True:
+            bloco = list(islice(contas, self._tamanho_bloco))
+            if not bloco:
+                break
+            if np is None:
+                saldos = list(map(ler_saldo, bloco))
+            else:
+                saldos = np.fromiter(map(ler_saldo, bloco), dtype=np.int64, count=len(bloco))
+            juros, tarifas, cheque_especial = self.calcular(saldos)
+            if np is None:
+                posicoes = [i for i, valores in enumerate(zip(juros, tarifas, cheque_especial)) if any(valores)]
+            else:
+                posicoes = np.flatnonzero(juros | tarifas | cheque_especial).tolist()
+                juros, tarifas, cheque_especial = juros.tolist(), tarifas.tolist(), cheque_especial.tolist()
+            for posicao in posicoes:
+                lancamentos = (juros[posicao], tarifas[posicao], cheque_especial[posicao])
+                resultado = self._lancar(bloco[posicao], lancamentos, carimbo, codigos)
+                if resultado is None:
+                    totais[1] += 1
+                elif not resultado:
+                    totais[5] += 1
+                else:
+                    totais[0] += 1
+                    totais[2] += lancamentos[0]
+                    totais[3] += lancamentos[1]
+                    totais[4] += lancamentos[2]
+        return ResumoFechamento(*totais)
+
+    @staticmethod
+    def _lancar(conta, lancamentos, carimbo, codigos):
+        """
+        Registra os lançamentos de uma conta, a menos que o fechamento do dia já a tenha processado.
+
+        Args:
+            conta (Conta): A conta.
+            lancamentos (tuple): Os valores de juros, tarifa e juros do cheque especial, em centavos;
+                os de valor zero são omitidos.
+            carimbo (int): O último segundo do dia do fechamento, em segundos desde a época, que é
+                a data dos lançamentos.
+            codigos (frozenset): Os códigos dos tipos de lançamento do fechamento.
+
+        Returns:
+            Resultado: `SUCESSO` se os lançamentos foram registrados, `VALOR_INVALIDO` se algum saldo
+            passaria do limite, ou None se a conta já havia sido processada no dia.
+        """
+        historico = conta.historico
+        diario_ativo, agregados_ativos = diario.ativo(), agregados.ativo()
+        movimentos = (lancamentos[0], -lancamentos[1], -lancamentos[2])
+        marca = None
+        with conta.trava:
+            datas = historico.datas
+            inicio = bisect.bisect_left(datas, carimbo)
+            if not codigos.isdisjoint(historico.tipos[inicio:bisect.bisect_right(datas, carimbo, inicio)]):
+                return None
+            parciais = list(accumulate(movimentos))
+            minimo, maximo = historico.extremos_saldo(carimbo + 1)
+            extremos = (conta.saldo, minimo, maximo)
+            if any(
+                abs(extremo + parcial) > LIMITE_CENTAVOS for extremo in extremos for parcial in parciais
+            ) or max(lancamentos) > LIMITE_CENTAVOS:
+                return Resultado.VALOR_INVALIDO
+            for tipo, valor, movimento in zip(TIPOS_FECHAMENTO, lancamentos, movimentos):
+                if valor:
+                    marca = diario_ativo.anotar_transacao(conta, tipo, valor, carimbo, aguardar=False)
+                    historico.registrar(tipo, valor, carimbo)
+                    conta._saldo += movimento
+                    agregados_ativos.anotar_transacao(conta, tipo, valor, carimbo)
+        diario_ativo.confirmar(marca)
+        return Resultado.SUCESSO
+
+
+def _aplicar_taxa(saldos, taxas):
+    """
+    Calcula `saldos * taxas // PPM` em int64 sem estourar o produto, separando os saldos em milhões e
+    resto: `(q * PPM + r) * t // PPM == q * t + r * t // PPM`.
+    """
+    milhoes, resto = np.divmod(saldos, PPM)
+    return milhoes * taxas + resto * taxas // PPM
+
+
+def _ler_saldo(conta, carimbo):
+    """Retorna o saldo de uma conta ao fim de um dia, lido com a trava da conta adquirida."""
+    with conta.trava:
+        saldos = conta.historico.saldos
+        posteriores = (saldos[-1] if saldos else 0) - conta.historico.saldo_em(carimbo)
+        return conta.saldo - posteriores
@@ -1,48 +1,576 @@
-"""
-Módulo que define a classe Historico para gerenciar transações financeiras.
-"""
-
-from datetime import datetime
-
-
-class Historico:
-    """
-    Classe que representa o histórico de transações financeiras.
-
-    Métodos:
-        __init__() - Inicializa uma nova instância da classe Historico.
-        transacoes() - Retorna a lista de transações.
-        adicionar_transacao(transacao) - Adiciona uma nova transação ao histórico.
-    """
-
-    def __init__(self):
-        """
-        Inicializa uma nova instância da classe Historico.
-        """
-        self._transacoes = []
-
-    @property
-    def transacoes(self):
-        """
-        Retorna a lista de transações.
-
-        Retorna:
-            list: Lista de dicionários, onde cada dicionário representa uma transação.
-        """
-        return self._transacoes
-
-    def adicionar_transacao(self, transacao):
-        """
-        Adiciona uma nova transação ao histórico.
-
-        Parâmetros:
-            transacao (objeto): O objeto de transação a ser adicionado. Espera-se que o objeto tenha
-            um atributo `valor`.
-        """
-        self._transacoes.append(
-            {
-                "tipo": transacao.__class__.__name__,
-                "valor": transacao.valor,
-                "data": datetime.now().strftime("%d-%m-%Y %H:%M:%S"),
-            }
-        )
+"""
+Módulo que define a classe Historico para gerenciar transações financeiras.
+
+As transações são armazenadas em colunas compactas (`array`): o código do tipo, o valor em
+centavos e a data em segundos desde a época. As datas só são formatadas quando o extrato é exibido.
+
+O histórico também mantém o saldo acumulado após cada transação e um índice de mínimos e máximos
+desse saldo, para responder consultas de saldo histórico em tempo logarítmico.
+
+As transações ficam em ordem de data. Uma transação com data anterior à da última, como os lançamentos
+do fechamento de um dia já passado, é inserida na sua posição: os saldos seguintes são deslocados e o
+índice é refeito. Como as posições seguintes mudam de conteúdo, o histórico conta essas inserções
+(`insercoes`), para que quem guarda dados por posição, como o cache de extratos, saiba refazê-los.
+
+As classes usam `__slots__` e as colunas, os contadores e o índice só são alocados quando necessários,
+de modo que uma conta sem movimentação ocupa pouca memória.
+
+As funções `dia_de` e `fim_do_dia` convertem entre as datas do histórico e os dias locais; os módulos
+que agrupam as transações por dia (agregados e exportacao) as usam para localizar os dias por busca
+binária nas colunas de datas.
+"""
+
+import bisect
+import functools
+import threading
+import time
+from array import array
+from itertools import accumulate, islice
+from collections.abc import Sequence
+from datetime import date, datetime, timedelta
+
+from dinheiro import LIMITE_CENTAVOS
+
+TIPOS_CREDITO = frozenset({"Deposito", "TransferenciaRecebida", "Estorno", "Juros"})
+TAMANHO_BLOCO_SALDOS = 64
+
+_cache_dia = [0, 0, None]
+
+
+def dia_de(timestamp):
+    """
+    Retorna o dia local de um timestamp, reaproveitando o último dia calculado.
+
+    Parâmetros:
+        timestamp (int): A data em segundos desde a época.
+
+    Retorna:
+        date: O dia correspondente ao timestamp.
+    """
+    inicio, fim, dia = _cache_dia
+    if inicio <= timestamp < fim:
+        return dia
+    dia = date.fromtimestamp(timestamp)
+    inicio = datetime.combine(dia, datetime.min.time())
+    _cache_dia[:] = [int(inicio.timestamp()), int((inicio + timedelta(days=1)).timestamp()), dia]
+    return dia
+
+
+@functools.lru_cache(maxsize=4_096)
+def fim_do_dia(dia):
+    """
+    Retorna o início do dia seguinte a um dia local, o limite exclusivo das datas do dia.
+
+    Parâmetros:
+        dia (date): O dia.
+
+    Retorna:
+        int: O início do dia seguinte, em segundos desde a época.
+    """
+    return int(datetime.combine(dia + timedelta(days=1), datetime.min.time()).timestamp())
+
+
+class TransacoesView(Sequence):
+    """
+    Visão somente leitura das transações de um histórico.
+
+    Cada item é montado sob demanda como um dicionário com as chaves "tipo", "valor" e "data",
+    mantendo a compatibilidade com o formato original do histórico.
+    """
+
+    __slots__ = ("_historico",)
+
+    def __init__(self, historico):
+        """
+        Inicializa a visão sobre um histórico.
+
+        Parâmetros:
+            historico (Historico): O histórico a ser exibido.
+        """
+        self._historico = historico
+
+    def __len__(self):
+        return len(self._historico._valores)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        historico = self._historico
+        return {
+            "tipo": Historico.nome_tipo(historico._tipos[indice]),
+            "valor": historico._valores[indice],
+            "data": Historico.formatar_data(historico._datas[indice]),
+        }
+
+
+class IndiceExtremos:
+    """
+    Índice de mínimos e máximos de uma coluna que só cresce no final, como o saldo acumulado.
+
+    A coluna é dividida em blocos de `TAMANHO_BLOCO_SALDOS` posições. O primeiro nível guarda o
+    mínimo e o máximo de cada bloco completo e cada nível seguinte combina pares do nível anterior,
+    formando uma árvore de segmentos que cresce junto com a coluna. Uma consulta percorre no máximo
+    dois blocos parciais e O(log n) nós da árvore. O índice ocupa cerca de 1/16 da memória da coluna.
+    """
+
+    __slots__ = ("_coluna", "_minimos", "_maximos")
+
+    def __init__(self, coluna):
+        """
+        Inicializa o índice sobre uma coluna.
+
+        Parâmetros:
+            coluna (array): A coluna indexada; o índice deve ser atualizado a cada crescimento.
+        """
+        self._coluna = coluna
+        self._minimos = []
+        self._maximos = []
+
+    def atualizar(self):
+        """
+        Indexa os blocos que ficaram completos desde a última atualização.
+        """
+        coluna = self._coluna
+        indexados = len(self._minimos[0]) if self._minimos else 0
+        for bloco in range(indexados, len(coluna) // TAMANHO_BLOCO_SALDOS):
+            valores = coluna[bloco * TAMANHO_BLOCO_SALDOS:(bloco + 1) * TAMANHO_BLOCO_SALDOS]
+            self._acrescentar(0, min(valores), max(valores))
+
+    def _acrescentar(self, nivel, minimo, maximo):
+        """Acrescenta um nó a um nível da árvore, combinando-o com o irmão no nível seguinte."""
+        while True:
+            if nivel == len(self._minimos):
+                self._minimos.append(array("q"))
+                self._maximos.append(array("q"))
+            minimos, maximos = self._minimos[nivel], self._maximos[nivel]
+            minimos.append(minimo)
+            maximos.append(maximo)
+            if len(minimos) % 2:
+                return
+            minimo = min(minimos[-2], minimo)
+            maximo = max(maximos[-2], maximo)
+            nivel += 1
+
+    def extremos(self, inicio, fim):
+        """
+        Retorna o mínimo e o máximo da coluna entre duas posições.
+
+        Parâmetros:
+            inicio (int): A posição inicial, inclusiva.
+            fim (int): A posição final, exclusiva; deve ser maior que `inicio`.
+
+        Retorna:
+            tuple: O mínimo e o máximo do intervalo.
+        """
+        coluna = self._coluna
+        bloco_inicio = -(-inicio // TAMANHO_BLOCO_SALDOS)
+        bloco_fim = fim // TAMANHO_BLOCO_SALDOS
+        if bloco_inicio >= bloco_fim:
+            valores = coluna[inicio:fim]
+            return min(valores), max(valores)
+
+        bordas = coluna[inicio:bloco_inicio * TAMANHO_BLOCO_SALDOS] + coluna[bloco_fim * TAMANHO_BLOCO_SALDOS:fim]
+        minimo = min(bordas, default=float("inf"))
+        maximo = max(bordas, default=float("-inf"))
+        esquerda, direita = bloco_inicio, bloco_fim
+        for minimos, maximos in zip(self._minimos, self._maximos):
+            if esquerda >= direita:
+                break
+            if esquerda & 1:
+                minimo = min(minimo, minimos[esquerda])
+                maximo = max(maximo, maximos[esquerda])
+                esquerda += 1
+            if direita & 1:
+                direita -= 1
+                minimo = min(minimo, minimos[direita])
+                maximo = max(maximo, maximos[direita])
+            esquerda >>= 1
+            direita >>= 1
+        return minimo, maximo
+
+
+class Historico:
+    """
+    Classe que representa o histórico de transações financeiras.
+
+    Métodos:
+        __init__() - Inicializa uma nova instância da classe Historico.
+        transacoes() - Retorna uma visão das transações.
+        adicionar_transacao(transacao) - Adiciona uma nova transação ao histórico.
+        registrar(tipo, valor, timestamp=None) - Registra uma transação a partir dos seus campos.
+        verificar(tipo, valor, timestamp) - Verifica se uma transação pode ser registrada.
+        carregar_colunas(tipos, valores, datas) - Acrescenta colunas de transações já codificadas.
+        insercoes() - Retorna quantas transações foram inseridas antes de outras já registradas.
+        contar_transacoes(tipo, dia=None) - Retorna a quantidade de transações de um tipo em um dia.
+        saldo_em(timestamp) - Retorna o saldo da conta em uma data.
+        extremos_saldo(inicio=None, fim=None) - Retorna o menor e o maior saldo em um período.
+        pagina(inicio=None, fim=None, cursor=0, limite=None) - Retorna as posições de uma página do extrato.
+        extrato(inicio=None, fim=None, cursor=0, limite=None) - Gera as transações de uma página do extrato.
+        codigo_tipo(nome) - Retorna o código numérico de um tipo de transação.
+        nome_tipo(codigo) - Retorna o nome de um tipo de transação a partir do código.
+        formatar_data(timestamp) - Formata uma data armazenada no histórico.
+    """
+
+    __slots__ = (
+        "_tipos", "_valores", "_datas", "_saldos", "_indice_saldos", "_contadores_diarios", "_insercoes", "_trava",
+    )
+
+    _codigos_tipos = {}
+    _nomes_tipos = []
+    _sinais_tipos = array("b")
+    _trava_tipos = threading.Lock()
+
+    def __init__(self, trava=None):
+        """
+        Inicializa uma nova instância da classe Historico.
+
+        Parâmetros:
+            trava (Lock, opcional): A trava que protege o histórico. A conta compartilha a sua própria
+            trava (reentrante) com o histórico; por padrão é criada uma trava exclusiva.
+        """
+        self._tipos = self._valores = self._datas = self._saldos = ()
+        self._indice_saldos = None
+        self._contadores_diarios = None
+        self._insercoes = 0
+        self._trava = trava if trava is not None else threading.Lock()
+
+    @property
+    def transacoes(self):
+        """
+        Retorna as transações do histórico.
+
+        Retorna:
+            TransacoesView: Sequência de dicionários, onde cada dicionário representa uma transação.
+        """
+        return TransacoesView(self)
+
+    @property
+    def tipos(self):
+        """Retorna a coluna com os códigos dos tipos das transações."""
+        return self._tipos or array("B")
+
+    @property
+    def valores(self):
+        """Retorna a coluna com os valores das transações, em centavos."""
+        return self._valores or array("q")
+
+    @property
+    def datas(self):
+        """Retorna a coluna com as datas das transações, em segundos desde a época."""
+        return self._datas or array("q")
+
+    @property
+    def saldos(self):
+        """Retorna a coluna com o saldo acumulado após cada transação, em centavos."""
+        return self._saldos or array("q")
+
+    @property
+    def insercoes(self):
+        """Retorna quantas transações foram inseridas antes de outras já registradas."""
+        return self._insercoes
+
+    def _alocar(self):
+        """Aloca as colunas e os contadores quando o histórico recebe a primeira transação."""
+        if not self._datas:
+            self._tipos = array("B")
+            self._valores = array("q")
+            self._datas = array("q")
+            self._saldos = array("q")
+            self._contadores_diarios = {}
+
+    @classmethod
+    def codigo_tipo(cls, nome):
+        """
+        Retorna o código numérico de um tipo de transação, registrando-o se ainda não existir.
+
+        Parâmetros:
+            nome (str): O nome da classe da transação.
+
+        Retorna:
+            int: O código do tipo.
+        """
+        codigo = cls._codigos_tipos.get(nome)
+        if codigo is None:
+            with cls._trava_tipos:
+                codigo = cls._codigos_tipos.get(nome)
+                if codigo is None:
+                    codigo = len(cls._nomes_tipos)
+                    cls._nomes_tipos.append(nome)
+                    cls._sinais_tipos.append(1 if nome in TIPOS_CREDITO else -1)
+                    cls._codigos_tipos[nome] = codigo
+        return codigo
+
+    @classmethod
+    def nome_tipo(cls, codigo):
+        """
+        Retorna o nome de um tipo de transação a partir do código.
+
+        Parâmetros:
+            codigo (int): O código do tipo.
+
+        Retorna:
+            str: O nome da classe da transação.
+        """
+        return cls._nomes_tipos[codigo]
+
+    @staticmethod
+    def formatar_data(timestamp):
+        """
+        Formata uma data armazenada no histórico.
+
+        Parâmetros:
+            timestamp (int): A data em segundos desde a época.
+
+        Retorna:
+            str: A data no formato "dd-mm-aaaa HH:MM:SS".
+        """
+        return datetime.fromtimestamp(timestamp).strftime("%d-%m-%Y %H:%M:%S")
+
+    def adicionar_transacao(self, transacao):
+        """
+        Adiciona uma nova transação ao histórico.
+
+        Parâmetros:
+            transacao (objeto): O objeto de transação a ser adicionado. Espera-se que o objeto tenha
+            um atributo `valor`.
+
+        Retorna:
+            int: A data registrada, em segundos desde a época.
+        """
+        return self.registrar(transacao.__class__.__name__, transacao.valor)
+
+    def registrar(self, tipo, valor, timestamp=None):
+        """
+        Registra uma transação a partir dos seus campos, sem exigir o objeto de transação.
+
+        Usado na reconstrução do histórico a partir do diário de transações. Uma transação com data
+        anterior à da última é inserida na posição da sua data, em tempo O(n).
+
+        Parâmetros:
+            tipo (str): O nome da classe da transação.
+            valor (int): O valor da transação, em centavos.
+            timestamp (int, opcional): A data em segundos desde a época. Padrão é o momento atual.
+
+        Retorna:
+            int: A data registrada, em segundos desde a época.
+
+        Exceções:
+            TypeError: Se o valor ou a data não for um `int`.
+            OverflowError: Se o valor ou o saldo acumulado passar de `dinheiro.LIMITE_CENTAVOS` em
+            módulo.
+
+            Em ambos os casos nenhuma coluna é alterada.
+        """
+        if timestamp is None:
+            timestamp = int(time.time())
+        codigo = self.codigo_tipo(tipo)
+        with self._trava:
+            posicao, saldo = self._verificar(codigo, valor, timestamp)
+            if posicao < len(self._datas):
+                self._inserir(posicao, codigo, valor, timestamp, saldo)
+            else:
+                if not self._datas:
+                    self._alocar()
+                self._tipos.append(codigo)
+                self._valores.append(valor)
+                self._datas.append(timestamp)
+                saldos = self._saldos
+                saldos.append(saldo)
+                if not len(saldos) % TAMANHO_BLOCO_SALDOS:
+                    self._atualizar_indice()
+            chave = (dia_de(timestamp), codigo)
+            self._contadores_diarios[chave] = self._contadores_diarios.get(chave, 0) + 1
+        return timestamp
+
+    def verificar(self, tipo, valor, timestamp):
+        """
+        Verifica se uma transação pode ser registrada, sem alterar o histórico.
+
+        Usado antes de anotar a transação no diário, para que uma transação que o histórico recusaria
+        não fique anotada. O resultado só vale para o `registrar` seguinte se a trava do histórico
+        ficar adquirida entre as duas chamadas.
+
+        Parâmetros:
+            tipo (str): O nome da classe da transação.
+            valor (int): O valor da transação, em centavos.
+            timestamp (int): A data em segundos desde a época.
+
+        Exceções:
+            TypeError: Se o valor ou a data não for um `int`.
+            OverflowError: Se o valor ou o saldo acumulado passar de `dinheiro.LIMITE_CENTAVOS` em
+            módulo.
+        """
+        codigo = self.codigo_tipo(tipo)
+        with self._trava:
+            self._verificar(codigo, valor, timestamp)
+
+    def _verificar(self, codigo, valor, timestamp):
+        """
+        Verifica os tipos e os limites de uma transação e retorna a posição em que ela será registrada
+        e o saldo após ela; deve ser chamado com a trava adquirida.
+        """
+        if type(valor) is not int or type(timestamp) is not int:
+            raise TypeError(f"Valor e data da transação devem ser inteiros: {valor!r}, {timestamp!r}")
+        datas, saldos = self._datas, self._saldos
+        if datas and timestamp < datas[-1]:
+            posicao = bisect.bisect_right(datas, timestamp)
+        else:
+            posicao = len(datas)
+        movimento = self._sinais_tipos[codigo] * valor
+        saldo = (saldos[posicao - 1] if posicao else 0) + movimento
+        cabe = -LIMITE_CENTAVOS <= valor <= LIMITE_CENTAVOS and -LIMITE_CENTAVOS <= saldo <= LIMITE_CENTAVOS
+        if cabe and posicao < len(datas):
+            seguintes = saldos[posicao:]
+            cabe = -LIMITE_CENTAVOS <= min(seguintes) + movimento and max(seguintes) + movimento <= LIMITE_CENTAVOS
+        if not cabe:
+            raise OverflowError(f"Valor ou saldo fora do limite de 64 bits: {valor} centavos")
+        return posicao, saldo
+
+    def _inserir(self, posicao, codigo, valor, timestamp, saldo):
+        """
+        Insere uma transação já verificada antes das que têm data posterior, deslocando os saldos
+        seguintes e refazendo o índice; deve ser chamado com a trava adquirida.
+        """
+        saldos = self._saldos
+        movimento = self._sinais_tipos[codigo] * valor
+        seguintes = saldos[posicao:]
+        self._tipos.insert(posicao, codigo)
+        self._valores.insert(posicao, valor)
+        self._datas.insert(posicao, timestamp)
+        saldos[posicao:] = array("q", [saldo, *(anterior + movimento for anterior in seguintes)])
+        self._indice_saldos = None
+        self._atualizar_indice()
+        self._insercoes += 1
+
+    def carregar_colunas(self, tipos, valores, datas):
+        """
+        Acrescenta ao histórico colunas de transações já codificadas, recalculando os contadores diários.
+
+        Usado na carga do histórico a partir de um snapshot.
+
+        Parâmetros:
+            tipos (array): Os códigos dos tipos, conforme `codigo_tipo`.
+            valores (array): Os valores das transações, em centavos.
+            datas (array): As datas das transações, em segundos desde a época.
+        """
+        with self._trava:
+            self._alocar()
+            self._tipos.extend(tipos)
+            self._valores.extend(valores)
+            self._datas.extend(datas)
+            saldos = self._saldos
+            sinais = self._sinais_tipos
+            movimentos = (sinais[codigo] * valor for codigo, valor in zip(tipos, valores))
+            saldos.extend(islice(accumulate(movimentos, initial=saldos[-1] if saldos else 0), 1, None))
+            self._atualizar_indice()
+            contadores = self._contadores_diarios
+            for codigo, timestamp in zip(tipos, datas):
+                chave = (dia_de(timestamp), codigo)
+                contadores[chave] = contadores.get(chave, 0) + 1
+
+    def _atualizar_indice(self):
+        """Cria o índice de saldos quando o primeiro bloco se completa e indexa os blocos novos."""
+        if len(self._saldos) < TAMANHO_BLOCO_SALDOS:
+            return
+        if self._indice_saldos is None:
+            self._indice_saldos = IndiceExtremos(self._saldos)
+        self._indice_saldos.atualizar()
+
+    def contar_transacoes(self, tipo, dia=None):
+        """
+        Retorna a quantidade de transações de um tipo realizadas em um dia, em tempo constante.
+
+        Parâmetros:
+            tipo (str): O nome da classe da transação, por exemplo "Saque".
+            dia (date, opcional): O dia a ser consultado. Padrão é o dia atual.
+
+        Retorna:
+            int: A quantidade de transações do tipo informado no dia.
+        """
+        if dia is None:
+            dia = date.today()
+        codigo = self._codigos_tipos.get(tipo)
+        if codigo is None or self._contadores_diarios is None:
+            return 0
+        return self._contadores_diarios.get((dia, codigo), 0)
+
+    def saldo_em(self, timestamp):
+        """
+        Retorna o saldo da conta em uma data, em tempo O(log n).
+
+        Parâmetros:
+            timestamp (int): A data em segundos desde a época.
+
+        Retorna:
+            int: O saldo em centavos após todas as transações registradas até a data, inclusive.
+        """
+        posicao = bisect.bisect_right(self._datas, timestamp)
+        return self._saldos[posicao - 1] if posicao else 0
+
+    def extremos_saldo(self, inicio=None, fim=None):
+        """
+        Retorna o menor e o maior saldo da conta em um período, em tempo O(log n).
+
+        O saldo considerado é o de cada instante do período: o saldo no início e o saldo após cada
+        transação registrada no período.
+
+        Parâmetros:
+            inicio (int, opcional): A data inicial, inclusiva, em segundos desde a época.
+            fim (int, opcional): A data final, exclusiva, em segundos desde a época.
+
+        Retorna:
+            tuple: O menor e o maior saldo do período, em centavos.
+        """
+        datas = self._datas
+        primeira = 0 if inicio is None else bisect.bisect_left(datas, inicio)
+        ultima = len(datas) if fim is None else bisect.bisect_left(datas, fim, primeira)
+        indice = self._indice_saldos or IndiceExtremos(self._saldos)
+        if primeira:
+            return indice.extremos(primeira - 1, max(ultima, primeira))
+        if not ultima:
+            return 0, 0
+        minimo, maximo = indice.extremos(0, ultima)
+        return min(minimo, 0), max(maximo, 0)
+
+    def pagina(self, inicio=None, fim=None, cursor=0, limite=None):
+        """
+        Retorna as posições das transações de uma página do extrato, em tempo O(log n).
+
+        As transações são registradas em ordem de data, então o período é localizado por busca
+        binária na coluna de datas.
+
+        Parâmetros:
+            inicio (int, opcional): A data inicial, inclusiva, em segundos desde a época.
+            fim (int, opcional): A data final, exclusiva, em segundos desde a época.
+            cursor (int, opcional): A posição a partir da qual a página começa. Padrão é 0.
+            limite (int, opcional): A quantidade máxima de transações na página. Padrão é sem limite.
+
+        Retorna:
+            tuple: O `range` das posições da página e o cursor da próxima página, ou None se esta
+            for a última.
+        """
+        datas = self._datas
+        primeira = 0 if inicio is None else bisect.bisect_left(datas, inicio)
+        ultima = len(datas) if fim is None else bisect.bisect_left(datas, fim, primeira)
+        primeira = max(primeira, cursor)
+        final = ultima if limite is None else min(ultima, primeira + limite)
+        if final < primeira:
+            final = primeira
+        return range(primeira, final), (final if final < ultima else None)
+
+    def extrato(self, inicio=None, fim=None, cursor=0, limite=None):
+        """
+        Gera as transações de uma página do extrato, sem percorrer o histórico inteiro.
+
+        Parâmetros:
+            inicio (int, opcional): A data inicial, inclusiva, em segundos desde a época.
+            fim (int, opcional): A data final, exclusiva, em segundos desde a época.
+            cursor (int, opcional): A posição a partir da qual a página começa. Padrão é 0.
+            limite (int, opcional): A quantidade máxima de transações na página. Padrão é sem limite.
+
+        Retorna:
+            generator: Dicionários com as chaves "tipo", "valor" e "data", como em `transacoes`.
+        """
+        transacoes = TransacoesView(self)
+        for indice in self.pagina(inicio, fim, cursor, limite)[0]:
+            yield transacoes[indice]
@@ -0,0 +1,181 @@
+"""
+Módulo que define o cache de chaves de idempotência das transações.
+
+Uma transação pode levar uma chave de idempotência, escolhida pelo cliente e repetida quando ele
+reenvia a mesma operação (por exemplo depois de um timeout). A primeira execução com uma chave guarda
+o seu `Resultado` no cache ativo; as repetições devolvem esse resultado sem executar a operação de
+novo, ou seja, sem alterar o saldo nem o histórico da conta. As chaves valem por conta (a de origem,
+nas transferências), e a consulta e a gravação são feitas com a trava da conta adquirida, de modo que
+duas repetições simultâneas não são ambas executadas. Uma chave repetida com outro tipo de operação
+ou outro valor resulta em `Resultado.CHAVE_REUTILIZADA`.
+
+O cache é limitado em quantidade de chaves e em tempo: cada chave expira `ttl` segundos depois de
+gravada e, quando a capacidade é atingida, a chave usada há mais tempo é descartada (LRU). Cada chave
+ocupa cerca de 300 bytes (veja `python benchmark.py idempotencia`), o que orienta a escolha da
+capacidade.
+
+Classes:
+    CacheIdempotencia: Cache das chaves recentes e dos seus resultados, com expiração e descarte LRU.
+    CacheNulo: Cache que não guarda nada, usado quando nenhum está ativo.
+
+Funções:
+    ativar(cache): Define o cache consultado pelas transações.
+    ativo(): Retorna o cache ativo.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from eventos import Resultado
+
+
+class CacheIdempotencia:
+    """
+    Cache das chaves de idempotência recentes e dos resultados das suas operações.
+
+    As chaves ficam em um `OrderedDict` em ordem de uso: a consulta bem-sucedida move a chave para o
+    fim e o descarte remove do início. Chaves expiradas são removidas quando consultadas e, na
+    gravação, enquanto estiverem no início da ordem.
+
+    Métodos:
+        __init__(self, capacidade=1_000_000, ttl=86_400, relogio=time.monotonic): Inicializa o cache.
+        consultar(conta, chave, tipo, valor): Retorna o resultado guardado de uma chave.
+        memorizar(conta, chave, tipo, valor, resultado): Guarda o resultado de uma chave.
+        estatisticas(): Retorna os contadores do cache.
+    """
+
+    def __init__(self, capacidade=1_000_000, ttl=86_400, relogio=time.monotonic):
+        """
+        Inicializa o cache.
+
+        Args:
+            capacidade (int, optional): Quantidade máxima de chaves guardadas. Padrão é 1.000.000.
+            ttl (float, optional): Segundos durante os quais uma chave é válida. Padrão é 86.400 (um dia).
+            relogio (callable, optional): Função que retorna o tempo atual em segundos. Padrão é
+                `time.monotonic`.
+        """
+        self._capacidade = capacidade
+        self._ttl = ttl
+        self._relogio = relogio
+        self._entradas = OrderedDict()
+        self._trava = threading.Lock()
+        self._acertos = self._faltas = self._expulsoes = self._expiradas = 0
+
+    def __len__(self):
+        return len(self._entradas)
+
+    def consultar(self, conta, chave, tipo, valor):
+        """
+        Retorna o resultado guardado de uma chave, se ainda válida.
+
+        Args:
+            conta (Conta): A conta da operação.
+            chave (str): A chave de idempotência.
+            tipo (str): O nome da classe da transação.
+            valor (int): O valor da transação, em centavos.
+
+        Returns:
+            Resultado | None: O resultado da primeira execução, CHAVE_REUTILIZADA se a chave foi usada
+            com outra operação, ou None se a chave não está no cache.
+        """
+        indice = (conta.agencia, conta.numero, chave)
+        with self._trava:
+            entrada = self._entradas.get(indice)
+            if entrada is None:
+                self._faltas += 1
+                return None
+            if entrada[0] <= self._relogio():
+                del self._entradas[indice]
+                self._expiradas += 1
+                self._faltas += 1
+                return None
+            self._entradas.move_to_end(indice)
+            self._acertos += 1
+        _, tipo_guardado, valor_guardado, resultado = entrada
+        if tipo_guardado != tipo or valor_guardado != valor:
+            return Resultado.CHAVE_REUTILIZADA
+        return resultado
+
+    def memorizar(self, conta, chave, tipo, valor, resultado):
+        """
+        Guarda o resultado da primeira execução de uma chave, descartando as chaves expiradas no início
+        da ordem e as usadas há mais tempo além da capacidade.
+
+        Args:
+            conta (Conta): A conta da operação.
+            chave (str): A chave de idempotência.
+            tipo (str): O nome da classe da transação.
+            valor (int): O valor da transação, em centavos.
+            resultado (Resultado): O resultado da operação.
+        """
+        agora = self._relogio()
+        entradas = self._entradas
+        with self._trava:
+            entradas[(conta.agencia, conta.numero, chave)] = (agora + self._ttl, tipo, valor, resultado)
+            while entradas:
+                primeira = next(iter(entradas))
+                if entradas[primeira][0] > agora:
+                    break
+                del entradas[primeira]
+                self._expiradas += 1
+            while len(entradas) > self._capacidade:
+                entradas.popitem(last=False)
+                self._expulsoes += 1
+
+    def estatisticas(self):
+        """
+        Retorna os contadores do cache.
+
+        Returns:
+            dict: As chaves "chaves", "capacidade", "acertos", "faltas", "expulsoes" (descartes por
+            capacidade) e "expiradas".
+        """
+        with self._trava:
+            return {
+                "chaves": len(self._entradas),
+                "capacidade": self._capacidade,
+                "acertos": self._acertos,
+                "faltas": self._faltas,
+                "expulsoes": self._expulsoes,
+                "expiradas": self._expiradas,
+            }
+
+
+class CacheNulo:
+    """
+    Cache que não guarda nenhuma chave. É o cache ativo por padrão.
+    """
+
+    def consultar(self, conta, chave, tipo, valor):
+        return None
+
+    def memorizar(self, conta, chave, tipo, valor, resultado):
+        pass
+
+    def estatisticas(self):
+        return {}
+
+
+_cache_ativo = CacheNulo()
+
+
+def ativar(cache):
+    """
+    Define o cache consultado pelas transações com chave de idempotência.
+
+    Args:
+        cache (CacheIdempotencia): O cache, ou None para desativar.
+    """
+    global _cache_ativo
+    _cache_ativo = cache if cache is not None else CacheNulo()
+
+
+def ativo():
+    """
+    Retorna o cache ativo.
+
+    Returns:
+        CacheIdempotencia | CacheNulo: O cache ativo.
+    """
+    return _cache_ativo
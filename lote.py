@@ -0,0 +1,239 @@
+"""
+Módulo para processamento não interativo de transações em lote.
+
+Lê arquivos CSV ou JSONL com registros de depósito e saque e os aplica por meio de
+`Transacao.registrar`, devolvendo um relatório por registro. O motivo de uma operação recusada é a
+descrição do seu `Resultado` (por exemplo "saldo insuficiente"). Um registro malformado, como uma
+linha JSONL que não é um objeto JSON válido ou uma linha CSV com menos colunas que o cabeçalho, é
+recusado com o motivo correspondente, sem interromper o processamento dos demais.
+
+Formato dos registros:
+    Cada registro identifica a conta pelo campo `cpf` (primeira conta do cliente) ou pelos campos
+    `conta` (número da conta) e `agencia` (opcional, padrão "0001"), e informa `tipo` ("deposito" ou
+    "saque") e `valor` em reais. No resultado, o valor é convertido para centavos.
+
+    CSV:
+        cpf,conta,tipo,valor
+        11144477735,,deposito,100.00
+        ,1,saque,50.00
+
+    JSONL:
+        {"cpf": "11144477735", "tipo": "deposito", "valor": 100.0}
+        {"conta": 1, "tipo": "saque", "valor": 50.0}
+
+Classes:
+    ResultadoLote: Resultado do processamento de um registro.
+    RegistroInvalido: Registro que não pôde ser lido, com o motivo.
+    ProcessadorLote: Aplica registros de transações em lote às contas cadastradas.
+"""
+
+import csv
+import json
+from collections import namedtuple
+from itertools import islice
+
+import dinheiro
+from registro import IndiceContas
+from transacao import Deposito, Saque
+
+ResultadoLote = namedtuple("ResultadoLote", ["linha", "tipo", "valor", "sucesso", "motivo"])
+RegistroInvalido = namedtuple("RegistroInvalido", ["motivo"])
+
+CAMPOS = ("cpf", "agencia", "conta", "tipo", "valor")
+AGENCIA_PADRAO = "0001"
+
+TIPOS_TRANSACAO = {
+    "deposito": Deposito,
+    "depósito": Deposito,
+    "saque": Saque,
+}
+
+
+class ProcessadorLote:
+    """
+    Aplica registros de transações em lote às contas cadastradas.
+
+    Os registros são lidos em blocos de tamanho fixo, de modo que a memória usada não depende do
+    tamanho do arquivo. As contas informadas pelo número são buscadas no índice de contas, sem copiá-lo.
+
+    Métodos:
+        __init__(self, clientes, contas, tamanho_bloco=10_000): Inicializa o processador.
+        processar_arquivo(self, caminho): Processa um arquivo CSV ou JSONL.
+        processar(self, registros): Processa um iterável de registros.
+    """
+
+    def __init__(self, clientes, contas, tamanho_bloco=10_000):
+        """
+        Inicializa o processador.
+
+        Args:
+            clientes (ClienteRegistry): O registro de clientes cadastrados.
+            contas (IndiceContas | iterable): O índice das contas cadastradas (ou outro com `buscar`,
+                como `ContasSQLite`); outras coleções de contas são indexadas em um `IndiceContas`.
+            tamanho_bloco (int, optional): Quantidade de registros processados por bloco. Padrão é 10.000.
+        """
+        self._clientes = clientes
+        self._contas = contas if hasattr(contas, "buscar") else IndiceContas(contas)
+        self._tamanho_bloco = tamanho_bloco
+
+    def processar_arquivo(self, caminho):
+        """
+        Processa um arquivo CSV ou JSONL, conforme a extensão.
+
+        Args:
+            caminho (str): O caminho do arquivo.
+
+        Yields:
+            ResultadoLote: O resultado de cada registro, na ordem do arquivo.
+        """
+        with open(caminho, newline="", encoding="utf-8") as arquivo:
+            if caminho.endswith(".jsonl"):
+                yield from self.processar(_ler_jsonl(arquivo))
+            else:
+                yield from self._processar_campos(self._ler_csv(arquivo))
+
+    def processar(self, registros):
+        """
+        Processa um iterável de registros.
+
+        Args:
+            registros (iterable): Dicionários com os campos `cpf` ou `conta` (e `agencia`), `tipo` e
+                `valor`; outros valores são recusados como registros inválidos.
+
+        Yields:
+            ResultadoLote: O resultado de cada registro, na ordem recebida.
+        """
+        yield from self._processar_campos(map(_campos, registros))
+
+    @staticmethod
+    def _ler_csv(arquivo):
+        """
+        Lê as linhas de um arquivo CSV como tuplas (cpf, agencia, conta, tipo, valor).
+
+        Args:
+            arquivo (file): O arquivo CSV aberto, com linha de cabeçalho.
+
+        Yields:
+            tuple | RegistroInvalido: Os campos de cada registro, ou RegistroInvalido se a linha tem
+            menos colunas que o cabeçalho.
+        """
+        leitor = csv.reader(arquivo)
+        cabecalho = [coluna.strip().lower() for coluna in next(leitor, [])]
+        indices = [cabecalho.index(coluna) if coluna in cabecalho else None for coluna in CAMPOS]
+        colunas = max((indice + 1 for indice in indices if indice is not None), default=0)
+        for linha in leitor:
+            if not linha:
+                continue
+            if len(linha) < colunas:
+                yield RegistroInvalido("linha incompleta")
+            else:
+                yield tuple(linha[indice] if indice is not None else None for indice in indices)
+
+    def _processar_campos(self, campos):
+        """
+        Processa os registros em blocos de tamanho fixo.
+
+        Args:
+            campos (iterable): Tuplas (cpf, agencia, conta, tipo, valor) ou registros inválidos.
+
+        Yields:
+            ResultadoLote: O resultado de cada registro, na ordem recebida.
+        """
+        campos = iter(campos)
+        linha = 1
+        while True:
+            bloco = list(islice(campos, self._tamanho_bloco))
+            if not bloco:
+                return
+            yield from self._processar_bloco(bloco, linha)
+            linha += len(bloco)
+
+    def _processar_bloco(self, bloco, primeira_linha):
+        """
+        Aplica um bloco de registros.
+
+        Args:
+            bloco (list): Os campos dos registros do bloco.
+            primeira_linha (int): O número do primeiro registro do bloco.
+
+        Returns:
+            list: Os resultados do bloco.
+        """
+        aplicar = self._aplicar
+        return [
+            ResultadoLote(linha, None, None, False, campos.motivo)
+            if isinstance(campos, RegistroInvalido)
+            else aplicar(linha, *campos)
+            for linha, campos in enumerate(bloco, primeira_linha)
+        ]
+
+    def _aplicar(self, linha, cpf, agencia, numero, tipo, valor):
+        """
+        Converte um registro em transação e a registra na conta correspondente.
+
+        Args:
+            linha (int): O número do registro.
+            cpf (str): O CPF do cliente, usado quando o número da conta não é informado.
+            agencia (str): A agência da conta; vazia para a agência padrão.
+            numero (str): O número da conta.
+            tipo (str): O tipo da transação.
+            valor (str): O valor da transação, em reais.
+
+        Returns:
+            ResultadoLote: O resultado do registro.
+        """
+        tipo = str(tipo or "").strip().lower()
+        classe = TIPOS_TRANSACAO.get(tipo)
+        if classe is None:
+            return ResultadoLote(linha, tipo, None, False, "tipo inválido")
+        try:
+            valor = dinheiro.para_centavos(valor)
+        except (TypeError, ValueError):
+            return ResultadoLote(linha, tipo, None, False, "valor inválido")
+
+        if numero not in (None, ""):
+            try:
+                conta = self._contas.buscar(str(agencia or "").strip() or AGENCIA_PADRAO, str(numero).strip())
+            except ValueError:
+                conta = None
+            if conta is None:
+                return ResultadoLote(linha, tipo, valor, False, "conta não encontrada")
+        else:
+            cliente = self._clientes.buscar(str(cpf or ""))
+            if not cliente:
+                return ResultadoLote(linha, tipo, valor, False, "cliente não encontrado")
+            if not cliente.contas:
+                return ResultadoLote(linha, tipo, valor, False, "cliente não possui conta")
+            conta = cliente.contas[0]
+
+        resultado = classe(valor).registrar(conta)
+        if resultado:
+            return ResultadoLote(linha, tipo, valor, True, None)
+        return ResultadoLote(linha, tipo, valor, False, resultado.value)
+
+
+def _campos(registro):
+    """Retorna a tupla de campos de um registro, ou RegistroInvalido se ele não for um dicionário."""
+    if isinstance(registro, dict):
+        return tuple(map(registro.get, CAMPOS))
+    if isinstance(registro, RegistroInvalido):
+        return registro
+    return RegistroInvalido("registro inválido")
+
+
+def _ler_jsonl(arquivo):
+    """
+    Lê as linhas não vazias de um arquivo JSONL.
+
+    Args:
+        arquivo (file): O arquivo JSONL aberto.
+
+    Yields:
+        object | RegistroInvalido: O valor de cada linha, ou RegistroInvalido se ela não for JSON válido.
+    """
+    for linha in arquivo:
+        if linha.strip():
+            try:
+                yield json.loads(linha)
+            except ValueError:
+                yield RegistroInvalido("JSON inválido")
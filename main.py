@@ -1,71 +1,144 @@
-"""
-Módulo principal do sistema bancário.
-
-Este módulo fornece a função `main` que é responsável por controlar o fluxo principal do programa.
-O programa permite a criação de clientes e contas bancárias, além de operações como depósito,
-saque e exibição de extratos.
-
-Importa as funções necessárias do módulo `menu`:
-- `menu`
-- `depositar`
-- `sacar`
-- `exibir_extrato`
-- `criar_cliente`
-- `criar_conta`
-- `listar_contas`
-"""
-
-from menu import (
-    menu,
-    depositar,
-    sacar,
-    exibir_extrato,
-    criar_cliente,
-    criar_conta,
-    listar_contas
-)
-
-
-def main():
-    """
-    Função principal que controla o fluxo do programa.
-
-    Esta função inicializa listas de clientes e contas, e entra em um loop infinito onde exibe
-    um menu e executa ações baseadas na opção escolhida pelo usuário. As opções incluem:
-    - 'd': Depositar dinheiro em uma conta.
-    - 's': Sacar dinheiro de uma conta.
-    - 'e': Exibir extrato de uma conta.
-    - 'nu': Criar um novo cliente.
-    - 'nc': Criar uma nova conta.
-    - 'lc': Listar todas as contas.
-    - 'q': Sair do programa.
-
-    A função valida a entrada do usuário e exibe uma mensagem de erro para entradas inválidas.
-    """
-    clientes = []
-    contas = []
-
-    while True:
-        opcao = menu()
-
-        if opcao == "d":
-            depositar(clientes)
-        elif opcao == "s":
-            sacar(clientes)
-        elif opcao == "e":
-            exibir_extrato(clientes)
-        elif opcao == "nu":
-            criar_cliente(clientes)
-        elif opcao == "nc":
-            numero_conta = len(contas) + 1
-            criar_conta(numero_conta, clientes, contas)
-        elif opcao == "lc":
-            listar_contas(contas)
-        elif opcao == "q":
-            break
-        else:
-            print("\n@@@ Operação inválida, por favor selecione novamente a operação desejada. @@@")
-
-
-if __name__ == "__main__":
-    main()
+"""
+Módulo principal do sistema bancário.
+
+Este módulo fornece a função `main` que é responsável por controlar o fluxo principal do programa.
+O programa permite a criação de clientes e contas bancárias, além de operações como depósito,
+saque e exibição de extratos.
+
+Importa as funções necessárias do módulo `menu`:
+- `menu`
+- `depositar`
+- `sacar`
+- `exibir_extrato`
+- `criar_cliente`
+- `criar_conta`
+- `listar_contas`
+"""
+
+import os
+
+import diario
+import extratos
+import metricas
+import snapshot
+from registro import AlocadorNumeros
+from repositorio import RepositorioSQLite
+from menu import (
+    menu,
+    depositar,
+    sacar,
+    exibir_extrato,
+    criar_cliente,
+    criar_conta,
+    listar_contas
+)
+
+
+ANOTACOES_POR_SNAPSHOT = 1_000
+
+OPERACOES_MENU = {
+    "d": "depositar",
+    "s": "sacar",
+    "e": "exibir_extrato",
+    "nu": "criar_cliente",
+    "nc": "criar_conta",
+    "lc": "listar_contas",
+    "q": "sair",
+}
+
+
+def main(diretorio_dados="banco", arquivo_metricas=None, repositorio=None):
+    """
+    Função principal que controla o fluxo do programa.
+
+    Esta função restaura o registro de clientes e a lista de contas a partir do snapshot e do diário
+    de transações, ativa o diário para as novas operações e entra em um loop infinito onde exibe
+    um menu e executa ações baseadas na opção escolhida pelo usuário. As opções incluem:
+    - 'd': Depositar dinheiro em uma conta.
+    - 's': Sacar dinheiro de uma conta.
+    - 'e': Exibir extrato de uma conta.
+    - 'nu': Criar um novo cliente.
+    - 'nc': Criar uma nova conta.
+    - 'lc': Listar todas as contas.
+    - 'q': Sair do programa.
+
+    A função valida a entrada do usuário e exibe uma mensagem de erro para entradas inválidas.
+    A cada `ANOTACOES_POR_SNAPSHOT` anotações no diário, um novo snapshot é gravado em segundo plano
+    e os segmentos do diário cobertos por ele são descartados; ao sair, a gravação é feita antes de
+    encerrar. Só as contas usadas ou criadas desde a restauração são serializadas de novo. Os
+    extratos exibidos ficam no cache de extratos, que só formata as transações novas quando o mesmo
+    extrato é exibido de novo.
+
+    Se um repositório for informado (por exemplo um `repositorio.RepositorioSQLite`), os clientes e
+    as contas vêm dele e ele recebe as anotações no lugar do diário e dos snapshots.
+
+    Os agregados diários (veja o módulo agregados) não são ativados: o menu não tem relatório que os
+    leia, e mantê-los custaria uma soma a cada operação e a carga dos históricos ao iniciar. O servidor,
+    que responde à operação `relatorio`, os ativa.
+
+    Se um arquivo de métricas for informado, a instrumentação é ativada, cada operação do menu é
+    medida e as métricas são gravadas no formato do Prometheus ao sair.
+
+    Args:
+        diretorio_dados (str, optional): O diretório do diário e do snapshot. Padrão é "banco".
+        arquivo_metricas (str, optional): O arquivo onde gravar as métricas. Padrão é não instrumentar.
+        repositorio (RepositorioSQLite, optional): O repositório dos dados. Padrão é o estado em memória
+            restaurado do diretório de dados.
+    """
+    if repositorio is None:
+        clientes, contas = snapshot.restaurar(diretorio_dados)
+        diario_atual = diario.Diario(diretorio_dados)
+    else:
+        clientes, contas = repositorio.clientes, repositorio.contas
+        diario_atual = repositorio
+    diario.ativar(diario_atual)
+    alocador = AlocadorNumeros(contas.ultimo_numero() + 1)
+    extratos.ativar(extratos.CacheExtratos())
+    if arquivo_metricas:
+        metricas.ativar()
+    compactacao = None
+
+    while True:
+        opcao = menu()
+
+        with metricas.ativo().medir(f"menu.{OPERACOES_MENU.get(opcao, 'invalida')}"):
+            if opcao == "d":
+                depositar(clientes)
+            elif opcao == "s":
+                sacar(clientes)
+            elif opcao == "e":
+                exibir_extrato(clientes)
+            elif opcao == "nu":
+                criar_cliente(clientes)
+            elif opcao == "nc":
+                criar_conta(alocador, clientes, contas)
+            elif opcao == "lc":
+                listar_contas(contas)
+            elif opcao == "q":
+                if repositorio is None:
+                    if compactacao is not None:
+                        compactacao.join()
+                    snapshot.compactar(diretorio_dados, clientes, contas, diario_atual)
+                diario_atual.fechar()
+                break
+            else:
+                print("\n@@@ Operação inválida, por favor selecione novamente a operação desejada. @@@")
+
+        if (
+            repositorio is None
+            and diario_atual.anotacoes_no_segmento >= ANOTACOES_POR_SNAPSHOT
+            and (compactacao is None or not compactacao.is_alive())
+        ):
+            compactacao = snapshot.compactar(diretorio_dados, clientes, contas, diario_atual, em_segundo_plano=True)
+
+    if arquivo_metricas:
+        metricas.ativo().gravar_prometheus(arquivo_metricas)
+        metricas.desativar()
+
+
+if __name__ == "__main__":
+    caminho_sqlite = os.environ.get("BANCO_SQLITE")
+    main(
+        arquivo_metricas=os.environ.get("BANCO_METRICAS"),
+        repositorio=RepositorioSQLite(caminho_sqlite) if caminho_sqlite else None,
+    )
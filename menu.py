@@ -1,196 +1,283 @@
-"""
-Módulo para gerenciar transações bancárias, contas e clientes.
-
-Este módulo contém funções para realizar operações bancárias como depósito,
-saque, exibição de extrato, criação de cliente e conta, e listagem de contas.
-"""
-
-
-import textwrap
-from transacao import Deposito, Saque
-from cliente import PessoaFisica
-from conta import ContaCorrente
-from validador_cpf import ValidadorCPF
-from datetime import datetime
-
-
-def menu():
-    """
-    Exibe o menu principal e retorna a opção escolhida pelo usuário.
-
-    Returns:
-        str: A opção escolhida pelo usuário.
-    """
-    menu = """\n
-    ================ MENU ================
-    [d]\tDepositar
-    [s]\tSacar
-    [e]\tExtrato
-    [nc]\tNova conta
-    [lc]\tListar contas
-    [nu]\tNovo usuário
-    [q]\tSair
-    => """
-    return input(textwrap.dedent(menu))
-
-
-def filtrar_cliente(cpf, clientes):
-    """
-    Filtra e retorna o cliente com o CPF informado.
-
-    Args:
-        cpf (str): O CPF do cliente a ser filtrado.
-        clientes (list): A lista de clientes cadastrados.
-
-    Returns:
-        PessoaFisica: O cliente correspondente ao CPF informado, ou None se não encontrado.
-    """
-    clientes_filtrados = [cliente for cliente in clientes if cliente.cpf == cpf]
-    return clientes_filtrados[0] if clientes_filtrados else None
-
-
-def recuperar_conta_cliente(cliente):
-    """
-    Recupera a primeira conta associada ao cliente.
-
-    Args:
-        cliente (PessoaFisica): O cliente cuja conta será recuperada.
-
-    Returns:
-        ContaCorrente: A primeira conta do cliente, ou None se o cliente não possuir conta.
-    """
-    if not cliente.contas:
-        print("\n@@@ Cliente não possui conta! @@@")
-        return
-    return cliente.contas[0]
-
-
-def depositar(clientes):
-    """
-    Realiza uma operação de depósito para um cliente.
-
-    Args:
-        clientes (list): A lista de clientes cadastrados.
-    """
-    cpf = input("Informe o CPF do cliente: ")
-    cliente = filtrar_cliente(cpf, clientes)
-    if not cliente:
-        print("\n@@@ Cliente não encontrado! @@@")
-        return
-    valor = float(input("Informe o valor do depósito: "))
-    transacao = Deposito(valor)
-    conta = recuperar_conta_cliente(cliente)
-    if not conta:
-        return
-    cliente.realizar_transacao(conta, transacao)
-
-
-def sacar(clientes):
-    """
-    Realiza uma operação de saque para um cliente.
-
-    Args:
-        clientes (list): A lista de clientes cadastrados.
-    """
-    cpf = input("Informe o CPF do cliente: ")
-    cliente = filtrar_cliente(cpf, clientes)
-    if not cliente:
-        print("\n@@@ Cliente não encontrado! @@@")
-        return
-    valor = float(input("Informe o valor do saque: "))
-    transacao = Saque(valor)
-    conta = recuperar_conta_cliente(cliente)
-    if not conta:
-        return
-    cliente.realizar_transacao(conta, transacao)
-
-
-def exibir_extrato(clientes):
-    """
-    Exibe o extrato da conta de um cliente.
-
-    Args:
-        clientes (list): A lista de clientes cadastrados.
-    """
-    cpf = input("Informe o CPF do cliente: ")
-    cliente = filtrar_cliente(cpf, clientes)
-
-    if not cliente:
-        print("\n@@@ Cliente não encontrado! @@@")
-        return
-
-    conta = recuperar_conta_cliente(cliente)
-    if not conta:
-        return
-
-    print("\n================ EXTRATO ================")
-    print(f"Titular: {cliente.nome}")
-    print(f"Data: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}")
-
-    transacoes = conta.historico.transacoes
-
-    extrato = ""
-    if not transacoes:
-        extrato = "Não foram realizadas movimentações."
-    else:
-        for transacao in transacoes:
-            extrato += f"\n{transacao['tipo']}:\n\tR$ {transacao['valor']:.2f}"
-
-    print(extrato)
-    print(f"\nSaldo:\n\tR$ {conta.saldo:.2f}")
-    print("==========================================")
-
-
-def criar_cliente(clientes):
-    """
-    Cria um novo cliente.
-
-    Args:
-        clientes (list): A lista de clientes cadastrados.
-    """
-    cpf = input("Informe o CPF (somente número): ")
-    if not ValidadorCPF.validar(cpf):
-        print("\n@@@ CPF inválido! @@@")
-        return
-    cliente = filtrar_cliente(cpf, clientes)
-    if cliente:
-        print("\n@@@ Já existe cliente com esse CPF! @@@")
-        return
-    nome = input("Informe o nome completo: ")
-    data_nascimento = input("Informe a data de nascimento (dd-mm-aaaa): ")
-    endereco = input("Informe o endereço (logradouro, nro - bairro - cidade/sigla estado): ")
-    cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
-    clientes.append(cliente)
-    print("\n=== Cliente criado com sucesso! ===")
-
-
-def criar_conta(numero_conta, clientes, contas):
-    """
-    Cria uma nova conta para um cliente existente.
-
-    Args:
-        numero_conta (str): O número da nova conta.
-        clientes (list): A lista de clientes cadastrados.
-        contas (list): A lista de contas cadastradas.
-    """
-    cpf = input("Informe o CPF do cliente: ")
-    cliente = filtrar_cliente(cpf, clientes)
-    if not cliente:
-        print("\n@@@ Cliente não encontrado, fluxo de criação de conta encerrado! @@@")
-        return
-    conta = ContaCorrente.nova_conta(cliente=cliente, numero=numero_conta)
-    contas.append(conta)
-    cliente.contas.append(conta)
-    print("\n=== Conta criada com sucesso! ===")
-
-
-def listar_contas(contas):
-    """
-    Lista todas as contas cadastradas.
-
-    Args:
-        contas (list): A lista de contas cadastradas.
-    """
-    for conta in contas:
-        print("=" * 40)
-        print(textwrap.dedent(str(conta)))
+"""
+Módulo para gerenciar transações bancárias, contas e clientes.
+
+Este módulo contém funções para realizar operações bancárias como depósito,
+saque, exibição de extrato, criação de cliente e conta, e listagem de contas.
+"""
+
+
+import textwrap
+import diario
+import dinheiro
+import eventos
+import extratos
+from transacao import Deposito, Saque
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from validador_cpf import ValidadorCPF
+from datetime import datetime, timedelta
+
+LINHAS_POR_PAGINA = 20
+CONTAS_POR_PAGINA = 10
+
+
+def menu():
+    """
+    Exibe o menu principal e retorna a opção escolhida pelo usuário.
+
+    Returns:
+        str: A opção escolhida pelo usuário.
+    """
+    menu = """\n
+    ================ MENU ================
+    [d]\tDepositar
+    [s]\tSacar
+    [e]\tExtrato
+    [nc]\tNova conta
+    [lc]\tListar contas
+    [nu]\tNovo usuário
+    [q]\tSair
+    => """
+    return input(textwrap.dedent(menu))
+
+
+def filtrar_cliente(cpf, clientes):
+    """
+    Filtra e retorna o cliente com o CPF informado.
+
+    Args:
+        cpf (str): O CPF do cliente a ser filtrado.
+        clientes (ClienteRegistry): O registro de clientes cadastrados.
+
+    Returns:
+        PessoaFisica: O cliente correspondente ao CPF informado, ou None se não encontrado.
+    """
+    return clientes.buscar(cpf)
+
+
+def recuperar_conta_cliente(cliente):
+    """
+    Recupera uma conta do cliente. Se o cliente possuir mais de uma conta, lista as contas e pergunta
+    qual delas usar.
+
+    Args:
+        cliente (PessoaFisica): O cliente cuja conta será recuperada.
+
+    Returns:
+        ContaCorrente: A conta escolhida, ou None se o cliente não possuir conta ou a conta informada
+        não for dele.
+    """
+    if not cliente.contas:
+        print("\n@@@ Cliente não possui conta! @@@")
+        return
+    if len(cliente.contas) == 1:
+        return cliente.contas[0]
+    for conta in cliente.contas:
+        print(f"[{conta.numero}] Agência {conta.agencia}, C/C {conta.numero}")
+    numero = input("Informe o número da conta: ").strip()
+    for conta in cliente.contas:
+        if str(conta.numero) == numero:
+            return conta
+    print("\n@@@ Conta não encontrada! @@@")
+
+
+def depositar(clientes):
+    """
+    Realiza uma operação de depósito para um cliente.
+
+    Args:
+        clientes (ClienteRegistry): O registro de clientes cadastrados.
+    """
+    cpf = input("Informe o CPF do cliente: ")
+    cliente = filtrar_cliente(cpf, clientes)
+    if not cliente:
+        print("\n@@@ Cliente não encontrado! @@@")
+        return
+    try:
+        valor = dinheiro.para_centavos(input("Informe o valor do depósito: "))
+    except ValueError:
+        print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
+        return
+    transacao = Deposito(valor)
+    conta = recuperar_conta_cliente(cliente)
+    if not conta:
+        return
+    resultado = cliente.realizar_transacao(conta, transacao)
+    print(eventos.mensagem(transacao.__class__.__name__, resultado))
+
+
+def sacar(clientes):
+    """
+    Realiza uma operação de saque para um cliente.
+
+    Args:
+        clientes (ClienteRegistry): O registro de clientes cadastrados.
+    """
+    cpf = input("Informe o CPF do cliente: ")
+    cliente = filtrar_cliente(cpf, clientes)
+    if not cliente:
+        print("\n@@@ Cliente não encontrado! @@@")
+        return
+    try:
+        valor = dinheiro.para_centavos(input("Informe o valor do saque: "))
+    except ValueError:
+        print("\n@@@ Operação falhou! O valor informado é inválido. @@@")
+        return
+    transacao = Saque(valor)
+    conta = recuperar_conta_cliente(cliente)
+    if not conta:
+        return
+    resultado = cliente.realizar_transacao(conta, transacao)
+    print(eventos.mensagem(transacao.__class__.__name__, resultado))
+
+
+def ler_periodo():
+    """
+    Lê o período do extrato informado pelo usuário.
+
+    Returns:
+        tuple: As datas inicial (inclusiva) e final (exclusiva) em segundos desde a época, ou None
+        onde o usuário não informou data. Retorna None se alguma data for inválida.
+    """
+    periodo = []
+    for pergunta, dias in (("Data inicial", 0), ("Data final", 1)):
+        texto = input(f"{pergunta} (dd-mm-aaaa) ou Enter para não limitar: ").strip()
+        if not texto:
+            periodo.append(None)
+            continue
+        try:
+            data = datetime.strptime(texto, "%d-%m-%Y") + timedelta(days=dias)
+        except ValueError:
+            print("\n@@@ Data inválida! @@@")
+            return
+        periodo.append(int(data.timestamp()))
+    return tuple(periodo)
+
+
+def gerar_extrato(historico, inicio=None, fim=None, cursor=0, limite=None):
+    """
+    Gera as linhas de uma página do extrato, sem montar o extrato inteiro em memória.
+
+    Args:
+        historico (Historico): O histórico da conta.
+        inicio (int, optional): A data inicial, inclusiva, em segundos desde a época.
+        fim (int, optional): A data final, exclusiva, em segundos desde a época.
+        cursor (int, optional): A posição a partir da qual a página começa. Padrão é 0.
+        limite (int, optional): A quantidade máxima de transações na página. Padrão é sem limite.
+
+    Yields:
+        str: Uma linha do extrato para cada transação.
+    """
+    for transacao in historico.extrato(inicio, fim, cursor, limite):
+        yield extratos.formatar_linha(transacao["tipo"], transacao["valor"])
+
+
+def exibir_extrato(clientes):
+    """
+    Exibe o extrato da conta de um cliente, por período e em páginas de `LINHAS_POR_PAGINA` transações.
+
+    As linhas vêm do cache de extratos ativo (veja o módulo extratos), que só formata as transações
+    registradas desde a última exibição do mesmo período.
+
+    Args:
+        clientes (ClienteRegistry): O registro de clientes cadastrados.
+    """
+    cpf = input("Informe o CPF do cliente: ")
+    cliente = filtrar_cliente(cpf, clientes)
+
+    if not cliente:
+        print("\n@@@ Cliente não encontrado! @@@")
+        return
+
+    conta = recuperar_conta_cliente(cliente)
+    if not conta:
+        return
+
+    periodo = ler_periodo()
+    if not periodo:
+        return
+    inicio, fim = periodo
+
+    print("\n================ EXTRATO ================")
+    print(f"Titular: {cliente.nome}")
+    print(f"Data: {datetime.now().strftime('%d-%m-%Y %H:%M:%S')}")
+    print()
+
+    historico = conta.historico
+    cursor = 0
+    exibidas = 0
+    while cursor is not None:
+        linhas, proximo = extratos.ativo().pagina(historico, inicio, fim, cursor, LINHAS_POR_PAGINA)
+        for linha in linhas:
+            print(linha)
+        exibidas += len(linhas)
+        cursor = proximo
+        if cursor is not None and input("\nEnter para continuar ou [q] para encerrar: ").strip().lower() == "q":
+            break
+
+    if not exibidas:
+        print("Não foram realizadas movimentações.")
+    print(f"\nSaldo:\n\tR$ {dinheiro.formatar(conta.saldo)}")
+    print("==========================================")
+
+
+def criar_cliente(clientes):
+    """
+    Cria um novo cliente.
+
+    Args:
+        clientes (ClienteRegistry): O registro de clientes cadastrados.
+    """
+    cpf = input("Informe o CPF (somente número): ")
+    if not ValidadorCPF.validar(cpf):
+        print("\n@@@ CPF inválido! @@@")
+        return
+    cliente = filtrar_cliente(cpf, clientes)
+    if cliente:
+        print("\n@@@ Já existe cliente com esse CPF! @@@")
+        return
+    nome = input("Informe o nome completo: ")
+    data_nascimento = input("Informe a data de nascimento (dd-mm-aaaa): ")
+    endereco = input("Informe o endereço (logradouro, nro - bairro - cidade/sigla estado): ")
+    cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
+    clientes.adicionar(cliente)
+    diario.ativo().anotar_cliente(cliente)
+    print("\n=== Cliente criado com sucesso! ===")
+
+
+def criar_conta(alocador, clientes, contas):
+    """
+    Cria uma nova conta para um cliente existente.
+
+    Args:
+        alocador (AlocadorNumeros): O alocador que fornece o número da nova conta.
+        clientes (ClienteRegistry): O registro de clientes cadastrados.
+        contas (IndiceContas): O índice de contas cadastradas.
+    """
+    cpf = input("Informe o CPF do cliente: ")
+    cliente = filtrar_cliente(cpf, clientes)
+    if not cliente:
+        print("\n@@@ Cliente não encontrado, fluxo de criação de conta encerrado! @@@")
+        return
+    conta = ContaCorrente.nova_conta(cliente=cliente, numero=alocador.alocar())
+    contas.append(conta)
+    cliente.contas.append(conta)
+    diario.ativo().anotar_conta(conta)
+    print("\n=== Conta criada com sucesso! ===")
+
+
+def listar_contas(contas):
+    """
+    Lista as contas cadastradas, na ordem de agência e número, em páginas de `CONTAS_POR_PAGINA` contas.
+
+    Args:
+        contas (IndiceContas): O índice de contas cadastradas.
+    """
+    cursor = None
+    while True:
+        pagina, cursor = contas.intervalo(cursor, CONTAS_POR_PAGINA)
+        for conta in pagina:
+            print("=" * 40)
+            print(textwrap.dedent(str(conta)))
+        if cursor is None or input("\nEnter para continuar ou [q] para encerrar: ").strip().lower() == "q":
+            break
@@ -0,0 +1,436 @@
+"""
+Módulo de instrumentação opcional do sistema bancário: contadores, histogramas de latência e perfil.
+
+A instrumentação é desligada por padrão e, nesse caso, não tem custo: `ativar` substitui os métodos
+do caminho crítico (`Transacao.registrar` das transações concretas, `Conta.sacar`, `Conta.depositar`,
+`Conta.transferir`, `Historico.adicionar_transacao` e `Historico.registrar`) por versões que medem
+cada chamada, e `desativar` restaura os originais. As operações do menu são medidas no laço principal
+com `ativo().medir(...)`, que é um contexto vazio enquanto a instrumentação está desligada.
+
+Cada operação registra a quantidade de chamadas por resultado (o código do `Resultado` retornado,
+como "sucesso" ou "saldo_insuficiente", ou "erro" se a chamada levantar uma exceção) e um histograma
+de latência no estilo HDR: valores até 127 ns são exatos e os maiores são agrupados em faixas com
+erro relativo de no máximo 1/64 (cerca de 1,6%), com memória proporcional ao logaritmo do maior
+valor registrado.
+
+Classes:
+    Histograma: Histograma de latências log-linear, no estilo HDR.
+    Metricas: Contadores e histogramas por operação, exportáveis como dicionário ou texto Prometheus.
+    MetricasNulas: Métricas que não registram nada, usadas enquanto a instrumentação está desligada.
+
+Funções:
+    ativar(metricas=None): Liga a instrumentação dos métodos do caminho crítico.
+    desativar(): Desliga a instrumentação e restaura os métodos originais.
+    ativo(): Retorna as métricas ativas.
+    perfilar(caminho, segundos): Grava um perfil cProfile de uma janela de tempo.
+    encerrar_perfil(): Encerra a janela de perfil em andamento e grava o arquivo.
+"""
+
+import contextlib
+import cProfile
+import functools
+import os
+import threading
+import time
+
+from conta import Conta
+from eventos import Resultado
+from historico import Historico
+from transacao import Deposito, Saque, Transferencia
+
+PONTOS_INSTRUMENTADOS = (
+    (Saque, "registrar"),
+    (Deposito, "registrar"),
+    (Transferencia, "registrar"),
+    (Conta, "sacar"),
+    (Conta, "depositar"),
+    (Conta, "transferir"),
+    (Historico, "adicionar_transacao"),
+    (Historico, "registrar"),
+)
+
+LIMITES_PROMETHEUS = tuple(
+    base * 10 ** expoente for expoente in range(3, 10) for base in (1, 2.5, 5)
+) + (10 ** 10,)
+
+_SUBFAIXAS = 64
+
+
+class Histograma:
+    """
+    Histograma de latências log-linear, no estilo HDR.
+
+    Os valores menores que 2 * `_SUBFAIXAS` ocupam uma faixa cada; a partir daí, cada potência de dois
+    é dividida em `_SUBFAIXAS` faixas de mesma largura.
+
+    Atributos:
+        contagem (int): A quantidade de valores registrados.
+        soma (int): A soma dos valores registrados.
+        minimo (int): O menor valor registrado.
+        maximo (int): O maior valor registrado.
+
+    Métodos:
+        registrar(valor): Registra um valor.
+        percentil(percentual): Retorna o valor abaixo do qual está o percentual informado dos registros.
+        contagem_ate(limite): Retorna a quantidade de valores menores ou iguais ao limite.
+    """
+
+    __slots__ = ("_contagens", "contagem", "soma", "minimo", "maximo")
+
+    def __init__(self):
+        """
+        Inicializa um histograma vazio.
+        """
+        self._contagens = [0] * (3 * _SUBFAIXAS)
+        self.contagem = 0
+        self.soma = 0
+        self.minimo = None
+        self.maximo = 0
+
+    @staticmethod
+    def _inicio_faixa(indice):
+        """Retorna o menor valor de uma faixa."""
+        if indice < 2 * _SUBFAIXAS:
+            return indice
+        expoente, resto = divmod(indice - 2 * _SUBFAIXAS, _SUBFAIXAS)
+        return (resto + _SUBFAIXAS) << (expoente + 1)
+
+    def registrar(self, valor):
+        """
+        Registra um valor.
+
+        Args:
+            valor (int): O valor, por exemplo uma latência em nanossegundos.
+        """
+        if valor < 2 * _SUBFAIXAS:
+            indice = max(valor, 0)
+        else:
+            expoente = valor.bit_length() - 7
+            indice = 2 * _SUBFAIXAS + (expoente - 1) * _SUBFAIXAS + (valor >> expoente) - _SUBFAIXAS
+        contagens = self._contagens
+        if indice >= len(contagens):
+            contagens.extend([0] * (indice + 1 - len(contagens)))
+        contagens[indice] += 1
+        self.contagem += 1
+        self.soma += valor
+        if self.minimo is None or valor < self.minimo:
+            self.minimo = valor
+        if valor > self.maximo:
+            self.maximo = valor
+
+    def percentil(self, percentual):
+        """
+        Retorna o valor abaixo do qual está o percentual informado dos registros.
+
+        Args:
+            percentual (float): O percentual, entre 0 e 100.
+
+        Returns:
+            int: O maior valor da faixa que contém o percentil, limitado ao maior valor registrado.
+        """
+        if not self.contagem:
+            return 0
+        alvo = max(1, -(-self.contagem * percentual // 100))
+        acumulado = 0
+        for indice, quantidade in enumerate(self._contagens):
+            acumulado += quantidade
+            if acumulado >= alvo:
+                return min(self._inicio_faixa(indice + 1) - 1, self.maximo)
+        return self.maximo
+
+    def contagem_ate(self, limite):
+        """
+        Retorna a quantidade de valores menores ou iguais ao limite, com a precisão das faixas.
+
+        Args:
+            limite (float): O limite.
+
+        Returns:
+            int: A quantidade de valores das faixas que começam até o limite.
+        """
+        total = 0
+        for indice, quantidade in enumerate(self._contagens):
+            if self._inicio_faixa(indice) > limite:
+                break
+            total += quantidade
+        return total
+
+
+class Metricas:
+    """
+    Contadores de operações por resultado e histogramas de latência por operação.
+
+    Métodos:
+        registrar(operacao, resultado, nanossegundos): Registra uma chamada de uma operação.
+        medir(operacao): Contexto que mede o tempo de um trecho como uma operação.
+        instantaneo(): Retorna uma cópia das métricas como dicionário.
+        exportar_prometheus(): Retorna as métricas no formato de texto do Prometheus.
+        gravar_prometheus(caminho): Grava as métricas no formato do Prometheus, de forma atômica.
+    """
+
+    def __init__(self):
+        """
+        Inicializa métricas vazias.
+        """
+        self._series = {}
+        self._trava = threading.Lock()
+
+    def _serie(self, operacao):
+        """Retorna o histograma e as contagens por resultado de uma operação, criando-os se preciso."""
+        serie = self._series.get(operacao)
+        if serie is None:
+            with self._trava:
+                serie = self._series.setdefault(operacao, (Histograma(), {}))
+        return serie
+
+    def registrar(self, operacao, resultado, nanossegundos):
+        """
+        Registra uma chamada de uma operação.
+
+        Args:
+            operacao (str): O nome da operação, por exemplo "Conta.sacar".
+            resultado (str): O resultado da chamada, por exemplo "sucesso" ou "saldo_insuficiente".
+            nanossegundos (int): A latência da chamada.
+        """
+        histograma, resultados = self._serie(operacao)
+        with self._trava:
+            resultados[resultado] = resultados.get(resultado, 0) + 1
+            histograma.registrar(nanossegundos)
+        if _janela_perfil is not None:
+            _janela_perfil.verificar()
+
+    @contextlib.contextmanager
+    def medir(self, operacao):
+        """
+        Contexto que mede o tempo de um trecho como uma chamada de uma operação.
+
+        O resultado é "sucesso", ou "erro" se o trecho levantar uma exceção.
+
+        Args:
+            operacao (str): O nome da operação, por exemplo "menu.depositar".
+        """
+        inicio = time.perf_counter_ns()
+        try:
+            yield
+        except BaseException:
+            self.registrar(operacao, "erro", time.perf_counter_ns() - inicio)
+            raise
+        self.registrar(operacao, "sucesso", time.perf_counter_ns() - inicio)
+
+    def instantaneo(self):
+        """
+        Retorna uma cópia das métricas como dicionário.
+
+        Returns:
+            dict: "operacoes" com a contagem por operação e resultado, e "latencias_ns" com contagem,
+            soma, mínimo, máximo e percentis 50, 90, 99 e 99,9 de cada operação.
+        """
+        with self._trava:
+            operacoes = {operacao: dict(resultados) for operacao, (_, resultados) in self._series.items()}
+            latencias = {
+                operacao: {
+                    "contagem": histograma.contagem,
+                    "soma": histograma.soma,
+                    "minimo": histograma.minimo,
+                    "maximo": histograma.maximo,
+                    "p50": histograma.percentil(50),
+                    "p90": histograma.percentil(90),
+                    "p99": histograma.percentil(99),
+                    "p999": histograma.percentil(99.9),
+                }
+                for operacao, (histograma, _) in self._series.items()
+            }
+        return {"operacoes": operacoes, "latencias_ns": latencias}
+
+    def exportar_prometheus(self):
+        """
+        Retorna as métricas no formato de texto do Prometheus.
+
+        Returns:
+            str: O contador `banco_operacoes_total` e o histograma `banco_latencia_segundos`, com
+            faixas de 1 µs a 10 s.
+        """
+        linhas = [
+            "# HELP banco_operacoes_total Quantidade de chamadas por operação e resultado.",
+            "# TYPE banco_operacoes_total counter",
+        ]
+        with self._trava:
+            series = sorted(self._series.items())
+            for operacao, (_, resultados) in series:
+                for resultado, quantidade in sorted(resultados.items()):
+                    linhas.append(f'banco_operacoes_total{{operacao="{operacao}",resultado="{resultado}"}} {quantidade}')
+            linhas += [
+                "# HELP banco_latencia_segundos Latência das chamadas por operação.",
+                "# TYPE banco_latencia_segundos histogram",
+            ]
+            for operacao, (histograma, _) in series:
+                rotulo = f'operacao="{operacao}"'
+                for limite in LIMITES_PROMETHEUS:
+                    linhas.append(
+                        f'banco_latencia_segundos_bucket{{{rotulo},le="{limite / 1e9:g}"}} {histograma.contagem_ate(limite)}'
+                    )
+                linhas.append(f'banco_latencia_segundos_bucket{{{rotulo},le="+Inf"}} {histograma.contagem}')
+                linhas.append(f"banco_latencia_segundos_sum{{{rotulo}}} {histograma.soma / 1e9:.9f}")
+                linhas.append(f"banco_latencia_segundos_count{{{rotulo}}} {histograma.contagem}")
+        return "\n".join(linhas) + "\n"
+
+    def gravar_prometheus(self, caminho):
+        """
+        Grava as métricas no formato do Prometheus, substituindo o arquivo de forma atômica.
+
+        Args:
+            caminho (str): O caminho do arquivo, por exemplo no diretório do textfile collector.
+        """
+        temporario = f"{caminho}.tmp"
+        with open(temporario, "w", encoding="utf-8") as arquivo:
+            arquivo.write(self.exportar_prometheus())
+        os.replace(temporario, caminho)
+
+
+class MetricasNulas:
+    """
+    Métricas que não registram nada, usadas enquanto a instrumentação está desligada.
+    """
+
+    def registrar(self, operacao, resultado, nanossegundos):
+        pass
+
+    def medir(self, operacao):
+        return contextlib.nullcontext()
+
+    def instantaneo(self):
+        return {"operacoes": {}, "latencias_ns": {}}
+
+    def exportar_prometheus(self):
+        return ""
+
+    def gravar_prometheus(self, caminho):
+        pass
+
+
+class _JanelaPerfil:
+    """Perfil cProfile de uma janela de tempo, encerrado pela thread que o iniciou."""
+
+    def __init__(self, caminho, segundos):
+        self.caminho = caminho
+        self.fim = time.monotonic() + segundos
+        self.thread = threading.get_ident()
+        self.perfil = cProfile.Profile()
+        self.perfil.enable()
+
+    def verificar(self):
+        if time.monotonic() >= self.fim and threading.get_ident() == self.thread:
+            encerrar_perfil()
+
+
+_metricas_ativas = MetricasNulas()
+_originais = {}
+_janela_perfil = None
+
+
+def _rotulo(resultado):
+    """Retorna o rótulo de resultado de uma chamada a partir do valor retornado."""
+    if type(resultado) is Resultado:
+        return resultado.name.lower()
+    return "falha" if resultado is False else "sucesso"
+
+
+def _instrumentar(metricas, nome, funcao):
+    """Retorna uma versão de uma função que registra cada chamada nas métricas."""
+    histograma, resultados = metricas._serie(nome)
+    trava = metricas._trava
+    relogio = time.perf_counter_ns
+
+    @functools.wraps(funcao)
+    def instrumentada(*args, **kwargs):
+        inicio = relogio()
+        try:
+            resultado = funcao(*args, **kwargs)
+        except BaseException:
+            metricas.registrar(nome, "erro", relogio() - inicio)
+            raise
+        duracao = relogio() - inicio
+        rotulo = _rotulo(resultado)
+        with trava:
+            resultados[rotulo] = resultados.get(rotulo, 0) + 1
+            histograma.registrar(duracao)
+        if _janela_perfil is not None:
+            _janela_perfil.verificar()
+        return resultado
+
+    return instrumentada
+
+
+def ativar(metricas=None):
+    """
+    Liga a instrumentação dos métodos do caminho crítico, substituindo-os por versões medidas.
+
+    Args:
+        metricas (Metricas, optional): As métricas que recebem os registros. Padrão é um novo `Metricas`.
+
+    Returns:
+        Metricas: As métricas ativas.
+    """
+    global _metricas_ativas
+    desativar()
+    metricas = metricas or Metricas()
+    for classe, metodo in PONTOS_INSTRUMENTADOS:
+        original = classe.__dict__[metodo]
+        _originais[(classe, metodo)] = original
+        setattr(classe, metodo, _instrumentar(metricas, f"{classe.__name__}.{metodo}", original))
+    _metricas_ativas = metricas
+    return metricas
+
+
+def desativar():
+    """
+    Desliga a instrumentação e restaura os métodos originais.
+    """
+    global _metricas_ativas
+    for (classe, metodo), original in _originais.items():
+        setattr(classe, metodo, original)
+    _originais.clear()
+    _metricas_ativas = MetricasNulas()
+
+
+def ativo():
+    """
+    Retorna as métricas ativas.
+
+    Returns:
+        Metricas | MetricasNulas: As métricas ativas, ou métricas nulas se a instrumentação está desligada.
+    """
+    return _metricas_ativas
+
+
+def perfilar(caminho, segundos):
+    """
+    Inicia uma janela de perfil cProfile na thread atual e grava o resultado ao final da janela.
+
+    O cProfile mede apenas a thread que o iniciou. A janela é encerrada na primeira operação
+    instrumentada da mesma thread depois de decorridos os segundos informados, ou por
+    `encerrar_perfil`. O arquivo pode ser lido com `pstats` ou `snakeviz`.
+
+    Args:
+        caminho (str): O caminho do arquivo de perfil.
+        segundos (float): A duração da janela.
+    """
+    global _janela_perfil
+    encerrar_perfil()
+    _janela_perfil = _JanelaPerfil(caminho, segundos)
+
+
+def encerrar_perfil():
+    """
+    Encerra a janela de perfil em andamento, se houver, e grava o arquivo.
+
+    Returns:
+        str: O caminho do arquivo gravado, ou None se não havia janela em andamento.
+    """
+    global _janela_perfil
+    janela, _janela_perfil = _janela_perfil, None
+    if janela is None:
+        return None
+    janela.perfil.disable()
+    janela.perfil.dump_stats(janela.caminho)
+    return janela.caminho
@@ -0,0 +1,305 @@
+"""
+Módulo que define o motor de contas particionado em processos, para usar vários núcleos.
+
+As contas são distribuídas entre processos de trabalho pelo número da conta (`numero % processos`).
+Cada processo é dono dos objetos ContaCorrente e Historico da sua partição. Um roteador agrupa as
+operações por partição, envia cada lote ao seu processo e reúne os resultados na ordem original.
+
+Operações (tuplas):
+    ("criar_conta", numero, cpf, nome)
+    ("depositar", numero, valor)
+    ("sacar", numero, valor)
+    ("saldo", numero)
+    ("transferir", origem, valor, destino)
+
+Os valores e saldos são inteiros em centavos.
+
+Resultados (tuplas):
+    (sucesso, saldo): o saldo da conta principal da operação depois dela, ou None se a conta não existe.
+
+Transferências entre partições:
+    1. A partição de origem debita o valor e registra "Transferencia" no histórico (fase de débito,
+       executada junto com as demais operações do lote, na ordem recebida).
+    2. Depois que todas as partições respondem, a partição de destino credita o valor e registra
+       "TransferenciaRecebida" (fase de crédito).
+    3. Se o crédito falhar (conta de destino inexistente), a partição de origem devolve o valor e
+       registra "Estorno". Se o estorno também for recusado (o saldo da origem passaria do limite), o
+       valor continua em trânsito: depois de aplicar os demais estornos, `executar` lança
+       `EstornoRecusado` com os resultados do lote e as transferências em trânsito.
+    Entre as fases o valor está em trânsito: já saiu da origem e ainda não chegou ao destino.
+    Transferências dentro da mesma partição usam `Transferencia` e são atômicas.
+    Uma transferência entre partições com valor não positivo é recusada pelo roteador sem chegar à
+    partição de destino; a partição de origem apenas informa o saldo. Cada fase também recusa valores
+    não positivos, como `Conta.transferir`.
+
+Durabilidade:
+    Os processos de trabalho não têm diário: o estado de cada partição existe apenas na memória do seu
+    processo. Se um processo cair, perde todas as contas da partição, e uma transferência entre
+    partições em andamento (debitada e ainda não creditada ou estornada) perde o valor em trânsito.
+
+Classes:
+    MotorParticionado: Roteador que distribui as operações entre os processos de trabalho.
+
+Exceções:
+    EstornoRecusado: Um estorno de transferência entre partições foi recusado.
+"""
+
+import multiprocessing
+import os
+from collections import defaultdict
+
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from dinheiro import LIMITE_CENTAVOS
+from eventos import Resultado
+from transacao import Deposito, Saque, Transferencia
+
+
+class EstornoRecusado(RuntimeError):
+    """
+    Um estorno de transferência entre partições foi recusado, e o valor continua em trânsito.
+
+    Atributos:
+        resultados (list): Os resultados do lote, com os demais estornos já aplicados; as
+            transferências em trânsito têm resultado `(False, saldo)`.
+        em_transito (list): As transferências em trânsito, como tuplas `(origem, destino, valor)`.
+    """
+
+    def __init__(self, resultados, em_transito):
+        """
+        Inicializa a exceção.
+
+        Args:
+            resultados (list): Os resultados do lote.
+            em_transito (list): As transferências cujo estorno foi recusado.
+        """
+        super().__init__(f"Estorno recusado; valores em trânsito: {em_transito}")
+        self.resultados = resultados
+        self.em_transito = em_transito
+
+
+class MotorParticionado:
+    """
+    Roteador que distribui as operações entre os processos de trabalho.
+
+    Métodos:
+        __init__(self, quantidade_processos): Inicia os processos de trabalho.
+        particao(self, numero): Retorna a partição de uma conta.
+        executar(self, operacoes): Executa um lote de operações e retorna os resultados.
+        encerrar(self): Encerra os processos de trabalho.
+    """
+
+    def __init__(self, quantidade_processos=None):
+        """
+        Inicia os processos de trabalho.
+
+        Args:
+            quantidade_processos (int, optional): A quantidade de partições. Padrão é o número de núcleos.
+        """
+        self._quantidade = quantidade_processos or os.cpu_count() or 1
+        self._conexoes = []
+        self._processos = []
+        for _ in range(self._quantidade):
+            conexao, conexao_processo = multiprocessing.Pipe()
+            processo = multiprocessing.Process(target=_executar_particao, args=(conexao_processo,), daemon=True)
+            processo.start()
+            conexao_processo.close()
+            self._conexoes.append(conexao)
+            self._processos.append(processo)
+
+    def particao(self, numero):
+        """
+        Retorna a partição de uma conta.
+
+        Args:
+            numero (int): O número da conta.
+
+        Returns:
+            int: O índice da partição.
+        """
+        return int(numero) % self._quantidade
+
+    def executar(self, operacoes):
+        """
+        Executa um lote de operações e retorna os resultados na ordem recebida.
+
+        Args:
+            operacoes (list): As operações, no formato descrito no módulo.
+
+        Returns:
+            list: Os resultados, no formato descrito no módulo.
+
+        Raises:
+            EstornoRecusado: Se o estorno de uma transferência entre partições for recusado.
+        """
+        lotes = defaultdict(list)
+        indices = defaultdict(list)
+        creditos_pendentes = []
+        for indice, operacao in enumerate(operacoes):
+            particao = self.particao(operacao[1])
+            if operacao[0] == "transferir" and self.particao(operacao[3]) != particao:
+                if 0 < operacao[2] <= LIMITE_CENTAVOS:
+                    operacao = ("debitar_transferencia",) + operacao[1:]
+                    creditos_pendentes.append(indice)
+                else:
+                    operacao = ("recusar_transferencia", operacao[1])
+            lotes[particao].append(operacao)
+            indices[particao].append(indice)
+
+        resultados = [None] * len(operacoes)
+        for particao, resultados_particao in self._enviar(lotes).items():
+            for indice, resultado in zip(indices[particao], resultados_particao):
+                resultados[indice] = resultado
+
+        creditos = [indice for indice in creditos_pendentes if resultados[indice][0]]
+        if creditos:
+            self._creditar(operacoes, creditos, resultados)
+        return resultados
+
+    def encerrar(self):
+        """
+        Encerra os processos de trabalho.
+        """
+        for conexao in self._conexoes:
+            conexao.send(None)
+            conexao.close()
+        for processo in self._processos:
+            processo.join()
+
+    def _enviar(self, lotes):
+        """
+        Envia os lotes a todas as partições antes de aguardar as respostas, para que executem em paralelo.
+
+        Args:
+            lotes (dict): As operações de cada partição.
+
+        Returns:
+            dict: Os resultados de cada partição.
+        """
+        for particao, lote in lotes.items():
+            self._conexoes[particao].send(lote)
+        return {particao: self._conexoes[particao].recv() for particao in lotes}
+
+    def _creditar(self, operacoes, creditos, resultados):
+        """
+        Executa a fase de crédito das transferências entre partições, estornando as que falharem.
+
+        Args:
+            operacoes (list): As operações do lote.
+            creditos (list): Os índices das transferências debitadas com sucesso.
+            resultados (list): Os resultados do lote, atualizados no lugar.
+
+        Raises:
+            EstornoRecusado: Se algum estorno for recusado, depois de aplicados os demais.
+        """
+        lotes = defaultdict(list)
+        for indice in creditos:
+            _, _, valor, destino = operacoes[indice]
+            lotes[self.particao(destino)].append(("creditar_transferencia", destino, valor))
+
+        estornos = defaultdict(list)
+        indices_estornos = defaultdict(list)
+        posicoes = {particao: iter(creditos_particao) for particao, creditos_particao in self._enviar(lotes).items()}
+        for indice in creditos:
+            _, origem, valor, destino = operacoes[indice]
+            sucesso, _ = next(posicoes[self.particao(destino)])
+            if not sucesso:
+                estornos[self.particao(origem)].append(("estornar_transferencia", origem, valor))
+                indices_estornos[self.particao(origem)].append(indice)
+
+        em_transito = []
+        for particao, resultados_particao in self._enviar(estornos).items():
+            for indice, (estornado, saldo) in zip(indices_estornos[particao], resultados_particao):
+                resultados[indice] = (False, saldo)
+                if not estornado:
+                    _, origem, valor, destino = operacoes[indice]
+                    em_transito.append((origem, destino, valor))
+        if em_transito:
+            raise EstornoRecusado(resultados, em_transito)
+
+
+def _executar_particao(conexao):
+    """
+    Laço de um processo de trabalho: recebe lotes de operações, aplica-os às contas da partição e
+    devolve os resultados. Um lote None encerra o processo.
+
+    Args:
+        conexao (Connection): A conexão com o roteador.
+    """
+    contas = {}
+
+    def saldo(numero):
+        conta = contas.get(numero)
+        return conta.saldo if conta is not None else None
+
+    while True:
+        lote = conexao.recv()
+        if lote is None:
+            break
+        resultados = []
+        for operacao in lote:
+            tipo, numero = operacao[0], operacao[1]
+            conta = contas.get(numero)
+            if tipo == "criar_conta":
+                if conta is None:
+                    cliente = PessoaFisica(nome=operacao[3], data_nascimento="", cpf=operacao[2], endereco="")
+                    conta = contas[numero] = ContaCorrente.nova_conta(cliente=cliente, numero=numero)
+                    cliente.adicionar_conta(conta)
+                    resultados.append((True, conta.saldo))
+                else:
+                    resultados.append((False, conta.saldo))
+                continue
+            if conta is None:
+                resultados.append((False, None))
+                continue
+
+            if tipo in ("depositar", "sacar", "transferir") and (
+                type(operacao[2]) is not int or not -LIMITE_CENTAVOS <= operacao[2] <= LIMITE_CENTAVOS
+            ):
+                sucesso = Resultado.VALOR_INVALIDO
+            elif tipo == "depositar":
+                sucesso = Deposito(operacao[2]).registrar(conta)
+            elif tipo == "sacar":
+                sucesso = Saque(operacao[2]).registrar(conta)
+            elif tipo == "transferir":
+                destino = contas.get(operacao[3])
+                sucesso = destino is not None and Transferencia(operacao[2], destino).registrar(conta)
+            elif tipo == "debitar_transferencia":
+                sucesso = _movimentar(conta, "Transferencia", operacao[2], debito=True)
+            elif tipo == "creditar_transferencia":
+                sucesso = _movimentar(conta, "TransferenciaRecebida", operacao[2])
+            elif tipo == "estornar_transferencia":
+                sucesso = _movimentar(conta, "Estorno", operacao[2])
+            elif tipo == "recusar_transferencia":
+                sucesso = Resultado.VALOR_INVALIDO
+            else:
+                sucesso = tipo == "saldo"
+            resultados.append((bool(sucesso), saldo(numero)))
+        conexao.send(resultados)
+    conexao.close()
+
+
+def _movimentar(conta, tipo, valor, debito=False):
+    """
+    Aplica um lado de uma transferência entre partições, registrando-o no histórico da conta.
+
+    O histórico é registrado antes de o saldo ser alterado, de modo que uma falha no registro não
+    deixa o saldo sem a transação correspondente.
+
+    Args:
+        conta (Conta): A conta movimentada.
+        tipo (str): O tipo registrado no histórico.
+        valor (int): O valor em centavos, positivo e até `dinheiro.LIMITE_CENTAVOS`.
+        debito (bool, optional): Se True, o valor é debitado; senão, creditado. Padrão é False.
+
+    Returns:
+        Resultado: SUCESSO, VALOR_INVALIDO ou SALDO_INSUFICIENTE.
+    """
+    with conta.trava:
+        if not 0 < valor <= LIMITE_CENTAVOS or (not debito and conta.saldo + valor > LIMITE_CENTAVOS):
+            return Resultado.VALOR_INVALIDO
+        if debito and valor > conta.saldo:
+            return Resultado.SALDO_INSUFICIENTE
+        conta.historico.registrar(tipo, valor)
+        conta._saldo += -valor if debito else valor
+        return Resultado.SUCESSO
@@ -0,0 +1,302 @@
+"""
+Módulo que define os registros de clientes e de contas e a alocação de números de conta.
+
+Classes:
+    ClienteRegistry: Registro de clientes com busca em tempo constante pelo CPF normalizado.
+    IndiceContas: Índice de contas por (agência, número), com busca em tempo constante e percurso ordenado.
+    AlocadorNumeros: Alocador de números de conta seguro entre threads, que reserva blocos de números.
+"""
+
+import threading
+from bisect import bisect_right, insort
+from collections.abc import Sequence
+
+
+class ClienteRegistry:
+    """
+    Registro de clientes indexado pelo CPF normalizado (somente dígitos).
+
+    Substitui a lista simples de clientes, permitindo busca, verificação de unicidade e
+    inserção em O(1) independentemente da quantidade de clientes cadastrados.
+
+    Métodos:
+        __init__(self, clientes=None): Inicializa o registro, opcionalmente com uma carga inicial.
+        normalizar_cpf(cpf): Remove todos os caracteres não numéricos do CPF.
+        buscar(self, cpf): Retorna o cliente com o CPF informado, ou None se não encontrado.
+        adicionar(self, cliente): Adiciona um cliente, garantindo a unicidade do CPF.
+        carregar(self, clientes): Adiciona vários clientes de uma só vez.
+    """
+
+    def __init__(self, clientes=None):
+        """
+        Inicializa o registro de clientes.
+
+        Args:
+            clientes (iterable, optional): Clientes a serem carregados inicialmente.
+        """
+        self._clientes = {}
+        if clientes is not None:
+            self.carregar(clientes)
+
+    @staticmethod
+    def normalizar_cpf(cpf):
+        """
+        Remove todos os caracteres não numéricos do CPF.
+
+        Args:
+            cpf (str): O CPF a ser normalizado.
+
+        Returns:
+            str: O CPF contendo somente dígitos.
+        """
+        if cpf.isdigit():
+            return cpf
+        return ''.join(filter(str.isdigit, cpf))
+
+    def buscar(self, cpf):
+        """
+        Retorna o cliente com o CPF informado.
+
+        Args:
+            cpf (str): O CPF do cliente, com ou sem pontuação.
+
+        Returns:
+            PessoaFisica: O cliente correspondente ao CPF, ou None se não encontrado.
+        """
+        return self._clientes.get(self.normalizar_cpf(cpf))
+
+    def adicionar(self, cliente):
+        """
+        Adiciona um cliente ao registro, garantindo a unicidade do CPF.
+
+        Args:
+            cliente (PessoaFisica): O cliente a ser adicionado.
+
+        Returns:
+            bool: True se o cliente foi adicionado, False se já existia cliente com o mesmo CPF.
+        """
+        cpf = self.normalizar_cpf(cliente.cpf)
+        if cpf in self._clientes:
+            return False
+        self._clientes[cpf] = cliente
+        return True
+
+    def carregar(self, clientes):
+        """
+        Adiciona vários clientes de uma só vez, ignorando CPFs repetidos.
+
+        Args:
+            clientes (iterable): Os clientes a serem carregados.
+
+        Returns:
+            int: A quantidade de clientes efetivamente adicionados.
+        """
+        registro = self._clientes
+        normalizar = self.normalizar_cpf
+        tamanho_inicial = len(registro)
+        for cliente in clientes:
+            registro.setdefault(normalizar(cliente.cpf), cliente)
+        return len(registro) - tamanho_inicial
+
+    def __contains__(self, cpf):
+        return self.normalizar_cpf(cpf) in self._clientes
+
+    def __iter__(self):
+        return iter(self._clientes.values())
+
+    def __len__(self):
+        return len(self._clientes)
+
+
+class IndiceContas(Sequence):
+    """
+    Índice de contas pela chave (agência, número).
+
+    A busca por chave é feita em um dicionário, em tempo constante. As chaves também são mantidas em
+    uma lista ordenada, para percorrer as contas em ordem e em páginas; como os números são alocados
+    em ordem crescente, a inserção normalmente é um acréscimo ao final da lista. Como sequência, as
+    contas aparecem na ordem das chaves.
+
+    Métodos:
+        __init__(self, contas=None): Inicializa o índice, opcionalmente com uma carga inicial.
+        chave(agencia, numero): Retorna a chave de uma conta.
+        adicionar(self, conta): Adiciona uma conta, garantindo a unicidade da chave.
+        append(self, conta): Adiciona uma conta, como em uma lista.
+        carregar(self, contas): Adiciona várias contas de uma só vez.
+        buscar(self, agencia, numero): Retorna a conta com a agência e o número informados.
+        intervalo(self, cursor=None, limite=None): Retorna uma página de contas, na ordem das chaves.
+        ultimo_numero(self): Retorna o maior número de conta indexado.
+    """
+
+    def __init__(self, contas=None):
+        """
+        Inicializa o índice de contas.
+
+        Args:
+            contas (iterable, optional): Contas a serem carregadas inicialmente.
+        """
+        self._contas = {}
+        self._chaves = []
+        self._trava = threading.Lock()
+        if contas is not None:
+            self.carregar(contas)
+
+    @staticmethod
+    def chave(agencia, numero):
+        """
+        Retorna a chave de uma conta.
+
+        Args:
+            agencia (str): A agência da conta.
+            numero (int | str): O número da conta.
+
+        Returns:
+            tuple: A chave (agência, número), com o número inteiro.
+        """
+        return str(agencia), int(numero)
+
+    def adicionar(self, conta):
+        """
+        Adiciona uma conta ao índice, garantindo a unicidade da chave.
+
+        Args:
+            conta (Conta): A conta a ser adicionada.
+
+        Returns:
+            bool: True se a conta foi adicionada, False se já existia conta com a mesma chave.
+        """
+        chave = self.chave(conta.agencia, conta.numero)
+        with self._trava:
+            if chave in self._contas:
+                return False
+            self._contas[chave] = conta
+            if not self._chaves or chave > self._chaves[-1]:
+                self._chaves.append(chave)
+            else:
+                insort(self._chaves, chave)
+            return True
+
+    def append(self, conta):
+        """
+        Adiciona uma conta ao índice, como em uma lista de contas.
+
+        Args:
+            conta (Conta): A conta a ser adicionada.
+        """
+        self.adicionar(conta)
+
+    def carregar(self, contas):
+        """
+        Adiciona várias contas de uma só vez, ignorando chaves repetidas.
+
+        Args:
+            contas (iterable): As contas a serem carregadas.
+
+        Returns:
+            int: A quantidade de contas efetivamente adicionadas.
+        """
+        chave = self.chave
+        with self._trava:
+            tamanho_inicial = len(self._contas)
+            for conta in contas:
+                self._contas.setdefault(chave(conta.agencia, conta.numero), conta)
+            self._chaves = sorted(self._contas)
+            return len(self._contas) - tamanho_inicial
+
+    def buscar(self, agencia, numero):
+        """
+        Retorna a conta com a agência e o número informados.
+
+        Args:
+            agencia (str): A agência da conta.
+            numero (int | str): O número da conta.
+
+        Returns:
+            Conta: A conta correspondente, ou None se não encontrada.
+        """
+        return self._contas.get(self.chave(agencia, numero))
+
+    def intervalo(self, cursor=None, limite=None):
+        """
+        Retorna uma página de contas, na ordem das chaves.
+
+        Args:
+            cursor (tuple, optional): A chave da última conta da página anterior. Padrão é o início.
+            limite (int, optional): A quantidade máxima de contas. Padrão é todas.
+
+        Returns:
+            tuple: A lista de contas e o cursor da próxima página, ou None se não houver mais contas.
+        """
+        with self._trava:
+            inicio = 0 if cursor is None else bisect_right(self._chaves, tuple(cursor))
+            fim = len(self._chaves) if limite is None else min(inicio + limite, len(self._chaves))
+            chaves = self._chaves[inicio:fim]
+            mais = fim < len(self._chaves)
+        return [self._contas[chave] for chave in chaves], (chaves[-1] if mais and chaves else None)
+
+    def ultimo_numero(self):
+        """
+        Retorna o maior número de conta indexado.
+
+        Returns:
+            int: O maior número, ou 0 se o índice estiver vazio.
+        """
+        return max((numero for _, numero in self._chaves), default=0)
+
+    def __len__(self):
+        return len(self._chaves)
+
+    def __getitem__(self, indice):
+        chaves = self._chaves[indice]
+        if isinstance(indice, slice):
+            return [self._contas[chave] for chave in chaves]
+        return self._contas[chaves]
+
+    def __iter__(self):
+        for chave in list(self._chaves):
+            yield self._contas[chave]
+
+
+class AlocadorNumeros:
+    """
+    Alocador de números de conta seguro entre threads.
+
+    Cada thread reserva um bloco de números consecutivos de uma vez e aloca os números do seu bloco
+    sem disputar a trava, que só é adquirida para reservar o próximo bloco. Os números são únicos e
+    crescentes dentro de cada thread; números reservados e não usados (por exemplo, ao encerrar o
+    programa) são descartados, o que pode deixar lacunas na numeração.
+
+    Métodos:
+        __init__(self, proximo=1, tamanho_bloco=64): Inicializa o alocador.
+        alocar(self): Retorna um número de conta ainda não alocado.
+    """
+
+    def __init__(self, proximo=1, tamanho_bloco=64):
+        """
+        Inicializa o alocador.
+
+        Args:
+            proximo (int, optional): O primeiro número a alocar. Padrão é 1.
+            tamanho_bloco (int, optional): A quantidade de números reservados por vez. Padrão é 64.
+        """
+        self._proximo = proximo
+        self._tamanho_bloco = tamanho_bloco
+        self._trava = threading.Lock()
+        self._local = threading.local()
+
+    def alocar(self):
+        """
+        Retorna um número de conta ainda não alocado.
+
+        Returns:
+            int: O número alocado.
+        """
+        local = self._local
+        numero = getattr(local, "proximo", 0)
+        if numero >= getattr(local, "fim", 0):
+            with self._trava:
+                numero = self._proximo
+                self._proximo += self._tamanho_bloco
+            local.fim = numero + self._tamanho_bloco
+        local.proximo = numero + 1
+        return numero
@@ -0,0 +1,529 @@
+"""
+Módulo que define o motor de regras das operações de saque e depósito.
+
+Uma política é uma lista de regras declaradas uma vez, na ordem em que são verificadas. Ao ser
+compilada, a política gera, para cada tipo de operação, uma função Python com as condições das suas
+regras em sequência e os parâmetros já fixados, de modo que a verificação de uma operação é uma única
+chamada, sem percorrer a lista de regras. A mesma declaração gera a avaliação vetorizada de lotes.
+
+Regras com estado (saldo, saques do dia, valor sacado no dia, operações recentes) partem do estado da
+conta e acumulam o efeito das operações aprovadas. Em um lote, o estado antes de cada operação é
+calculado com somas acumuladas por conta, supondo conhecidos os vereditos das operações anteriores:
+a primeira passada supõe todas aprovadas e cada passada seguinte usa os vereditos da anterior. Em cada
+conta, os vereditos ficam corretos pelo menos até a primeira operação em que a suposição estava
+errada, então as passadas convergem para o resultado da avaliação em sequência; depois de
+`PASSADAS_VETORIZADAS` passadas, o que resta é avaliado em sequência. Sem NumPy, todo o lote é avaliado
+em sequência, com o mesmo resultado.
+
+Os limites originais da conta corrente (valor por saque, saques por dia) e as verificações de saldo
+e de valor formam a política padrão (`politica_padrao`).
+
+Classes:
+    Regra: Classe base das regras.
+    LimitePorSaque: Valor máximo de cada saque.
+    SaquesPorDia: Quantidade máxima de saques por dia.
+    SaldoSuficiente: O saque não pode exceder o saldo.
+    ValorPositivo: O valor da operação deve ser positivo.
+    TetoDiario: Valor máximo sacado por dia.
+    LimiteNoturno: Valor máximo de cada saque no período noturno.
+    Velocidade: Quantidade máxima de operações em uma janela de tempo.
+    Politica: Lista de regras declaradas.
+    PoliticaCompilada: Política compilada, que verifica operações e avalia lotes.
+
+Funções:
+    politica_padrao(limite=None, limite_saques=None): Retorna a política padrão compilada.
+    avaliar_lote(operacoes, agora=None): Avalia um lote de operações de contas com políticas diversas.
+"""
+
+import bisect
+import functools
+import time
+from datetime import date, datetime
+from itertools import compress
+from operator import attrgetter, itemgetter
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy é opcional
+    np = None
+
+from eventos import Resultado
+from historico import Historico
+
+SAQUE = frozenset({"Saque"})
+DEPOSITO = frozenset({"Deposito"})
+TODAS = SAQUE | DEPOSITO
+
+PASSADAS_VETORIZADAS = 8
+
+RESULTADOS = tuple(Resultado)
+_CODIGOS = {resultado: codigo for codigo, resultado in enumerate(RESULTADOS)}
+
+
+class Regra:
+    """
+    Classe base das regras.
+
+    Cada regra declara a `condicao` que a viola, como uma expressão Python sobre `{valor}`, `{estado}`,
+    `{contexto}` e os seus parâmetros (por exemplo `{limite}`). A expressão deve valer tanto para
+    números quanto para arrays NumPy, por isso usa `&` em vez de `and`.
+
+    Atributos:
+        tipos (frozenset): Os tipos de operação verificados pela regra ("Saque", "Deposito").
+        resultado (Resultado): O resultado devolvido quando a regra é violada.
+        condicao (str): A expressão que indica a violação.
+        com_estado (bool): Se a regra depende do estado acumulado da conta.
+
+    Métodos:
+        inicial(conta, agora): Retorna o estado da conta antes das operações.
+        incremento(saque, valor): Retorna o efeito de uma operação aprovada sobre o estado.
+        contexto(agora): Retorna o valor que a regra usa do momento da avaliação.
+    """
+
+    __slots__ = ("tipos",)
+
+    resultado = None
+    condicao = "False"
+    com_estado = False
+
+    def __init__(self, tipos=SAQUE):
+        self.tipos = frozenset(tipos)
+
+    def parametros(self):
+        """Retorna os parâmetros declarados pela regra, além dos tipos."""
+        return {nome: getattr(self, nome) for nome in type(self).__slots__ if nome != "tipos"}
+
+    def inicial(self, conta, agora):
+        return 0
+
+    def incremento(self, saque, valor):
+        return 0
+
+    def contexto(self, agora):
+        return None
+
+    def __repr__(self):
+        argumentos = ", ".join(f"{nome}={valor!r}" for nome, valor in self.parametros().items())
+        return f"{type(self).__name__}({argumentos})"
+
+
+class LimitePorSaque(Regra):
+    """
+    Valor máximo de cada saque, em centavos.
+    """
+
+    __slots__ = ("limite",)
+
+    resultado = Resultado.LIMITE_EXCEDIDO
+    condicao = "{valor} > {limite}"
+
+    def __init__(self, limite):
+        super().__init__()
+        self.limite = limite
+
+
+class SaquesPorDia(Regra):
+    """
+    Quantidade máxima de saques por dia.
+    """
+
+    __slots__ = ("maximo",)
+
+    resultado = Resultado.SAQUES_EXCEDIDOS
+    condicao = "{estado} >= {maximo}"
+    com_estado = True
+
+    def __init__(self, maximo):
+        super().__init__()
+        self.maximo = maximo
+
+    def inicial(self, conta, agora):
+        return conta.historico.contar_transacoes("Saque", None if agora is None else date.fromtimestamp(agora))
+
+    def incremento(self, saque, valor):
+        return saque * 1
+
+
+class SaldoSuficiente(Regra):
+    """
+    O valor do saque não pode exceder o saldo.
+    """
+
+    __slots__ = ()
+
+    resultado = Resultado.SALDO_INSUFICIENTE
+    condicao = "{valor} > {estado}"
+    com_estado = True
+
+    def inicial(self, conta, agora):
+        return conta.saldo
+
+    def incremento(self, saque, valor):
+        return valor - 2 * valor * saque
+
+
+class ValorPositivo(Regra):
+    """
+    O valor da operação deve ser positivo. Por padrão vale para saques e depósitos.
+    """
+
+    __slots__ = ()
+
+    resultado = Resultado.VALOR_INVALIDO
+    condicao = "{valor} <= 0"
+
+    def __init__(self, tipos=TODAS):
+        super().__init__(tipos)
+
+
+class TetoDiario(Regra):
+    """
+    Valor máximo sacado por dia, somando os saques já realizados no dia, em centavos.
+    """
+
+    __slots__ = ("limite",)
+
+    resultado = Resultado.TETO_DIARIO_EXCEDIDO
+    condicao = "{estado} + {valor} > {limite}"
+    com_estado = True
+
+    def __init__(self, limite):
+        super().__init__()
+        self.limite = limite
+
+    def inicial(self, conta, agora):
+        historico = conta.historico
+        dia = date.today() if agora is None else date.fromtimestamp(agora)
+        inicio = bisect.bisect_left(historico.datas, datetime.combine(dia, datetime.min.time()).timestamp())
+        tipos = historico.tipos[inicio:]
+        return sum(compress(historico.valores[inicio:], map(Historico.codigo_tipo("Saque").__eq__, tipos)))
+
+    def incremento(self, saque, valor):
+        return valor * saque
+
+
+class LimiteNoturno(Regra):
+    """
+    Valor máximo de cada saque entre as horas `inicio` e `fim` (por padrão das 22h às 6h), em centavos.
+    """
+
+    __slots__ = ("limite", "inicio", "fim")
+
+    resultado = Resultado.LIMITE_NOTURNO_EXCEDIDO
+    condicao = "{contexto} & ({valor} > {limite})"
+
+    def __init__(self, limite, inicio=22, fim=6):
+        super().__init__()
+        self.limite = limite
+        self.inicio = inicio
+        self.fim = fim
+
+    def contexto(self, agora):
+        hora = datetime.fromtimestamp(time.time() if agora is None else agora).hour
+        if self.inicio <= self.fim:
+            return self.inicio <= hora < self.fim
+        return hora >= self.inicio or hora < self.fim
+
+
+class Velocidade(Regra):
+    """
+    Quantidade máxima de operações dos tipos da regra nos últimos `janela` segundos.
+    """
+
+    __slots__ = ("maximo", "janela")
+
+    resultado = Resultado.VELOCIDADE_EXCEDIDA
+    condicao = "{estado} >= {maximo}"
+    com_estado = True
+
+    def __init__(self, maximo, janela, tipos=SAQUE):
+        super().__init__(tipos)
+        self.maximo = maximo
+        self.janela = janela
+
+    def inicial(self, conta, agora):
+        historico = conta.historico
+        inicio = bisect.bisect_left(historico.datas, (time.time() if agora is None else agora) - self.janela)
+        recentes = historico.tipos[inicio:]
+        return sum(recentes.count(Historico.codigo_tipo(tipo)) for tipo in self.tipos)
+
+    def incremento(self, saque, valor):
+        if self.tipos == TODAS:
+            return saque * 0 + 1
+        return saque * 1 if self.tipos == SAQUE else 1 - saque
+
+
+class Politica:
+    """
+    Lista de regras declaradas, verificadas na ordem em que aparecem.
+
+    Métodos:
+        compilar(): Gera as funções de verificação da política.
+    """
+
+    def __init__(self, regras):
+        """
+        Inicializa a política.
+
+        Args:
+            regras (iterable): As regras, na ordem de verificação.
+        """
+        self.regras = tuple(regras)
+
+    def compilar(self):
+        """
+        Gera as funções de verificação da política.
+
+        Returns:
+            PoliticaCompilada: A política compilada.
+        """
+        return PoliticaCompilada(self.regras)
+
+
+class PoliticaCompilada:
+    """
+    Política compilada em funções de verificação por tipo de operação.
+
+    Métodos:
+        verificar(conta, tipo, valor, agora=None): Verifica uma operação no estado atual da conta.
+        avaliar(operacoes, agora=None): Avalia um lote de operações pendentes.
+    """
+
+    def __init__(self, regras):
+        """
+        Compila as regras.
+
+        Args:
+            regras (tuple): As regras, na ordem de verificação.
+        """
+        self.regras = regras
+        self._com_estado = [regra for regra in regras if regra.com_estado]
+        ambiente = {"SUCESSO": Resultado.SUCESSO}
+        for indice, regra in enumerate(regras):
+            ambiente[f"r{indice}_resultado"] = regra.resultado
+            ambiente[f"r{indice}_inicial"] = regra.inicial
+            ambiente[f"r{indice}_contexto"] = regra.contexto
+            for nome, valor in regra.parametros().items():
+                ambiente[f"r{indice}_{nome}"] = valor
+
+        self._verificadores = {}
+        self._verificadores_estado = {}
+        for tipo in TODAS:
+            self._verificadores[tipo] = self._gerar(
+                ambiente, tipo, "conta, valor, agora", "r{i}_inicial(conta, agora)", "r{i}_contexto(agora)"
+            )
+            self._verificadores_estado[tipo] = self._gerar(
+                ambiente, tipo, "valor, estados, contextos", "estados[{k}]", "contextos[{i}]"
+            )
+        condicoes = ", ".join(self._condicao(indice, "estados[{k}]", "contextos[{i}]") for indice in range(len(regras)))
+        self._violacoes = self._definir(ambiente, "violacoes", "valor, estados, contextos", f"    return ({condicoes},)")
+
+    def _condicao(self, indice, estado, contexto):
+        """Retorna a condição de violação de uma regra, com os nomes do código gerado."""
+        regra = self.regras[indice]
+        k = self._com_estado.index(regra) if regra.com_estado else None
+        nomes = {nome: f"r{indice}_{nome}" for nome in regra.parametros()}
+        return "(" + regra.condicao.format(
+            valor="valor", estado=estado.format(i=indice, k=k), contexto=contexto.format(i=indice), **nomes
+        ) + ")"
+
+    def _gerar(self, ambiente, tipo, argumentos, estado, contexto):
+        """Gera a função que verifica, em ordem, as regras que valem para um tipo de operação."""
+        linhas = [
+            f"    if {self._condicao(indice, estado, contexto)}:\n        return r{indice}_resultado"
+            for indice, regra in enumerate(self.regras)
+            if tipo in regra.tipos
+        ]
+        linhas.append("    return SUCESSO")
+        return self._definir(ambiente, f"verificar_{tipo.lower()}", argumentos, "\n".join(linhas))
+
+    @staticmethod
+    def _definir(ambiente, nome, argumentos, corpo):
+        """Compila o código de uma função no ambiente da política e a retorna."""
+        namespace = {}
+        exec(compile(f"def {nome}({argumentos}):\n{corpo}\n", f"<politica:{nome}>", "exec"), ambiente, namespace)
+        return namespace[nome]
+
+    def verificar(self, conta, tipo, valor, agora=None):
+        """
+        Verifica uma operação no estado atual da conta. Deve ser chamado com a trava da conta.
+
+        Args:
+            conta (Conta): A conta da operação.
+            tipo (str): "Saque" ou "Deposito".
+            valor (int): O valor da operação, em centavos.
+            agora (float, optional): O momento da operação, em segundos desde a época. Padrão é o atual.
+
+        Returns:
+            Resultado: SUCESSO ou o resultado da primeira regra violada.
+        """
+        return self._verificadores[tipo](conta, valor, agora)
+
+    def avaliar(self, operacoes, agora=None):
+        """
+        Avalia um lote de operações pendentes, sem aplicá-las.
+
+        O veredito de cada operação considera o estado da conta no momento da avaliação e o efeito das
+        operações anteriores do lote na mesma conta que seriam aprovadas.
+
+        Args:
+            operacoes (list): Pares (conta, transacao), com transações `Saque` ou `Deposito`.
+            agora (float, optional): O momento das operações, em segundos desde a época. Padrão é o atual.
+
+        Returns:
+            list: O `Resultado` de cada operação, na ordem recebida.
+        """
+        if not operacoes:
+            return []
+        agora = time.time() if agora is None else agora
+        contas, transacoes = zip(*operacoes)
+        classes = list(map(type, transacoes))
+        e_saque = {classe: classe.__name__ == "Saque" for classe in set(classes)}
+        contextos = tuple(regra.contexto(agora) for regra in self.regras)
+        if np is None:
+            indices = {}
+            grupos = [indices.setdefault(id(conta), len(indices)) for conta in contas]
+            unicas = list({id(conta): conta for conta in contas}.values())
+            saques = list(map(e_saque.__getitem__, classes))
+            valores = list(map(attrgetter("valor"), transacoes))
+        else:
+            quantidade = len(contas)
+            identificadores = np.fromiter(map(id, contas), dtype=np.uint64, count=quantidade)
+            _, primeiras, grupos = np.unique(identificadores, return_index=True, return_inverse=True)
+            unicas = [contas[indice] for indice in primeiras.tolist()]
+            saques = np.fromiter(map(e_saque.__getitem__, classes), dtype=bool, count=quantidade)
+            valores = np.fromiter(map(attrgetter("valor"), transacoes), dtype=np.int64, count=quantidade)
+        iniciais = [[regra.inicial(conta, agora) for conta in unicas] for regra in self._com_estado]
+        if np is None:
+            return self._avaliar_em_sequencia(grupos, saques, valores, iniciais, contextos)
+        return self._avaliar_vetorizado(grupos.reshape(-1), saques, valores, iniciais, contextos)
+
+    def _avaliar_em_sequencia(self, grupos, saques, valores, iniciais, contextos):
+        """Avalia o lote operação a operação, acumulando o estado de cada conta."""
+        estados = [list(estado) for estado in zip(*iniciais)] if iniciais else [[] for _ in range(max(grupos) + 1)]
+        resultados = []
+        for grupo, saque, valor in zip(grupos, saques, valores):
+            resultados.append(self._aplicar(estados[grupo], saque, valor, contextos))
+        return resultados
+
+    def _aplicar(self, estado, saque, valor, contextos):
+        """Verifica uma operação contra um estado e, se aprovada, acumula o seu efeito nele."""
+        resultado = self._verificadores_estado["Saque" if saque else "Deposito"](valor, estado, contextos)
+        if resultado:
+            for k, regra in enumerate(self._com_estado):
+                estado[k] += regra.incremento(saque, valor)
+        return resultado
+
+    def _avaliar_vetorizado(self, grupos, saques, valores, iniciais, contextos):
+        """Avalia o lote em passadas vetorizadas até os vereditos se repetirem, terminando em sequência se preciso."""
+        quantidade = len(valores)
+        ordem = np.argsort(grupos, kind="stable")
+        grupos_ordenados = grupos[ordem]
+        inicios = np.flatnonzero(np.r_[True, grupos_ordenados[1:] != grupos_ordenados[:-1]])
+        inicio_do_grupo = np.repeat(inicios, np.diff(np.r_[inicios, quantidade]))
+
+        def acumular_no_grupo(incrementos):
+            """Soma acumulada exclusiva de cada posição (já ordenada) dentro do seu grupo."""
+            acumulado = np.cumsum(incrementos) - incrementos
+            return acumulado - acumulado[inicio_do_grupo]
+
+        incrementos = [
+            np.broadcast_to(regra.incremento(saques, valores), (quantidade,)).astype(np.int64)[ordem]
+            for regra in self._com_estado
+        ]
+        iniciais = [np.array(inicial, dtype=np.int64)[grupos_ordenados] for inicial in iniciais]
+        aprovadas = np.ones(quantidade, dtype=bool)
+        for _ in range(PASSADAS_VETORIZADAS):
+            aprovadas_ordenadas = aprovadas[ordem]
+            estados_ordenados = [
+                inicial + acumular_no_grupo(incremento * aprovadas_ordenadas)
+                for inicial, incremento in zip(iniciais, incrementos)
+            ]
+            estados = []
+            for ordenados in estados_ordenados:
+                estado = np.empty(quantidade, dtype=np.int64)
+                estado[ordem] = ordenados
+                estados.append(estado)
+            codigos = self._codigos(saques, valores, estados, contextos)
+            vereditos = codigos == _CODIGOS[Resultado.SUCESSO]
+            divergentes = (vereditos != aprovadas)[ordem]
+            if not divergentes.any():
+                return [RESULTADOS[codigo] for codigo in codigos.tolist()]
+            aprovadas = vereditos
+
+        divergentes = divergentes.astype(np.int64)
+        pendentes = np.flatnonzero((acumular_no_grupo(divergentes) + divergentes) > 0)
+        grupo_atual, estado = None, None
+        for posicao in pendentes.tolist():
+            if grupos_ordenados[posicao] != grupo_atual:
+                grupo_atual = grupos_ordenados[posicao]
+                estado = [int(ordenados[posicao]) for ordenados in estados_ordenados]
+            indice = ordem[posicao]
+            resultado = self._aplicar(estado, bool(saques[indice]), int(valores[indice]), contextos)
+            codigos[indice] = _CODIGOS[resultado]
+        return [RESULTADOS[codigo] for codigo in codigos.tolist()]
+
+    def _codigos(self, saques, valores, estados, contextos):
+        """Retorna o código do veredito de cada operação: o da primeira regra violada ou o de sucesso."""
+        quantidade = len(valores)
+        codigos = np.full(quantidade, _CODIGOS[Resultado.SUCESSO], dtype=np.uint8)
+        violacoes = self._violacoes(valores, estados, contextos)
+        for regra, violacao in reversed(list(zip(self.regras, violacoes))):
+            if regra.tipos == TODAS:
+                aplicavel = np.broadcast_to(violacao, (quantidade,))
+            else:
+                aplicavel = violacao & (saques if regra.tipos == SAQUE else ~saques)
+            codigos[aplicavel] = _CODIGOS[regra.resultado]
+        return codigos
+
+
+@functools.lru_cache(maxsize=None)
+def politica_padrao(limite=None, limite_saques=None):
+    """
+    Retorna a política padrão compilada, compartilhada pelas contas com os mesmos limites.
+
+    A ordem das regras reproduz as verificações originais: limite por saque, saques por dia, saldo
+    e valor positivo.
+
+    Args:
+        limite (int, optional): O valor máximo de cada saque, em centavos. Padrão é sem limite.
+        limite_saques (int, optional): A quantidade máxima de saques por dia. Padrão é sem limite.
+
+    Returns:
+        PoliticaCompilada: A política compilada.
+    """
+    regras = []
+    if limite is not None:
+        regras.append(LimitePorSaque(limite))
+    if limite_saques is not None:
+        regras.append(SaquesPorDia(limite_saques))
+    regras += [SaldoSuficiente(), ValorPositivo()]
+    return Politica(regras).compilar()
+
+
+def avaliar_lote(operacoes, agora=None):
+    """
+    Avalia um lote de operações pendentes de contas com políticas diversas, sem aplicá-las.
+
+    As operações são agrupadas pela política de cada conta e cada grupo é avaliado de uma vez.
+
+    Args:
+        operacoes (iterable): Pares (conta, transacao), com transações `Saque` ou `Deposito`.
+        agora (float, optional): O momento das operações, em segundos desde a época. Padrão é o atual.
+
+    Returns:
+        list: O `Resultado` de cada operação, na ordem recebida.
+    """
+    operacoes = list(operacoes)
+    agora = time.time() if agora is None else agora
+    politicas = list(map(attrgetter("politica"), map(itemgetter(0), operacoes)))
+    if len(set(politicas)) <= 1:
+        return politicas[0].avaliar(operacoes, agora) if politicas else []
+    por_politica = {}
+    for indice, politica in enumerate(politicas):
+        por_politica.setdefault(politica, []).append(indice)
+    resultados = [None] * len(operacoes)
+    for politica, indices in por_politica.items():
+        for indice, resultado in zip(indices, politica.avaliar([operacoes[i] for i in indices], agora)):
+            resultados[indice] = resultado
+    return resultados
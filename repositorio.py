@@ -0,0 +1,678 @@
+"""
+Módulo que define os repositórios de clientes, contas e históricos do sistema bancário.
+
+Um repositório oferece o registro de clientes (`clientes`) e as contas (`contas`) usados
+pelo menu, pelo servidor e pelo processamento em lote, e recebe as mesmas anotações do diário
+(`anotar_cliente`, `anotar_conta`, `anotar_transacao` e `anotar_transferencia`), de modo que pode ser
+ativado com `diario.ativar(repositorio)`.
+
+Implementações:
+    RepositorioMemoria: Clientes em um ClienteRegistry e contas em uma lista, como no restante do
+        sistema. A persistência fica a cargo do diário e dos snapshots.
+    RepositorioSQLite: Clientes, contas e históricos em um banco SQLite local. Os objetos são
+        construídos sob demanda e mantidos em cache, de modo que apenas os clientes e contas usados
+        ocupam memória, e os históricos podem ser consultados por período com SQL.
+
+Banco SQLite:
+    clientes(cpf TEXT PRIMARY KEY, nome, data_nascimento, endereco)
+    contas(numero INTEGER PRIMARY KEY, agencia, cpf, saldo, limite, limite_saques), índice em cpf
+    transacoes(id INTEGER PRIMARY KEY, conta, tipo, valor, data), índice em (conta, data)
+
+    estado(chave TEXT PRIMARY KEY, valor), com o primeiro segmento do diário ainda não aplicado
+
+    O banco usa journal em modo WAL, de modo que as leituras não bloqueiam a escrita. As transações
+    são acumuladas e gravadas em blocos com `executemany`, junto com a variação dos saldos das contas
+    movimentadas, a cada `tamanho_lote` anotações ou em `sincronizar`. As leituras usam um pool de
+    conexões somente leitura; a escrita usa uma conexão própria. Os valores são inteiros em centavos e
+    os tipos usam os códigos do diário (`diario.TIPOS_TRANSACAO`).
+
+Durabilidade do RepositorioSQLite:
+    Antes de entrar no bloco, cada transação é anotada no diário de transações do repositório (um
+    `diario.Diario` ao lado do banco), que a grava em disco conforme a sua `PoliticaCommit` antes de
+    ela ser confirmada: com a política padrão, nenhuma transação confirmada se perde, mesmo que o bloco
+    ainda não tenha sido gravado no banco. Cada bloco é gravado com `synchronous = FULL` na mesma
+    transação SQLite que avança o segmento do diário já aplicado, e os segmentos aplicados são então
+    descartados; ao abrir o banco, os segmentos ainda não aplicados são reproduzidos nele. O custo é
+    uma escrita a mais por transação, no diário; uma política com `aguardar=False` troca essa garantia
+    por vazão e pode perder as transações anotadas desde o último fsync. Clientes e contas são gravados
+    no banco imediatamente.
+
+Classes:
+    RepositorioMemoria: Repositório em memória.
+    RepositorioSQLite: Repositório em um banco SQLite.
+    RegistroSQLite: Registro de clientes que consulta o banco sob demanda.
+    ContasSQLite: Contas indexadas pelo número, que consulta o banco sob demanda.
+"""
+
+import os
+import pathlib
+import queue
+import sqlite3
+import threading
+from array import array
+from contextlib import contextmanager
+
+import diario
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from historico import TIPOS_CREDITO, Historico
+from registro import ClienteRegistry
+
+ESQUEMA = """
+CREATE TABLE IF NOT EXISTS clientes (
+    cpf TEXT PRIMARY KEY,
+    nome TEXT NOT NULL,
+    data_nascimento TEXT NOT NULL,
+    endereco TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS contas (
+    numero INTEGER PRIMARY KEY,
+    agencia TEXT NOT NULL,
+    cpf TEXT NOT NULL REFERENCES clientes (cpf),
+    saldo INTEGER NOT NULL,
+    limite INTEGER NOT NULL,
+    limite_saques INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS contas_cpf ON contas (cpf);
+CREATE TABLE IF NOT EXISTS transacoes (
+    id INTEGER PRIMARY KEY,
+    conta INTEGER NOT NULL REFERENCES contas (numero),
+    tipo INTEGER NOT NULL,
+    valor INTEGER NOT NULL,
+    data INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS transacoes_conta_data ON transacoes (conta, data);
+CREATE TABLE IF NOT EXISTS estado (
+    chave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+"""
+
+_INSERIR_CLIENTE = "INSERT OR IGNORE INTO clientes (cpf, nome, data_nascimento, endereco) VALUES (?, ?, ?, ?)"
+_INSERIR_CONTA = (
+    "INSERT OR IGNORE INTO contas (numero, agencia, cpf, saldo, limite, limite_saques) VALUES (?, ?, ?, ?, ?, ?)"
+)
+_INSERIR_TRANSACAO = "INSERT INTO transacoes (conta, tipo, valor, data) VALUES (?, ?, ?, ?)"
+_SOMAR_SALDO = "UPDATE contas SET saldo = saldo + ? WHERE numero = ?"
+_SEGMENTO_APLICADO = "SELECT valor FROM estado WHERE chave = 'segmento_diario'"
+_AVANCAR_SEGMENTO = "INSERT OR REPLACE INTO estado (chave, valor) VALUES ('segmento_diario', ?)"
+_BUSCAR_CLIENTE = "SELECT cpf, nome, data_nascimento, endereco FROM clientes WHERE cpf = ?"
+_CONTAS_CLIENTE = "SELECT numero, saldo, limite, limite_saques FROM contas WHERE cpf = ? ORDER BY numero"
+_CPF_CONTA = "SELECT cpf FROM contas WHERE numero = ?"
+_HISTORICO = "SELECT tipo, valor, data FROM transacoes WHERE conta = ? ORDER BY data, id"
+_TRANSACOES_PERIODO = (
+    "SELECT tipo, valor, data FROM transacoes WHERE conta = ? AND data >= ? AND data < ? ORDER BY data, id"
+)
+
+_TIPOS_LOCAIS = {codigo: Historico.codigo_tipo(nome) for codigo, nome in diario.NOMES_TIPOS_TRANSACAO.items()}
+_SINAIS = {codigo: 1 if nome in TIPOS_CREDITO else -1 for codigo, nome in diario.NOMES_TIPOS_TRANSACAO.items()}
+
+
+class RepositorioMemoria(diario.DiarioNulo):
+    """
+    Repositório em memória: clientes em um ClienteRegistry e contas em uma lista.
+
+    As anotações são descartadas, pois o estado já está nos objetos; a persistência fica a cargo do
+    diário e dos snapshots.
+
+    Atributos:
+        clientes (ClienteRegistry): O registro de clientes.
+        contas (list): As contas cadastradas.
+
+    Métodos:
+        consultar_transacoes(self, conta, inicio=None, fim=None): Retorna as transações de uma conta em um período.
+        sincronizar(self): Não faz nada; existe para manter a interface dos repositórios.
+    """
+
+    def __init__(self, clientes=None, contas=None):
+        """
+        Inicializa o repositório.
+
+        Args:
+            clientes (ClienteRegistry, optional): O registro de clientes. Padrão é um registro vazio.
+            contas (list, optional): As contas cadastradas. Padrão é uma lista vazia.
+        """
+        self.clientes = clientes if clientes is not None else ClienteRegistry()
+        self.contas = contas if contas is not None else []
+
+    def consultar_transacoes(self, conta, inicio=None, fim=None):
+        """
+        Retorna as transações de uma conta em um período, em ordem cronológica.
+
+        Args:
+            conta (Conta): A conta.
+            inicio (int, optional): A data inicial, em segundos desde a época.
+            fim (int, optional): A data final, exclusiva.
+
+        Returns:
+            list: Tuplas (tipo, valor em centavos, data).
+        """
+        historico = conta.historico
+        indices, _ = historico.pagina(inicio, fim)
+        tipos, valores, datas = historico.tipos, historico.valores, historico.datas
+        return [(Historico.nome_tipo(tipos[i]), valores[i], datas[i]) for i in indices]
+
+    def sincronizar(self):
+        pass
+
+
+class _PoolConexoes:
+    """Pool de conexões somente leitura a um banco SQLite, compartilhado entre threads."""
+
+    def __init__(self, caminho, tamanho):
+        self._caminho = caminho
+        self._tamanho = tamanho
+        self._livres = queue.LifoQueue()
+        self._conexoes = []
+        self._trava = threading.Lock()
+
+    @contextmanager
+    def conexao(self):
+        """Empresta uma conexão do pool, criando-a se o pool ainda não estiver cheio."""
+        try:
+            conexao = self._livres.get_nowait()
+        except queue.Empty:
+            with self._trava:
+                criar = len(self._conexoes) < self._tamanho
+                if criar:
+                    conexao = sqlite3.connect(
+                        f"{pathlib.Path(self._caminho).absolute().as_uri()}?mode=ro",
+                        uri=True,
+                        check_same_thread=False,
+                        cached_statements=64,
+                    )
+                    self._conexoes.append(conexao)
+            if not criar:
+                conexao = self._livres.get()
+        try:
+            yield conexao
+        finally:
+            self._livres.put(conexao)
+
+    def fechar(self):
+        """Fecha todas as conexões do pool."""
+        with self._trava:
+            for conexao in self._conexoes:
+                conexao.close()
+            self._conexoes.clear()
+
+
+class RepositorioSQLite(diario.DiarioNulo):
+    """
+    Repositório de clientes, contas e históricos em um banco SQLite local.
+
+    Atributos:
+        clientes (RegistroSQLite): O registro de clientes.
+        contas (ContasSQLite): As contas.
+
+    Métodos:
+        __init__(self, caminho, tamanho_lote=10_000, leitores=4, diretorio_diario=None, politica=None):
+            Abre ou cria o banco, reproduzindo os segmentos do diário ainda não aplicados.
+        anotar_cliente(self, cliente): Grava um cliente.
+        anotar_conta(self, conta): Grava uma conta.
+        anotar_transacao(self, conta, tipo, valor, timestamp, aguardar=True): Acumula uma transação para
+            gravação em bloco.
+        anotar_transferencia(self, origem, destino, valor, timestamp, aguardar=True): Acumula os dois lados
+            de uma transferência.
+        confirmar(self, marca): Aguarda a gravação em disco de uma anotação no diário.
+        importar(self, clientes, contas): Grava em bloco clientes e contas existentes, com os históricos.
+        buscar_cliente(self, cpf): Retorna o cliente com o CPF normalizado informado.
+        buscar_conta(self, numero): Retorna a conta com o número informado.
+        consultar_transacoes(self, conta, inicio=None, fim=None): Retorna as transações de uma conta em um período.
+        sincronizar(self): Grava as transações acumuladas e a variação dos saldos das contas movimentadas.
+        fechar(self): Sincroniza e fecha as conexões e o diário.
+    """
+
+    def __init__(self, caminho, tamanho_lote=10_000, leitores=4, diretorio_diario=None, politica=None):
+        """
+        Abre ou cria o banco e reproduz nele os segmentos do diário ainda não aplicados.
+
+        Args:
+            caminho (str): O caminho do arquivo do banco.
+            tamanho_lote (int, optional): Quantidade de transações acumuladas por gravação. Padrão é 10.000.
+            leitores (int, optional): Quantidade máxima de conexões de leitura. Padrão é 4.
+            diretorio_diario (str, optional): O diretório do diário das transações ainda não gravadas no
+                banco. Padrão é o caminho do banco seguido de "-diario".
+            politica (diario.PoliticaCommit, optional): A política de gravação do diário. Padrão é um
+                fsync por anotação.
+        """
+        self._escrita = sqlite3.connect(caminho, check_same_thread=False, cached_statements=64)
+        self._escrita.execute("PRAGMA journal_mode = WAL")
+        self._escrita.execute("PRAGMA synchronous = FULL")
+        self._escrita.executescript(ESQUEMA)
+        self._leitura = _PoolConexoes(caminho, leitores)
+        self._tamanho_lote = tamanho_lote
+        self._trava = threading.RLock()
+        self._pendentes = []
+        self._saldos_pendentes = {}
+        self._clientes_carregados = {}
+        self._contas_carregadas = {}
+        self._diretorio_diario = diretorio_diario or f"{caminho}-diario"
+        self._diario = diario.Diario(self._diretorio_diario, politica)
+        self._recuperar()
+        self.clientes = RegistroSQLite(self)
+        self.contas = ContasSQLite(self)
+
+    def anotar_cliente(self, cliente):
+        """
+        Grava um cliente, se ainda não estiver no banco.
+
+        Args:
+            cliente (PessoaFisica): O cliente.
+        """
+        cpf = ClienteRegistry.normalizar_cpf(cliente.cpf)
+        with self._trava:
+            self._escrita.execute(_INSERIR_CLIENTE, (cpf, cliente.nome, cliente.data_nascimento, cliente.endereco))
+            self._escrita.commit()
+            self._clientes_carregados.setdefault(cpf, cliente)
+
+    def anotar_conta(self, conta):
+        """
+        Grava uma conta, se ainda não estiver no banco.
+
+        Args:
+            conta (ContaCorrente): A conta, cujo titular já deve estar no banco.
+        """
+        with self._trava:
+            self._escrita.execute(_INSERIR_CONTA, self._linha_conta(conta))
+            self._escrita.commit()
+            self._contas_carregadas.setdefault(int(conta.numero), conta)
+
+    def anotar_transacao(self, conta, tipo, valor, timestamp, aguardar=True):
+        """
+        Acumula uma transação bem-sucedida, gravando o bloco quando atingir `tamanho_lote`.
+
+        Args:
+            conta (Conta): A conta em que a transação foi registrada.
+            tipo (str): O nome do tipo da transação.
+            valor (int): O valor da transação, em centavos.
+            timestamp (int): A data registrada no histórico, em segundos desde a época.
+            aguardar (bool, optional): Se False, retorna sem aguardar a gravação do diário em disco,
+                que deve ser aguardada com `confirmar`. Padrão é True.
+
+        Returns:
+            int: A marca da anotação no diário, para `confirmar`.
+        """
+        numero = int(conta.numero)
+        codigo = diario.TIPOS_TRANSACAO[tipo]
+        with self._trava:
+            marca = self._diario.anotar_transacao(conta, tipo, valor, timestamp, aguardar=False)
+            self._pendentes.append((numero, codigo, valor, timestamp))
+            self._somar_saldo(numero, _SINAIS[codigo] * valor)
+            if len(self._pendentes) >= self._tamanho_lote:
+                self.sincronizar()
+        if aguardar:
+            self.confirmar(marca)
+        return marca
+
+    def anotar_transferencia(self, origem, destino, valor, timestamp, aguardar=True):
+        """
+        Acumula os dois lados de uma transferência, que são gravados no mesmo bloco.
+
+        Args:
+            origem (Conta): A conta debitada.
+            destino (Conta): A conta creditada.
+            valor (int): O valor transferido, em centavos.
+            timestamp (int): A data registrada nos históricos, em segundos desde a época.
+            aguardar (bool, optional): Se False, retorna sem aguardar a gravação do diário em disco,
+                que deve ser aguardada com `confirmar`. Padrão é True.
+
+        Returns:
+            int: A marca da anotação no diário, para `confirmar`.
+        """
+        with self._trava:
+            marca = self._diario.anotar_transferencia(origem, destino, valor, timestamp, aguardar=False)
+            self._acumular_transferencia(int(origem.numero), int(destino.numero), valor, timestamp)
+            if len(self._pendentes) >= self._tamanho_lote:
+                self.sincronizar()
+        if aguardar:
+            self.confirmar(marca)
+        return marca
+
+    def confirmar(self, marca):
+        """
+        Aguarda a gravação em disco de uma anotação no diário, conforme a política do diário.
+
+        Args:
+            marca (int): A marca retornada pela anotação.
+        """
+        self._diario.confirmar(marca)
+
+    def importar(self, clientes, contas):
+        """
+        Grava em bloco clientes e contas existentes, com os seus históricos, em uma única transação.
+
+        Args:
+            clientes (iterable): Os clientes.
+            contas (iterable): As contas, cujos titulares estão entre os clientes.
+        """
+        codigos = {codigo_local: codigo for codigo, codigo_local in _TIPOS_LOCAIS.items()}
+        with self._trava, self._escrita:
+            self._escrita.executemany(
+                _INSERIR_CLIENTE,
+                (
+                    (ClienteRegistry.normalizar_cpf(cliente.cpf), cliente.nome, cliente.data_nascimento, cliente.endereco)
+                    for cliente in clientes
+                ),
+            )
+            for conta in contas:
+                self._escrita.execute(_INSERIR_CONTA, self._linha_conta(conta))
+                historico = conta.historico
+                numero = int(conta.numero)
+                self._escrita.executemany(
+                    _INSERIR_TRANSACAO,
+                    (
+                        (numero, codigos[tipo], valor, data)
+                        for tipo, valor, data in zip(historico.tipos, historico.valores, historico.datas)
+                    ),
+                )
+
+    def buscar_cliente(self, cpf):
+        """
+        Retorna o cliente com o CPF normalizado informado, construindo-o com as suas contas se necessário.
+
+        Args:
+            cpf (str): O CPF contendo somente dígitos.
+
+        Returns:
+            PessoaFisica: O cliente, ou None se não estiver no banco.
+        """
+        cliente = self._clientes_carregados.get(cpf)
+        if cliente is not None:
+            return cliente
+        with self._leitura.conexao() as conexao:
+            linha = conexao.execute(_BUSCAR_CLIENTE, (cpf,)).fetchone()
+            if linha is None:
+                return None
+            contas = conexao.execute(_CONTAS_CLIENTE, (cpf,)).fetchall()
+            historicos = [conexao.execute(_HISTORICO, (numero,)).fetchall() for numero, *_ in contas]
+        with self._trava:
+            cliente = self._clientes_carregados.get(cpf)
+            if cliente is not None:
+                return cliente
+            _, nome, data_nascimento, endereco = linha
+            cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
+            for (numero, saldo, limite, limite_saques), transacoes in zip(contas, historicos):
+                conta = self._contas_carregadas.get(numero)
+                if conta is None:
+                    conta = self._construir_conta(numero, cliente, saldo, limite, limite_saques, transacoes)
+                cliente.adicionar_conta(conta)
+            self._clientes_carregados[cpf] = cliente
+            return cliente
+
+    def buscar_conta(self, numero):
+        """
+        Retorna a conta com o número informado, construindo-a junto com o seu titular se necessário.
+
+        Args:
+            numero (int): O número da conta.
+
+        Returns:
+            ContaCorrente: A conta, ou None se não estiver no banco.
+        """
+        numero = int(numero)
+        conta = self._contas_carregadas.get(numero)
+        if conta is not None:
+            return conta
+        with self._leitura.conexao() as conexao:
+            linha = conexao.execute(_CPF_CONTA, (numero,)).fetchone()
+        if linha is None:
+            return None
+        self.buscar_cliente(linha[0])
+        return self._contas_carregadas.get(numero)
+
+    def consultar_transacoes(self, conta, inicio=None, fim=None):
+        """
+        Retorna as transações de uma conta em um período, em ordem cronológica, consultando o banco.
+
+        Args:
+            conta (Conta): A conta.
+            inicio (int, optional): A data inicial, em segundos desde a época.
+            fim (int, optional): A data final, exclusiva.
+
+        Returns:
+            list: Tuplas (tipo, valor em centavos, data).
+        """
+        self.sincronizar()
+        parametros = (int(conta.numero), -(2 ** 63) if inicio is None else inicio, 2 ** 63 - 1 if fim is None else fim)
+        with self._leitura.conexao() as conexao:
+            linhas = conexao.execute(_TRANSACOES_PERIODO, parametros).fetchall()
+        nomes = diario.NOMES_TIPOS_TRANSACAO
+        return [(nomes[tipo], valor, data) for tipo, valor, data in linhas]
+
+    def sincronizar(self):
+        """
+        Grava as transações acumuladas e a variação dos saldos das contas movimentadas em uma única
+        transação, que também marca os segmentos do diário como aplicados; depois os descarta.
+        """
+        with self._trava:
+            if not self._pendentes and not self._saldos_pendentes:
+                return
+            self._gravar_bloco(self._diario.rotacionar())
+
+    def fechar(self):
+        """
+        Grava as transações acumuladas e fecha as conexões e o diário.
+        """
+        self.sincronizar()
+        self._diario.fechar()
+        self._leitura.fechar()
+        self._escrita.close()
+
+    def _somar_saldo(self, numero, variacao):
+        """Acumula a variação do saldo de uma conta no bloco; deve ser chamado com a trava adquirida."""
+        self._saldos_pendentes[numero] = self._saldos_pendentes.get(numero, 0) + variacao
+
+    def _acumular_transferencia(self, origem, destino, valor, timestamp):
+        """Acumula os dois lados de uma transferência no bloco; deve ser chamado com a trava adquirida."""
+        self._pendentes.append((origem, diario.TIPOS_TRANSACAO["Transferencia"], valor, timestamp))
+        self._pendentes.append((destino, diario.TIPOS_TRANSACAO["TransferenciaRecebida"], valor, timestamp))
+        self._somar_saldo(origem, -valor)
+        self._somar_saldo(destino, valor)
+
+    def _gravar_bloco(self, segmento):
+        """
+        Grava o bloco acumulado marcando como aplicados os segmentos do diário anteriores a `segmento`,
+        que são então descartados; deve ser chamado com a trava adquirida.
+        """
+        with self._escrita:
+            self._escrita.executemany(_INSERIR_TRANSACAO, self._pendentes)
+            self._escrita.executemany(
+                _SOMAR_SALDO, ((variacao, numero) for numero, variacao in self._saldos_pendentes.items())
+            )
+            self._escrita.execute(_AVANCAR_SEGMENTO, (segmento,))
+        self._pendentes = []
+        self._saldos_pendentes = {}
+        for numero, caminho in diario.segmentos(self._diretorio_diario):
+            if numero < segmento:
+                os.remove(caminho)
+
+    def _recuperar(self):
+        """
+        Reproduz no banco as transações dos segmentos do diário ainda não aplicados, de uma interrupção
+        anterior à gravação do seu bloco.
+        """
+        linha = self._escrita.execute(_SEGMENTO_APLICADO).fetchone()
+        primeiro = linha[0] if linha is not None else 1
+        with self._trava:
+            for numero, caminho in diario.segmentos(self._diretorio_diario):
+                if numero < primeiro:
+                    continue
+                for tipo, campos in diario.ler(caminho):
+                    if tipo == diario.TRANSACAO:
+                        conta, nome_tipo, valor, timestamp = campos
+                        codigo = diario.TIPOS_TRANSACAO[nome_tipo]
+                        self._pendentes.append((conta, codigo, valor, timestamp))
+                        self._somar_saldo(conta, _SINAIS[codigo] * valor)
+                    elif tipo == diario.TRANSFERENCIA:
+                        self._acumular_transferencia(*campos)
+            self._gravar_bloco(self._diario.rotacionar())
+
+    def _quantidade(self, tabela):
+        """Retorna a quantidade de linhas de uma tabela."""
+        with self._leitura.conexao() as conexao:
+            return conexao.execute(f"SELECT count(*) FROM {tabela}").fetchone()[0]
+
+    def _chaves(self, tabela, coluna, inicial):
+        """Percorre em ordem as chaves de uma tabela, em blocos, sem manter uma conexão emprestada entre eles."""
+        consulta = f"SELECT {coluna} FROM {tabela} WHERE {coluna} > ? ORDER BY {coluna} LIMIT 1000"
+        ultima = inicial
+        while True:
+            with self._leitura.conexao() as conexao:
+                bloco = [chave for (chave,) in conexao.execute(consulta, (ultima,))]
+            if not bloco:
+                return
+            yield from bloco
+            ultima = bloco[-1]
+
+    @staticmethod
+    def _linha_conta(conta):
+        """Retorna os campos de uma conta na ordem da tabela `contas`."""
+        return (
+            int(conta.numero),
+            conta.agencia,
+            ClienteRegistry.normalizar_cpf(conta.cliente.cpf),
+            conta.saldo,
+            conta._limite,
+            conta._limite_saques,
+        )
+
+    def _construir_conta(self, numero, cliente, saldo, limite, limite_saques, transacoes):
+        """Constrói uma conta do banco, carregando o seu histórico."""
+        conta = ContaCorrente(numero, cliente, limite=limite, limite_saques=limite_saques)
+        conta._saldo = saldo
+        if transacoes:
+            tipos, valores, datas = zip(*transacoes)
+            conta.historico.carregar_colunas(
+                array("B", map(_TIPOS_LOCAIS.__getitem__, tipos)), array("q", valores), array("q", datas)
+            )
+        self._contas_carregadas[numero] = conta
+        return conta
+
+
+class RegistroSQLite(ClienteRegistry):
+    """
+    Registro de clientes que consulta o banco para os clientes ainda não construídos.
+
+    Os clientes adicionados são gravados no banco imediatamente.
+    """
+
+    def __init__(self, repositorio):
+        """
+        Inicializa o registro sobre um repositório.
+
+        Args:
+            repositorio (RepositorioSQLite): O repositório com os clientes.
+        """
+        super().__init__()
+        self._repositorio = repositorio
+
+    def buscar(self, cpf):
+        return self._repositorio.buscar_cliente(self.normalizar_cpf(cpf))
+
+    def adicionar(self, cliente):
+        if self.buscar(cliente.cpf) is not None:
+            return False
+        self._repositorio.anotar_cliente(cliente)
+        return True
+
+    def carregar(self, clientes):
+        return sum(self.adicionar(cliente) for cliente in clientes)
+
+    def __contains__(self, cpf):
+        return self.buscar(cpf) is not None
+
+    def __iter__(self):
+        for cpf in self._repositorio._chaves("clientes", "cpf", ""):
+            yield self._repositorio.buscar_cliente(cpf)
+
+    def __len__(self):
+        return self._repositorio._quantidade("clientes")
+
+
+class ContasSQLite:
+    """
+    Contas indexadas pelo número, que consulta o banco para as contas ainda não construídas.
+
+    `contas[numero]` busca a conta pela chave primária da tabela; a iteração e `intervalo` percorrem
+    as contas na ordem do número. As contas acrescentadas são gravadas no banco imediatamente.
+    """
+
+    def __init__(self, repositorio):
+        """
+        Inicializa as contas sobre um repositório.
+
+        Args:
+            repositorio (RepositorioSQLite): O repositório com as contas.
+        """
+        self._repositorio = repositorio
+
+    def append(self, conta):
+        """
+        Acrescenta uma conta, gravando-a no banco.
+
+        Args:
+            conta (ContaCorrente): A conta criada, cujo titular já está no banco.
+        """
+        self._repositorio.anotar_conta(conta)
+
+    def buscar(self, agencia, numero):
+        """
+        Retorna a conta com a agência e o número informados, pela chave primária da tabela.
+
+        Args:
+            agencia (str): A agência da conta.
+            numero (int | str): O número da conta.
+
+        Returns:
+            ContaCorrente: A conta, ou None se não encontrada.
+        """
+        conta = self._repositorio.buscar_conta(numero)
+        if conta is not None and conta.agencia != str(agencia):
+            return None
+        return conta
+
+    def intervalo(self, cursor=None, limite=None):
+        """
+        Retorna uma página de contas, na ordem do número, percorrendo o índice da chave primária.
+
+        Args:
+            cursor (int, optional): O número da última conta da página anterior. Padrão é o início.
+            limite (int, optional): A quantidade máxima de contas. Padrão é todas.
+
+        Returns:
+            tuple: A lista de contas e o cursor da próxima página, ou None se não houver mais contas.
+        """
+        with self._repositorio._leitura.conexao() as conexao:
+            numeros = [
+                numero for (numero,) in conexao.execute(
+                    "SELECT numero FROM contas WHERE numero > ? ORDER BY numero LIMIT ?",
+                    (-(2 ** 63) if cursor is None else cursor, -1 if limite is None else limite + 1),
+                )
+            ]
+        mais = limite is not None and len(numeros) > limite
+        numeros = numeros[:limite]
+        return [self._repositorio.buscar_conta(numero) for numero in numeros], (numeros[-1] if mais else None)
+
+    def ultimo_numero(self):
+        """
+        Retorna o maior número de conta do banco.
+
+        Returns:
+            int: O maior número, ou 0 se não houver contas.
+        """
+        with self._repositorio._leitura.conexao() as conexao:
+            return conexao.execute("SELECT coalesce(max(numero), 0) FROM contas").fetchone()[0]
+
+    def __len__(self):
+        return self._repositorio._quantidade("contas")
+
+    def __getitem__(self, numero):
+        conta = self._repositorio.buscar_conta(numero)
+        if conta is None:
+            raise KeyError(numero)
+        return conta
+
+    def __iter__(self):
+        for numero in self._repositorio._chaves("contas", "numero", -(2 ** 63)):
+            yield self._repositorio.buscar_conta(numero)
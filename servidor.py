@@ -0,0 +1,463 @@
+"""
+Módulo que define o serviço de rede do sistema bancário, baseado em asyncio.
+
+O serviço expõe as mesmas operações do menu interativo por um protocolo JSON delimitado por linhas:
+cada linha enviada pelo cliente é uma requisição e cada linha devolvida é a resposta correspondente,
+na mesma ordem. O cliente pode enviar várias requisições sem aguardar as respostas (pipelining).
+
+Requisições:
+    {"id": 1, "op": "criar_cliente", "cpf": "...", "nome": "...", "data_nascimento": "...", "endereco": "..."}
+    {"id": 2, "op": "criar_conta", "cpf": "..."}
+    {"id": 3, "op": "depositar", "cpf": "...", "conta": 2, "valor": 100.0, "chave": "3f9c-01"}
+    {"id": 4, "op": "sacar", "cpf": "...", "valor": 50.0}
+    {"id": 5, "op": "extrato", "cpf": "...", "inicio": 1700000000, "fim": 1710000000, "cursor": 0, "limite": 100}
+    {"id": 6, "op": "listar_contas", "cursor": null, "limite": 100}
+    {"id": 7, "op": "metricas"}
+    {"id": 8, "op": "relatorio", "data": "31-12-2024"}
+
+O campo `conta` (número) escolhe uma das contas do cliente; se omitido, é usada a primeira.
+O campo opcional `chave` de `depositar` e `sacar` é uma chave de idempotência: ao reenviar a mesma
+operação com a mesma chave, por exemplo depois de um timeout, o cliente recebe o resultado original
+sem que a operação seja repetida (veja o módulo idempotencia).
+Os valores e saldos são números em reais, convertidos para centavos na entrada e de volta na saída.
+O período (datas em segundos desde a época, fim exclusivo) e a paginação do extrato são opcionais;
+a resposta traz `proximo_cursor` para buscar a página seguinte, ou null se for a última.
+A listagem de contas é sempre paginada da mesma forma, com no máximo `CONTAS_POR_PAGINA` contas por
+página (o padrão quando `limite` é omitido); o cursor é opaco e deve ser devolvido como recebido.
+A operação `metricas` devolve o instantâneo da instrumentação (vazio se o servidor não foi iniciado
+com `--metricas`) e os contadores do cache de idempotência.
+A operação `relatorio` devolve os totais do dia por agência e tipo de transação e o fluxo líquido do
+banco, lidos dos agregados diários (veja o módulo agregados); sem `data`, o relatório é do dia atual.
+Os agregados são carregados dos históricos em segundo plano depois que o servidor inicia; enquanto a
+carga não termina, o relatório traz `"parcial": true`.
+
+Respostas:
+    {"id": 3, "ok": true, "saldo": 100.0}
+    {"id": 4, "ok": false, "erro": "Você não tem saldo suficiente.", "codigo": "saldo_insuficiente", "saldo": 100.0}
+
+Classes:
+    ServicoBancario: Executa as requisições sobre os clientes e as contas.
+    ServidorBancario: Servidor TCP que atende as conexões com asyncio.
+
+Uso:
+    python servidor.py --porta 8000 --dados banco [--metricas]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+import agregados
+import diario
+import dinheiro
+import eventos
+import idempotencia
+import metricas
+import snapshot
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from registro import AlocadorNumeros
+from transacao import Deposito, Saque
+from validador_cpf import ValidadorCPF
+
+LIMITE_BUFFER_ESCRITA = 64 * 1024
+CONTAS_POR_PAGINA = 1_000
+ANOTACOES_POR_SNAPSHOT = 100_000
+INTERVALO_COMPACTACAO = 1.0
+
+
+class ServicoBancario:
+    """
+    Executa as requisições do protocolo sobre os clientes e as contas.
+
+    Métodos:
+        __init__(self, clientes, contas): Inicializa o serviço.
+        executar(self, requisicao): Executa uma requisição e retorna a resposta.
+        processar_linha(self, linha): Executa uma requisição codificada em JSON.
+    """
+
+    def __init__(self, clientes, contas):
+        """
+        Inicializa o serviço.
+
+        Args:
+            clientes (ClienteRegistry): O registro de clientes cadastrados.
+            contas (IndiceContas): O índice de contas cadastradas.
+        """
+        self._clientes = clientes
+        self._contas = contas
+        self._trava_cadastro = threading.Lock()
+        self._alocador = AlocadorNumeros(contas.ultimo_numero() + 1)
+        self._operacoes = {
+            "depositar": self._depositar,
+            "sacar": self._sacar,
+            "extrato": self._extrato,
+            "criar_cliente": self._criar_cliente,
+            "criar_conta": self._criar_conta,
+            "listar_contas": self._listar_contas,
+            "metricas": self._metricas,
+            "relatorio": self._relatorio,
+        }
+
+    def executar(self, requisicao):
+        """
+        Executa uma requisição e retorna a resposta.
+
+        Args:
+            requisicao (dict): A requisição, com o campo `op` e os parâmetros da operação.
+
+        Returns:
+            dict: A resposta, com o campo `ok` e o `id` da requisição, se informado.
+        """
+        operacao = self._operacoes.get(requisicao.get("op"))
+        if operacao is None:
+            resposta = {"ok": False, "erro": "Operação inválida."}
+        else:
+            try:
+                resposta = operacao(requisicao)
+            except (KeyError, TypeError, ValueError, OverflowError):
+                resposta = {"ok": False, "erro": "Requisição inválida."}
+        if "id" in requisicao:
+            resposta["id"] = requisicao["id"]
+        return resposta
+
+    def processar_linha(self, linha):
+        """
+        Executa uma requisição codificada em JSON.
+
+        Args:
+            linha (bytes): A requisição em JSON.
+
+        Returns:
+            bytes: A resposta em JSON, terminada por quebra de linha.
+        """
+        try:
+            requisicao = json.loads(linha)
+            if not isinstance(requisicao, dict):
+                raise ValueError
+        except ValueError:
+            resposta = {"ok": False, "erro": "JSON inválido."}
+        else:
+            resposta = self.executar(requisicao)
+        return json.dumps(resposta, ensure_ascii=False).encode("utf-8") + b"\n"
+
+    def _conta_do_cliente(self, requisicao):
+        """Retorna a conta da requisição (a informada em `conta` ou a primeira do CPF), ou uma resposta de erro."""
+        cliente = self._clientes.buscar(str(requisicao["cpf"]))
+        if not cliente:
+            return None, {"ok": False, "erro": "Cliente não encontrado."}
+        if not cliente.contas:
+            return None, {"ok": False, "erro": "Cliente não possui conta."}
+        if requisicao.get("conta") is None:
+            return cliente.contas[0], None
+        numero = int(requisicao["conta"])
+        for conta in cliente.contas:
+            if int(conta.numero) == numero:
+                return conta, None
+        return None, {"ok": False, "erro": "Conta não encontrada."}
+
+    def _movimentar(self, requisicao, classe):
+        conta, erro = self._conta_do_cliente(requisicao)
+        if erro:
+            return erro
+        chave = requisicao.get("chave")
+        transacao = classe(dinheiro.para_centavos(requisicao["valor"]), None if chave is None else str(chave))
+        resultado = transacao.registrar(conta)
+        if not resultado:
+            return {
+                "ok": False,
+                "erro": eventos.FALHAS[resultado],
+                "codigo": resultado.name.lower(),
+                "saldo": dinheiro.reais(conta.saldo),
+            }
+        return {"ok": True, "saldo": dinheiro.reais(conta.saldo)}
+
+    def _depositar(self, requisicao):
+        return self._movimentar(requisicao, Deposito)
+
+    def _sacar(self, requisicao):
+        return self._movimentar(requisicao, Saque)
+
+    def _extrato(self, requisicao):
+        conta, erro = self._conta_do_cliente(requisicao)
+        if erro:
+            return erro
+        historico = conta.historico
+        parametros = [requisicao.get(campo) for campo in ("inicio", "fim", "cursor", "limite")]
+        inicio, fim, cursor, limite = (None if valor is None else int(valor) for valor in parametros)
+        with conta.trava:
+            posicoes, proximo = historico.pagina(inicio, fim, cursor or 0, limite)
+            return {
+                "ok": True,
+                "titular": conta.cliente.nome,
+                "transacoes": [
+                    {**transacao, "valor": dinheiro.reais(transacao["valor"])}
+                    for transacao in historico.transacoes[posicoes.start:posicoes.stop]
+                ],
+                "proximo_cursor": proximo,
+                "saldo": dinheiro.reais(conta.saldo),
+            }
+
+    def _criar_cliente(self, requisicao):
+        cpf = str(requisicao["cpf"])
+        if not ValidadorCPF.validar(cpf):
+            return {"ok": False, "erro": "CPF inválido."}
+        cliente = PessoaFisica(
+            nome=str(requisicao["nome"]),
+            data_nascimento=str(requisicao["data_nascimento"]),
+            cpf=cpf,
+            endereco=str(requisicao["endereco"]),
+        )
+        with self._trava_cadastro:
+            if not self._clientes.adicionar(cliente):
+                return {"ok": False, "erro": "Já existe cliente com esse CPF."}
+            diario.ativo().anotar_cliente(cliente)
+        return {"ok": True}
+
+    def _criar_conta(self, requisicao):
+        cliente = self._clientes.buscar(str(requisicao["cpf"]))
+        if not cliente:
+            return {"ok": False, "erro": "Cliente não encontrado."}
+        conta = ContaCorrente.nova_conta(cliente=cliente, numero=self._alocador.alocar())
+        with self._trava_cadastro:
+            self._contas.append(conta)
+            cliente.adicionar_conta(conta)
+            diario.ativo().anotar_conta(conta)
+        return {"ok": True, "agencia": conta.agencia, "numero": conta.numero}
+
+    def _listar_contas(self, requisicao):
+        limite = requisicao.get("limite")
+        limite = CONTAS_POR_PAGINA if limite is None else min(int(limite), CONTAS_POR_PAGINA)
+        if limite < 1:
+            raise ValueError("limite deve ser positivo")
+        contas, proximo = self._contas.intervalo(requisicao.get("cursor"), limite)
+        return {
+            "ok": True,
+            "contas": [
+                {"agencia": conta.agencia, "numero": conta.numero, "titular": conta.cliente.nome}
+                for conta in contas
+            ],
+            "proximo_cursor": proximo,
+        }
+
+    def _metricas(self, requisicao):
+        return {
+            "ok": True,
+            "metricas": metricas.ativo().instantaneo(),
+            "idempotencia": idempotencia.ativo().estatisticas(),
+        }
+
+    def _relatorio(self, requisicao):
+        dia = None
+        if requisicao.get("data") is not None:
+            dia = datetime.strptime(str(requisicao["data"]), "%d-%m-%Y").date()
+        agregados_ativos = agregados.ativo()
+        parcial = agregados_ativos.carregando
+        relatorio = agregados_ativos.relatorio(dia)
+        return {
+            "ok": True,
+            "parcial": parcial,
+            "data": relatorio["dia"].strftime("%d-%m-%Y"),
+            "agencias": {
+                agencia: {
+                    tipo: {"total": dinheiro.reais(total), "quantidade": quantidade}
+                    for tipo, (total, quantidade) in totais.items()
+                }
+                for agencia, totais in relatorio["agencias"].items()
+            },
+            "fluxo_liquido": dinheiro.reais(relatorio["fluxo_liquido"]),
+        }
+
+
+class ServidorBancario:
+    """
+    Servidor TCP que atende as conexões do protocolo com asyncio.
+
+    Cada conexão é atendida por uma corrotina que lê as requisições em sequência e escreve as
+    respostas na mesma ordem, aguardando o envio apenas quando o buffer de escrita fica cheio. As
+    requisições são executadas em um pool de threads, uma de cada vez por conexão: a espera pela
+    gravação do diário em disco bloqueia apenas a thread da requisição, nunca o laço de eventos, e as
+    anotações de conexões simultâneas são gravadas no mesmo fsync.
+
+    O servidor pode ser pausado para executar uma tarefa sem requisições em andamento, como a captura
+    do estado para um snapshot: as novas requisições aguardam no laço de eventos enquanto as que já
+    estão em execução terminam.
+
+    Métodos:
+        __init__(self, servico, trabalhadores=64): Inicializa o servidor.
+        iniciar(self, host, porta): Começa a aceitar conexões.
+        atender(self, leitor, escritor): Atende uma conexão.
+        pausado(self, funcao, *args): Executa uma função sem requisições em andamento.
+        fechar(self): Encerra o pool de threads.
+    """
+
+    def __init__(self, servico, trabalhadores=64):
+        """
+        Inicializa o servidor.
+
+        Args:
+            servico (ServicoBancario): O serviço que executa as requisições.
+            trabalhadores (int, optional): Quantidade de threads que executam as requisições, o que
+                limita as anotações que compartilham um fsync. Padrão é 64.
+        """
+        self._servico = servico
+        self._executor = ThreadPoolExecutor(trabalhadores, thread_name_prefix="servidor")
+        self._em_andamento = 0
+        self._ocioso = asyncio.Event()
+        self._ocioso.set()
+        self._liberado = asyncio.Event()
+        self._liberado.set()
+
+    async def iniciar(self, host="127.0.0.1", porta=8000):
+        """
+        Começa a aceitar conexões.
+
+        Args:
+            host (str, optional): O endereço de escuta. Padrão é "127.0.0.1".
+            porta (int, optional): A porta de escuta; 0 escolhe uma porta livre. Padrão é 8000.
+
+        Returns:
+            asyncio.Server: O servidor em execução.
+        """
+        return await asyncio.start_server(self.atender, host, porta, backlog=4096)
+
+    async def atender(self, leitor, escritor):
+        """
+        Atende uma conexão até que o cliente a encerre.
+
+        Args:
+            leitor (asyncio.StreamReader): O fluxo de leitura da conexão.
+            escritor (asyncio.StreamWriter): O fluxo de escrita da conexão.
+        """
+        processar_linha = self._servico.processar_linha
+        laco = asyncio.get_running_loop()
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                if not linha.strip():
+                    continue
+                if not self._liberado.is_set():
+                    await self._liberado.wait()
+                self._em_andamento += 1
+                self._ocioso.clear()
+                try:
+                    resposta = await laco.run_in_executor(self._executor, processar_linha, linha)
+                finally:
+                    self._em_andamento -= 1
+                    if not self._em_andamento:
+                        self._ocioso.set()
+                escritor.write(resposta)
+                if escritor.transport.get_write_buffer_size() > LIMITE_BUFFER_ESCRITA:
+                    await escritor.drain()
+            await escritor.drain()
+        except (ConnectionError, asyncio.LimitOverrunError, ValueError):
+            pass
+        finally:
+            escritor.close()
+
+    async def pausado(self, funcao, *args):
+        """
+        Executa uma função no pool de threads sem requisições em andamento: as novas requisições só
+        começam depois que ela termina.
+
+        Args:
+            funcao (callable): A função a executar.
+            *args: Os argumentos da função.
+
+        Returns:
+            object: O retorno da função.
+        """
+        self._liberado.clear()
+        try:
+            await self._ocioso.wait()
+            return await asyncio.get_running_loop().run_in_executor(self._executor, funcao, *args)
+        finally:
+            self._liberado.set()
+
+    def fechar(self):
+        """
+        Encerra o pool de threads, aguardando as requisições em execução.
+        """
+        self._executor.shutdown()
+
+
+async def executar(host, porta, diretorio_dados, instrumentar=False):
+    """
+    Restaura o estado, ativa o diário, os agregados diários e o cache de idempotência e atende
+    conexões até ser interrompido.
+
+    O diário usa group commit com espera: cada resposta só é enviada depois que a anotação da
+    operação foi gravada em disco, de modo que nenhuma operação confirmada ao cliente se perde em uma
+    queda. A espera acontece nas threads que executam as requisições, fora das travas das contas, e
+    as anotações feitas durante um fsync são gravadas juntas no seguinte.
+
+    Os agregados diários são carregados dos históricos em uma thread, para que o início não dependa
+    do tamanho do banco.
+
+    A cada `INTERVALO_COMPACTACAO` segundos, se o segmento atual do diário já tem
+    `ANOTACOES_POR_SNAPSHOT` anotações e a compactação anterior terminou, o servidor é pausado para
+    capturar o estado (veja `snapshot.compactar`); o snapshot é gravado em segundo plano, com as
+    requisições já liberadas. Ao encerrar, um último snapshot é gravado.
+
+    Args:
+        host (str): O endereço de escuta.
+        porta (int): A porta de escuta.
+        diretorio_dados (str): O diretório do diário e do snapshot.
+        instrumentar (bool, optional): Se True, ativa a instrumentação das operações. Padrão é False.
+    """
+    clientes, contas = snapshot.restaurar(diretorio_dados)
+    diario_atual = diario.Diario(diretorio_dados, diario.PoliticaCommit(registros=1_000, aguardar=True))
+    diario.ativar(diario_atual)
+    agregados_diarios = agregados.AgregadosDiarios()
+    agregados_diarios.carregar(contas)
+    agregados.ativar(agregados_diarios)
+    idempotencia.ativar(idempotencia.CacheIdempotencia())
+    if instrumentar:
+        metricas.ativar()
+    servidor_bancario = ServidorBancario(ServicoBancario(clientes, contas))
+    compactacao = None
+
+    def capturar():
+        nonlocal compactacao
+        compactacao = snapshot.compactar(diretorio_dados, clientes, contas, diario_atual, em_segundo_plano=True)
+
+    async def compactar_periodicamente():
+        while True:
+            await asyncio.sleep(INTERVALO_COMPACTACAO)
+            if diario_atual.anotacoes_no_segmento >= ANOTACOES_POR_SNAPSHOT and (
+                compactacao is None or not compactacao.is_alive()
+            ):
+                await servidor_bancario.pausado(capturar)
+
+    servidor = await servidor_bancario.iniciar(host, porta)
+    print(f"Servidor bancário escutando em {host}:{servidor.sockets[0].getsockname()[1]}")
+    compactacoes = asyncio.create_task(compactar_periodicamente())
+    try:
+        async with servidor:
+            await servidor.serve_forever()
+    finally:
+        compactacoes.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await compactacoes
+        servidor_bancario.fechar()
+        if compactacao is not None:
+            compactacao.join()
+        snapshot.compactar(diretorio_dados, clientes, contas, diario_atual)
+        diario_atual.fechar()
+
+
+if __name__ == "__main__":
+    argumentos = argparse.ArgumentParser(description="Servidor bancário com protocolo JSON por linhas.")
+    argumentos.add_argument("--host", default="127.0.0.1")
+    argumentos.add_argument("--porta", type=int, default=8000)
+    argumentos.add_argument("--dados", default="banco", help="Diretório do diário e do snapshot.")
+    argumentos.add_argument("--metricas", action="store_true", help="Ativa a instrumentação das operações.")
+    opcoes = argumentos.parse_args()
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(executar(opcoes.host, opcoes.porta, opcoes.dados, opcoes.metricas))
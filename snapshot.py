@@ -0,0 +1,683 @@
+"""
+Módulo que define os snapshots do sistema bancário, usados para acelerar a inicialização.
+
+Um snapshot guarda, em um arquivo binário de layout fixo, os clientes, as contas com seus saldos, o
+vínculo entre contas e clientes e as colunas dos históricos. Na inicialização o arquivo é mapeado em
+memória (`mmap`) e os objetos só são construídos para as contas e clientes efetivamente usados, de
+modo que o tempo de inicialização não depende do tamanho do banco. Depois de gravado, os segmentos do
+diário cobertos pelo snapshot são descartados.
+
+Um novo snapshot do estado restaurado de outro só serializa os clientes e as contas construídos
+desde a restauração (os usados ou criados); os demais registros e colunas são copiados do arquivo
+mapeado, sem construir os objetos. A compactação pode gravar o arquivo em uma thread: o estado é
+capturado no instante em que o diário muda de segmento, e as operações seguintes não esperam a
+gravação.
+
+Layout do arquivo:
+    Cabeçalho (`<8sIQQQQ7Q`): assinatura, versão, primeiro segmento do diário a reproduzir,
+        quantidades de clientes, contas e transações, e a posição de cada seção.
+    Clientes, ordenados pelo CPF normalizado (`<11sQHQHQHQHQI`): CPF normalizado, posição e tamanho do
+        CPF, nome, data de nascimento e endereço no bloco de textos, e a faixa das suas contas.
+    Contas, ordenadas pelo número (`<qqqIQQQ`): número, saldo e limite em centavos, limite de saques,
+        índice do cliente e a faixa do seu histórico.
+    Contas por cliente (`Q`): índices das contas de cada cliente.
+    Tipos (`B`), valores em centavos (`q`) e datas (`q`) dos históricos, agrupados por conta.
+    Bloco de textos em UTF-8.
+
+Classes:
+    Snapshot: Leitor de um arquivo de snapshot mapeado em memória.
+    RegistroSnapshot: Registro de clientes que consulta o snapshot sob demanda.
+    ContasSnapshot: Sequência de contas que consulta o snapshot sob demanda.
+
+Funções:
+    escrever(caminho, clientes, contas, segmento): Grava um snapshot do estado informado.
+    restaurar(diretorio): Reconstrói o estado a partir do snapshot e dos segmentos seguintes do diário.
+    compactar(diretorio, clientes, contas, diario_atual, em_segundo_plano=False): Grava um snapshot e
+        descarta os segmentos cobertos.
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import threading
+from array import array
+from collections.abc import Sequence
+
+import diario
+from cliente import PessoaFisica
+from conta import AGENCIA, ContaCorrente
+from historico import Historico
+from registro import ClienteRegistry, IndiceContas
+
+ASSINATURA = b"SNAPBANC"
+VERSAO = 2
+NOME_ARQUIVO = "snapshot.bin"
+
+_CABECALHO = struct.Struct("<8sIQQQQ7Q")
+_CLIENTE = struct.Struct("<11sQHQHQHQHQI")
+_CONTA = struct.Struct("<qqqIQQQ")
+
+
+class Snapshot:
+    """
+    Leitor de um arquivo de snapshot mapeado em memória.
+
+    Os clientes e as contas são construídos apenas quando consultados e mantidos em cache, de modo
+    que cada objeto é construído no máximo uma vez. A construção é feita com uma trava adquirida, já
+    que as requisições e a carga dos agregados consultam o snapshot em threads diferentes; um cliente
+    só entra no cache depois que as suas contas foram construídas.
+
+    Atributos:
+        segmento (int): O primeiro segmento do diário não coberto pelo snapshot.
+        quantidade_clientes (int): A quantidade de clientes no snapshot.
+        quantidade_contas (int): A quantidade de contas no snapshot.
+
+    Métodos:
+        __init__(self, caminho): Abre e mapeia o arquivo de snapshot.
+        cliente(self, indice): Retorna o cliente na posição informada.
+        conta(self, indice): Retorna a conta na posição informada.
+        buscar_cliente(self, cpf): Retorna o cliente com o CPF normalizado informado.
+        buscar_conta(self, numero): Retorna a conta com o número informado.
+        ultimo_numero(self): Retorna o maior número de conta do snapshot.
+        historico_conta(self, indice, marcar): Retorna as colunas do histórico de uma conta.
+        fechar(self): Libera o mapeamento do arquivo.
+    """
+
+    def __init__(self, caminho):
+        """
+        Abre e mapeia o arquivo de snapshot.
+
+        Args:
+            caminho (str): O caminho do arquivo de snapshot.
+
+        Raises:
+            ValueError: Se o arquivo não for um snapshot válido.
+        """
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        (
+            assinatura, versao, self.segmento, self.quantidade_clientes, self.quantidade_contas, _,
+            self._inicio_clientes, self._inicio_contas, self._inicio_contas_cliente,
+            self._inicio_tipos, self._inicio_valores, self._inicio_datas, self._inicio_textos,
+        ) = _CABECALHO.unpack_from(self._mapa, 0)
+        if assinatura != ASSINATURA or versao != VERSAO:
+            self._mapa.close()
+            raise ValueError(f"Arquivo de snapshot inválido: {caminho}")
+        self._clientes = {}
+        self._contas = {}
+        self._trava = threading.RLock()
+        self._tipos_locais = bytes(
+            Historico.codigo_tipo(diario.NOMES_TIPOS_TRANSACAO[codigo])
+            if codigo in diario.NOMES_TIPOS_TRANSACAO else 0
+            for codigo in range(256)
+        )
+
+    def cliente(self, indice):
+        """
+        Retorna o cliente na posição informada, construindo-o junto com suas contas se necessário.
+
+        Args:
+            indice (int): A posição do cliente na ordem do snapshot.
+
+        Returns:
+            PessoaFisica: O cliente.
+        """
+        cliente = self._clientes.get(indice)
+        if cliente is not None:
+            return cliente
+        with self._trava:
+            cliente = self._clientes.get(indice)
+            if cliente is not None:
+                return cliente
+
+            campos = _CLIENTE.unpack_from(self._mapa, self._inicio_clientes + indice * _CLIENTE.size)
+            cpf, nome, data_nascimento, endereco = (
+                self._texto(campos[posicao], campos[posicao + 1]) for posicao in (1, 3, 5, 7)
+            )
+            cliente = PessoaFisica(nome=nome, data_nascimento=data_nascimento, cpf=cpf, endereco=endereco)
+
+            inicio_contas, quantidade_contas = campos[9], campos[10]
+            indices_contas = array("Q")
+            posicao = self._inicio_contas_cliente + inicio_contas * indices_contas.itemsize
+            indices_contas.frombytes(self._mapa[posicao:posicao + quantidade_contas * indices_contas.itemsize])
+            for indice_conta in indices_contas:
+                cliente.adicionar_conta(self._construir_conta(indice_conta, cliente))
+            self._clientes[indice] = cliente
+            return cliente
+
+    def conta(self, indice):
+        """
+        Retorna a conta na posição informada, construindo-a junto com seu cliente se necessário.
+
+        Args:
+            indice (int): A posição da conta na ordem do snapshot.
+
+        Returns:
+            ContaCorrente: A conta.
+        """
+        conta = self._contas.get(indice)
+        if conta is None:
+            indice_cliente = _CONTA.unpack_from(self._mapa, self._inicio_contas + indice * _CONTA.size)[4]
+            self.cliente(indice_cliente)
+            conta = self._contas[indice]
+        return conta
+
+    def buscar_cliente(self, cpf):
+        """
+        Retorna o cliente com o CPF normalizado informado, usando busca binária.
+
+        Args:
+            cpf (str): O CPF contendo somente dígitos.
+
+        Returns:
+            PessoaFisica: O cliente, ou None se não estiver no snapshot.
+        """
+        if len(cpf) != 11 or not cpf.isascii():
+            return None
+        chave = cpf.encode("ascii")
+        mapa = self._mapa
+        baixo, alto = 0, self.quantidade_clientes
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            posicao = self._inicio_clientes + meio * _CLIENTE.size
+            atual = mapa[posicao:posicao + 11]
+            if atual < chave:
+                baixo = meio + 1
+            elif atual > chave:
+                alto = meio
+            else:
+                return self.cliente(meio)
+        return None
+
+    def buscar_conta(self, numero):
+        """
+        Retorna a conta com o número informado, usando busca binária.
+
+        Args:
+            numero (int): O número da conta.
+
+        Returns:
+            ContaCorrente: A conta, ou None se não estiver no snapshot.
+        """
+        numero = int(numero)
+        mapa = self._mapa
+        baixo, alto = 0, self.quantidade_contas
+        while baixo < alto:
+            meio = (baixo + alto) // 2
+            (atual,) = struct.unpack_from("<q", mapa, self._inicio_contas + meio * _CONTA.size)
+            if atual < numero:
+                baixo = meio + 1
+            elif atual > numero:
+                alto = meio
+            else:
+                return self.conta(meio)
+        return None
+
+    def ultimo_numero(self):
+        """
+        Retorna o maior número de conta do snapshot, sem construir a conta.
+
+        Returns:
+            int: O maior número, ou 0 se o snapshot não tiver contas.
+        """
+        if not self.quantidade_contas:
+            return 0
+        posicao = self._inicio_contas + (self.quantidade_contas - 1) * _CONTA.size
+        return struct.unpack_from("<q", self._mapa, posicao)[0]
+
+    def historico_conta(self, indice, marcar):
+        """
+        Retorna o número e as colunas do histórico de uma conta, sem construir a conta se ela ainda
+        não foi usada.
+
+        `marcar(numero)` é chamado enquanto a conta não pode ser movimentada: com a trava de
+        construção do snapshot adquirida, se a conta não foi construída, ou com a trava da conta. As
+        colunas retornadas são exatamente o histórico da conta no instante da marcação.
+
+        Args:
+            indice (int): A posição da conta na ordem do snapshot.
+            marcar (callable): Função chamada com o número da conta.
+
+        Returns:
+            tuple: O número da conta e as colunas `(tipos, valores, datas)` do histórico, com os
+            códigos de tipo de `Historico.codigo_tipo`.
+        """
+        with self._trava:
+            conta = self._contas.get(indice)
+            if conta is None:
+                numero, _, _, _, _, inicio, quantidade = _CONTA.unpack_from(
+                    self._mapa, self._inicio_contas + indice * _CONTA.size
+                )
+                marcar(numero)
+                return (numero, *self._colunas(inicio, quantidade))
+        return _copiar_historico(conta, marcar)
+
+    def fechar(self):
+        """
+        Libera o mapeamento do arquivo. Os objetos já construídos continuam válidos.
+        """
+        self._mapa.close()
+
+    def _construir_conta(self, indice, cliente):
+        """Constrói uma conta do snapshot, carregando o seu histórico."""
+        numero, saldo, limite, limite_saques, _, inicio, quantidade = _CONTA.unpack_from(
+            self._mapa, self._inicio_contas + indice * _CONTA.size
+        )
+        conta = ContaCorrente(numero, cliente, limite=limite, limite_saques=limite_saques)
+        conta._saldo = saldo
+        if quantidade:
+            conta.historico.carregar_colunas(*self._colunas(inicio, quantidade))
+        self._contas[indice] = conta
+        return conta
+
+    def _colunas(self, inicio, quantidade):
+        """Lê as colunas de um histórico do arquivo, convertendo os códigos de tipo."""
+        mapa = self._mapa
+        tipos = array("B", mapa[self._inicio_tipos + inicio:self._inicio_tipos + inicio + quantidade]
+                      .translate(self._tipos_locais))
+        valores = array("q")
+        valores.frombytes(mapa[self._inicio_valores + inicio * 8:self._inicio_valores + (inicio + quantidade) * 8])
+        datas = array("q")
+        datas.frombytes(mapa[self._inicio_datas + inicio * 8:self._inicio_datas + (inicio + quantidade) * 8])
+        return tipos, valores, datas
+
+    def _texto(self, posicao, tamanho):
+        """Lê um texto do bloco de textos."""
+        inicio = self._inicio_textos + posicao
+        return self._mapa[inicio:inicio + tamanho].decode("utf-8")
+
+
+class RegistroSnapshot(ClienteRegistry):
+    """
+    Registro de clientes que consulta o snapshot para os clientes ainda não construídos.
+
+    Os clientes criados depois do snapshot ficam no dicionário do registro, como no ClienteRegistry.
+    """
+
+    def __init__(self, snapshot):
+        """
+        Inicializa o registro sobre um snapshot.
+
+        Args:
+            snapshot (Snapshot): O snapshot com os clientes existentes.
+        """
+        super().__init__()
+        self._snapshot = snapshot
+
+    def buscar(self, cpf):
+        cpf = self.normalizar_cpf(cpf)
+        return self._clientes.get(cpf) or self._snapshot.buscar_cliente(cpf)
+
+    def adicionar(self, cliente):
+        if self._snapshot.buscar_cliente(self.normalizar_cpf(cliente.cpf)) is not None:
+            return False
+        return super().adicionar(cliente)
+
+    def carregar(self, clientes):
+        return sum(self.adicionar(cliente) for cliente in clientes)
+
+    def __contains__(self, cpf):
+        return self.buscar(cpf) is not None
+
+    def __iter__(self):
+        for indice in range(self._snapshot.quantidade_clientes):
+            yield self._snapshot.cliente(indice)
+        yield from self._clientes.values()
+
+    def __len__(self):
+        return self._snapshot.quantidade_clientes + len(self._clientes)
+
+
+class ContasSnapshot(Sequence):
+    """
+    Sequência de contas que consulta o snapshot para as contas ainda não construídas.
+
+    As contas do snapshot vêm primeiro, na ordem do número; as criadas depois ficam em um IndiceContas
+    e vêm em seguida, também na ordem do número.
+    """
+
+    def __init__(self, snapshot):
+        """
+        Inicializa a sequência sobre um snapshot.
+
+        Args:
+            snapshot (Snapshot): O snapshot com as contas existentes.
+        """
+        self._snapshot = snapshot
+        self._novas = IndiceContas()
+
+    def append(self, conta):
+        """
+        Acrescenta uma conta criada depois do snapshot.
+
+        Args:
+            conta (ContaCorrente): A conta criada.
+        """
+        self._novas.append(conta)
+
+    def buscar(self, agencia, numero):
+        """
+        Retorna a conta com a agência e o número informados.
+
+        Args:
+            agencia (str): A agência da conta.
+            numero (int | str): O número da conta.
+
+        Returns:
+            ContaCorrente: A conta, ou None se não encontrada.
+        """
+        conta = self._novas.buscar(agencia, numero)
+        if conta is None:
+            conta = self._snapshot.buscar_conta(numero)
+            if conta is not None and conta.agencia != str(agencia):
+                return None
+        return conta
+
+    def intervalo(self, cursor=None, limite=None):
+        """
+        Retorna uma página de contas, na ordem da sequência.
+
+        Args:
+            cursor (int, optional): A posição da primeira conta da página. Padrão é o início.
+            limite (int, optional): A quantidade máxima de contas. Padrão é todas.
+
+        Returns:
+            tuple: A lista de contas e o cursor da próxima página, ou None se não houver mais contas.
+        """
+        inicio = cursor or 0
+        fim = len(self) if limite is None else min(inicio + limite, len(self))
+        return self[inicio:fim], (fim if fim < len(self) else None)
+
+    def historicos(self, marcar):
+        """
+        Percorre os históricos de todas as contas, na ordem da sequência, sem construir as contas do
+        snapshot que ainda não foram usadas; veja `Snapshot.historico_conta`.
+
+        Args:
+            marcar (callable): Função chamada com o número de cada conta enquanto ela não pode ser
+                movimentada, antes de as colunas do seu histórico serem lidas.
+
+        Yields:
+            tuple: A agência e o número da conta e as colunas `(tipos, valores, datas)` do histórico.
+        """
+        snapshot = self._snapshot
+        for indice in range(snapshot.quantidade_contas):
+            yield (AGENCIA, *snapshot.historico_conta(indice, marcar))
+        for conta in self._novas:
+            yield (conta.agencia, *_copiar_historico(conta, marcar))
+
+    def ultimo_numero(self):
+        """
+        Retorna o maior número de conta, do snapshot ou das contas criadas depois dele.
+
+        Returns:
+            int: O maior número, ou 0 se não houver contas.
+        """
+        return max(self._snapshot.ultimo_numero(), self._novas.ultimo_numero())
+
+    def __len__(self):
+        return self._snapshot.quantidade_contas + len(self._novas)
+
+    def __getitem__(self, indice):
+        if isinstance(indice, slice):
+            return [self[i] for i in range(*indice.indices(len(self)))]
+        if indice < 0:
+            indice += len(self)
+        if indice < self._snapshot.quantidade_contas:
+            return self._snapshot.conta(indice)
+        return self._novas[indice - self._snapshot.quantidade_contas]
+
+
+def _copiar_historico(conta, marcar):
+    """Marca uma conta e copia as colunas do seu histórico, com a trava da conta adquirida."""
+    with conta.trava:
+        marcar(conta.numero)
+        historico = conta.historico
+        return conta.numero, historico.tipos[:], historico.valores[:], historico.datas[:]
+
+
+class _Corte:
+    """
+    Estado capturado em um instante para a gravação de um snapshot.
+
+    Quando o estado vem de um snapshot (`RegistroSnapshot` e `ContasSnapshot`), só são capturados os
+    clientes e as contas já construídos e os criados depois dele; os demais não mudaram desde o
+    snapshot e são copiados do arquivo mapeado na gravação. De cada conta capturada guarda-se o saldo
+    e uma cópia das colunas do histórico (o fechamento pode inserir transações no meio dele), e de
+    cada cliente a quantidade de contas, que só cresce no final; assim a gravação pode ser feita
+    depois, em outra thread, com o estado do instante da captura.
+    """
+
+    def __init__(self, clientes, contas):
+        base = getattr(contas, "_snapshot", None)
+        if base is not None and getattr(clientes, "_snapshot", None) is base:
+            with base._trava:
+                clientes_base, contas_base = dict(base._clientes), dict(base._contas)
+            novos_clientes, novas_contas = list(clientes._clientes.values()), list(contas._novas)
+        else:
+            base, clientes_base, contas_base = None, {}, {}
+            novos_clientes, novas_contas = list(clientes), list(contas)
+        tipos_estaveis = bytes(
+            diario.TIPOS_TRANSACAO.get(nome, 0) for nome in Historico._nomes_tipos
+        ).ljust(256, b"\0")
+        self.base = base
+        self.clientes_base = {indice: _capturar_cliente(cliente) for indice, cliente in clientes_base.items()}
+        self.contas_base = {indice: _capturar_conta(conta, tipos_estaveis) for indice, conta in contas_base.items()}
+        self.novos_clientes = sorted(map(_capturar_cliente, novos_clientes), key=lambda capturado: capturado[0])
+        self.novas_contas = sorted(
+            (_capturar_conta(conta, tipos_estaveis) for conta in novas_contas), key=lambda capturada: capturada[0]
+        )
+
+
+def _capturar_cliente(cliente):
+    """Retorna a chave de ordenação, o cliente e a quantidade atual das suas contas."""
+    return ClienteRegistry.normalizar_cpf(cliente.cpf).encode("ascii", "replace"), cliente, len(cliente.contas)
+
+
+def _capturar_conta(conta, tipos_estaveis):
+    """Retorna o número, a conta, o saldo e as colunas do histórico, copiados com a trava da conta."""
+    historico = conta.historico
+    with conta.trava:
+        colunas = (
+            historico.tipos.tobytes().translate(tipos_estaveis),
+            historico.valores.tobytes(),
+            historico.datas.tobytes(),
+        )
+        return int(conta.numero), conta, conta.saldo, colunas
+
+
+def escrever(caminho, clientes, contas, segmento):
+    """
+    Grava um snapshot do estado informado, de forma atômica.
+
+    Se o estado vier de um snapshot, apenas os clientes e as contas construídos desde então são
+    serializados; os demais são copiados do arquivo mapeado, sem construir os objetos.
+
+    Args:
+        caminho (str): O caminho do arquivo de snapshot.
+        clientes (iterable): Os clientes cadastrados.
+        contas (iterable): As contas cadastradas.
+        segmento (int): O primeiro segmento do diário não coberto pelo estado gravado.
+    """
+    _gravar(caminho, _Corte(clientes, contas), segmento)
+
+
+def _gravar(caminho, corte, segmento):
+    """Grava um snapshot do estado capturado em um corte, de forma atômica."""
+    base = corte.base
+    mapa = base._mapa if base is not None else b""
+    quantidade_clientes_base = base.quantidade_clientes if base is not None else 0
+    quantidade_contas_base = base.quantidade_contas if base is not None else 0
+
+    # Ordem do novo arquivo: os registros do snapshot base, já ordenados, intercalados com os novos.
+    # Um inteiro é a posição de um registro no snapshot base; uma tupla é um objeto capturado.
+    def chave_cliente(indice):
+        posicao = base._inicio_clientes + indice * _CLIENTE.size
+        return mapa[posicao:posicao + 11]
+
+    def numero_conta(indice):
+        return struct.unpack_from("<q", mapa, base._inicio_contas + indice * _CONTA.size)[0]
+
+    clientes = list(heapq.merge(
+        range(quantidade_clientes_base), corte.novos_clientes,
+        key=lambda item: chave_cliente(item) if isinstance(item, int) else item[0],
+    ))
+    contas = list(heapq.merge(
+        range(quantidade_contas_base), corte.novas_contas,
+        key=lambda item: numero_conta(item) if isinstance(item, int) else item[0],
+    ))
+    novos_indices_clientes = array("Q", bytes(8 * quantidade_clientes_base))
+    novos_indices_contas = array("Q", bytes(8 * quantidade_contas_base))
+    indices_objetos = {}
+    for novo, item in enumerate(clientes):
+        if isinstance(item, int):
+            novos_indices_clientes[item] = novo
+            item = corte.clientes_base.get(item)
+        if item is not None:
+            indices_objetos[id(item[1])] = novo
+    for novo, item in enumerate(contas):
+        if isinstance(item, int):
+            novos_indices_contas[item] = novo
+            item = corte.contas_base.get(item)
+        if item is not None:
+            indices_objetos[id(item[1])] = novo
+
+    # Os textos dos clientes do snapshot base não mudam e continuam nas mesmas posições.
+    textos = bytearray(mapa[base._inicio_textos:] if base is not None else b"")
+
+    def texto(valor):
+        dados = str(valor).encode("utf-8")
+        posicao = len(textos)
+        textos.extend(dados)
+        return posicao, len(dados)
+
+    secao_clientes = bytearray()
+    contas_cliente = array("Q")
+    for item in clientes:
+        inicio = len(contas_cliente)
+        if isinstance(item, int):
+            campos = _CLIENTE.unpack_from(mapa, base._inicio_clientes + item * _CLIENTE.size)
+            capturado = corte.clientes_base.get(item)
+            if capturado is None:
+                posicao = base._inicio_contas_cliente + campos[9] * 8
+                indices = array("Q")
+                indices.frombytes(mapa[posicao:posicao + campos[10] * 8])
+                contas_cliente.extend(novos_indices_contas[indice] for indice in indices)
+            else:
+                _, cliente, quantidade = capturado
+                contas_cliente.extend(indices_objetos[id(conta)] for conta in cliente.contas[:quantidade])
+            secao_clientes += _CLIENTE.pack(*campos[:9], inicio, len(contas_cliente) - inicio)
+        else:
+            chave, cliente, quantidade = item
+            campos = []
+            for valor in (cliente.cpf, cliente.nome, cliente.data_nascimento, cliente.endereco):
+                campos.extend(texto(valor))
+            contas_cliente.extend(indices_objetos[id(conta)] for conta in cliente.contas[:quantidade])
+            secao_clientes += _CLIENTE.pack(chave, *campos, inicio, quantidade)
+
+    secao_contas = bytearray()
+    tipos = bytearray()
+    valores = bytearray()
+    datas = bytearray()
+    for item in contas:
+        inicio = len(tipos)
+        capturada = corte.contas_base.get(item) if isinstance(item, int) else item
+        if capturada is None:
+            numero, saldo, limite, limite_saques, indice_cliente, origem, quantidade = _CONTA.unpack_from(
+                mapa, base._inicio_contas + item * _CONTA.size
+            )
+            tipos += mapa[base._inicio_tipos + origem:base._inicio_tipos + origem + quantidade]
+            valores += mapa[base._inicio_valores + origem * 8:base._inicio_valores + (origem + quantidade) * 8]
+            datas += mapa[base._inicio_datas + origem * 8:base._inicio_datas + (origem + quantidade) * 8]
+            secao_contas += _CONTA.pack(
+                numero, saldo, limite, limite_saques, novos_indices_clientes[indice_cliente], inicio, quantidade
+            )
+        else:
+            numero, conta, saldo, (tipos_conta, valores_conta, datas_conta) = capturada
+            tipos += tipos_conta
+            valores += valores_conta
+            datas += datas_conta
+            secao_contas += _CONTA.pack(
+                numero, saldo, conta._limite, conta._limite_saques, indices_objetos[id(conta.cliente)], inicio,
+                len(tipos_conta),
+            )
+
+    secoes = [secao_clientes, secao_contas, contas_cliente.tobytes(), tipos, valores, datas, textos]
+    posicoes = []
+    posicao = _CABECALHO.size
+    for secao in secoes:
+        posicao += -posicao % 8
+        posicoes.append(posicao)
+        posicao += len(secao)
+
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(_CABECALHO.pack(
+            ASSINATURA, VERSAO, segmento, len(clientes), len(contas), len(tipos), *posicoes
+        ))
+        for inicio, secao in zip(posicoes, secoes):
+            arquivo.write(b"\0" * (inicio - arquivo.tell()))
+            arquivo.write(secao)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+def restaurar(diretorio):
+    """
+    Reconstrói o estado a partir do snapshot, se houver, e dos segmentos seguintes do diário.
+
+    Args:
+        diretorio (str): O diretório do diário e do snapshot.
+
+    Returns:
+        tuple: O registro de clientes e a sequência de contas.
+    """
+    caminho = os.path.join(diretorio, NOME_ARQUIVO)
+    if not os.path.exists(caminho):
+        return diario.restaurar(diretorio)
+
+    snapshot = Snapshot(caminho)
+    clientes = RegistroSnapshot(snapshot)
+    contas = ContasSnapshot(snapshot)
+    diario.reproduzir(diretorio, clientes, contas, localizar_conta=snapshot.buscar_conta, a_partir_de=snapshot.segmento)
+    return clientes, contas
+
+
+def compactar(diretorio, clientes, contas, diario_atual, em_segundo_plano=False):
+    """
+    Grava um snapshot do estado atual e descarta os segmentos do diário cobertos por ele.
+
+    O estado é capturado logo depois de o diário mudar de segmento, e deve ser chamado sem operações
+    em andamento, para que o snapshot corresponda exatamente aos segmentos que ele cobre. Em segundo
+    plano, só a captura é feita na thread que chama; uma compactação deve terminar antes da seguinte.
+
+    Args:
+        diretorio (str): O diretório do diário e do snapshot.
+        clientes (iterable): Os clientes cadastrados.
+        contas (iterable): As contas cadastradas.
+        diario_atual (Diario): O diário ativo, que passa a anotar em um novo segmento.
+        em_segundo_plano (bool, optional): Se True, grava o snapshot e descarta os segmentos em uma
+            thread. Padrão é False.
+
+    Returns:
+        threading.Thread | None: A thread da gravação, se em segundo plano.
+    """
+    segmento = diario_atual.rotacionar()
+    corte = _Corte(clientes, contas)
+    if not em_segundo_plano:
+        _concluir(diretorio, corte, segmento)
+        return None
+    gravacao = threading.Thread(target=_concluir, args=(diretorio, corte, segmento), name="snapshot")
+    gravacao.start()
+    return gravacao
+
+
+def _concluir(diretorio, corte, segmento):
+    """Grava o snapshot de um corte e descarta os segmentos do diário anteriores a `segmento`."""
+    _gravar(os.path.join(diretorio, NOME_ARQUIVO), corte, segmento)
+    for numero, caminho in diario.segmentos(diretorio):
+        if numero < segmento:
+            os.remove(caminho)
+    diario.sincronizar_diretorio(diretorio)
@@ -0,0 +1,61 @@
+"""Testes da carga dos agregados diários em segundo plano, com e sem snapshot."""
+
+import agregados
+import diario
+import snapshot
+from cliente import PessoaFisica
+from conftest import nova_conta
+from conta import ContaCorrente
+from registro import IndiceContas
+from transacao import Deposito, Saque, Transferencia
+
+
+def _popular(diretorio, quantidade):
+    """Cria contas com depósitos, anotando tudo no diário, e grava um snapshot."""
+    diario_atual = diario.Diario(diretorio)
+    diario.ativar(diario_atual)
+    clientes, contas = diario.restaurar(diretorio)
+    for numero in range(1, quantidade + 1):
+        cliente = PessoaFisica(nome="Ana", data_nascimento="", cpf=f"{numero:011d}", endereco="")
+        conta = ContaCorrente.nova_conta(cliente, numero)
+        cliente.adicionar_conta(conta)
+        clientes.adicionar(cliente)
+        contas.append(conta)
+        diario_atual.anotar_cliente(cliente)
+        diario_atual.anotar_conta(conta)
+        Deposito(1_000 + numero).registrar(conta)
+    snapshot.compactar(diretorio, clientes, contas, diario_atual)
+    diario_atual.fechar()
+    diario.ativar(None)
+
+
+def test_carga_com_operacoes_simultaneas_nao_diverge():
+    contas = IndiceContas()
+    for numero in range(1, 51):
+        conta = nova_conta(numero)
+        contas.adicionar(conta)
+        Deposito(10_000).registrar(conta)
+    somados = agregados.AgregadosDiarios()
+    carga = somados.carregar(contas)
+    agregados.ativar(somados)
+
+    for numero in range(1, 50):
+        Transferencia(100, contas.buscar("0001", numero + 1)).registrar(contas.buscar("0001", numero))
+    carga.join()
+
+    assert not somados.carregando
+    assert agregados.verificar(somados, contas) == []
+
+
+def test_carga_do_snapshot_nao_constroi_contas_nao_usadas(tmp_path):
+    _popular(tmp_path, 20)
+    _, contas = snapshot.restaurar(tmp_path)
+    usada = contas.buscar("0001", 3)
+    somados = agregados.AgregadosDiarios()
+    carga = somados.carregar(contas)
+    agregados.ativar(somados)
+    Saque(10).registrar(usada)
+    carga.join()
+
+    assert contas._snapshot._contas.keys() == {2}
+    assert agregados.verificar(somados, contas) == []
@@ -0,0 +1,113 @@
+"""Testes da reprodução do diário e da ordem entre as anotações e os históricos."""
+
+import os
+
+import pytest
+
+import diario
+from conftest import nova_conta
+from dinheiro import LIMITE_CENTAVOS
+from transacao import Deposito, Transferencia
+
+
+def _anotar_estado(diretorio):
+    """Cria duas contas, com um depósito e uma transferência, anotando tudo no diário."""
+    diario_atual = diario.Diario(diretorio)
+    diario.ativar(diario_atual)
+    origem, destino = nova_conta(1), nova_conta(2)
+    for conta in (origem, destino):
+        diario_atual.anotar_cliente(conta.cliente)
+        diario_atual.anotar_conta(conta)
+    Deposito(1_000).registrar(origem)
+    Transferencia(300, destino).registrar(origem)
+    diario_atual.fechar()
+    diario.ativar(None)
+    return diario.caminho_segmento(diretorio, diario_atual.segmento)
+
+
+def _saldos(contas):
+    return {int(conta.numero): conta.saldo for conta in contas}
+
+
+def test_restaurar_reproduz_todas_as_anotacoes(tmp_path):
+    _anotar_estado(tmp_path)
+
+    _, contas = diario.restaurar(tmp_path)
+
+    assert _saldos(contas) == {1: 700, 2: 300}
+    assert list(contas.buscar("0001", 1).historico.valores) == [1_000, 300]
+
+
+def test_registro_truncado_e_ignorado_na_reproducao(tmp_path):
+    caminho = _anotar_estado(tmp_path)
+    tamanho = os.path.getsize(caminho)
+    with open(caminho, "r+b") as arquivo:
+        arquivo.truncate(tamanho - 5)
+
+    clientes, contas = diario.restaurar(tmp_path)
+
+    assert len(clientes) == 2
+    assert _saldos(contas) == {1: 1_000, 2: 0}
+    assert list(contas.buscar("0001", 2).historico.valores) == []
+
+
+def test_registro_corrompido_encerra_a_reproducao(tmp_path):
+    caminho = _anotar_estado(tmp_path)
+    with open(caminho, "r+b") as arquivo:
+        arquivo.seek(-1, os.SEEK_END)
+        ultimo = arquivo.read(1)
+        arquivo.seek(-1, os.SEEK_END)
+        arquivo.write(bytes([ultimo[0] ^ 0xFF]))
+
+    _, contas = diario.restaurar(tmp_path)
+
+    assert _saldos(contas) == {1: 1_000, 2: 0}
+
+
+def test_reabrir_descarta_o_final_truncado_antes_de_anotar(tmp_path):
+    caminho = _anotar_estado(tmp_path)
+    with open(caminho, "r+b") as arquivo:
+        arquivo.truncate(os.path.getsize(caminho) - 5)
+    clientes, contas = diario.restaurar(tmp_path)
+
+    diario_atual = diario.Diario(tmp_path)
+    diario.ativar(diario_atual)
+    Deposito(50).registrar(contas.buscar("0001", 2))
+    diario_atual.fechar()
+    diario.ativar(None)
+
+    _, contas = diario.restaurar(tmp_path)
+    assert _saldos(contas) == {1: 1_000, 2: 50}
+
+
+def _tipos_anotados(diretorio):
+    return [tipo for _, caminho in diario.segmentos(diretorio) for tipo, _ in diario.ler(caminho)]
+
+
+def test_transacao_recusada_pelo_historico_nao_fica_no_diario(tmp_path):
+    diario_atual = diario.Diario(tmp_path)
+    diario.ativar(diario_atual)
+    conta = nova_conta(1)
+    conta.historico.registrar("Deposito", LIMITE_CENTAVOS, 0)
+
+    with pytest.raises(OverflowError):
+        Deposito(10).registrar(conta)
+    diario_atual.fechar()
+
+    assert conta.saldo == 0
+    assert diario.TRANSACAO not in _tipos_anotados(tmp_path)
+
+
+def test_transferencia_recusada_pelo_destino_nao_deixa_debito_orfao(tmp_path):
+    diario_atual = diario.Diario(tmp_path)
+    diario.ativar(diario_atual)
+    origem, destino = nova_conta(1, saldo=1_000), nova_conta(2)
+    destino.historico.registrar("Deposito", LIMITE_CENTAVOS, 0)
+
+    with pytest.raises(OverflowError):
+        Transferencia(300, destino).registrar(origem)
+    diario_atual.fechar()
+
+    assert (origem.saldo, destino.saldo) == (1_000, 0)
+    assert not len(origem.historico.valores)
+    assert diario.TRANSFERENCIA not in _tipos_anotados(tmp_path)
@@ -0,0 +1,78 @@
+"""Testes dos limites de 64 bits e do tipo dos valores e saldos."""
+
+import pytest
+
+import dinheiro
+from conftest import nova_conta
+from dinheiro import LIMITE_CENTAVOS
+from eventos import Resultado
+from historico import Historico
+from transacao import Deposito, Saque, Transferencia
+
+
+def test_para_centavos_no_limite():
+    assert dinheiro.para_centavos("92233720368547758.07") == LIMITE_CENTAVOS
+    with pytest.raises(ValueError):
+        dinheiro.para_centavos("92233720368547758.08")
+    with pytest.raises(ValueError):
+        dinheiro.para_centavos(LIMITE_CENTAVOS)
+
+
+@pytest.mark.parametrize("transacao", [Deposito, Saque])
+def test_transacao_acima_do_limite_e_recusada_na_criacao(transacao):
+    with pytest.raises(ValueError):
+        transacao(LIMITE_CENTAVOS + 1)
+
+
+def test_transferencia_acima_do_limite_e_recusada_na_criacao():
+    with pytest.raises(ValueError):
+        Transferencia(LIMITE_CENTAVOS + 1, nova_conta(2))
+
+
+def test_deposito_que_estouraria_o_saldo_e_recusado():
+    conta = nova_conta(1, saldo=LIMITE_CENTAVOS - 10)
+
+    assert Deposito(11).registrar(conta) is Resultado.VALOR_INVALIDO
+    assert conta.saldo == LIMITE_CENTAVOS - 10
+    assert not len(conta.historico.valores)
+    assert Deposito(10).registrar(conta)
+    assert conta.saldo == LIMITE_CENTAVOS
+
+
+def test_transferencia_que_estouraria_o_destino_e_recusada():
+    origem, destino = nova_conta(1, saldo=1_000), nova_conta(2, saldo=LIMITE_CENTAVOS - 10)
+
+    assert Transferencia(11, destino).registrar(origem) is Resultado.VALOR_INVALIDO
+    assert (origem.saldo, destino.saldo) == (1_000, LIMITE_CENTAVOS - 10)
+    assert not len(origem.historico.valores) and not len(destino.historico.valores)
+
+
+def test_historico_recusa_saldo_acumulado_acima_do_limite():
+    historico = Historico()
+    historico.registrar("Deposito", LIMITE_CENTAVOS, 0)
+
+    with pytest.raises(OverflowError):
+        historico.registrar("Deposito", 1, 0)
+    with pytest.raises(OverflowError):
+        historico.registrar("Saque", LIMITE_CENTAVOS + 1, 0)
+    assert list(historico.valores) == [LIMITE_CENTAVOS]
+    assert list(historico.saldos) == [LIMITE_CENTAVOS]
+
+
+@pytest.mark.parametrize("valor", [100.0, True, "100", None])
+def test_valor_que_nao_e_int_e_recusado_na_criacao(valor):
+    with pytest.raises(TypeError):
+        Deposito(valor)
+    with pytest.raises(TypeError):
+        dinheiro.validar_centavos(valor)
+
+
+@pytest.mark.parametrize("valor", [100.0, True])
+def test_historico_recusa_valor_que_nao_e_int_sem_alterar_colunas(valor):
+    historico = Historico()
+    historico.registrar("Deposito", 100, 0)
+
+    with pytest.raises(TypeError):
+        historico.registrar("Deposito", valor, 1)
+    assert (len(historico.tipos), len(historico.valores), len(historico.datas)) == (1, 1, 1)
+    assert list(historico.saldos) == [100]
@@ -0,0 +1,98 @@
+"""Testes da exportação dos históricos em arquivos particionados."""
+
+import csv
+import os
+from datetime import datetime
+
+import pytest
+
+from conftest import nova_conta
+from exportacao import COLUNAS, Exportador
+
+DIA_1 = int(datetime(2024, 1, 31, 10).timestamp())
+DIA_2 = int(datetime(2024, 2, 1, 9).timestamp())
+
+
+def _contas():
+    primeira, segunda = nova_conta(1), nova_conta(2)
+    primeira.historico.registrar("Deposito", 1_000, DIA_1)
+    primeira.historico.registrar("Saque", 300, DIA_2)
+    segunda.historico.registrar("Deposito", 50, DIA_1)
+    return [primeira, segunda]
+
+
+def _ler(diretorio):
+    """Retorna as linhas de cada arquivo, pelo caminho relativo ao diretório exportado."""
+    arquivos = {}
+    for raiz, _, nomes in os.walk(diretorio):
+        for nome in nomes:
+            with open(os.path.join(raiz, nome), newline="", encoding="utf-8") as arquivo:
+                arquivos[os.path.relpath(os.path.join(raiz, nome), diretorio)] = list(csv.reader(arquivo))
+    return arquivos
+
+
+def test_particiona_por_data(tmp_path):
+    destino = tmp_path / "exportacao"
+
+    resumo = Exportador(str(destino), formato="csv").exportar(_contas())
+
+    arquivos = _ler(destino)
+    assert resumo == (3, 2)
+    assert sorted(arquivos) == [
+        os.path.join("data=2024-01-31", "parte-000001.csv"),
+        os.path.join("data=2024-02-01", "parte-000001.csv"),
+    ]
+    cabecalho, *linhas = arquivos[os.path.join("data=2024-01-31", "parte-000001.csv")]
+    assert tuple(cabecalho) == COLUNAS
+    assert [(conta, tipo, valor) for _, conta, _, _, _, _, tipo, valor, _ in linhas] == [
+        ("1", "Deposito", "1000"), ("2", "Deposito", "50"),
+    ]
+
+
+def test_particiona_por_agencia_em_varios_blocos(tmp_path):
+    destino = tmp_path / "exportacao"
+
+    resumo = Exportador(str(destino), particionar_por="agencia", formato="csv", linhas_por_bloco=2).exportar(_contas())
+
+    arquivos = _ler(destino)
+    assert resumo == (3, 2)
+    assert sorted(arquivos) == [
+        os.path.join("agencia=0001", "parte-000001.csv"),
+        os.path.join("agencia=0001", "parte-000002.csv"),
+    ]
+    assert sum(len(linhas) - 1 for linhas in arquivos.values()) == 3
+
+
+def test_nova_exportacao_substitui_a_anterior(tmp_path):
+    destino = tmp_path / "exportacao"
+    exportador = Exportador(str(destino), formato="csv")
+    exportador.exportar(_contas())
+
+    resumo = exportador.exportar([nova_conta(3)])
+
+    assert resumo == (0, 0)
+    assert _ler(destino) == {}
+    assert sorted(os.listdir(tmp_path)) == ["exportacao"]
+
+
+def test_exportacao_interrompida_preserva_a_anterior(tmp_path):
+    destino = tmp_path / "exportacao"
+    exportador = Exportador(str(destino), formato="csv")
+    exportador.exportar(_contas())
+    anterior = _ler(destino)
+
+    def contas():
+        yield from _contas()
+        raise RuntimeError("falha")
+
+    with pytest.raises(RuntimeError):
+        exportador.exportar(contas())
+
+    assert _ler(destino) == anterior
+    assert sorted(os.listdir(tmp_path)) == ["exportacao"]
+
+
+@pytest.mark.parametrize("opcoes", [{"particionar_por": "conta"}, {"formato": "xlsx"}])
+def test_rejeita_opcoes_invalidas(tmp_path, opcoes):
+    with pytest.raises(ValueError):
+        Exportador(str(tmp_path), **opcoes)
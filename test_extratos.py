@@ -0,0 +1,64 @@
+"""Testes do cache de extratos: linhas iguais às formatadas sem cache, acréscimos e orçamento."""
+
+import extratos
+from conftest import nova_conta
+from extratos import LINHAS_POR_JANELA, CacheExtratos, ExtratosSemCache
+from historico import Historico
+
+
+def _historico(quantidade, inicio=0):
+    historico = Historico()
+    for indice in range(inicio, inicio + quantidade):
+        historico.registrar("Deposito" if indice % 3 else "Saque", 100 + indice, 1_700_000_000 + indice * 60)
+    return historico
+
+
+def test_paginas_iguais_as_formatadas_sem_cache():
+    historico = _historico(3 * LINHAS_POR_JANELA)
+    cache, sem_cache = CacheExtratos(), ExtratosSemCache()
+    consultas = [
+        {},
+        {"cursor": LINHAS_POR_JANELA - 5, "limite": 10},
+        {"inicio": 1_700_000_000 + 600, "fim": 1_700_000_000 + 2_000 * 60, "cursor": 30, "limite": 1_500},
+    ]
+
+    for consulta in consultas * 2:
+        assert cache.pagina(historico, **consulta) == sem_cache.pagina(historico, **consulta)
+
+
+def test_historico_que_cresce_so_formata_as_posicoes_novas():
+    conta = nova_conta(1)
+    historico = conta.historico
+    historico.registrar("Deposito", 100, 1_700_000_000)
+    cache = CacheExtratos()
+    cache.pagina(historico)
+
+    historico.registrar("Saque", 40, 1_700_000_060)
+    linhas, _ = cache.pagina(historico)
+
+    assert linhas == [extratos.formatar_linha("Deposito", 100), extratos.formatar_linha("Saque", 40)]
+    assert cache.estatisticas()["acrescimos"] == 1
+
+
+def test_orcamento_descarta_as_janelas_menos_recentes():
+    historicos = [_historico(LINHAS_POR_JANELA) for _ in range(4)]
+    memoria_maxima = 150 * LINHAS_POR_JANELA
+    cache = CacheExtratos(memoria_maxima=memoria_maxima)
+
+    for historico in historicos:
+        cache.pagina(historico, limite=LINHAS_POR_JANELA // 16)
+
+    estatisticas = cache.estatisticas()
+    assert estatisticas["bytes"] <= memoria_maxima
+    assert estatisticas["expulsoes"] > 0
+
+
+def test_consulta_grande_e_formatada_sem_o_cache():
+    historico = _historico(2 * LINHAS_POR_JANELA)
+    cache = CacheExtratos(memoria_maxima=100 * LINHAS_POR_JANELA)
+
+    linhas, _ = cache.pagina(historico)
+
+    assert len(linhas) == 2 * LINHAS_POR_JANELA
+    assert cache.estatisticas()["diretas"] == 1
+    assert cache.estatisticas()["janelas"] == 0
@@ -0,0 +1,135 @@
+"""Testes do fechamento diário: saldo do fim do dia, datas dos lançamentos e dias já fechados."""
+
+from datetime import date, datetime, time, timedelta
+
+import pytest
+
+import diario
+import extratos
+from conftest import nova_conta
+from dinheiro import LIMITE_CENTAVOS
+from fechamento import JUROS, TARIFA, FechamentoDiario, TabelaTarifas
+from historico import Historico
+from transacao import Deposito
+
+TABELA = TabelaTarifas(faixas_juros=((0, 1_000),), tarifa_manutencao=100, isencao_tarifa=10**12)
+
+
+def fim_do_dia(dia):
+    return int(datetime.combine(dia, time(23, 59, 59)).timestamp())
+
+
+def tipos(conta):
+    return [Historico.nome_tipo(codigo) for codigo in conta.historico.tipos]
+
+
+def test_fechamento_de_dia_nao_terminado_e_recusado():
+    conta = nova_conta(1, saldo=10_000)
+
+    with pytest.raises(ValueError):
+        FechamentoDiario(TABELA).executar([conta], date.today())
+    with pytest.raises(ValueError):
+        FechamentoDiario(TABELA).executar([conta], date.today() + timedelta(days=1))
+    assert conta.saldo == 10_000
+    assert not len(conta.historico.valores)
+
+
+def test_saldo_do_fim_do_dia_ignora_transacoes_posteriores():
+    conta = nova_conta(1)
+    Deposito(10_000).registrar(conta)
+    ontem = date.today() - timedelta(days=1)
+
+    resumo = FechamentoDiario(TABELA).executar([conta], ontem)
+
+    assert resumo.contas == 1
+    assert (resumo.juros, resumo.tarifas) == (0, 100)
+    assert tipos(conta) == [TARIFA, "Deposito"]
+    assert list(conta.historico.datas)[0] == fim_do_dia(ontem)
+    assert list(conta.historico.saldos) == [-100, 9_900]
+    assert conta.saldo == 10_000 - 100
+
+
+def test_dias_atrasados_fechados_em_ordem():
+    conta = nova_conta(1)
+    Deposito(10_000).registrar(conta)
+    anteontem, ontem = date.today() - timedelta(days=2), date.today() - timedelta(days=1)
+    fechamento = FechamentoDiario(TABELA)
+
+    primeiro = fechamento.executar([conta], anteontem)
+    segundo = fechamento.executar([conta], ontem)
+
+    assert (primeiro.contas, primeiro.ignoradas) == (1, 0)
+    assert (segundo.contas, segundo.ignoradas) == (1, 0)
+    datas = list(conta.historico.datas)
+    assert datas == sorted(datas)
+    assert datas[:2] == [fim_do_dia(anteontem), fim_do_dia(ontem)]
+    assert tipos(conta) == [TARIFA, TARIFA, "Deposito"]
+    assert conta.saldo == 10_000 - 200
+
+
+def test_lancamentos_datados_no_fim_do_dia():
+    conta = nova_conta(1, saldo=10_000)
+    anteontem = date.today() - timedelta(days=2)
+
+    FechamentoDiario(TABELA).executar([conta], anteontem)
+
+    assert list(conta.historico.datas) == [fim_do_dia(anteontem), fim_do_dia(anteontem)]
+    assert tipos(conta) == [JUROS, TARIFA]
+
+
+def test_fechamento_repetido_nao_cobra_duas_vezes():
+    contas = [nova_conta(1, saldo=10_000), nova_conta(2, saldo=-5_000)]
+    ontem = date.today() - timedelta(days=1)
+    fechamento = FechamentoDiario(TABELA)
+
+    primeiro = fechamento.executar(contas, ontem)
+    saldos = [conta.saldo for conta in contas]
+    segundo = fechamento.executar(contas, ontem)
+
+    assert (primeiro.contas, primeiro.ignoradas) == (2, 0)
+    assert (segundo.contas, segundo.ignoradas) == (0, 2)
+    assert [conta.saldo for conta in contas] == saldos
+
+
+def test_conta_que_passaria_do_limite_e_recusada_sem_lancamentos():
+    conta = nova_conta(1, saldo=LIMITE_CENTAVOS - 5)
+    ontem = date.today() - timedelta(days=1)
+
+    resumo = FechamentoDiario(TabelaTarifas(faixas_juros=((0, 1_000),))).executar([conta], ontem)
+
+    assert (resumo.contas, resumo.recusadas) == (0, 1)
+    assert conta.saldo == LIMITE_CENTAVOS - 5
+    assert not len(conta.historico.valores)
+
+
+def test_diario_reproduz_lancamentos_inseridos(tmp_path):
+    ativo = diario.Diario(str(tmp_path))
+    diario.ativar(ativo)
+    conta = nova_conta(1)
+    ativo.anotar_cliente(conta.cliente)
+    ativo.anotar_conta(conta)
+    Deposito(10_000).registrar(conta)
+    anteontem, ontem = date.today() - timedelta(days=2), date.today() - timedelta(days=1)
+    FechamentoDiario(TABELA).executar([conta], anteontem)
+    FechamentoDiario(TABELA).executar([conta], ontem)
+    ativo.fechar()
+
+    _, contas = diario.restaurar(str(tmp_path))
+
+    restaurada = contas.buscar(conta.agencia, 1)
+    assert restaurada.saldo == conta.saldo
+    assert list(restaurada.historico.datas) == list(conta.historico.datas)
+    assert FechamentoDiario(TABELA).executar([restaurada], ontem).ignoradas == 1
+
+
+def test_extrato_em_cache_mostra_lancamentos_inseridos():
+    extratos.ativar(extratos.CacheExtratos())
+    conta = nova_conta(1)
+    Deposito(10_000).registrar(conta)
+    antes, _ = extratos.ativo().pagina(conta.historico)
+
+    FechamentoDiario(TABELA).executar([conta], date.today() - timedelta(days=1))
+
+    depois, _ = extratos.ativo().pagina(conta.historico)
+    assert len(depois) == len(antes) + 1
+    assert any("Tarifa" in linha for linha in depois)
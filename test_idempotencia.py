@@ -0,0 +1,76 @@
+"""Testes das chaves de idempotência: repetição, reutilização, expiração e descarte LRU."""
+
+import idempotencia
+from conftest import nova_conta
+from eventos import Resultado
+from transacao import Deposito, Saque, Transferencia
+
+
+class Relogio:
+    def __init__(self):
+        self.agora = 0.0
+
+    def __call__(self):
+        return self.agora
+
+
+def test_repeticao_devolve_o_resultado_sem_executar_de_novo():
+    idempotencia.ativar(idempotencia.CacheIdempotencia())
+    conta = nova_conta(1, saldo=1_000)
+
+    assert Saque(300, chave="a").registrar(conta) is Resultado.SUCESSO
+    assert Saque(300, chave="a").registrar(conta) is Resultado.SUCESSO
+    assert Saque(5_000, chave="b").registrar(conta) is Resultado.SALDO_INSUFICIENTE
+    assert Saque(5_000, chave="b").registrar(conta) is Resultado.SALDO_INSUFICIENTE
+    assert conta.saldo == 700
+    assert len(conta.historico.valores) == 1
+
+
+def test_chave_reutilizada_com_outra_operacao_e_recusada():
+    idempotencia.ativar(idempotencia.CacheIdempotencia())
+    origem, destino = nova_conta(1, saldo=1_000), nova_conta(2)
+
+    assert Transferencia(100, destino, chave="t").registrar(origem)
+    assert Transferencia(200, destino, chave="t").registrar(origem) is Resultado.CHAVE_REUTILIZADA
+    assert Deposito(100, chave="t").registrar(origem) is Resultado.CHAVE_REUTILIZADA
+    assert Transferencia(100, destino, chave="t").registrar(origem)
+    assert (origem.saldo, destino.saldo) == (900, 100)
+
+
+def test_chaves_valem_por_conta():
+    idempotencia.ativar(idempotencia.CacheIdempotencia())
+    contas = [nova_conta(1), nova_conta(2)]
+
+    for conta in contas:
+        assert Deposito(100, chave="mesma").registrar(conta)
+    assert [conta.saldo for conta in contas] == [100, 100]
+
+
+def test_chave_expirada_executa_de_novo():
+    relogio = Relogio()
+    idempotencia.ativar(idempotencia.CacheIdempotencia(ttl=10, relogio=relogio))
+    conta = nova_conta(1)
+
+    Deposito(100, chave="a").registrar(conta)
+    relogio.agora = 5
+    Deposito(100, chave="a").registrar(conta)
+    relogio.agora = 16
+    Deposito(100, chave="a").registrar(conta)
+
+    assert conta.saldo == 200
+
+
+def test_capacidade_descarta_a_chave_usada_ha_mais_tempo():
+    cache = idempotencia.CacheIdempotencia(capacidade=2)
+    idempotencia.ativar(cache)
+    conta = nova_conta(1)
+
+    for chave in ("a", "b"):
+        Deposito(100, chave=chave).registrar(conta)
+    Deposito(100, chave="a").registrar(conta)
+    Deposito(100, chave="c").registrar(conta)
+    Deposito(100, chave="a").registrar(conta)
+    Deposito(100, chave="b").registrar(conta)
+
+    assert len(cache) == 2
+    assert conta.saldo == 400
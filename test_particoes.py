@@ -0,0 +1,56 @@
+"""Testes das transferências entre partições do motor particionado."""
+
+import pytest
+
+from dinheiro import LIMITE_CENTAVOS
+from particoes import EstornoRecusado, MotorParticionado
+
+
+@pytest.fixture
+def motor():
+    motor = MotorParticionado(2)
+    motor.executar([("criar_conta", 1, "00000000001", "Um"), ("criar_conta", 2, "00000000002", "Dois")])
+    motor.executar([("depositar", 1, 1_000), ("depositar", 2, 1_000)])
+    yield motor
+    motor.encerrar()
+
+
+def _saldos(motor):
+    return [saldo for _, saldo in motor.executar([("saldo", 1), ("saldo", 2)])]
+
+
+def test_contas_em_particoes_diferentes(motor):
+    assert motor.particao(1) != motor.particao(2)
+
+
+@pytest.mark.parametrize("valor", [-500, 0, LIMITE_CENTAVOS + 1])
+def test_transferencia_entre_particoes_com_valor_invalido_e_recusada(motor, valor):
+    assert motor.executar([("transferir", 1, valor, 2)]) == [(False, 1_000)]
+    assert _saldos(motor) == [1_000, 1_000]
+
+
+def test_transferencia_entre_particoes_conserva_o_dinheiro(motor):
+    resultados = motor.executar([("transferir", 1, 400, 2), ("transferir", 2, 100, 1), ("transferir", 1, 5_000, 2)])
+
+    assert [sucesso for sucesso, _ in resultados] == [True, True, False]
+    assert _saldos(motor) == [700, 1_300]
+
+
+def test_transferencia_para_conta_inexistente_e_estornada(motor):
+    assert motor.executar([("transferir", 1, 400, 4)]) == [(False, 1_000)]
+    assert _saldos(motor) == [1_000, 1_000]
+
+
+def test_deposito_acima_do_limite_e_recusado(motor):
+    assert motor.executar([("depositar", 1, LIMITE_CENTAVOS + 1)]) == [(False, 1_000)]
+
+
+def test_estorno_recusado_informa_o_valor_em_transito(motor):
+    deposito = LIMITE_CENTAVOS - 700
+
+    with pytest.raises(EstornoRecusado) as erro:
+        motor.executar([("transferir", 1, 400, 4), ("depositar", 1, deposito)])
+
+    assert erro.value.em_transito == [(1, 4, 400)]
+    assert erro.value.resultados == [(False, 600 + deposito), (True, 600 + deposito)]
+    assert _saldos(motor) == [600 + deposito, 1_000]
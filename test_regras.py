@@ -0,0 +1,63 @@
+"""Testes do motor de regras: política padrão, regras com estado e avaliação de lotes."""
+
+import random
+from datetime import datetime
+
+import pytest
+
+import regras
+from conftest import nova_conta
+from eventos import Resultado
+from transacao import Deposito, Saque
+
+AGORA = datetime(2024, 5, 10, 14, 0).timestamp()
+
+
+def test_politica_padrao_reproduz_os_limites_da_conta_corrente():
+    conta = nova_conta(1, saldo=200_000)
+
+    assert Saque(50_001).registrar(conta) is Resultado.LIMITE_EXCEDIDO
+    assert Saque(300_000).registrar(conta) is Resultado.LIMITE_EXCEDIDO
+    assert Saque(0).registrar(conta) is Resultado.VALOR_INVALIDO
+    assert [Saque(100).registrar(conta) for _ in range(4)] == [Resultado.SUCESSO] * 3 + [Resultado.SAQUES_EXCEDIDOS]
+    assert conta.saldo == 200_000 - 300
+
+
+def test_regras_com_estado_acumulam_as_operacoes_do_lote():
+    conta = nova_conta(1, saldo=10_000)
+    conta.politica = regras.Politica(
+        [regras.TetoDiario(1_000), regras.SaldoSuficiente(), regras.ValorPositivo()]
+    ).compilar()
+
+    vereditos = conta.politica.avaliar([(conta, Saque(600)), (conta, Saque(600)), (conta, Saque(400))], AGORA)
+
+    assert vereditos == [Resultado.SUCESSO, Resultado.TETO_DIARIO_EXCEDIDO, Resultado.SUCESSO]
+
+
+@pytest.mark.parametrize("com_numpy", [True, False])
+def test_avaliar_lote_equivale_a_avaliacao_em_sequencia(monkeypatch, com_numpy):
+    if not com_numpy:
+        monkeypatch.setattr(regras, "np", None)
+    aleatorio = random.Random(21)
+    contas = [nova_conta(numero, saldo=aleatorio.randrange(0, 5_000)) for numero in range(1, 9)]
+    restrita = regras.Politica(
+        [regras.LimitePorSaque(2_000), regras.Velocidade(4, 3_600), regras.SaldoSuficiente(), regras.ValorPositivo()]
+    ).compilar()
+    for conta in contas[::2]:
+        conta.politica = restrita
+    lote = [
+        (aleatorio.choice(contas), (Saque if aleatorio.random() < 0.7 else Deposito)(aleatorio.randrange(-100, 3_000)))
+        for _ in range(500)
+    ]
+
+    vereditos = regras.avaliar_lote(lote, AGORA)
+
+    esperados = []
+    for conta, transacao in lote:
+        tipo = type(transacao).__name__
+        resultado = conta.politica.verificar(conta, tipo, transacao.valor, AGORA)
+        if resultado:
+            conta._saldo += -transacao.valor if tipo == "Saque" else transacao.valor
+            conta.historico.registrar(tipo, transacao.valor, int(AGORA))
+        esperados.append(resultado)
+    assert vereditos == esperados
@@ -0,0 +1,77 @@
+"""Testes do repositório SQLite: gravação em blocos, consultas e reprodução do diário após uma queda."""
+
+import diario
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from repositorio import RepositorioSQLite
+from transacao import Deposito, Saque, Transferencia
+
+
+def _abrir(caminho, **opcoes):
+    repositorio = RepositorioSQLite(str(caminho), **opcoes)
+    diario.ativar(repositorio)
+    return repositorio
+
+
+def _criar_conta(repositorio, numero):
+    cliente = PessoaFisica(nome=f"Cliente {numero}", data_nascimento="", cpf=f"{numero:011d}", endereco="")
+    repositorio.clientes.adicionar(cliente)
+    conta = ContaCorrente.nova_conta(cliente, numero)
+    cliente.adicionar_conta(conta)
+    repositorio.contas.append(conta)
+    return conta
+
+
+def _simular_queda(repositorio):
+    """Fecha os arquivos sem gravar o bloco acumulado, como em uma queda do processo."""
+    repositorio._diario.fechar()
+    repositorio._leitura.fechar()
+    repositorio._escrita.close()
+    diario.ativar(None)
+
+
+def test_contas_e_transacoes_sobrevivem_ao_reabrir(tmp_path):
+    repositorio = _abrir(tmp_path / "banco.sqlite")
+    origem, destino = _criar_conta(repositorio, 1), _criar_conta(repositorio, 2)
+    Deposito(1_000).registrar(origem)
+    Transferencia(300, destino).registrar(origem)
+    repositorio.fechar()
+
+    repositorio = _abrir(tmp_path / "banco.sqlite")
+
+    contas = repositorio.contas
+    assert [conta.saldo for conta in contas] == [700, 300]
+    assert list(contas[1].historico.valores) == [1_000, 300]
+    assert repositorio.clientes.buscar("00000000002").contas[0] is contas[2]
+    repositorio.fechar()
+
+
+def test_transacoes_nao_gravadas_no_banco_sao_reproduzidas_do_diario(tmp_path):
+    repositorio = _abrir(tmp_path / "banco.sqlite", tamanho_lote=1_000)
+    conta, outra = _criar_conta(repositorio, 1), _criar_conta(repositorio, 2)
+    Deposito(1_000).registrar(conta)
+    Saque(250).registrar(conta)
+    Transferencia(100, outra).registrar(conta)
+    _simular_queda(repositorio)
+
+    repositorio = _abrir(tmp_path / "banco.sqlite", tamanho_lote=1_000)
+
+    assert (repositorio.contas[1].saldo, repositorio.contas[2].saldo) == (650, 100)
+    assert [tipo for tipo, _, _ in repositorio.consultar_transacoes(repositorio.contas[1])] == [
+        "Deposito", "Saque", "Transferencia",
+    ]
+    repositorio.fechar()
+
+
+def test_consulta_por_periodo_e_paginacao_das_contas(tmp_path):
+    repositorio = _abrir(tmp_path / "banco.sqlite", tamanho_lote=2)
+    contas = [_criar_conta(repositorio, numero) for numero in range(1, 6)]
+    for indice, data in enumerate((100, 200, 300)):
+        repositorio.anotar_transacao(contas[0], "Deposito", 10 * (indice + 1), data)
+
+    assert repositorio.consultar_transacoes(contas[0], 150, 300) == [("Deposito", 20, 200)]
+    pagina, cursor = repositorio.contas.intervalo(None, 2)
+    assert [conta.numero for conta in pagina] == [1, 2]
+    pagina, cursor = repositorio.contas.intervalo(cursor, 10)
+    assert ([conta.numero for conta in pagina], cursor) == ([3, 4, 5], None)
+    repositorio.fechar()
@@ -0,0 +1,132 @@
+"""Testes do serviço de rede: protocolo, paginação e pausa para a compactação."""
+
+import asyncio
+import json
+import threading
+
+from registro import ClienteRegistry, IndiceContas
+from servidor import ServicoBancario, ServidorBancario
+
+CPF = "52998224725"
+
+
+def _servico():
+    servico = ServicoBancario(ClienteRegistry(), IndiceContas())
+    servico.executar(
+        {"op": "criar_cliente", "cpf": CPF, "nome": "Ana", "data_nascimento": "01-01-1990", "endereco": ""}
+    )
+    servico.executar({"op": "criar_conta", "cpf": CPF})
+    return servico
+
+
+def test_operacoes_do_protocolo():
+    servico = _servico()
+
+    deposito = servico.executar({"id": 1, "op": "depositar", "cpf": CPF, "valor": 100.5})
+    assert deposito == {"id": 1, "ok": True, "saldo": 100.5}
+    assert servico.executar({"op": "sacar", "cpf": CPF, "valor": 0.5}) == {"ok": True, "saldo": 100.0}
+    recusado = servico.executar({"op": "sacar", "cpf": CPF, "valor": 200})
+    assert (recusado["ok"], recusado["codigo"], recusado["saldo"]) == (False, "saldo_insuficiente", 100.0)
+    extrato = servico.executar({"op": "extrato", "cpf": CPF})
+    assert [transacao["valor"] for transacao in extrato["transacoes"]] == [100.5, 0.5]
+    repetido = servico.executar({"op": "criar_cliente", "cpf": CPF, "nome": "", "data_nascimento": "", "endereco": ""})
+    assert repetido == {"ok": False, "erro": "Já existe cliente com esse CPF."}
+    assert servico.executar({"op": "depositar", "cpf": "11144477735", "valor": 1})["erro"] == "Cliente não encontrado."
+
+
+def test_requisicoes_invalidas():
+    servico = _servico()
+
+    assert servico.executar({"id": 7, "op": "transferir"}) == {"id": 7, "ok": False, "erro": "Operação inválida."}
+    assert servico.executar({"op": "depositar", "cpf": CPF})["erro"] == "Requisição inválida."
+    assert servico.executar({"op": "depositar", "cpf": CPF, "valor": "dez"})["erro"] == "Requisição inválida."
+    assert json.loads(servico.processar_linha(b"{nao e json")) == {"ok": False, "erro": "JSON inválido."}
+    assert json.loads(servico.processar_linha(b"[1, 2]")) == {"ok": False, "erro": "JSON inválido."}
+
+
+def test_listagem_de_contas_paginada(monkeypatch):
+    monkeypatch.setattr("servidor.CONTAS_POR_PAGINA", 4)
+    servico = _servico()
+    for _ in range(5):
+        servico.executar({"op": "criar_conta", "cpf": CPF})
+
+    numeros, cursor, limites = [], None, []
+    while True:
+        pagina = servico.executar({"op": "listar_contas", "cursor": cursor, "limite": 10})
+        numeros += [conta["numero"] for conta in pagina["contas"]]
+        limites.append(len(pagina["contas"]))
+        cursor = pagina["proximo_cursor"]
+        if cursor is None:
+            break
+
+    assert numeros == [1, 2, 3, 4, 5, 6]
+    assert limites == [4, 2]
+    assert [conta["numero"] for conta in servico.executar({"op": "listar_contas", "limite": 2})["contas"]] == [1, 2]
+    assert servico.executar({"op": "listar_contas", "limite": 0})["erro"] == "Requisição inválida."
+
+
+def test_respostas_em_pipeline_voltam_na_ordem_das_requisicoes():
+    servidor_bancario = ServidorBancario(_servico(), trabalhadores=4)
+    requisicoes = [{"id": indice, "op": "depositar", "cpf": CPF, "valor": 1} for indice in range(50)]
+
+    async def cenario():
+        servidor = await servidor_bancario.iniciar("127.0.0.1", 0)
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", servidor.sockets[0].getsockname()[1])
+        escritor.write(b"".join(json.dumps(requisicao).encode() + b"\n" for requisicao in requisicoes))
+        respostas = [json.loads(await leitor.readline()) for _ in requisicoes]
+        escritor.close()
+        servidor.close()
+        await servidor.wait_closed()
+        return respostas
+
+    respostas = asyncio.run(cenario())
+    servidor_bancario.fechar()
+
+    assert [resposta["id"] for resposta in respostas] == list(range(50))
+    assert [resposta["saldo"] for resposta in respostas] == [float(indice + 1) for indice in range(50)]
+
+
+def test_pausa_aguarda_requisicoes_em_andamento_e_segura_as_novas():
+    servico = ServicoBancario(ClienteRegistry(), IndiceContas())
+    servidor_bancario = ServidorBancario(servico, trabalhadores=4)
+    ordem = []
+    liberar = threading.Event()
+    processar_linha = servico.processar_linha
+
+    def processar_linha_registrando(linha):
+        identificador = json.loads(linha)["id"]
+        ordem.append(("inicio", identificador))
+        if identificador == 1:
+            liberar.wait(5)
+        ordem.append(("fim", identificador))
+        return processar_linha(linha)
+
+    servico.processar_linha = processar_linha_registrando
+
+    async def requisitar(porta, identificador):
+        leitor, escritor = await asyncio.open_connection("127.0.0.1", porta)
+        escritor.write(json.dumps({"id": identificador, "op": "listar_contas"}).encode() + b"\n")
+        resposta = json.loads(await leitor.readline())
+        escritor.close()
+        return resposta
+
+    async def cenario():
+        servidor = await servidor_bancario.iniciar("127.0.0.1", 0)
+        porta = servidor.sockets[0].getsockname()[1]
+        primeira = asyncio.ensure_future(requisitar(porta, 1))
+        while not ordem:
+            await asyncio.sleep(0.01)
+        pausa = asyncio.ensure_future(servidor_bancario.pausado(ordem.append, ("pausa", None)))
+        segunda = asyncio.ensure_future(requisitar(porta, 2))
+        await asyncio.sleep(0.05)
+        liberar.set()
+        respostas = await asyncio.gather(primeira, segunda, pausa)
+        servidor.close()
+        await servidor.wait_closed()
+        return respostas
+
+    respostas = asyncio.run(cenario())
+    servidor_bancario.fechar()
+
+    assert [resposta["ok"] for resposta in respostas[:2]] == [True, True]
+    assert ordem == [("inicio", 1), ("fim", 1), ("pausa", None), ("inicio", 2), ("fim", 2)]
@@ -0,0 +1,80 @@
+"""Testes da gravação, restauração e compactação incremental dos snapshots."""
+
+import diario
+import snapshot
+from cliente import PessoaFisica
+from conta import ContaCorrente
+from transacao import Deposito, Transferencia
+
+
+def _estado(clientes, contas):
+    """Resume clientes e contas em estruturas comparáveis."""
+    return (
+        sorted((cliente.cpf, cliente.nome, tuple(int(conta.numero) for conta in cliente.contas)) for cliente in clientes),
+        sorted(
+            (int(conta.numero), conta.saldo, list(conta.historico.valores), list(conta.historico.datas))
+            for conta in contas
+        ),
+    )
+
+
+def _criar_conta(diario_atual, clientes, contas, cliente, numero):
+    conta = ContaCorrente.nova_conta(cliente, numero)
+    cliente.adicionar_conta(conta)
+    contas.append(conta)
+    diario_atual.anotar_conta(conta)
+    return conta
+
+
+def _popular(diretorio, quantidade=30):
+    """Cria clientes com contas e depósitos, anotando no diário, e retorna o diário aberto."""
+    diario_atual = diario.Diario(diretorio)
+    diario.ativar(diario_atual)
+    clientes, contas = diario.restaurar(diretorio)
+    for indice in range(1, quantidade + 1):
+        cliente = PessoaFisica(nome=f"Cliente {indice}", data_nascimento="", cpf=f"{indice:011d}", endereco="")
+        clientes.adicionar(cliente)
+        diario_atual.anotar_cliente(cliente)
+        conta = _criar_conta(diario_atual, clientes, contas, cliente, indice)
+        Deposito(100 * indice).registrar(conta)
+    return diario_atual, clientes, contas
+
+
+def test_snapshot_restaura_o_estado_e_descarta_segmentos(tmp_path):
+    diario_atual, clientes, contas = _popular(tmp_path)
+    Transferencia(50, contas.buscar("0001", 2)).registrar(contas.buscar("0001", 1))
+    snapshot.compactar(tmp_path, clientes, contas, diario_atual)
+    Deposito(7).registrar(contas.buscar("0001", 3))
+    esperado = _estado(clientes, contas)
+    diario_atual.fechar()
+
+    restaurados = snapshot.restaurar(tmp_path)
+
+    assert _estado(*restaurados) == esperado
+    assert [numero for numero, _ in diario.segmentos(tmp_path)] == [diario_atual.segmento]
+
+
+def test_compactacao_incremental_copia_contas_nao_usadas(tmp_path):
+    diario_atual, clientes, contas = _popular(tmp_path)
+    snapshot.compactar(tmp_path, clientes, contas, diario_atual)
+    diario_atual.fechar()
+
+    clientes, contas = snapshot.restaurar(tmp_path)
+    diario_atual = diario.Diario(tmp_path)
+    diario.ativar(diario_atual)
+    Deposito(5).registrar(contas.buscar("0001", 4))
+    novo = PessoaFisica(nome="Novo", data_nascimento="", cpf="99999999999", endereco="")
+    clientes.adicionar(novo)
+    diario_atual.anotar_cliente(novo)
+    Deposito(9).registrar(_criar_conta(diario_atual, clientes, contas, novo, 31))
+    construidas = len(contas._snapshot._contas)
+    gravacao = snapshot.compactar(tmp_path, clientes, contas, diario_atual, em_segundo_plano=True)
+    Deposito(1).registrar(contas.buscar("0001", 6))
+    gravacao.join()
+    esperado = _estado(clientes, contas)
+    diario_atual.fechar()
+
+    restaurados = snapshot.restaurar(tmp_path)
+
+    assert construidas == 1
+    assert _estado(*restaurados) == esperado
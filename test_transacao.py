@@ -0,0 +1,92 @@
+"""Testes de concorrência das transações: conservação do dinheiro e ausência de deadlocks."""
+
+import random
+import threading
+
+from conftest import nova_conta
+from historico import TIPOS_CREDITO
+from transacao import Deposito, Saque, Transferencia
+
+
+def _saldo_do_historico(conta, saldo_inicial):
+    historico = conta.historico
+    return saldo_inicial + sum(
+        valor if nome in TIPOS_CREDITO else -valor
+        for nome, valor in zip(map(historico.nome_tipo, historico.tipos), historico.valores)
+    )
+
+
+def test_transferencias_concorrentes_conservam_o_dinheiro():
+    contas = [nova_conta(numero, saldo=100_000) for numero in range(1, 33)]
+    total_inicial = sum(conta.saldo for conta in contas)
+
+    def transferir(semente):
+        gerador = random.Random(semente)
+        for _ in range(2_000):
+            origem, destino = gerador.sample(contas, 2)
+            Transferencia(gerador.randint(1, 5_000), destino).registrar(origem)
+
+    threads = [threading.Thread(target=transferir, args=(semente,)) for semente in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert sum(conta.saldo for conta in contas) == total_inicial
+    for conta in contas:
+        assert conta.saldo == _saldo_do_historico(conta, 100_000)
+
+
+def test_operacoes_concorrentes_na_mesma_conta_nao_perdem_atualizacoes():
+    conta = nova_conta(1)
+
+    def depositar():
+        for _ in range(5_000):
+            Deposito(3).registrar(conta)
+
+    threads = [threading.Thread(target=depositar) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert conta.saldo == 8 * 5_000 * 3
+    assert len(conta.historico.valores) == 8 * 5_000
+
+
+def test_transferencias_cruzadas_nao_causam_deadlock():
+    primeira, segunda = nova_conta(1, saldo=1_000_000), nova_conta(2, saldo=1_000_000)
+
+    def transferir(origem, destino):
+        for _ in range(5_000):
+            Transferencia(1, destino).registrar(origem)
+
+    threads = [
+        threading.Thread(target=transferir, args=pares, daemon=True)
+        for pares in [(primeira, segunda), (segunda, primeira)] * 4
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=60)
+
+    assert not any(thread.is_alive() for thread in threads)
+    assert primeira.saldo + segunda.saldo == 2_000_000
+
+
+def test_transferencia_sem_saldo_nao_altera_as_contas():
+    origem, destino = nova_conta(1, saldo=100), nova_conta(2)
+
+    assert not Transferencia(101, destino).registrar(origem)
+    assert not Transferencia(0, destino).registrar(origem)
+    assert not Transferencia(10, origem).registrar(origem)
+    assert (origem.saldo, destino.saldo) == (100, 0)
+    assert not len(origem.historico.valores) and not len(destino.historico.valores)
+
+
+def test_saque_acima_do_saldo_e_recusado():
+    conta = nova_conta(1, saldo=500)
+
+    assert not Saque(501).registrar(conta)
+    assert Saque(500).registrar(conta)
+    assert conta.saldo == 0
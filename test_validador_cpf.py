@@ -0,0 +1,55 @@
+"""Testes da validação de CPFs em lote, que deve coincidir com `motivo` CPF a CPF."""
+
+import random
+
+import pytest
+
+import validador_cpf
+from validador_cpf import ValidadorCPF
+
+
+def _cpf_valido(gerador):
+    digitos = [gerador.randrange(10) for _ in range(9)]
+    for pesos in (range(10, 1, -1), range(11, 1, -1)):
+        digitos.append(sum(peso * digito for peso, digito in zip(pesos, digitos)) * 10 % 11 % 10)
+    return "".join(map(str, digitos))
+
+
+def _cpfs():
+    gerador = random.Random(8)
+    validos = [_cpf_valido(gerador) for _ in range(200)]
+    return validos + [
+        f"{cpf[:3]}.{cpf[3:6]}.{cpf[6:9]}-{cpf[9:]}" for cpf in validos[:20]
+    ] + [
+        cpf[:10] + str((int(cpf[10]) + 1) % 10) for cpf in validos[:20]
+    ] + [
+        "", "123", "1234567890", "123456789012", "00000000000", "111.111.111-11", "abc",
+        "１２３４５６７８９０９", "١٢٣٤٥٦٧٨٩٠٩", "529.982.247-25", "52998224725 ", "5299822472x5",
+    ]
+
+
+@pytest.mark.parametrize("com_numpy", [True, False])
+def test_validar_lote_coincide_com_motivo(monkeypatch, com_numpy):
+    if com_numpy and validador_cpf.np is None:
+        pytest.skip("NumPy não instalado")
+    if not com_numpy:
+        monkeypatch.setattr(validador_cpf, "np", None)
+    cpfs = _cpfs()
+
+    validos, motivos = ValidadorCPF.validar_lote(cpfs)
+
+    assert [int(motivo) for motivo in motivos] == [ValidadorCPF.motivo(cpf) for cpf in cpfs]
+    assert [bool(valido) for valido in validos] == [ValidadorCPF.validar(cpf) for cpf in cpfs]
+
+
+def test_validar_lote_vazio():
+    validos, motivos = ValidadorCPF.validar_lote([])
+
+    assert len(validos) == len(motivos) == 0
+
+
+def test_motivos():
+    assert ValidadorCPF.motivo("529.982.247-25") == ValidadorCPF.VALIDO
+    assert ValidadorCPF.motivo("529.982.247-26") == ValidadorCPF.DIGITO_VERIFICADOR_INVALIDO
+    assert ValidadorCPF.motivo("999.999.999-99") == ValidadorCPF.DIGITOS_REPETIDOS
+    assert ValidadorCPF.motivo("5299822472") == ValidadorCPF.TAMANHO_INVALIDO
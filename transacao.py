@@ -1,140 +1,375 @@
-"""
-Módulo de transações bancárias.
-
-Este módulo define classes abstratas e concretas para representar transações bancárias,
-como saques e depósitos. As transações são registradas em uma conta bancária específica.
-
-Classes:
-    Transacao: Classe abstrata base para todas as transações bancárias.
-    Saque: Classe para representar uma transação de saque.
-    Deposito: Classe para representar uma transação de depósito.
-
-Exceções:
-    Nenhuma
-
-Funções:
-    Nenhuma
-
-Uso:
-    from conta import Conta
-    from transacoes import Saque, Deposito
-
-    conta = Conta()
-    saque = Saque(100)
-    deposito = Deposito(200)
-
-    saque.registrar(conta)
-    deposito.registrar(conta)
-"""
-
-from abc import ABC, abstractmethod
-from conta import Conta
-
-
-class Transacao(ABC):
-    """
-    Classe abstrata que define uma transação bancária.
-
-    Propriedades:
-        valor (float): Retorna o valor da transação.
-
-    Métodos:
-        registrar(conta: Conta): Registra a transação em uma conta.
-    """
-    @property
-    @abstractmethod
-    def valor(self):
-        """
-        Retorna o valor da transação.
-
-        Este método deve ser implementado por subclasses.
-        """
-        pass
-
-    @abstractmethod
-    def registrar(self, conta):
-        """
-        Registra a transação em uma conta.
-
-        Este método deve ser implementado por subclasses.
-
-        Args:
-            conta (Conta): A conta em que a transação será registrada.
-        """
-        pass
-
-
-class Saque(Transacao):
-    """
-    Classe para representar uma transação de saque.
-
-    Args:
-        valor (float): O valor do saque.
-
-    Propriedades:
-        valor (float): Retorna o valor do saque.
-
-    Métodos:
-        registrar(conta: Conta): Registra o saque em uma conta.
-    """
-    def __init__(self, valor):
-        self._valor = valor
-
-    @property
-    def valor(self):
-        """
-        Retorna o valor do saque.
-
-        Returns:
-            float: O valor do saque.
-        """
-        return self._valor
-
-    def registrar(self, conta: Conta):
-        """
-        Registra o saque em uma conta.
-
-        Args:
-            conta (Conta): A conta em que o saque será registrado.
-        """
-        sucesso_transacao = conta.sacar(self.valor)
-        if sucesso_transacao:
-            conta.historico.adicionar_transacao(self)
-
-
-class Deposito(Transacao):
-    """
-    Classe para representar uma transação de depósito.
-
-    Args:
-        valor (float): O valor do depósito.
-
-    Propriedades:
-        valor (float): Retorna o valor do depósito.
-
-    Métodos:
-        registrar(conta: Conta): Registra o depósito em uma conta.
-    """
-    def __init__(self, valor):
-        self._valor = valor
-
-    @property
-    def valor(self):
-        """
-        Retorna o valor do depósito.
-
-        Returns:
-            float: O valor do depósito.
-        """
-        return self._valor
-
-    def registrar(self, conta: Conta):
-        """
-        Registra o depósito em uma conta.
-
-        Args:
-            conta (Conta): A conta em que o depósito será registrado.
-        """
-        sucesso_transacao = conta.depositar(self.valor)
-        if sucesso_transacao:
-            conta.historico.adicionar_transacao(self)
+"""
+Módulo de transações bancárias.
+
+Este módulo define classes abstratas e concretas para representar transações bancárias,
+como saques, depósitos e transferências. As transações são registradas em uma conta bancária
+específica, mantendo a trava da conta durante a operação e o registro no histórico.
+
+As transações usam `__slots__` e são imutáveis: uma mesma instância pode ser registrada em várias
+contas, sem alocar um objeto novo por operação.
+
+`registrar` retorna o `Resultado` da operação e publica o evento correspondente no destino de eventos
+ativo (veja o módulo eventos), sem escrever no terminal.
+
+Uma transação aprovada é anotada no diário e registrada no histórico com a trava da conta adquirida.
+Antes da anotação, o histórico verifica se aceita a transação (`Historico.verificar`), de modo que uma
+transação recusada pelo histórico não fica no diário; se uma das escritas falhar mesmo assim, a
+alteração do saldo é desfeita antes de a exceção ser propagada. A
+gravação do diário em disco (o fsync do grupo, veja `diario.PoliticaCommit`) é aguardada depois de a
+trava ser liberada, de modo que outras operações na conta não esperam pelo disco.
+
+Uma transação pode levar uma chave de idempotência (`chave`). Se a mesma chave já foi usada na conta,
+`registrar` devolve o resultado guardado no cache ativo (veja o módulo idempotencia) sem repetir a
+operação nem publicar um novo evento.
+
+Classes:
+    Transacao: Classe abstrata base para todas as transações bancárias.
+    Saque: Classe para representar uma transação de saque.
+    Deposito: Classe para representar uma transação de depósito.
+    Transferencia: Classe para representar uma transferência entre duas contas.
+
+Exceções:
+    Nenhuma
+
+Funções:
+    Nenhuma
+
+Uso:
+    from conta import Conta
+    from transacoes import Saque, Deposito
+
+    conta = Conta()
+    saque = Saque(100)
+    deposito = Deposito(200, chave="3f9c-01")
+
+    saque.registrar(conta)
+    deposito.registrar(conta)
+"""
+
+import time
+from abc import ABC, abstractmethod
+from conta import Conta, travar_contas
+import agregados
+import diario
+import dinheiro
+import eventos
+import idempotencia
+
+
+class Transacao(ABC):
+    """
+    Classe abstrata que define uma transação bancária.
+
+    Propriedades:
+        valor (int): Retorna o valor da transação, em centavos.
+        chave (str): Retorna a chave de idempotência da transação, ou None.
+
+    Métodos:
+        registrar(conta: Conta): Registra a transação em uma conta.
+    """
+
+    __slots__ = ()
+
+    @property
+    def chave(self):
+        """
+        Retorna a chave de idempotência da transação.
+
+        Returns:
+            str | None: A chave informada pelo cliente, ou None.
+        """
+        return self._chave
+
+    @property
+    @abstractmethod
+    def valor(self):
+        """
+        Retorna o valor da transação.
+
+        Este método deve ser implementado por subclasses.
+        """
+        pass
+
+    @abstractmethod
+    def registrar(self, conta):
+        """
+        Registra a transação em uma conta.
+
+        Este método deve ser implementado por subclasses.
+
+        Args:
+            conta (Conta): A conta em que a transação será registrada.
+
+        Returns:
+            Resultado: O resultado da transação, verdadeiro apenas em caso de sucesso.
+        """
+        pass
+
+    def _repetida(self, conta):
+        """
+        Retorna o resultado guardado se a chave da transação já foi usada na conta.
+
+        Args:
+            conta (Conta): A conta da transação, cuja trava deve estar adquirida.
+
+        Returns:
+            Resultado | None: O resultado guardado, ou None se a transação deve ser executada.
+        """
+        if self._chave is None:
+            return None
+        return idempotencia.ativo().consultar(conta, self._chave, self.__class__.__name__, self.valor)
+
+    def _memorizar(self, conta, resultado):
+        """
+        Guarda o resultado da transação no cache ativo, se ela tiver chave de idempotência.
+
+        Args:
+            conta (Conta): A conta da transação, cuja trava deve estar adquirida.
+            resultado (Resultado): O resultado da transação.
+        """
+        if self._chave is not None:
+            idempotencia.ativo().memorizar(conta, self._chave, self.__class__.__name__, self.valor, resultado)
+
+    def _concluir(self, conta, variacao):
+        """
+        Anota a transação bem-sucedida no diário, adiciona-a ao histórico da conta e a soma nos agregados
+        ativos, desfazendo a variação já aplicada ao saldo se a verificação do histórico, o diário ou o
+        histórico falharem. O diário só é anotado depois que o histórico aceita a transação.
+
+        Args:
+            conta (Conta): A conta em que a transação foi realizada, cuja trava deve estar adquirida.
+            variacao (int): A variação aplicada ao saldo da conta, em centavos.
+
+        Returns:
+            int | None: A marca da anotação, cuja gravação deve ser confirmada sem a trava da conta.
+        """
+        tipo = self.__class__.__name__
+        timestamp = int(time.time())
+        try:
+            conta.historico.verificar(tipo, self.valor, timestamp)
+            marca = diario.ativo().anotar_transacao(conta, tipo, self.valor, timestamp, aguardar=False)
+            conta.historico.registrar(tipo, self.valor, timestamp)
+        except BaseException:
+            conta._saldo -= variacao
+            raise
+        agregados.ativo().anotar_transacao(conta, tipo, self.valor, timestamp)
+        return marca
+
+
+class Saque(Transacao):
+    """
+    Classe para representar uma transação de saque.
+
+    Args:
+        valor (int): O valor do saque, em centavos.
+        chave (str, optional): A chave de idempotência do saque.
+
+    Raises:
+        ValueError: Se o valor passar do limite de `dinheiro.LIMITE_CENTAVOS`.
+
+    Propriedades:
+        valor (int): Retorna o valor do saque, em centavos.
+
+    Métodos:
+        registrar(conta: Conta): Registra o saque em uma conta.
+    """
+
+    __slots__ = ("_valor", "_chave")
+
+    def __init__(self, valor, chave=None):
+        self._valor = dinheiro.validar_centavos(valor)
+        self._chave = chave
+
+    @property
+    def valor(self):
+        """
+        Retorna o valor do saque.
+
+        Returns:
+            int: O valor do saque, em centavos.
+        """
+        return self._valor
+
+    def registrar(self, conta: Conta):
+        """
+        Registra o saque em uma conta.
+
+        Args:
+            conta (Conta): A conta em que o saque será registrado.
+
+        Returns:
+            Resultado: O resultado do saque.
+        """
+        with conta.trava:
+            repetida = self._repetida(conta)
+            if repetida is not None:
+                return repetida
+            resultado = conta.sacar(self.valor)
+            if resultado:
+                marca = self._concluir(conta, -self.valor)
+            self._memorizar(conta, resultado)
+        if resultado:
+            diario.ativo().confirmar(marca)
+        eventos.ativo().publicar("Saque", conta, self.valor, resultado)
+        return resultado
+
+
+class Deposito(Transacao):
+    """
+    Classe para representar uma transação de depósito.
+
+    Args:
+        valor (int): O valor do depósito, em centavos.
+        chave (str, optional): A chave de idempotência do depósito.
+
+    Raises:
+        ValueError: Se o valor passar do limite de `dinheiro.LIMITE_CENTAVOS`.
+
+    Propriedades:
+        valor (int): Retorna o valor do depósito, em centavos.
+
+    Métodos:
+        registrar(conta: Conta): Registra o depósito em uma conta.
+    """
+
+    __slots__ = ("_valor", "_chave")
+
+    def __init__(self, valor, chave=None):
+        self._valor = dinheiro.validar_centavos(valor)
+        self._chave = chave
+
+    @property
+    def valor(self):
+        """
+        Retorna o valor do depósito.
+
+        Returns:
+            int: O valor do depósito, em centavos.
+        """
+        return self._valor
+
+    def registrar(self, conta: Conta):
+        """
+        Registra o depósito em uma conta.
+
+        Args:
+            conta (Conta): A conta em que o depósito será registrado.
+
+        Returns:
+            Resultado: O resultado do depósito.
+        """
+        with conta.trava:
+            repetida = self._repetida(conta)
+            if repetida is not None:
+                return repetida
+            resultado = conta.depositar(self.valor)
+            if resultado:
+                marca = self._concluir(conta, self.valor)
+            self._memorizar(conta, resultado)
+        if resultado:
+            diario.ativo().confirmar(marca)
+        eventos.ativo().publicar("Deposito", conta, self.valor, resultado)
+        return resultado
+
+
+class Transferencia(Transacao):
+    """
+    Classe para representar uma transferência entre duas contas.
+
+    A conta informada em `registrar` é a conta de origem. O débito na origem, o crédito no destino,
+    os registros nos dois históricos e a anotação no diário são feitos com as travas das duas contas
+    adquiridas em ordem fixa, o que torna a transferência atômica e livre de deadlocks; a gravação do
+    diário em disco é aguardada depois de liberá-las.
+
+    Args:
+        valor (int): O valor da transferência, em centavos.
+        destino (Conta): A conta que recebe o valor.
+        chave (str, optional): A chave de idempotência da transferência, válida na conta de origem.
+
+    Raises:
+        ValueError: Se o valor passar do limite de `dinheiro.LIMITE_CENTAVOS`.
+
+    Propriedades:
+        valor (int): Retorna o valor da transferência, em centavos.
+        destino (Conta): Retorna a conta de destino.
+
+    Métodos:
+        registrar(conta: Conta): Registra a transferência a partir de uma conta de origem.
+    """
+
+    __slots__ = ("_valor", "_destino", "_chave")
+
+    def __init__(self, valor, destino, chave=None):
+        self._valor = dinheiro.validar_centavos(valor)
+        self._destino = destino
+        self._chave = chave
+
+    @property
+    def valor(self):
+        """
+        Retorna o valor da transferência.
+
+        Returns:
+            int: O valor da transferência, em centavos.
+        """
+        return self._valor
+
+    @property
+    def destino(self):
+        """
+        Retorna a conta de destino.
+
+        Returns:
+            Conta: A conta que recebe o valor.
+        """
+        return self._destino
+
+    def registrar(self, conta: Conta):
+        """
+        Registra a transferência a partir de uma conta de origem.
+
+        Args:
+            conta (Conta): A conta de origem, da qual o valor será debitado.
+
+        Returns:
+            Resultado: O resultado da transferência.
+        """
+        with travar_contas(conta, self.destino):
+            repetida = self._repetida(conta)
+            if repetida is not None:
+                return repetida
+            resultado = conta.transferir(self.destino, self.valor)
+            if resultado:
+                marca = self._concluir_transferencia(conta)
+            self._memorizar(conta, resultado)
+        if resultado:
+            diario.ativo().confirmar(marca)
+        eventos.ativo().publicar("Transferencia", conta, self.valor, resultado)
+        return resultado
+
+    def _concluir_transferencia(self, conta):
+        """
+        Anota a transferência bem-sucedida no diário, adiciona-a aos dois históricos e a soma nos
+        agregados ativos, desfazendo o débito e o crédito se a verificação dos históricos, o diário ou um
+        histórico falharem. O diário só é anotado depois que os dois históricos aceitam a transferência.
+
+        Args:
+            conta (Conta): A conta de origem; as travas das duas contas devem estar adquiridas.
+
+        Returns:
+            int | None: A marca da anotação, cuja gravação deve ser confirmada sem as travas das contas.
+        """
+        destino = self.destino
+        timestamp = int(time.time())
+        try:
+            conta.historico.verificar("Transferencia", self.valor, timestamp)
+            destino.historico.verificar("TransferenciaRecebida", self.valor, timestamp)
+            marca = diario.ativo().anotar_transferencia(conta, destino, self.valor, timestamp, aguardar=False)
+            conta.historico.registrar("Transferencia", self.valor, timestamp)
+            destino.historico.registrar("TransferenciaRecebida", self.valor, timestamp)
+        except BaseException:
+            conta._saldo += self.valor
+            destino._saldo -= self.valor
+            raise
+        agregados.ativo().anotar_transferencia(conta, destino, self.valor, timestamp)
+        return marca
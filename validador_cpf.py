@@ -1,37 +1,170 @@
-class ValidadorCPF:
-    """
-    Classe para validação de CPF (Cadastro de Pessoas Físicas) brasileiros.
-
-    Esta classe contém um método estático para validar se um CPF fornecido é válido,
-    conforme as regras definidas pela Receita Federal do Brasil.
-
-    Methods:
-        validar(cpf: str) -> bool
-            Valida o número de CPF fornecido.
-    """
-
-    @staticmethod
-    def validar(cpf):
-        """
-        Valida um número de CPF.
-
-        Este método remove todos os caracteres não numéricos do CPF fornecido e verifica se ele possui 11 dígitos.
-        Em seguida, ele realiza os cálculos dos dígitos verificadores para determinar se o CPF é válido.
-
-        Args:
-            cpf (str): O número de CPF a ser validado.
-
-        Returns:
-            bool: True se o CPF for válido, False caso contrário.
-        """
-        cpf = ''.join(filter(str.isdigit, cpf))
-        if len(cpf) != 11 or cpf == cpf[0] * len(cpf):
-            return False
-
-        for i in range(9, 11):
-            soma = sum(int(cpf[num]) * ((i + 1) - num) for num in range(0, i))
-            digito = ((soma * 10) % 11) % 10
-            if digito != int(cpf[i]):
-                return False
-
-        return True
+from array import array
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - NumPy é opcional
+    np = None
+
+_APENAS_DIGITOS = str.maketrans("", "", "".join(chr(c) for c in range(128) if not chr(c).isdigit()))
+_PESOS_PRIMEIRO_DIGITO = tuple(range(10, 1, -1))
+_PESOS_SEGUNDO_DIGITO = tuple(range(11, 1, -1))
+
+
+class ValidadorCPF:
+    """
+    Classe para validação de CPF (Cadastro de Pessoas Físicas) brasileiros.
+
+    Esta classe contém métodos estáticos para validar se um CPF fornecido é válido,
+    conforme as regras definidas pela Receita Federal do Brasil.
+
+    Attributes:
+        VALIDO (int): Código de motivo para CPF válido.
+        TAMANHO_INVALIDO (int): Código de motivo para CPF que não possui 11 dígitos.
+        DIGITOS_REPETIDOS (int): Código de motivo para CPF com todos os dígitos iguais.
+        DIGITO_VERIFICADOR_INVALIDO (int): Código de motivo para CPF com dígito verificador incorreto.
+
+    Methods:
+        validar(cpf: str) -> bool
+            Valida o número de CPF fornecido.
+        motivo(cpf: str) -> int
+            Retorna o código de motivo da validação do CPF fornecido.
+        validar_lote(cpfs: iterable) -> tuple
+            Valida vários números de CPF de uma só vez.
+    """
+
+    VALIDO = 0
+    TAMANHO_INVALIDO = 1
+    DIGITOS_REPETIDOS = 2
+    DIGITO_VERIFICADOR_INVALIDO = 3
+
+    @staticmethod
+    def validar(cpf):
+        """
+        Valida um número de CPF.
+
+        Este método remove todos os caracteres não numéricos do CPF fornecido e verifica se ele possui 11 dígitos.
+        Em seguida, ele realiza os cálculos dos dígitos verificadores para determinar se o CPF é válido.
+
+        Args:
+            cpf (str): O número de CPF a ser validado.
+
+        Returns:
+            bool: True se o CPF for válido, False caso contrário.
+        """
+        return ValidadorCPF.motivo(cpf) == ValidadorCPF.VALIDO
+
+    @staticmethod
+    def motivo(cpf):
+        """
+        Retorna o código de motivo da validação de um número de CPF.
+
+        Args:
+            cpf (str): O número de CPF a ser validado.
+
+        Returns:
+            int: `VALIDO`, `TAMANHO_INVALIDO`, `DIGITOS_REPETIDOS` ou `DIGITO_VERIFICADOR_INVALIDO`.
+        """
+        cpf = ''.join(filter(str.isdigit, cpf))
+        if len(cpf) != 11:
+            return ValidadorCPF.TAMANHO_INVALIDO
+        if cpf == cpf[0] * len(cpf):
+            return ValidadorCPF.DIGITOS_REPETIDOS
+
+        for i in range(9, 11):
+            soma = sum(int(cpf[num]) * ((i + 1) - num) for num in range(0, i))
+            digito = ((soma * 10) % 11) % 10
+            if digito != int(cpf[i]):
+                return ValidadorCPF.DIGITO_VERIFICADOR_INVALIDO
+
+        return ValidadorCPF.VALIDO
+
+    @staticmethod
+    def validar_lote(cpfs):
+        """
+        Valida vários números de CPF de uma só vez.
+
+        Os CPFs são normalizados e concatenados em um único buffer, do qual os de 11 dígitos são
+        extraídos como uma matriz de dígitos uint8; os dígitos verificadores são então calculados de
+        forma vetorizada com NumPy. Sem NumPy, o cálculo é
+        feito CPF a CPF. O resultado é sempre idêntico ao de `validar` e `motivo`.
+
+        Args:
+            cpfs (iterable): Os números de CPF a serem validados.
+
+        Returns:
+            tuple: A máscara de CPFs válidos e os códigos de motivo, na ordem recebida. São arrays
+            NumPy (`bool` e `uint8`) quando o NumPy está disponível, ou uma lista de bool e um
+            `array('B')` caso contrário.
+        """
+        if np is None:
+            motivos = array("B", map(ValidadorCPF._motivo_normalizado, map(ValidadorCPF._normalizar, cpfs)))
+            return [motivo == ValidadorCPF.VALIDO for motivo in motivos], motivos
+
+        normalizados = list(map(ValidadorCPF._normalizar, cpfs))
+        especiais = {}
+        texto = "".join(normalizados)
+        if not texto.isascii():
+            for indice, cpf in enumerate(normalizados):
+                if not cpf.isascii():
+                    especiais[indice] = ValidadorCPF._motivo_normalizado(cpf)
+                    normalizados[indice] = ""
+            texto = "".join(normalizados)
+
+        tamanhos = np.fromiter(map(len, normalizados), dtype=np.int64, count=len(normalizados))
+        motivos = np.full(len(normalizados), ValidadorCPF.TAMANHO_INVALIDO, dtype=np.uint8)
+        onze = np.flatnonzero(tamanhos == 11)
+        if len(onze):
+            inicios = np.cumsum(tamanhos) - tamanhos
+            buffer = np.frombuffer(texto.encode("ascii"), dtype=np.uint8)
+            matriz = (buffer[inicios[onze, None] + np.arange(11)] - ord("0")).astype(np.int32)
+            primeiro = (matriz[:, :9] @ np.array(_PESOS_PRIMEIRO_DIGITO) * 10 % 11) % 10
+            segundo = (matriz[:, :10] @ np.array(_PESOS_SEGUNDO_DIGITO) * 10 % 11) % 10
+            repetidos = (matriz == matriz[:, :1]).all(axis=1)
+            corretos = (primeiro == matriz[:, 9]) & (segundo == matriz[:, 10])
+            motivos[onze] = np.where(
+                repetidos,
+                ValidadorCPF.DIGITOS_REPETIDOS,
+                np.where(corretos, ValidadorCPF.VALIDO, ValidadorCPF.DIGITO_VERIFICADOR_INVALIDO),
+            )
+        for indice, motivo in especiais.items():
+            motivos[indice] = motivo
+        return motivos == ValidadorCPF.VALIDO, motivos
+
+    @staticmethod
+    def _normalizar(cpf):
+        """
+        Remove todos os caracteres não numéricos do CPF, com atalho para textos ASCII.
+
+        Args:
+            cpf (str): O número de CPF.
+
+        Returns:
+            str: O CPF contendo somente dígitos.
+        """
+        if cpf.isascii():
+            return cpf if cpf.isdigit() else cpf.translate(_APENAS_DIGITOS)
+        return ''.join(filter(str.isdigit, cpf))
+
+    @staticmethod
+    def _motivo_normalizado(cpf):
+        """
+        Retorna o código de motivo de um CPF já normalizado, sem recalcular a normalização.
+
+        Args:
+            cpf (str): O CPF contendo somente dígitos.
+
+        Returns:
+            int: O código de motivo, igual ao de `motivo`.
+        """
+        if len(cpf) != 11:
+            return ValidadorCPF.TAMANHO_INVALIDO
+        if not cpf.isascii():
+            return ValidadorCPF.motivo(cpf)
+        if cpf == cpf[0] * 11:
+            return ValidadorCPF.DIGITOS_REPETIDOS
+        numeros = [ord(digito) - 48 for digito in cpf]
+        primeiro = sum(map(int.__mul__, numeros, _PESOS_PRIMEIRO_DIGITO)) * 10 % 11 % 10
+        segundo = sum(map(int.__mul__, numeros, _PESOS_SEGUNDO_DIGITO)) * 10 % 11 % 10
+        if primeiro != numeros[9] or segundo != numeros[10]:
+            return ValidadorCPF.DIGITO_VERIFICADOR_INVALIDO
+        return ValidadorCPF.VALIDO